@@ -7,6 +7,12 @@ mkdir -p /actinia_core/workspace/temp_db
 mkdir -p /actinia_core/workspace/tmp
 mkdir -p /actinia_core/resources
 
+# Share the prometheus metrics of all gunicorn workers and jobs, the directory
+# must be empty at server start
+export PROMETHEUS_MULTIPROC_DIR=/actinia_core/workspace/metrics
+rm -rf $PROMETHEUS_MULTIPROC_DIR
+mkdir -p $PROMETHEUS_MULTIPROC_DIR
+
 # Create default location in mounted (!) directory
 [ ! -d "/actinia_core/grassdb/nc_spm_08" ] && grass -e -c 'EPSG:3358' /actinia_core/grassdb/nc_spm_08
 
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Fan-out of a process chain template over a table of parameters
+"""
+
+import re
+
+from actinia_core.core.common.exceptions import AsyncProcessError
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The pattern of the parameter placeholders in a process chain template,
+# e.g. {{mapset}}
+PARAMETER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# The parameter that specifies the target mapset of a batch job
+MAPSET_PARAMETER = "mapset"
+# The states of finished jobs
+FINISHED_STATES = ("finished", "error", "terminated", "timeout")
+
+
+def get_template_parameters(template):
+    """Return the names of the parameters that a process chain template
+    references
+
+    Args:
+        template: The process chain template or a part of it
+
+    Returns:
+        set:
+        The parameter names
+    """
+    if isinstance(template, dict):
+        return set().union(*[get_template_parameters(value)
+                             for value in template.values()])
+    if isinstance(template, list):
+        return set().union(*[get_template_parameters(value)
+                             for value in template])
+    if isinstance(template, str):
+        return set(PARAMETER_PATTERN.findall(template))
+    return set()
+
+
+def render_process_chain_template(template, parameters):
+    """Replace the parameter placeholders of a process chain template
+
+    A string that consists of a single placeholder is replaced by the
+    parameter value, so that numbers and lists keep their type. Placeholders
+    inside of strings are replaced by the string representation of the
+    parameter value.
+
+    Args:
+        template: The process chain template or a part of it
+        parameters (dict): The parameter values
+
+    Returns:
+        The process chain
+    """
+    if isinstance(template, dict):
+        return {key: render_process_chain_template(value, parameters)
+                for key, value in template.items()}
+    if isinstance(template, list):
+        return [render_process_chain_template(value, parameters)
+                for value in template]
+    if isinstance(template, str):
+        match = PARAMETER_PATTERN.fullmatch(template.strip())
+        if match is not None:
+            return parameters[match.group(1)]
+        return PARAMETER_PATTERN.sub(
+            lambda match: str(parameters[match.group(1)]), template)
+    return template
+
+
+def check_batch_definition(batch, max_jobs):
+    """Check a batch definition before its jobs are created
+
+    The process chain template is checked once: all parameters it references
+    must be defined for each job, the jobs must use different mapsets and the
+    number of jobs must not exceed the limit.
+
+    Args:
+        batch (dict): The batch definition with the process chain template
+                      and the list of job parameters
+        max_jobs (int): The maximum number of jobs
+
+    Raises:
+        AsyncProcessError: If the batch definition is wrong
+
+    Returns:
+        tuple:
+        (template, parameter_list)
+    """
+    if not isinstance(batch, dict):
+        raise AsyncProcessError("The batch definition must be a JSON object")
+    template = batch.get("process_chain")
+    if not isinstance(template, dict) or "list" not in template:
+        raise AsyncProcessError(
+            "The batch definition requires a process chain template")
+    parameter_list = batch.get("parameters")
+    if not isinstance(parameter_list, list) or len(parameter_list) == 0:
+        raise AsyncProcessError(
+            "The batch definition requires a non-empty list of parameters")
+    if len(parameter_list) > max_jobs:
+        raise AsyncProcessError(
+            "Batch limit exceeded, a maximum of %i jobs are allowed in a "
+            "batch." % max_jobs)
+
+    names = get_template_parameters(template)
+    mapsets = {}
+    for count, parameters in enumerate(parameter_list):
+        if not isinstance(parameters, dict):
+            raise AsyncProcessError(
+                "The parameters of job %i must be a JSON object" % count)
+        missing = names - set(parameters)
+        if missing:
+            raise AsyncProcessError(
+                "The parameters <%s> of job %i are missing"
+                % (", ".join(sorted(missing)), count))
+        if MAPSET_PARAMETER in parameters \
+                and not isinstance(parameters[MAPSET_PARAMETER], str):
+            raise AsyncProcessError(
+                "The mapset of job %i must be a string" % count)
+        # Persistent jobs of the same mapset would overwrite their results
+        if MAPSET_PARAMETER in parameters:
+            mapset = parameters[MAPSET_PARAMETER]
+            if mapset in mapsets:
+                raise AsyncProcessError(
+                    "The mapset <%s> of job %i is already used by job %i"
+                    % (mapset, count, mapsets[mapset]))
+            mapsets[mapset] = count
+
+    return template, parameter_list
+
+
+def aggregate_batch_status(job_list):
+    """Aggregate the states of the jobs of a batch
+
+    Args:
+        job_list (list): The status documents of the jobs, None if the status
+                         of a job is not available
+
+    Returns:
+        tuple:
+        (status, summary, progress) with the batch status, the number of jobs
+        for each status and the number of finished and total jobs
+    """
+    summary = {}
+    for job in job_list:
+        status = job["status"] if job is not None else "error"
+        summary[status] = summary.get(status, 0) + 1
+
+    num_finished = sum(summary.get(status, 0) for status in FINISHED_STATES)
+    if num_finished < len(job_list):
+        if num_finished > 0 or summary.get("running", 0) > 0:
+            status = "running"
+        else:
+            status = "accepted"
+    elif summary.get("finished", 0) == len(job_list):
+        status = "finished"
+    elif summary.get("terminated", 0) == len(job_list):
+        status = "terminated"
+    else:
+        status = "error"
+
+    progress = {"step": num_finished, "num_of_steps": len(job_list)}
+    return status, summary, progress
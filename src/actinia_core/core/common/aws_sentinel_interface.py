@@ -24,15 +24,24 @@
 """
 Storage base class
 """
-from urllib.request import urlopen
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
 from flask.json import loads as json_loads
 from flask.json import dumps as json_dumps
+from requests.adapters import HTTPAdapter
 
 __license__ = "GPLv3"
 __author__ = "Sören Gebbert, Anika Weinmann"
 __copyright__ = "Copyright 2016-2021, Sören Gebbert and mundialis GmbH & Co. KG"
 __maintainer__ = "mundialis"
 
+# The directory in the download cache that stores immutable product metadata
+METADATA_CACHE_NAME = ".metadata"
+
 
 def get_sentinel_date(product_id):
     """Returns year month and day of a (AWS) Sentinel scene from the Sentinel product-id.
@@ -60,6 +69,71 @@ def get_sentinel_date(product_id):
     return year, month, day
 
 
+class MetadataCache(object):
+    """A persistent file cache of immutable JSON metadata files
+
+    Each cached file is written atomically, so that concurrent jobs never
+    read incomplete metadata.
+    """
+
+    def __init__(self, cache_path):
+        """
+
+        Args:
+            cache_path (str): The directory of the cache
+
+        """
+        self.cache_path = cache_path
+
+    def get_cache_file_path(self, url):
+        """Return the path of the cache file of a metadata URL
+
+        Args:
+            url (str): The URL of the metadata file
+
+        Returns:
+            str:
+            The cache file path
+        """
+        name = urlsplit(url).path.strip("/").replace("/", "_")
+        return os.path.join(self.cache_path, name)
+
+    def get(self, url):
+        """Return the cached metadata file content
+
+        Args:
+            url (str): The URL of the metadata file
+
+        Returns:
+            bytes:
+            The content of the metadata file or None if not in cache
+        """
+        try:
+            with open(self.get_cache_file_path(url), "rb") as cache_file:
+                return cache_file.read()
+        except OSError:
+            return None
+
+    def set(self, url, content):
+        """Store the content of a metadata file
+
+        Args:
+            url (str): The URL of the metadata file
+            content (bytes): The content of the metadata file
+
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_path, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, self.get_cache_file_path(url))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
 class AWSSentinel2AInterface(object):
     """Query interface to the Sentinel2 and Landsat public geo-data
     available in the google cloud storage
@@ -75,6 +149,11 @@ class AWSSentinel2AInterface(object):
         self.aws_sentinel_base_eu_central_url = (
             "http://sentinel-s2-l1c.s3-website.eu-central-1.amazonaws.com")
         self.config = config
+        self.metadata_cache = None
+        if config.METADATA_CACHE is True:
+            self.metadata_cache = MetadataCache(os.path.join(
+                config.DOWNLOAD_CACHE, METADATA_CACHE_NAME, "sentinel2"))
+        self.max_connections = max(1, config.DOWNLOAD_MAX_CONNECTIONS)
 
         self.sentinel_bands = ["B01", "B02", "B03", "B04", "B05", "B06", "B07",
                                "B08", "B8A", "B09", "B10", "B11", "B12"]
@@ -156,11 +235,11 @@ class AWSSentinel2AInterface(object):
                 if band not in self.sentinel_bands:
                     raise Exception("Unknown Sentinel-2 band name <%s>" % band)
 
-            result = []
+            product_ids = [product_id.replace(".SAFE", "")
+                           for product_id in product_ids]
+            json_urls = []
 
             for product_id in product_ids:
-                product_id = product_id.replace(".SAFE", "")
-
                 year, month, day = get_sentinel_date(product_id)
 
                 # Get the product info JSON file
@@ -170,17 +249,12 @@ class AWSSentinel2AInterface(object):
                                                  "month": month,
                                                  "day": day,
                                                  "id": product_id}
+                json_urls.append(json_url)
 
-                response = urlopen(json_url)
-                product_info = response.read()
-
-                try:
-                    info = json_loads(product_info)
-                except Exception:
-                    raise Exception(
-                        "Unable to read the productInfo.json file from URL: "
-                        "%s. Error: %s" % (json_url, product_info))
+            result = []
 
+            for product_id, info in zip(product_ids,
+                                        self._get_json_files(json_urls)):
                 if info:
                     scene_entry = self._parse_scene_info(bands, product_id, info)
                     result.append(scene_entry)
@@ -190,6 +264,65 @@ class AWSSentinel2AInterface(object):
         except Exception:
             raise
 
+    def _get_json_file(self, url, session=None):
+        """Return the content of an immutable JSON metadata file from the
+        metadata cache or download it
+
+        Args:
+            url (str): The URL of the JSON file
+            session (requests.Session): The HTTP session to use
+
+        Returns:
+            dict:
+            The content of the JSON file
+        """
+        if self.metadata_cache is not None:
+            content = self.metadata_cache.get(url)
+            if content is not None:
+                return json_loads(content)
+
+        response = (session or requests).get(url, timeout=60)
+        response.raise_for_status()
+        content = response.content
+
+        try:
+            info = json_loads(content)
+        except Exception:
+            raise Exception(
+                "Unable to read the json file from URL: "
+                "%s. Error: %s" % (url, content))
+
+        if self.metadata_cache is not None:
+            try:
+                self.metadata_cache.set(url, content)
+            except OSError:
+                pass
+        return info
+
+    def _get_json_files(self, urls):
+        """Return the content of immutable JSON metadata files, the files
+        that are not in the metadata cache are downloaded concurrently
+
+        Args:
+            urls (list): The URLs of the JSON files
+
+        Returns:
+            list:
+            The content of the JSON files in the order of the URLs
+        """
+        if len(urls) < 2:
+            return [self._get_json_file(url) for url in urls]
+
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_connections=self.max_connections,
+                                  pool_maxsize=self.max_connections)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            with ThreadPoolExecutor(max_workers=min(
+                    self.max_connections, len(urls))) as executor:
+                return list(executor.map(
+                    lambda url: self._get_json_file(url, session), urls))
+
     def _parse_scene_info(self, bands, product_id, info):
         """Helpher method to parse the Sentinel-2 scene info:
         1. Parse the product info and extract the tile urls
@@ -283,13 +416,5 @@ class AWSSentinel2AInterface(object):
 
         """
         # Get the tile info url that contains the tile footprint geojson
-        response = urlopen(tile_entry["info"])
-        tile_info = response.read()
-
-        try:
-            info = json_loads(tile_info)
-        except Exception:
-            raise Exception(
-                "Unable to read the info json file from URL: %s. Error: %s"
-                % (tile_entry["info"], tile_info))
+        info = self._get_json_file(tile_entry["info"])
         return json_dumps(info["tileDataGeometry"])
@@ -179,11 +179,82 @@ class Configuration(object):
         self.DOWNLOAD_CACHE = "/tmp/download_cache"
         # The quota of the download cache in Gigabit
         self.DOWNLOAD_CACHE_QUOTA = 100
+        # If True remote files of the importer are cached in a download cache
+        # that is shared between all jobs and users
+        self.DOWNLOAD_CACHE_SHARED = True
+        # The maximum number of concurrent downloads of a job in total and
+        # from a single host
+        self.DOWNLOAD_MAX_CONNECTIONS = 8
+        self.DOWNLOAD_MAX_CONNECTIONS_PER_HOST = 4
+        # The size in megabyte of the GDAL cache of HTTP range requests, that
+        # is used if only the region window of remote rasters is imported
+        self.VSICURL_CACHE_SIZE = 256
+        # If True the immutable metadata files of satellite products are
+        # cached in the download cache
+        self.METADATA_CACHE = True
+        # The time in seconds the results of Google BigQuery archive queries
+        # are cached in the metadata cache. Set 0 to disable
+        self.BIGQUERY_CACHE_TTL = 3600
+        # The maximum number of processes of a job that run concurrently, if
+        # the process list provides the dependencies between its processes.
+        # The dependencies of process chains are inferred from the map names,
+        # other dependencies like a shared attribute database are not detected.
+        # The default 1 runs the processes in the order of the process list
+        self.PROCESS_MAX_PARALLEL = 1
+        # The modules that compute each cell from a bounded neighborhood and
+        # can be executed tile-parallel. The r.mapcalc expressions must not
+        # depend on the position of a cell in the region
+        self.TILE_SAFE_MODULES = [
+            "r.mapcalc", "r.slope.aspect", "r.neighbors", "r.relief",
+            "r.shade", "r.recode", "r.resample", "r.resamp.interp",
+            "r.resamp.stats", "r.series", "r.grow", "r.param.scale",
+            "r.texture", "r.geomorphon", "i.vi"]
+        # The maximum number of jobs of a batch submission
+        self.BATCH_MAX_JOBS = 1000
         # If True the interim results (temporary mapset) are saved
         self.SAVE_INTERIM_RESULTS = False
         # Type of queue. Can be "local" or "redis". If redis is set, job can
         # be received and executed from different actinia instances
         self.QUEUE_TYPE = "local"
+        # The time in seconds a validated process chain is cached in the redis
+        # server, identical process chains are not converted and checked
+        # again within this time. Set 0 to disable the cache
+        self.PROCESS_CHAIN_CACHE_TTL = 600
+        # The time in seconds the result of the access and mimetype check of
+        # an import URL is cached in the redis server. Set 0 to disable
+        self.URL_CHECK_CACHE_TTL = 300
+        # The time in seconds the items of a STAC search are cached in the
+        # redis server. Set 0 to disable
+        self.STAC_SEARCH_CACHE_TTL = 600
+        # The file that switches the node into drain mode if it exists, new
+        # jobs are rejected and the readiness check fails while running jobs
+        # are finished. It must be located on a node-local file system
+        self.DRAIN_FILE = "%s/actinia/workspace/drain" % home
+        # The minimum free disk space in GB of the temporary database that
+        # is required for the readiness of the node
+        self.READINESS_MIN_FREE_DISK = 1.0
+        # The time in seconds after which an unresponsive process queue
+        # manager fails the readiness check
+        self.READINESS_QUEUE_TIMEOUT = 30
+        # The directory to cache the rendered raster map tiles
+        self.TILE_CACHE = "%s/actinia/workspace/tile_cache" % home
+        # The maximum zoom level of the raster map tiles
+        self.TILE_CACHE_MAX_ZOOM = 20
+        # The maximum number of tiles of a tile seeding job
+        self.TILE_CACHE_MAX_SEED_TILES = 10000
+        # The directory to cache the rendered PNG images of the raster and
+        # vector renderers, an empty string disables the cache
+        self.RENDER_CACHE = "%s/actinia/workspace/render_cache" % home
+        # The maximum size of the render cache in MB
+        self.RENDER_CACHE_QUOTA = 1024
+        # If True raster maps are rendered in the API process with GDAL and
+        # NumPy instead of a d.rast job, if GDAL provides the GRASS driver
+        self.RENDER_IN_PROCESS = False
+        # The number of threads of the in-process raster renderer
+        self.RENDER_IN_PROCESS_THREADS = 4
+        # The maximum number of pixel of an image that is rendered in-process,
+        # larger images are rendered by d.rast
+        self.RENDER_IN_PROCESS_MAX_PIXELS = 4000000
 
         """
         LOGGING
@@ -303,10 +374,43 @@ class Configuration(object):
         config.add_section('MISC')
         config.set('MISC', 'DOWNLOAD_CACHE', self.DOWNLOAD_CACHE)
         config.set('MISC', 'DOWNLOAD_CACHE_QUOTA', str(self.DOWNLOAD_CACHE_QUOTA))
+        config.set('MISC', 'DOWNLOAD_CACHE_SHARED',
+                   str(self.DOWNLOAD_CACHE_SHARED))
+        config.set('MISC', 'DOWNLOAD_MAX_CONNECTIONS',
+                   str(self.DOWNLOAD_MAX_CONNECTIONS))
+        config.set('MISC', 'DOWNLOAD_MAX_CONNECTIONS_PER_HOST',
+                   str(self.DOWNLOAD_MAX_CONNECTIONS_PER_HOST))
+        config.set('MISC', 'VSICURL_CACHE_SIZE', str(self.VSICURL_CACHE_SIZE))
+        config.set('MISC', 'METADATA_CACHE', str(self.METADATA_CACHE))
+        config.set('MISC', 'BIGQUERY_CACHE_TTL', str(self.BIGQUERY_CACHE_TTL))
+        config.set('MISC', 'PROCESS_MAX_PARALLEL', str(self.PROCESS_MAX_PARALLEL))
+        config.set('MISC', 'TILE_SAFE_MODULES', str(self.TILE_SAFE_MODULES))
+        config.set('MISC', 'BATCH_MAX_JOBS', str(self.BATCH_MAX_JOBS))
         config.set('MISC', 'TMP_WORKDIR', self.TMP_WORKDIR)
         config.set('MISC', 'SECRET_KEY', self.SECRET_KEY)
         config.set('MISC', 'SAVE_INTERIM_RESULTS', str(self.SAVE_INTERIM_RESULTS))
         config.set('MISC', 'QUEUE_TYPE', self.QUEUE_TYPE)
+        config.set('MISC', 'PROCESS_CHAIN_CACHE_TTL',
+                   str(self.PROCESS_CHAIN_CACHE_TTL))
+        config.set('MISC', 'URL_CHECK_CACHE_TTL', str(self.URL_CHECK_CACHE_TTL))
+        config.set('MISC', 'STAC_SEARCH_CACHE_TTL',
+                   str(self.STAC_SEARCH_CACHE_TTL))
+        config.set('MISC', 'DRAIN_FILE', self.DRAIN_FILE)
+        config.set('MISC', 'READINESS_MIN_FREE_DISK',
+                   str(self.READINESS_MIN_FREE_DISK))
+        config.set('MISC', 'READINESS_QUEUE_TIMEOUT',
+                   str(self.READINESS_QUEUE_TIMEOUT))
+        config.set('MISC', 'TILE_CACHE', self.TILE_CACHE)
+        config.set('MISC', 'TILE_CACHE_MAX_ZOOM', str(self.TILE_CACHE_MAX_ZOOM))
+        config.set('MISC', 'TILE_CACHE_MAX_SEED_TILES',
+                   str(self.TILE_CACHE_MAX_SEED_TILES))
+        config.set('MISC', 'RENDER_CACHE', self.RENDER_CACHE)
+        config.set('MISC', 'RENDER_CACHE_QUOTA', str(self.RENDER_CACHE_QUOTA))
+        config.set('MISC', 'RENDER_IN_PROCESS', str(self.RENDER_IN_PROCESS))
+        config.set('MISC', 'RENDER_IN_PROCESS_THREADS',
+                   str(self.RENDER_IN_PROCESS_THREADS))
+        config.set('MISC', 'RENDER_IN_PROCESS_MAX_PIXELS',
+                   str(self.RENDER_IN_PROCESS_MAX_PIXELS))
 
         config.add_section('LOGGING')
         config.set('LOGGING', 'LOG_INTERFACE', self.LOG_INTERFACE)
@@ -444,6 +548,33 @@ class Configuration(object):
                 if config.has_option("MISC", "DOWNLOAD_CACHE_QUOTA"):
                     self.DOWNLOAD_CACHE_QUOTA = config.getint(
                         "MISC", "DOWNLOAD_CACHE_QUOTA")
+                if config.has_option("MISC", "DOWNLOAD_CACHE_SHARED"):
+                    self.DOWNLOAD_CACHE_SHARED = config.getboolean(
+                        "MISC", "DOWNLOAD_CACHE_SHARED")
+                if config.has_option("MISC", "DOWNLOAD_MAX_CONNECTIONS"):
+                    self.DOWNLOAD_MAX_CONNECTIONS = config.getint(
+                        "MISC", "DOWNLOAD_MAX_CONNECTIONS")
+                if config.has_option("MISC", "DOWNLOAD_MAX_CONNECTIONS_PER_HOST"):
+                    self.DOWNLOAD_MAX_CONNECTIONS_PER_HOST = config.getint(
+                        "MISC", "DOWNLOAD_MAX_CONNECTIONS_PER_HOST")
+                if config.has_option("MISC", "VSICURL_CACHE_SIZE"):
+                    self.VSICURL_CACHE_SIZE = config.getint(
+                        "MISC", "VSICURL_CACHE_SIZE")
+                if config.has_option("MISC", "METADATA_CACHE"):
+                    self.METADATA_CACHE = config.getboolean(
+                        "MISC", "METADATA_CACHE")
+                if config.has_option("MISC", "BIGQUERY_CACHE_TTL"):
+                    self.BIGQUERY_CACHE_TTL = config.getint(
+                        "MISC", "BIGQUERY_CACHE_TTL")
+                if config.has_option("MISC", "PROCESS_MAX_PARALLEL"):
+                    self.PROCESS_MAX_PARALLEL = config.getint(
+                        "MISC", "PROCESS_MAX_PARALLEL")
+                if config.has_option("MISC", "TILE_SAFE_MODULES"):
+                    self.TILE_SAFE_MODULES = ast.literal_eval(
+                        config.get("MISC", "TILE_SAFE_MODULES"))
+                if config.has_option("MISC", "BATCH_MAX_JOBS"):
+                    self.BATCH_MAX_JOBS = config.getint(
+                        "MISC", "BATCH_MAX_JOBS")
                 if config.has_option("MISC", "TMP_WORKDIR"):
                     self.TMP_WORKDIR = config.get("MISC", "TMP_WORKDIR")
                 if config.has_option("MISC", "SECRET_KEY"):
@@ -456,6 +587,45 @@ class Configuration(object):
                 if config.has_option("MISC", "QUEUE_TYPE"):
                     self.QUEUE_TYPE = config.get(
                         "MISC", "QUEUE_TYPE")
+                if config.has_option("MISC", "PROCESS_CHAIN_CACHE_TTL"):
+                    self.PROCESS_CHAIN_CACHE_TTL = config.getint(
+                        "MISC", "PROCESS_CHAIN_CACHE_TTL")
+                if config.has_option("MISC", "URL_CHECK_CACHE_TTL"):
+                    self.URL_CHECK_CACHE_TTL = config.getint(
+                        "MISC", "URL_CHECK_CACHE_TTL")
+                if config.has_option("MISC", "STAC_SEARCH_CACHE_TTL"):
+                    self.STAC_SEARCH_CACHE_TTL = config.getint(
+                        "MISC", "STAC_SEARCH_CACHE_TTL")
+                if config.has_option("MISC", "DRAIN_FILE"):
+                    self.DRAIN_FILE = config.get("MISC", "DRAIN_FILE")
+                if config.has_option("MISC", "READINESS_MIN_FREE_DISK"):
+                    self.READINESS_MIN_FREE_DISK = config.getfloat(
+                        "MISC", "READINESS_MIN_FREE_DISK")
+                if config.has_option("MISC", "READINESS_QUEUE_TIMEOUT"):
+                    self.READINESS_QUEUE_TIMEOUT = config.getint(
+                        "MISC", "READINESS_QUEUE_TIMEOUT")
+                if config.has_option("MISC", "TILE_CACHE"):
+                    self.TILE_CACHE = config.get("MISC", "TILE_CACHE")
+                if config.has_option("MISC", "TILE_CACHE_MAX_ZOOM"):
+                    self.TILE_CACHE_MAX_ZOOM = config.getint(
+                        "MISC", "TILE_CACHE_MAX_ZOOM")
+                if config.has_option("MISC", "TILE_CACHE_MAX_SEED_TILES"):
+                    self.TILE_CACHE_MAX_SEED_TILES = config.getint(
+                        "MISC", "TILE_CACHE_MAX_SEED_TILES")
+                if config.has_option("MISC", "RENDER_CACHE"):
+                    self.RENDER_CACHE = config.get("MISC", "RENDER_CACHE")
+                if config.has_option("MISC", "RENDER_CACHE_QUOTA"):
+                    self.RENDER_CACHE_QUOTA = config.getint(
+                        "MISC", "RENDER_CACHE_QUOTA")
+                if config.has_option("MISC", "RENDER_IN_PROCESS"):
+                    self.RENDER_IN_PROCESS = config.getboolean(
+                        "MISC", "RENDER_IN_PROCESS")
+                if config.has_option("MISC", "RENDER_IN_PROCESS_THREADS"):
+                    self.RENDER_IN_PROCESS_THREADS = config.getint(
+                        "MISC", "RENDER_IN_PROCESS_THREADS")
+                if config.has_option("MISC", "RENDER_IN_PROCESS_MAX_PIXELS"):
+                    self.RENDER_IN_PROCESS_MAX_PIXELS = config.getint(
+                        "MISC", "RENDER_IN_PROCESS_MAX_PIXELS")
 
             if config.has_section("LOGGING"):
                 if config.has_option("LOGGING", "LOG_INTERFACE"):
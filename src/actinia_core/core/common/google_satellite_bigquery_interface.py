@@ -24,11 +24,15 @@
 """
 Storage base class
 """
+import hashlib
+import json
 import os
-from google.cloud import bigquery
-from google.cloud import storage
+import pickle
+import sqlite3
+import time
 import xml.etree.ElementTree as eTree
 from .exceptions import GoogleCloudAPIError
+from .aws_sentinel_interface import METADATA_CACHE_NAME
 import dateutil.parser as dtparser
 
 
@@ -37,6 +41,9 @@ __author__ = "Sören Gebbert"
 __copyright__ = "Copyright 2016-2018, Sören Gebbert and mundialis GmbH & Co. KG"
 __maintainer__ = "mundialis"
 
+# The maximum number of scene ids in a single IN query
+MAX_IN_QUERY_IDS = 1000
+
 GML_BODY = """<?xml version="1.0" encoding="utf-8" ?>
 <ogr:FeatureCollection
      xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
@@ -73,11 +80,29 @@ def extract_sensor_id_from_scene_id(scene_id):
     return "%s0%s" % (scene_id[0:2], scene_id[2:3])
 
 
+def get_id_query(column, scene_id):
+    """Create the query of one or several scene ids
+
+    Args:
+        column (str): The column of the scene id
+        scene_id (str, list): The scene id or a list of scene ids
+
+    Returns:
+        (str)
+        The scene id query
+
+    """
+    if isinstance(scene_id, (list, tuple)):
+        return "%s IN (%s)" % (
+            column, ",".join("\'%s\'" % entry for entry in sorted(scene_id)))
+    return "%s = \'%s\'" % (column, scene_id)
+
+
 def get_landsat_query(scene_id, spacecraft_id):
     """Extract the sensor id from a Landsat scene id
 
     Args:
-        scene_id (str): The landsat scene id
+        scene_id (str, list): The landsat scene id or a list of scene ids
         spacecraft_id (str): The landsat spacecraft id
 
     Returns:
@@ -89,12 +114,14 @@ def get_landsat_query(scene_id, spacecraft_id):
 
     """
     has_where_statement = False
+    scene_id_query = None
+    spacecraft_id_query = None
     query = "SELECT scene_id,sensing_time,north_lat,south_lat,east_lon," \
             "west_lon,cloud_cover,total_size FROM `bigquery-public-data" \
             ".cloud_storage_geo_index.landsat_index` "
 
     if scene_id:
-        scene_id_query = "scene_id = \'%s\'" % scene_id
+        scene_id_query = get_id_query("scene_id", scene_id)
         has_where_statement = True
 
     if spacecraft_id:
@@ -107,7 +134,7 @@ def get_sentinel_query(scene_id):
     """Extract the sensor id from a Sentinel scene id
 
     Args:
-        scene_id (str): The Sentinel scene id
+        scene_id (str, list): The Sentinel scene id or a list of scene ids
 
     Returns:
         query (str): The Sentinel query
@@ -116,17 +143,131 @@ def get_sentinel_query(scene_id):
                                     in the query is required
 
     """
+    has_where_statement = False
+    scene_id_query = None
     # Select specific columns from the sentinel table
     query = "SELECT product_id,sensing_time,north_lat,south_lat,east_lon," \
             "west_lon,cloud_cover,total_size FROM `bigquery-public-data" \
             ".cloud_storage_geo_index.sentinel_2_index` "
 
     if scene_id:
-        scene_id_query = "product_id = \'%s\'" % scene_id
+        scene_id_query = get_id_query("product_id", scene_id)
         has_where_statement = True
     return query, scene_id_query, has_where_statement
 
 
+def create_query_cache_key(*params):
+    """Create the cache key of a query from its normalized parameters
+
+    Args:
+        *params: The JSON serializable query parameters
+
+    Returns:
+        (str)
+        The cache key
+
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"),
+                           default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class BigQueryResultCache(object):
+    """A local SQLite cache of BigQuery results and product footprints
+
+    The results of scene id lookups are immutable and never expire, the
+    results of archive queries expire after a time to live.
+    """
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS results (" \
+             "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+
+    def __init__(self, database_path):
+        """
+
+        Args:
+            database_path (str): The path of the SQLite database file
+
+        """
+        self.database_path = database_path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        connection = sqlite3.connect(self.database_path, timeout=30)
+        connection.execute(self.SCHEMA)
+        return connection
+
+    def get_many(self, keys):
+        """Return the cached values of several keys
+
+        Args:
+            keys (list): The cache keys
+
+        Returns:
+            (dict)
+            The unpickled values of the cached keys
+
+        """
+        result = {}
+        connection = self._connect()
+        try:
+            for offset in range(0, len(keys), MAX_IN_QUERY_IDS):
+                chunk = keys[offset:offset + MAX_IN_QUERY_IDS]
+                rows = connection.execute(
+                    "SELECT key, value FROM results WHERE key IN (%s) "
+                    "AND (expires IS NULL OR expires > ?)"
+                    % ",".join("?" * len(chunk)), chunk + [time.time()])
+                for key, value in rows:
+                    result[key] = pickle.loads(value)
+        finally:
+            connection.close()
+        return result
+
+    def get(self, key):
+        """Return the cached value of a key
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            The unpickled value or None if not in cache
+
+        """
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items, ttl=None):
+        """Store several values
+
+        Args:
+            items (dict): The values by cache key
+            ttl (int): The time to live in seconds, values never expire if None
+
+        """
+        expires = None if ttl is None else time.time() + ttl
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO results (key, value, expires) "
+                    "VALUES (?, ?, ?)",
+                    [(key, pickle.dumps(value), expires)
+                     for key, value in items.items()])
+        finally:
+            connection.close()
+
+    def set(self, key, value, ttl=None):
+        """Store a value
+
+        Args:
+            key (str): The cache key
+            value: The value, it must be picklable
+            ttl (int): The time to live in seconds, the value never expires if
+                       None
+
+        """
+        self.set_many({key: value}, ttl)
+
+
 def get_where_query(scene_id_query, spacecraft_id_query, temporal_query,
                     spatial_query, cloud_cover_query):
     """Create where query to request the satellite archive
@@ -176,11 +317,14 @@ class GoogleSatelliteBigQueryInterface(object):
     available in the google cloud storage
     """
 
-    def __init__(self, config):
+    def __init__(self, config, bigquery_client=None, storage_client=None):
         """Interface to the Sentinel2 and Landsat data in the google cloud storage
 
         Args:
             config: The configuration of Actinia Core
+            bigquery_client: The BigQuery client, created on first use if None
+            storage_client: The cloud storage client, created on first use if
+                            None
         """
         self.aws_sentinel_base_url = "http://sentinel-s2-l1c.s3.amazonaws.com"
         self.gcs_url = "https://storage.googleapis.com/"
@@ -189,6 +333,15 @@ class GoogleSatelliteBigQueryInterface(object):
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = \
             self.config.GOOGLE_APPLICATION_CREDENTIALS
         os.environ["GOOGLE_CLOUD_PROJECT"] = self.config.GOOGLE_CLOUD_PROJECT
+        self.bigquery_client = bigquery_client
+        self.storage_client = storage_client
+
+        # The local cache of query results and footprints
+        self.result_cache = None
+        if self.config.METADATA_CACHE is True:
+            self.result_cache = BigQueryResultCache(os.path.join(
+                self.config.DOWNLOAD_CACHE, METADATA_CACHE_NAME,
+                "bigquery.sqlite"))
 
         self.sentinel_bands = ["B01", "B02", "B03", "B04", "B05", "B06", "B07",
                                "B08", "B8A", "B09", "B10", "B11", "B12"]
@@ -211,8 +364,66 @@ class GoogleSatelliteBigQueryInterface(object):
                                          ".8", ".9", ".10", ".11"]}
 
     def _start_clients(self):
-        self.bigquery_client = bigquery.Client()
-        self.storage_client = storage.Client()
+        # The Google Cloud clients are imported on first use to speed up the
+        # server start
+        if self.bigquery_client is None:
+            from google.cloud import bigquery
+            self.bigquery_client = bigquery.Client()
+        if self.storage_client is None:
+            from google.cloud import storage
+            self.storage_client = storage.Client()
+
+    def _query_rows(self, query):
+        """Run a query and return the result rows as tuples
+
+        Args:
+            query (str): The SQL query
+
+        Returns:
+            (list)
+            The result rows
+
+        """
+        return [tuple(row) for row in self.bigquery_client.query(query).result()]
+
+    def _lookup_scenes(self, query, scene_ids, id_index):
+        """Look up the rows of scenes by their ids
+
+        The rows of the scenes that are in the result cache are not queried,
+        the other scenes are queried with batched IN queries.
+
+        Args:
+            query (str): The SQL query with a %s placeholder for the
+                         comma separated list of quoted scene ids
+            scene_ids (list): The scene ids
+            id_index (int): The column of the scene id in the result rows
+
+        Returns:
+            (list)
+            The result rows
+
+        """
+        scene_ids = list(dict.fromkeys(scene_ids))
+        keys = [create_query_cache_key(query, scene_id) for scene_id in scene_ids]
+
+        cached = {}
+        if self.result_cache is not None:
+            cached = self.result_cache.get_many(keys)
+
+        missing = [scene_id for scene_id, key in zip(scene_ids, keys)
+                   if key not in cached]
+        queried = {}
+        for offset in range(0, len(missing), MAX_IN_QUERY_IDS):
+            chunk = missing[offset:offset + MAX_IN_QUERY_IDS]
+            for row in self._query_rows(query % "\",\"".join(chunk)):
+                queried[create_query_cache_key(query, row[id_index])] = row
+
+        # Scene rows are immutable, they never expire
+        if self.result_cache is not None and queried:
+            self.result_cache.set_many(queried)
+
+        cached.update(queried)
+        return [cached[key] for key in keys if key in cached]
 
     def query_landsat_archive(self, start_time, end_time, lat=None,
                               lon=None, cloud_cover=None, scene_id=None,
@@ -319,11 +530,22 @@ class GoogleSatelliteBigQueryInterface(object):
                     scene_id_query, spacecraft_id_query, temporal_query,
                     spatial_query, cloud_cover_query)
 
-            query_results = self.bigquery_client.query(query)
+            # Archive queries are cached for a limited time, because new
+            # scenes are added to the archive
+            key = None
+            rows = None
+            if self.result_cache is not None and self.config.BIGQUERY_CACHE_TTL > 0:
+                key = create_query_cache_key(query)
+                rows = self.result_cache.get(key)
+            if rows is None:
+                rows = self._query_rows(query)
+                if key is not None:
+                    self.result_cache.set(key, rows,
+                                          self.config.BIGQUERY_CACHE_TTL)
             result = []
 
-            if query_results.result():
-                for row in query_results.result():
+            if rows:
+                for row in rows:
                     scene_id, sensing_time, north_lat, south_lat, east_lon, \
                         west_lon, cloud_cover, total_size = row
                     result.append(dict(scene_id=scene_id, sensing_time=sensing_time,
@@ -436,13 +658,13 @@ class GoogleSatelliteBigQueryInterface(object):
             # Select specific columns from the sentinel table
             query = "SELECT scene_id,sensing_time,base_url FROM " \
                     "`bigquery-public-data.cloud_storage_geo_index.landsat_index` " \
-                    "WHERE scene_id IN (\"%s\");" % "\",\"".join(scene_ids)
+                    "WHERE scene_id IN (\"%s\");"
 
-            query_results = self.bigquery_client.query(query)
+            rows = self._lookup_scenes(query, scene_ids, id_index=0)
             result = {}
 
-            if query_results.result():
-                for row in query_results.result():
+            if rows:
+                for row in rows:
 
                     scene_id, sensing_time, base_url = row
                     public_url = self.gcs_url + base_url[5:]
@@ -616,9 +838,9 @@ class GoogleSatelliteBigQueryInterface(object):
                 "SELECT granule_id,product_id,sensing_Time,datatake_identifier,"
                 "base_url "
                 "FROM `bigquery-public-data.cloud_storage_geo_index.sentinel_2_index` "
-                "WHERE product_id IN (\"%s\");" % "\",\"".join(product_ids))
+                "WHERE product_id IN (\"%s\");")
 
-            rows = list(self.bigquery_client.query(query))  # API request
+            rows = self._lookup_scenes(query, product_ids, id_index=1)
 
             result = {}
 
@@ -641,8 +863,7 @@ class GoogleSatelliteBigQueryInterface(object):
 
                     # Generate the GML file from the sentinel product footprint
                     # The whole XML content is returned as well
-                    gml, xml_metadata, bbox = self._generate_sentinel2_footprint(
-                        base_url=base_url)
+                    gml, bbox = self._get_sentinel2_footprint(base_url=base_url)
                     result[product_id]["gml_footprint"] = gml
                     result[product_id]["bbox"] = bbox
                     # The xml content is currently not needed
@@ -665,6 +886,31 @@ class GoogleSatelliteBigQueryInterface(object):
                 "An error occurred while fetching "
                 "Sentinel-2 download URL's. Error message: %s" % str(e))
 
+    def _get_sentinel2_footprint(self, base_url):
+        """Return the footprint of a Sentinel-2 product from the result cache
+        or generate it from the XML metadata
+
+        Args:
+            base_url: The google cloud storage base url of the required product_id
+
+        Returns: a tuple
+            (str, tuple)
+            The footprint as GML code and the bounding box
+
+        """
+        key = create_query_cache_key("sentinel2_footprint", base_url)
+        if self.result_cache is not None:
+            footprint = self.result_cache.get(key)
+            if footprint is not None:
+                return footprint
+
+        gml, xml_metadata, bbox = self._generate_sentinel2_footprint(
+            base_url=base_url)
+
+        if self.result_cache is not None:
+            self.result_cache.set(key, (gml, bbox))
+        return gml, bbox
+
     def _generate_sentinel2_footprint(self, base_url):
         """Download the sentinel XML metadata and parse it for the footprint
 
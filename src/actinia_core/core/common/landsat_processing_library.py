@@ -214,6 +214,8 @@ class LandsatProcessing(GeoDataDownloadImportSupport):
                     SCENE_BANDS[self.landsat_sensor_id][count]] = raster_name
                 p = self.get_raster_import_command(file_path=file_path,
                                                    raster_name=raster_name)
+                # The bands are independent and imported concurrently
+                p.depends_on = self.get_file_dependencies(file_path)
                 import_commands.append(p)
                 count += 1
 
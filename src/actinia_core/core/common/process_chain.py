@@ -29,8 +29,10 @@ import requests
 
 from actinia_core.core.stac_importer_interface import STACImporter as STAC
 from .process_object import Process
+from .process_graph import infer_process_chain_dependencies
 from .exceptions import AsyncProcessError
 from actinia_core.core.geodata_download_importer import GeoDataDownloadImportSupport
+from actinia_core.core.url_check import UrlChecker
 from .config import global_config
 from .sentinel_processing_library import Sentinel2Processing
 from .landsat_processing_library import LandsatProcessing
@@ -54,7 +56,8 @@ class ProcessChainConverter(object):
     def __init__(self, config=None, temp_file_path=None, process_dict=None,
                  temporary_pc_files=None, required_mapsets=None,
                  resource_export_list=None, message_logger=None,
-                 output_parser_list=None, send_resource_update=None):
+                 output_parser_list=None, send_resource_update=None,
+                 url_check_cache=None, stac_search_cache=None):
         """Constructor to convert the process chain into a process list
 
         Args:
@@ -77,6 +80,10 @@ class ProcessChainConverter(object):
                                        has the process id a key
                                        {process_id:StdoutParser}
             send_resource_update: The function to call for resource updates
+            url_check_cache (RedisUrlCheckCacheInterface): The redis cache of
+                                                           import URL checks
+            stac_search_cache (RedisStacSearchCacheInterface): The redis cache
+                                                               of STAC searches
 
         Returns:
 
@@ -115,9 +122,13 @@ class ProcessChainConverter(object):
         self.send_resource_update = send_resource_update
         self.message_logger = message_logger
         self.import_descr_list = []
+        self.region_import_list = []
         self.webhook_finished = None
         self.webhook_update = None
         self.webhook_auth = None
+        self.url_check_cache = url_check_cache
+        self.url_checker = None
+        self.stac_search_cache = stac_search_cache
 
     def process_chain_to_process_list(self, process_chain):
 
@@ -171,26 +182,78 @@ class ProcessChainConverter(object):
                 self._check_if_webhook_exists(
                     self.webhook_update, process_chain, 'update')
 
+        process_descr_list = []
+        import_positions = {}
         for process_descr in process_chain["list"]:
 
+            # The position of the imports of the region import mode
+            if isinstance(process_descr.get("inputs"), list):
+                for entry in process_descr["inputs"]:
+                    import_positions[id(entry)] = len(process_list)
+
             if "module" in process_descr:
                 module = self._create_module_process(process_descr)
                 if module:
                     process_list.append(module)
+                    process_descr_list.append(process_descr)
             elif "exe" in process_descr:
                 exe = self._create_exec_process(process_descr)
                 if exe:
                     process_list.append(exe)
+                    process_descr_list.append(process_descr)
             elif "evaluate" in process_descr:
                 process_list.append(("python", process_descr["evaluate"]))
             else:
                 raise AsyncProcessError("Unknown process description "
                                         "in the process chain definition")
+
+        # Independent processes of the process chain run concurrently. The
+        # processes run in the order of the process list if interim results
+        # are saved, since a resumed job skips the first finished processes
+        if (self.config.PROCESS_MAX_PARALLEL > 1
+                and not self.config.SAVE_INTERIM_RESULTS
+                and len(process_list) == len(process_descr_list)):
+            infer_process_chain_dependencies(process_list, process_descr_list)
+
         downimp_list = self._create_download_process_list()
-        downimp_list.extend(process_list)
+        downimp_list.extend(self._insert_region_imports(process_list,
+                                                        import_positions))
 
         return downimp_list
 
+    def _insert_region_imports(self, process_list, import_positions):
+        """Insert the imports of the region import mode at the position of
+        the processes that declare them
+
+        The region imports read the window of the current region, hence they
+        must run after the region was set by the previous processes of the
+        process chain.
+
+        Args:
+            process_list (list): The processes of the process chain
+            import_positions (dict): The ids of the import descriptions as
+                                     keys and the positions in the process
+                                     list as values
+
+        Returns:
+            list:
+            The process list with the region imports
+        """
+        if not self.region_import_list:
+            return process_list
+
+        imports = {}
+        for entry, commands in self.region_import_list:
+            imports.setdefault(import_positions[id(entry)], []).extend(commands)
+
+        result = []
+        for index, process in enumerate(process_list):
+            result.extend(imports.pop(index, []))
+            result.append(process)
+        for index in sorted(imports):
+            result.extend(imports[index])
+        return result
+
     def _get_landsat_import_download_commands(self, entry):
         """Helper method to get the landsat import and download commands.
 
@@ -376,9 +439,24 @@ class ProcessChainConverter(object):
                     download_cache=self.temp_file_path,
                     message_logger=self.message_logger,
                     send_resource_update=self.send_resource_update,
-                    url_list=[url, ])
-        download_commands, import_file_info = gdis.get_download_process_list()
-        rvf_downimport_commands.extend(download_commands)
+                    url_list=[url, ],
+                    url_checker=self.url_checker)
+        # Read only the region window of remote rasters without download
+        import_mode = entry["import_descr"].get("import_mode", "download")
+        if import_mode == "region":
+            if entry["import_descr"]["type"] != "raster":
+                raise AsyncProcessError(
+                    "The import mode <region> is only supported for raster "
+                    "and stac imports.")
+            import_file_info = gdis.get_remote_import_info()
+        elif import_mode == "download":
+            download_commands, import_file_info = \
+                gdis.get_download_process_list()
+            rvf_downimport_commands.extend(download_commands)
+        else:
+            raise AsyncProcessError(
+                "Unknown import mode <%s>. Supported import modes are: "
+                "download, region" % import_mode)
         map_name = entry["value"]
         input_source = import_file_info[0][2]
         layer = None
@@ -387,6 +465,8 @@ class ProcessChainConverter(object):
             layer = entry["import_descr"]["vector_layer"]
         if entry["import_descr"]["type"] == "raster":
             kwargs = {"file_path": input_source, "raster_name": entry["value"]}
+            if import_mode == "region":
+                kwargs["extent"] = "region"
             resamp_opt = ["nearest", "bilinear", "bicubic, lanczos", "bilinear_f",
                           "bicubic_f", "lanzcos_f"]
             resol_opt = ["estimated", "value", "region"]
@@ -679,20 +759,55 @@ class ProcessChainConverter(object):
         Returns:
 
         """
-
-        downimp_list = []
-
         if self.message_logger:
             self.message_logger.info("Creating download process "
                                      "list for all import definitions")
 
+        for entry in self.import_descr_list:
+            check_required_keys_for_download_process_chain(entry)
+
+        # Check the access of all raster, vector and file URLs concurrently
+        url_list = [entry["import_descr"]["source"]
+                    for entry in self.import_descr_list
+                    if entry["import_descr"]["type"].lower()
+                    in ["raster", "vector", "file"]]
+        if url_list:
+            self.url_checker = UrlChecker(
+                max_connections=self.config.DOWNLOAD_MAX_CONNECTIONS,
+                cache=self.url_check_cache,
+                cache_ttl=self.config.URL_CHECK_CACHE_TTL,
+                message_logger=self.message_logger)
+
+        try:
+            if self.url_checker is not None:
+                self.url_checker.check_urls(url_list)
+            downimp_list = self._create_download_import_commands()
+        finally:
+            if self.url_checker is not None:
+                self.url_checker.close()
+                self.url_checker = None
+
+        # Downloads do not depend on other processes, put them in front so
+        # that all files are downloaded concurrently
+        download_list = [p for p in downimp_list if p.exec_type == "download"]
+        downimp_list = download_list + [
+            p for p in downimp_list if p.exec_type != "download"]
+        return downimp_list
+
+    def _create_download_import_commands(self):
+        """Create the download and import commands of all import definitions
+
+        Returns:
+            list:
+            The download and import processes
+        """
+        downimp_list = []
         sentinel2_entries = []
+        self.region_import_list = []
         for entry in self.import_descr_list:
             if self.message_logger:
                 self.message_logger.info(entry)
 
-            check_required_keys_for_download_process_chain(entry)
-
             # RASTER; VECTOR, FILE
             if entry["import_descr"]["type"].lower() == "raster" or \
                     entry["import_descr"]["type"].lower() == "vector" or \
@@ -700,7 +815,8 @@ class ProcessChainConverter(object):
 
                 rvf_downimport_commands = \
                     self._get_raster_vector_file_download_import_command(entry)
-                downimp_list.extend(rvf_downimport_commands)
+                self._add_import_commands(downimp_list, entry,
+                                          rvf_downimport_commands)
 
             # POSTGIS
             elif entry["import_descr"]["type"].lower() == "postgis":
@@ -722,12 +838,17 @@ class ProcessChainConverter(object):
 
             # STAC
             elif entry["import_descr"]["type"].lower() == "stac":
-                stac = STAC()
+                stac = STAC(
+                    search_cache=self.stac_search_cache,
+                    search_cache_ttl=self.config.STAC_SEARCH_CACHE_TTL,
+                    max_connections=self.config.DOWNLOAD_MAX_CONNECTIONS)
                 stac_commands = stac.get_stac_import_download_commands(
-                                                stac_entry=entry
+                                                stac_entry=entry,
+                                                config=self.config,
+                                                temp_file_path=self.temp_file_path
                                                 )
 
-                downimp_list.extend(stac_commands)
+                self._add_import_commands(downimp_list, entry, stac_commands)
 
             else:
                 raise AsyncProcessError(
@@ -738,8 +859,25 @@ class ProcessChainConverter(object):
             # put all Sentinel-2 downloading together
             sentinel_commands = self._get_sentinel_import_commands(sentinel2_entries)
             downimp_list.extend(sentinel_commands)
+
         return downimp_list
 
+    def _add_import_commands(self, downimp_list, entry, commands):
+        """Add the download and import commands of an import description
+
+        The commands of the region import mode are collected separately, they
+        run before the process that declares the import.
+
+        Args:
+            downimp_list (list): The download and import processes
+            entry (dict): Entry of the import description list
+            commands (list): The download and import commands of the entry
+        """
+        if entry["import_descr"].get("import_mode", "download") == "region":
+            self.region_import_list.append((entry, commands))
+        else:
+            downimp_list.extend(commands)
+
     # TODO: remove legacy methods and do no use them in actinia_core
     def _create_module_process_legacy(self, id, module_descr):
         """Analyse a grass process description dict and create a Process
@@ -1273,6 +1411,35 @@ class ProcessChainConverter(object):
         return process_list
 
 
+def get_process_chain_modules(process_chain):
+    """Return the names of the GRASS modules of a process chain
+
+    The actinia specific importer and exporter modules are not included.
+
+    Args:
+        process_chain (dict): The process chain in version 1 or the legacy
+                              format
+
+    Returns:
+        list:
+        The module names in the order of the process chain
+    """
+    if not isinstance(process_chain, dict):
+        return []
+    if "list" in process_chain and isinstance(process_chain["list"], list):
+        entries = process_chain["list"]
+    else:
+        entries = process_chain.values()
+    modules = []
+    for entry in entries:
+        if isinstance(entry, dict) and "module" in entry:
+            module = str(entry["module"])
+            if module not in ("importer", "exporter") \
+                    and module not in modules:
+                modules.append(module)
+    return modules
+
+
 def check_required_keys_for_download_process_chain(entry):
     """Helper function to check if the requiered keys to create the download
     process chain are set.
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Dependency graph of the processes of a process list
+"""
+
+import re
+
+from actinia_core.core.common.exceptions import AsyncProcessError
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The modules that change the state of the whole mapset, e.g. the region, the
+# mask or the temporal database, all other processes wait for them
+BARRIER_MODULE_PREFIXES = ("g.", "t.")
+BARRIER_MODULES = ["r.mask"]
+# The pattern of map, file and process names in parameter values
+NAME_PATTERN = re.compile(r"[\w.@$:]+")
+
+
+def has_process_dependencies(process_list):
+    """Check if any process of the process list specifies its dependencies
+
+    Args:
+        process_list (list): The list of Process objects
+
+    Returns:
+        bool:
+        True if at least one process specifies its dependencies
+    """
+    return any(getattr(process, "depends_on", None) is not None
+               for process in process_list)
+
+
+def get_process_dependencies(process_list):
+    """Compute the dependencies between the processes of a process list
+
+    Download processes are not part of the graph, they run in the
+    background and the processes wait for the downloads of the files they
+    reference. A process without explicit dependencies depends on all
+    previous processes, a process with explicit dependencies depends on all
+    processes with the listed ids. Processes of the user process chain
+    always depend on the previous internal processes, that import their
+    data.
+
+    Args:
+        process_list (list): The list of Process objects
+
+    Raises:
+        AsyncProcessError: If a dependency is unknown or the dependencies
+                           are cyclic
+
+    Returns:
+        dict:
+        The indices of the processes in the process list as keys and the sets
+        of the indices of the processes they depend on as values
+    """
+    indices = [index for index, process in enumerate(process_list)
+               if process.exec_type != "download"]
+    id_indices = {}
+    for index in indices:
+        id_indices.setdefault(process_list[index].id, []).append(index)
+
+    dependencies = {}
+    for count, index in enumerate(indices):
+        process = process_list[index]
+        depends_on = getattr(process, "depends_on", None)
+        if depends_on is None:
+            dependencies[index] = set(indices[:count])
+            continue
+        if process.skip_permission_check is False:
+            dependencies[index] = set(
+                previous for previous in indices[:count]
+                if process_list[previous].skip_permission_check is True)
+        else:
+            dependencies[index] = set()
+        for process_id in depends_on:
+            if process_id not in id_indices:
+                raise AsyncProcessError(
+                    "Process <%s> depends on the unknown process <%s>"
+                    % (process.id, process_id))
+            dependencies[index].update(id_indices[process_id])
+        dependencies[index].discard(index)
+
+    # Check the graph for cycles by resolving it
+    resolved = set()
+    unresolved = set(indices)
+    while unresolved:
+        ready = set(index for index in unresolved
+                    if dependencies[index] <= resolved)
+        if not ready:
+            raise AsyncProcessError(
+                "The dependencies of the processes <%s> are cyclic"
+                % ", ".join(sorted(str(process_list[index].id)
+                                   for index in unresolved)))
+        resolved.update(ready)
+        unresolved.difference_update(ready)
+
+    return dependencies
+
+
+def remove_finished_dependencies(process_list, finished_ids):
+    """Remove the dependencies on processes that already finished and are
+    not part of the process list anymore, e.g. when a job is resumed
+
+    Args:
+        process_list (list): The remaining processes
+        finished_ids (set): The ids of the finished processes
+    """
+    remaining_ids = set(getattr(process, "id", None) for process in process_list)
+    removed_ids = set(finished_ids) - remaining_ids
+    for process in process_list:
+        depends_on = getattr(process, "depends_on", None)
+        if depends_on is not None:
+            process.depends_on = [process_id for process_id in depends_on
+                                  if process_id not in removed_ids]
+
+
+def is_barrier_process(process):
+    """Check if a process may change the state of the whole mapset
+
+    Args:
+        process (Process): The process
+
+    Returns:
+        bool:
+        True if the process must not run concurrently with other processes
+    """
+    if process.exec_type != "grass":
+        return True
+    return (process.executable.startswith(BARRIER_MODULE_PREFIXES)
+            or process.executable in BARRIER_MODULES)
+
+
+def _get_names(parameters):
+    """Return the names of maps and files that a list of parameter
+    definitions of the process chain references
+    """
+    names = set()
+    for parameter in parameters:
+        names.update(NAME_PATTERN.findall(str(parameter.get("value", ""))))
+    return names
+
+
+def infer_process_chain_dependencies(process_list, process_descr_list):
+    """Set the dependencies of the processes of a process chain
+
+    A process depends on the previous processes that write maps or files it
+    reads or writes, that read maps or files it writes, on the process it
+    uses as stdin source and on the processes that are listed in its
+    depends_on definition. Modules without outputs may modify the maps they
+    read, e.g. r.colors, so their inputs of the current mapset are treated as
+    outputs. Barrier
+    processes like g.region, r.mask or executables depend on all previous
+    processes and all following processes depend on them.
+
+    The dependencies are not set if the process ids are not unique.
+
+    Args:
+        process_list (list): The Process objects of the process chain
+        process_descr_list (list): The process descriptions of the process
+                                   chain in the same order
+
+    Raises:
+        AsyncProcessError: If a process depends on an unknown or later process
+    """
+    ids = [process.id for process in process_list]
+    if len(set(ids)) != len(ids):
+        return
+
+    barrier = None
+    accesses = []
+    previous_ids = set()
+    for process, descr in zip(process_list, process_descr_list):
+        depends_on = set(descr.get("depends_on", []))
+        if "stdin" in descr and "::" in descr["stdin"]:
+            depends_on.add(descr["stdin"].split("::")[0])
+        for process_id in depends_on:
+            if process_id not in previous_ids:
+                raise AsyncProcessError(
+                    "Process <%s> depends on the unknown or later process <%s>"
+                    % (process.id, process_id))
+        previous_ids.add(process.id)
+
+        if is_barrier_process(process):
+            process.depends_on = None
+            barrier = process
+            accesses = []
+            continue
+
+        reads = _get_names(descr.get("inputs", []))
+        writes = _get_names(descr.get("outputs", []))
+        if not writes:
+            # Maps of other mapsets can not be modified
+            writes = set(name for name in reads if "@" not in name)
+
+        if barrier is not None:
+            depends_on.add(barrier.id)
+        for previous, previous_reads, previous_writes in accesses:
+            if previous_writes & (reads | writes) or writes & previous_reads:
+                depends_on.add(previous.id)
+
+        process.depends_on = [process_id for process_id in ids
+                              if process_id in depends_on]
+        accesses.append((process, reads, writes))
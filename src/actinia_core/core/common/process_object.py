@@ -38,7 +38,8 @@ class Process(object):
     """
 
     def __init__(self, exec_type, executable, executable_params,
-                 stdin_source=None, skip_permission_check=False, id=None):
+                 stdin_source=None, skip_permission_check=False, id=None,
+                 depends_on=None, env=None):
         """
 
         Args:
@@ -53,6 +54,13 @@ class Process(object):
                                             user can use internal process chains that
                                             contain module he has no permissions to use.
             id (str): The unique id of the process
+            depends_on (list): The ids of the processes that must be finished
+                               before this process can run. If None the process
+                               depends on all previous processes of the process
+                               list.
+            env (dict): The environment of the process, e.g. to run a GRASS
+                        module in another mapset. If None the environment of
+                        the job is used.
         """
 
         self.exec_type = exec_type
@@ -66,6 +74,8 @@ class Process(object):
         self.stderr = None
         self.skip_permission_check = skip_permission_check
         self.id = id
+        self.depends_on = depends_on
+        self.env = env
 
     def set_stdouts(self, stdout, stderr):
         """Set the content of stdout and stderr of this process
@@ -31,22 +31,25 @@ The process queue supports logging of the stderr output of the executed processe
 into a rotating logfile and fluent server.
 """
 
+import os
 import pickle
 import time
 from datetime import datetime
 import queue as standard_queue
-from multiprocessing import Process, Queue
+from multiprocessing import Process, Queue, Value
 from threading import Thread, Lock
-import logging
 import atexit
 from actinia_core.core.resources_logger import ResourceLogger
+from actinia_core.core.grass_init import get_module_path_index
 from actinia_core.core.logging_interface import log
+from actinia_core.core.metrics import is_metrics_message, mark_process_dead, \
+    record_metrics, set_metrics_queue, set_queue_size
 
 
 has_fluent = False
 
 try:
-    from fluent import handler
+    from fluent import handler  # noqa: F401
 
     has_fluent = True
 except Exception:
@@ -60,6 +63,8 @@ __copyright__ = "Copyright 2016-present, Sören Gebbert and mundialis GmbH & Co.
 
 process_queue = Queue()
 process_queue_manager = None
+# The time of the last loop of the process queue manager
+process_queue_heartbeat = Value("d", 0.0, lock=False)
 
 
 def create_process_queue(config, use_logger=True):
@@ -77,8 +82,10 @@ def create_process_queue(config, use_logger=True):
     global process_queue_manager
 
     if process_queue_manager is None:
+        process_queue_heartbeat.value = time.time()
         p = Process(target=start_process_queue_manager,
-                    args=(config, process_queue, use_logger))
+                    args=(config, process_queue, use_logger,
+                          process_queue_heartbeat))
         p.start()
         process_queue_manager = p
 
@@ -115,6 +122,21 @@ def enqueue_job(timeout, func, *args):
     # processing.run()
 
 
+def get_process_queue_state():
+    """Return the state of the process queue manager of this process
+
+    Returns:
+        tuple:
+        (alive, heartbeat_age) alive is True if the process queue manager is
+        running, heartbeat_age is the time in seconds since its last loop or
+        None if the process queue was not created
+    """
+    if process_queue_manager is None:
+        return False, None
+    return (process_queue_manager.is_alive(),
+            time.time() - process_queue_heartbeat.value)
+
+
 def stop_process_queue():
     """Destroy the process queue and terminate all running and enqueued jobs
     """
@@ -298,6 +320,10 @@ def queue_watcher(queue, data_set, lock):
         try:
             # print("Check for new data in queue")
             data = queue.get(block=True)
+            # The observations of the job processes are recorded immediately
+            if is_metrics_message(data):
+                record_metrics(data)
+                continue
             lock.acquire_lock()
             data_set.add(data)
             # print("Add data to set", len(data_set))
@@ -306,7 +332,7 @@ def queue_watcher(queue, data_set, lock):
             pass
 
 
-def start_process_queue_manager(config, queue, use_logger):
+def start_process_queue_manager(config, queue, use_logger, heartbeat=None):
     """The process queue manager that runs the infinite loop for worker creation
 
     - This function creates the stderr logger if requested
@@ -324,6 +350,9 @@ def start_process_queue_manager(config, queue, use_logger):
         config: The global config
         queue: The multiprocessing.Queue() object that should be listened to
         use_logger: Create logifle and fluent logger to log the stderr of the processes
+        heartbeat: The shared multiprocessing.Value() that is set to the time
+                   of each loop, so that the responsiveness of the manager can
+                   be checked
     """
     global finished_procs
 
@@ -357,9 +386,18 @@ def start_process_queue_manager(config, queue, use_logger):
                                      fluent_sender=fluent_sender)
     del kwargs
 
+    # Build the GRASS module path index once, it is inherited by all job
+    # processes that are forked from the queue manager
+    get_module_path_index(config.GRASS_GIS_BASE, config.GRASS_ADDON_PATH)
+
+    # The job processes send their metrics to the process queue manager
+    set_metrics_queue(queue)
+
     count = 0
     try:
         while True:
+            if heartbeat is not None:
+                heartbeat.value = time.time()
             # Get the process data from the set that is filled in the queue thread
             data = None
             lock.acquire_lock()
@@ -426,9 +464,12 @@ def start_process_queue_manager(config, queue, use_logger):
                 for enqproc in procs_to_remove:
                     waiting_processes.remove(enqproc)
 
+                set_queue_size(len(waiting_processes), len(running_procs))
+
             time.sleep(0.05)
             count += 1
     except Exception:
         raise
     finally:
+        mark_process_dead(os.getpid())
         queue.close()
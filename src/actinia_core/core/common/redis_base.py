@@ -25,8 +25,10 @@
 Redis base class
 """
 
+import time
 import redis
 from actinia_core.core.logging_interface import log
+from actinia_core.core.metrics import has_prometheus, observe_redis_call
 
 __license__ = "GPLv3"
 __author__ = "Sören Gebbert"
@@ -35,6 +37,19 @@ __maintainer__ = "Sören Gebbert"
 __email__ = "soerengebbert@googlemail.com"
 
 
+class MonitoredRedis(redis.StrictRedis):
+    """
+    Redis client that observes the latency of each call
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super(MonitoredRedis, self).execute_command(*args, **options)
+        finally:
+            observe_redis_call(args[0], time.perf_counter() - start)
+
+
 class RedisBaseInterface(object):
     """
     The base class for most redis database interfaces
@@ -60,7 +75,8 @@ class RedisBaseInterface(object):
             kwargs['password'] = password
         self.connection_pool = redis.ConnectionPool(**kwargs)
         del kwargs
-        self.redis_server = redis.StrictRedis(connection_pool=self.connection_pool)
+        redis_class = MonitoredRedis if has_prometheus is True else redis.StrictRedis
+        self.redis_server = redis_class(connection_pool=self.connection_pool)
         try:
             self.redis_server.ping()
         except redis.exceptions.ResponseError as e:
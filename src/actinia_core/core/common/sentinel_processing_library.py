@@ -27,10 +27,12 @@ Sentinel-2A processing commands
 import os
 import requests
 import dateutil.parser as dtparser
+from urllib.parse import urlsplit
 from .google_satellite_bigquery_interface import GoogleSatelliteBigQueryInterface
 from .aws_sentinel_interface import AWSSentinel2AInterface
 from .exceptions import AsyncProcessError
 from .process_object import Process
+from actinia_core.core.utils import get_download_process
 
 
 __license__ = "GPLv3"
@@ -102,6 +104,9 @@ class Sentinel2Processing(object):
         self.message_logger = message_logger
         self.gml_cache_file_name = None
         self.import_file_info = {}
+        # The ids of the processes that move downloaded files into the
+        # download cache, with the destination path as key
+        self.move_process_ids = {}
         self.gml_temp_file_name = None
         self.timestamp = None
         self.bbox = None
@@ -392,8 +397,8 @@ class Sentinel2Processing(object):
         the download cache. This avoids broken files in case a download was
         interrupted or stopped by termination.
 
-        This method creates wget calls to gather the sentinel2 scenes from the
-        Google Cloud Storage sentinel2 archive using public https address.
+        This method creates download calls to gather the sentinel2 scenes from
+        the Google Cloud Storage sentinel2 archive using public https address.
 
         Returns:
             (import_commands, import_file_info)
@@ -410,19 +415,9 @@ class Sentinel2Processing(object):
 
         # Create the download commands and update process chain
         for url in url_list:
-            wget = "/usr/bin/wget"
-            wget_params = list()
-            wget_params.append("-t5")
-            wget_params.append("-c")
-            wget_params.append("-q")
-            wget_params.append(url)
-
-            p = Process(exec_type="exec", executable=wget,
-                        executable_params=wget_params,
-                        id=f"wget_{url.split('/')[-1]}",
-                        skip_permission_check=True)
-
-            download_commands.append(p)
+            source = os.path.join(self.temp_file_path,
+                                  os.path.basename(urlsplit(url).path))
+            download_commands.append(get_download_process(source, url))
 
         # Create the commands to move the downloaded files to the download cache
         for source, dest in copy_file_list:
@@ -437,9 +432,25 @@ class Sentinel2Processing(object):
                             id=f"mv_{os.path.basename(dest)}",
                             skip_permission_check=True)
                 download_commands.append(p)
+                self.move_process_ids[dest] = p.id
 
         return download_commands, self.import_file_info
 
+    def _get_file_dependencies(self, file_path):
+        """Return the ids of the processes that must be finished before a
+        downloaded file can be used
+
+        Args:
+            file_path (str): The path of the file in the download cache
+
+        Returns:
+            list:
+            The process ids
+        """
+        if file_path in self.move_process_ids:
+            return [self.move_process_ids[file_path]]
+        return []
+
     def get_sentinel2_import_process_list(self):
         """Generate Senteinel2A import and preprocessing process list
 
@@ -451,6 +462,9 @@ class Sentinel2Processing(object):
             0. Use gdaltrans to select the footprint bbox
                that should be imported from the raster layer
             1. Import band with r.import
+
+        For each band:
+
             2. Use g.region to set the region to footprint
             3. Create a mask with r.mask
             4. Compute the cropped version of the band with r.mapcalc
@@ -458,6 +472,12 @@ class Sentinel2Processing(object):
             6. Remove uncropped version with g.remove
             7. Remove the mask with r.mask
 
+        The processes specify their dependencies, so that the bands are
+        imported concurrently. The cropping of the bands runs sequentially
+        after all previous processes, since the region and the mask are shared
+        by all processes of the mapset. Hence the cropping of several products
+        in a process list runs product by product.
+
         Returns:
             list[Process]:
             The list of import commands
@@ -465,24 +485,30 @@ class Sentinel2Processing(object):
         """
 
         import_commands = []
+        crop_commands = []
 
+        v_import_id = f"v_import_{self.product_id}"
         p = Process(exec_type="grass", executable="v.import",
                     executable_params=["input=%s" % self.gml_cache_file_name,
                                        "output=%s" % self.product_id,
                                        "--q"],
-                    id=f"v_import_{self.product_id}",
-                    skip_permission_check=True)
+                    id=v_import_id,
+                    skip_permission_check=True,
+                    depends_on=self._get_file_dependencies(
+                        self.gml_cache_file_name))
         import_commands.append(p)
 
         dt = dtparser.parse(self.timestamp.split(".")[0])
         timestamp = datetime_to_grass_datetime_string(dt)
 
         # Attach a the time stamp
+        v_timestamp_id = f"v_timestamp_{self.product_id}"
         p = Process(exec_type="grass", executable="v.timestamp",
                     executable_params=["map=%s" % self.product_id,
                                        "date=%s" % timestamp],
-                    id=f"v_timestamp_{self.product_id}",
-                    skip_permission_check=True)
+                    id=v_timestamp_id,
+                    skip_permission_check=True,
+                    depends_on=[v_import_id])
         import_commands.append(p)
 
         # Import and update
@@ -510,60 +536,73 @@ class Sentinel2Processing(object):
             gdal_translate_params.append(input_file)
             gdal_translate_params.append(cropped_input_file)
 
+            gdal_translate_id = f"gdal_translate_{self.product_id}_{key}"
             p = Process(exec_type="exec", executable=gdal_translate,
                         executable_params=gdal_translate_params,
-                        id=f"gdal_translate_{self.product_id}",
-                        skip_permission_check=True)
+                        id=gdal_translate_id,
+                        skip_permission_check=True,
+                        depends_on=self._get_file_dependencies(input_file))
             import_commands.append(p)
 
+            r_import_id = f"r_import_{self.product_id}_{key}"
             p = Process(exec_type="grass", executable="r.import",
                         executable_params=["input=%s" % cropped_input_file,
                                            "output=%s" % temp_map_name,
                                            "--q"],
-                        id=f"r_import_{self.product_id}",
-                        skip_permission_check=True)
+                        id=r_import_id,
+                        skip_permission_check=True,
+                        depends_on=[gdal_translate_id])
             import_commands.append(p)
 
             p = Process(exec_type="grass", executable="g.region",
                         executable_params=["align=%s" % temp_map_name,
                                            "vector=%s" % self.product_id,
                                            "-g"],
-                        id=f"set_g_region_to_{self.product_id}",
+                        id=f"set_g_region_to_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
 
             p = Process(exec_type="grass", executable="r.mask",
                         executable_params=["vector=%s" % self.product_id],
-                        id=f"r_mask_{self.product_id}",
+                        id=f"r_mask_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
 
             p = Process(exec_type="grass", executable="r.mapcalc",
                         executable_params=["expression=%s = float(%s)" % (
                             map_name, temp_map_name)],
-                        id=f"create_float_rastermap_{self.product_id}",
+                        id=f"create_float_rastermap_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
 
             p = Process(exec_type="grass", executable="r.timestamp",
                         executable_params=["map=%s" % map_name, "date=%s" % timestamp],
-                        id=f"r_timestamp_{self.product_id}",
+                        id=f"r_timestamp_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
 
             p = Process(exec_type="grass", executable="g.remove",
                         executable_params=["type=raster",
                                            "name=%s" % temp_map_name,
                                            "-f"],
-                        id=f"remove_tmp_map_{self.product_id}",
+                        id=f"remove_tmp_map_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
 
             p = Process(exec_type="grass", executable="r.mask",
                         executable_params=["-r"],
-                        id=f"remove_mask_{self.product_id}",
+                        id=f"remove_mask_{self.product_id}_{key}",
                         skip_permission_check=True)
-            import_commands.append(p)
+            crop_commands.append(p)
+
+        # The first cropping step depends on all previous processes, these are
+        # the imports of this product and the cropping steps of the previous
+        # products. Each further cropping step depends on the previous one
+        for count, p in enumerate(crop_commands):
+            if count > 0:
+                p.depends_on = [crop_commands[count - 1].id]
+
+        import_commands.extend(crop_commands)
 
         return import_commands
 
@@ -0,0 +1,624 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Shared, content-addressed download cache for imported geodata
+
+Files are cached by the URL and the ETag/Last-Modified validators of the
+HTTP header. The download runs as download process of the process chain,
+a file can be fetched manually with:
+
+    python -m actinia_core.core.download_cache --cache CACHE --key KEY URL TARGET
+
+Concurrent jobs that require the same file wait for a single download and the
+cached file is hard linked into the temporary directory of each job.
+
+The size and the last access of the entries of the shared and the user
+specific download caches are tracked in a SQLite index in the cache
+directory, that is used to evict the least recently used entries if the
+DOWNLOAD_CACHE_QUOTA is exceeded.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.metrics import count_download_cache_request
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The directory name of the shared cache in the download cache, user specific
+# download caches use the user id as directory name
+SHARED_DOWNLOAD_CACHE_NAME = ".shared"
+# The suffix of the lock files that serialize downloads of the same file
+LOCK_FILE_SUFFIX = ".lock"
+# The file name of the download cache index
+INDEX_FILE_NAME = ".index.sqlite"
+# The time in seconds that entries, which processes added to a download cache
+# without registration, are protected from eviction after their last access,
+# so that the job that downloaded them can import them
+UNREGISTERED_ENTRY_MIN_AGE = 3600
+
+# The total size and number of entries are maintained by triggers, so that
+# the size of a download cache is a single row lookup
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS pins (
+    name TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, owner));
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL,
+    count INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET size = size + NEW.size, count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET size = size - OLD.size, count = count - 1;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+BEGIN
+    UPDATE totals SET size = size - OLD.size + NEW.size;
+END;
+"""
+
+
+def get_shared_download_cache_path(config):
+    """Return the path to the shared download cache
+
+    Args:
+        config: The Actinia Core configuration object
+
+    Returns:
+        str:
+        The path to the shared download cache or None if disabled
+
+    """
+    if config.DOWNLOAD_CACHE_SHARED is not True:
+        return None
+    return os.path.join(config.DOWNLOAD_CACHE, SHARED_DOWNLOAD_CACHE_NAME)
+
+
+def get_download_cache_quota(config):
+    """Return the quota of a download cache in bytes
+
+    Args:
+        config: The Actinia Core configuration object
+
+    Returns:
+        int:
+        The quota in bytes
+    """
+    return int(config.DOWNLOAD_CACHE_QUOTA * 1024 * 1024 * 1024)
+
+
+def create_download_cache_key(url, headers):
+    """Create the cache key of a remote file from its URL and the
+    ETag/Last-Modified validators of the HTTP header
+
+    Args:
+        url (str): The URL of the file
+        headers (dict): The HTTP header of the URL
+
+    Returns:
+        str:
+        The cache key or None if the header has no validators, so that
+        changes of the remote file can not be detected
+
+    """
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return hashlib.sha256(
+        json.dumps([url, etag, last_modified]).encode()).hexdigest()
+
+
+def get_entry_size(path):
+    """Return the size of a download cache entry, that is a file or a
+    directory, e.g. of an extracted zip file
+
+    Args:
+        path (str): The path of the entry
+
+    Returns:
+        int:
+        The size in bytes
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if not os.path.islink(file_path):
+                size += os.path.getsize(file_path)
+    return size
+
+
+class DownloadCacheIndex(object):
+    """The index of a download cache directory, that tracks the size and the
+    last access of the cache entries and evicts the least recently used
+    entries that are not in use
+
+    An entry is in use if it is pinned, if it is a file that is hard linked
+    into the temporary directory of a job or if its download lock is held.
+    """
+
+    def __init__(self, cache_path):
+        """
+
+        Args:
+            cache_path (str): The path to the download cache directory
+
+        """
+        self.cache_path = cache_path
+        self.index_file = os.path.join(cache_path, INDEX_FILE_NAME)
+
+        os.makedirs(cache_path, exist_ok=True)
+        is_new = not os.path.isfile(self.index_file)
+        with self._connect() as connection:
+            connection.executescript(INDEX_SCHEMA)
+        # Register the entries of download caches that existed before
+        if is_new is True:
+            self.synchronize()
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.index_file, timeout=60,
+                                     isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def add(self, name, size=None):
+        """Add or update an entry of the download cache
+
+        Args:
+            name (str): The file or directory name of the entry
+            size (int): The size of the entry in bytes, computed if not set
+
+        """
+        if size is None:
+            size = get_entry_size(os.path.join(self.cache_path, name))
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO entries (name, size, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET size = excluded.size, "
+                "last_access = excluded.last_access", (name, size, time.time()))
+
+    def touch(self, name):
+        """Set the last access of an entry to now
+
+        Args:
+            name (str): The file or directory name of the entry
+
+        """
+        with self._connect() as connection:
+            connection.execute("UPDATE entries SET last_access = ? WHERE name = ?",
+                               (time.time(), name))
+
+    def pin(self, name, owner, timeout):
+        """Protect an entry from eviction, e.g. while a job uses it
+
+        Args:
+            name (str): The file or directory name of the entry
+            owner (str): The owner of the pin, e.g. the resource id of a job
+            timeout (int): The time in seconds after that the pin expires
+
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO pins (name, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, owner) DO UPDATE SET expires = excluded.expires",
+                (name, owner, time.time() + timeout))
+
+    def unpin(self, name, owner):
+        """Remove the pin of an entry
+
+        Args:
+            name (str): The file or directory name of the entry
+            owner (str): The owner of the pin
+
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM pins WHERE name = ? AND owner = ?",
+                               (name, owner))
+
+    def size(self):
+        """Return the total size of the download cache in bytes"""
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT size FROM totals WHERE id = 0").fetchone()[0]
+
+    def count(self):
+        """Return the number of entries of the download cache"""
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT count FROM totals WHERE id = 0").fetchone()[0]
+
+    def synchronize(self):
+        """Synchronize the index with the content of the cache directory
+
+        Entries that were added without the index are registered with their
+        modification time as last access, removed entries are dropped.
+        """
+        names = set(name for name in os.listdir(self.cache_path)
+                    if not name.startswith(".")
+                    and not name.endswith(LOCK_FILE_SUFFIX))
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                indexed = set(row[0] for row in connection.execute(
+                    "SELECT name FROM entries"))
+                for name in indexed - names:
+                    connection.execute("DELETE FROM entries WHERE name = ?",
+                                       (name,))
+                for name in names - indexed:
+                    path = os.path.join(self.cache_path, name)
+                    try:
+                        connection.execute(
+                            "INSERT INTO entries (name, size, last_access) "
+                            "VALUES (?, ?, ?)",
+                            (name, get_entry_size(path), os.path.getmtime(path)))
+                    except OSError:
+                        # The entry was removed in the meantime
+                        pass
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _remove_unused(self, connection, name):
+        """Remove an entry from the cache directory if it is not in use
+
+        Args:
+            connection: The connection to the index
+            name (str): The file or directory name of the entry
+
+        Returns:
+            bool:
+            True if the entry was removed, False if it is in use
+        """
+        if connection.execute(
+                "SELECT 1 FROM pins WHERE name = ? AND expires > ?",
+                (name, time.time())).fetchone() is not None:
+            return False
+
+        path = os.path.join(self.cache_path, name)
+        lock_file = path + LOCK_FILE_SUFFIX
+        lock = open(lock_file, "a") if os.path.exists(lock_file) else None
+        try:
+            if lock is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.lexists(path):
+                if os.stat(path).st_nlink > 1:
+                    return False
+                os.remove(path)
+            if lock is not None:
+                # Remove the lock file while holding the lock, otherwise the
+                # lock files of evicted entries accumulate
+                os.remove(lock_file)
+            return True
+        finally:
+            if lock is not None:
+                lock.close()
+
+    def evict(self, quota, min_age=0):
+        """Remove the least recently used entries that are not in use until
+        the size of the download cache is below the quota
+
+        Args:
+            quota (int): The quota in bytes
+            min_age (int): Entries that were accessed within this time in
+                           seconds are not removed
+
+        Returns:
+            list:
+            The names of the removed entries
+        """
+        evicted = []
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM pins WHERE expires <= ?",
+                                   (time.time(),))
+                total = connection.execute(
+                    "SELECT size FROM totals WHERE id = 0").fetchone()[0]
+                if total > quota:
+                    for name, size in connection.execute(
+                            "SELECT name, size FROM entries "
+                            "WHERE last_access <= ? ORDER BY last_access",
+                            (time.time() - min_age,)).fetchall():
+                        if total <= quota:
+                            break
+                        if self._remove_unused(connection, name) is True:
+                            connection.execute(
+                                "DELETE FROM entries WHERE name = ?", (name,))
+                            total -= size
+                            evicted.append(name)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return evicted
+
+
+class SharedDownloadCache(object):
+    """The shared, content-addressed download cache
+    """
+
+    def __init__(self, cache_path, retries=5, timeout=60, session=None):
+        """
+
+        Args:
+            cache_path (str): The path to the shared download cache
+            retries (int): The number of retries of a failed download
+            timeout (int): The connection and read timeout in seconds
+            session (requests.Session): The HTTP session to download files,
+                                        a new session is created if not set
+
+        """
+        self.cache_path = cache_path
+        self.retries = retries
+        self.timeout = timeout
+        self.session = session
+
+    def get_cache_file_path(self, key):
+        """Return the path of a cached file
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            str:
+            The path of the cached file
+        """
+        return os.path.join(self.cache_path, key)
+
+    def fetch(self, url, key, target=None):
+        """Return the cached file of an URL and download it if not cached
+
+        The download is serialized by a file lock, so concurrent jobs wait
+        until the file was downloaded by the first job. The file is published
+        atomically and read-only into the cache. The cached file is linked into
+        the target while the lock is held, so it can not be evicted in between.
+
+        Args:
+            url (str): The URL of the file
+            key (str): The cache key
+            target (str): The path of the file in the temporary directory of
+                          the job
+
+        Returns:
+            str:
+            The path of the cached file
+        """
+        cache_file = self.get_cache_file_path(key)
+        index = DownloadCacheIndex(self.cache_path)
+
+        with self._lock(cache_file + LOCK_FILE_SUFFIX) as lock:
+            try:
+                if not os.path.isfile(cache_file):
+                    count_download_cache_request(hit=False)
+                    self._download(url, cache_file)
+                    index.add(key)
+                else:
+                    count_download_cache_request(hit=True)
+                    index.touch(key)
+                if target is not None:
+                    self.link(cache_file, target)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return cache_file
+
+    @staticmethod
+    def _lock(lock_file):
+        """Open and exclusively lock the lock file of a cache entry
+
+        The eviction removes the lock file while holding the lock, the lock
+        file is opened again if it was removed while waiting for the lock.
+
+        Args:
+            lock_file (str): The path of the lock file
+
+        Returns:
+            file:
+            The locked lock file
+        """
+        while True:
+            lock = open(lock_file, "a")
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.stat(lock_file).st_ino == os.fstat(lock.fileno()).st_ino:
+                    return lock
+            except FileNotFoundError:
+                pass
+            lock.close()
+
+    def evict(self, quota):
+        """Evict the least recently used files that are not in use
+
+        Args:
+            quota (int): The quota in bytes
+
+        Returns:
+            list:
+            The keys of the removed files
+        """
+        return DownloadCacheIndex(self.cache_path).evict(quota)
+
+    def _download(self, url, cache_file):
+        """Download an URL into a temporary file and move it into the cache
+
+        Args:
+            url (str): The URL of the file
+            cache_file (str): The path of the cached file
+
+        """
+        fd, download_file = tempfile.mkstemp(dir=self.cache_path,
+                                             prefix=".download_")
+        try:
+            session = self.session
+            if session is None:
+                session = requests.Session()
+                session.mount("http://", HTTPAdapter(max_retries=self.retries))
+                session.mount("https://", HTTPAdapter(max_retries=self.retries))
+            with os.fdopen(fd, "wb") as output, \
+                    session.get(url, stream=True, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                    output.write(chunk)
+            # Hard links share the inode, hence jobs must not modify the file
+            os.chmod(download_file, 0o444)
+            os.replace(download_file, cache_file)
+        except BaseException:
+            if os.path.exists(download_file):
+                os.remove(download_file)
+            raise
+
+    @staticmethod
+    def link(cache_file, target):
+        """Hard link a cached file into the temporary directory of a job,
+        the file is copied if the cache is located on a different file system
+
+        Args:
+            cache_file (str): The path of the cached file
+            target (str): The path of the file in the temporary directory
+
+        """
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(cache_file, target)
+        except OSError:
+            shutil.copyfile(cache_file, target)
+
+
+def get_download_cache_process(cache_path, key, url, target):
+    """The function returns a download Process that fetches an URL from the
+    shared download cache into the temporary directory of a job
+
+    Args:
+        cache_path (str): The path to the shared download cache
+        key (str): The cache key
+        url (str): The url which should be downloaded
+        target (str): The file name where to store the data
+
+    Returns:
+        p (Process): process for the download cache
+    """
+    p = Process(
+        exec_type="download", executable="download",
+        executable_params=[target, url, cache_path, key],
+        id=f"importer_download_cache_{os.path.basename(target)}",
+        skip_permission_check=True)
+    return p
+
+
+def register_download_cache_entry(config, cache_path, name, owner, timeout):
+    """Register a new entry of a user download cache, pin it for the job that
+    uses it and evict least recently used entries if the quota is exceeded
+
+    Args:
+        config: The Actinia Core configuration object
+        cache_path (str): The path to the user download cache
+        name (str): The file or directory name of the entry
+        owner (str): The resource id of the job that uses the entry
+        timeout (int): The time in seconds the entry is pinned
+
+    """
+    index = DownloadCacheIndex(cache_path)
+    index.add(name)
+    index.pin(name, owner, timeout)
+    # Register the entries that were added by process chains
+    index.synchronize()
+    index.evict(get_download_cache_quota(config))
+
+
+def update_download_cache_index(config, cache_path):
+    """Synchronize the index of a user download cache with the files that
+    processes moved into it and evict least recently used entries if the
+    quota is exceeded
+
+    The entries that were accessed within UNREGISTERED_ENTRY_MIN_AGE seconds
+    are kept, since they may not be imported yet.
+
+    Args:
+        config: The Actinia Core configuration object
+        cache_path (str): The path to the user download cache
+
+    """
+    index = DownloadCacheIndex(cache_path)
+    index.synchronize()
+    index.evict(get_download_cache_quota(config),
+                min_age=UNREGISTERED_ENTRY_MIN_AGE)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch an URL from the shared download cache")
+    parser.add_argument("--cache", required=True,
+                        help="The path to the shared download cache")
+    parser.add_argument("--key", required=True, help="The cache key")
+    parser.add_argument("--quota", type=int,
+                        help="The quota of the shared download cache in bytes")
+    parser.add_argument("url", help="The URL of the file")
+    parser.add_argument("target", help="The path of the fetched file")
+    args = parser.parse_args()
+
+    cache = SharedDownloadCache(args.cache)
+    cache.fetch(args.url, args.key, args.target)
+    if args.quota is not None:
+        cache.evict(args.quota)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,14 +25,15 @@
 Geodata processing commands
 """
 import os
-import requests
 import zipfile
 import magic
-from urllib.request import urlopen
 from urllib.parse import urlsplit
 from actinia_core.core.common.exceptions import AsyncProcessError
 from actinia_core.core.common.process_object import Process
-from actinia_core.core.utils import get_wget_process, get_mv_process
+from actinia_core.core.utils import get_download_process, get_mv_process
+from actinia_core.core.download_cache import create_download_cache_key, \
+    get_download_cache_process, get_shared_download_cache_path
+from actinia_core.core.url_check import UrlChecker
 
 __license__ = "GPLv3"
 __author__ = "Sören Gebbert, Julia Haas, Anika Weinmann"
@@ -43,18 +44,47 @@ __maintainer__ = "mundialis"
 SUPPORTED_MIMETYPES = [
     "application/zip", "image/tiff", "application/gml", "text/xml",
     "application/x-sqlite3", "application/xml", "text/plain", "text/x-python"]
+# Mimetypes that can not be read by the GDAL virtual file system for HTTP
+# without a download
+UNSUPPORTED_REMOTE_MIMETYPES = ["application/zip"]
 # Suffixes supported in zip files
 SUPPORTED_SUFFIXES = [
     ".tif", ".tiff", ".xml", ".gml", ".shp", ".dbf", ".shx", ".atx", ".sbx",
     ".qix", ".aih", ".prj", ".cpg", ".json"]
 
 
+def get_vsicurl_gdal_config(config):
+    """Return the GDAL configuration options to read remote raster files with
+    few HTTP range requests
+
+    The downloaded blocks of remote files are cached, consecutive ranges are
+    merged into single requests and HTTP/2 connections are multiplexed.
+
+    Args:
+        config: The actinia configuration object
+
+    Returns:
+        dict:
+        The GDAL configuration options that should be set as environment
+        variables
+    """
+    cache_size = str(config.VSICURL_CACHE_SIZE * 1024 * 1024)
+    return {"VSI_CACHE": "TRUE",
+            "VSI_CACHE_SIZE": cache_size,
+            "CPL_VSIL_CURL_CACHE_SIZE": cache_size,
+            "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+            "GDAL_HTTP_MULTIPLEX": "YES",
+            "GDAL_HTTP_MAX_RETRY": "5",
+            "GDAL_HTTP_RETRY_DELAY": "1"}
+
+
 class GeoDataDownloadImportSupport(object):
     """
     """
 
     def __init__(self, config, temp_file_path, download_cache,
-                 send_resource_update, message_logger, url_list):
+                 send_resource_update, message_logger, url_list,
+                 url_checker=None):
         """ A collection of functions to generate geodata related import and
         processing commands. Each function returns a process chain that can be
         executed by the async processing classes.
@@ -69,6 +99,8 @@ class GeoDataDownloadImportSupport(object):
             message_logger: The message logger to be used
             url_list: A list of urls that should be accessed to download
                       imported geodata
+            url_checker (UrlChecker): The checker of the urls, that may
+                                      already contain the check results
 
         """
         self.config = config
@@ -77,10 +109,15 @@ class GeoDataDownloadImportSupport(object):
         self.send_resource_update = send_resource_update
         self.message_logger = message_logger
         self.url_list = url_list
+        self.url_checker = url_checker
         self.detected_mime_types = []
+        self.download_cache_keys = []
         self.file_list = []
         self.copy_file_list = []
         self.import_file_info = []
+        # The ids of the processes that move downloaded files into the
+        # download cache, with the destination path as key
+        self.move_process_ids = {}
 
     def _setup(self):
         """Setup the download cache.
@@ -111,26 +148,28 @@ class GeoDataDownloadImportSupport(object):
         If all files are already in the download cache, then
         nothing needs to be downloaded and checked.
         """
-        for url in self.url_list:
-            # Send a resource update
-            if self.send_resource_update is not None:
-                self.send_resource_update(message="Checking access to URL: %s" % url)
-
-            # Check if thr URL exists by investigating the HTTP header
-            resp = requests.head(url)
+        # Send a resource update
+        if self.send_resource_update is not None:
+            self.send_resource_update(
+                message="Checking access to URL: %s" % ", ".join(self.url_list))
+
+        # All urls are checked concurrently by a single ranged GET request
+        if self.url_checker is None:
+            self.url_checker = UrlChecker(
+                max_connections=self.config.DOWNLOAD_MAX_CONNECTIONS,
+                message_logger=self.message_logger)
+        results = self.url_checker.check_urls(self.url_list)
+
+        for url, result in zip(self.url_list, results):
             if self.message_logger:
-                self.message_logger.info("%i %s %s" % (resp.status_code,
-                                                       resp.text, resp.headers))
+                self.message_logger.info("%s %s %s" % (
+                    str(result["status_code"]), result["headers"],
+                    result["mime_type"]))
 
-            if resp.status_code != 200:
+            if result["status_code"] not in (200, 206):
                 raise AsyncProcessError("The URL <%s> can not be accessed." % url)
 
-            # Download 256 bytes from the url and check its mimetype
-            response = urlopen(url)
-            mime_type = magic.from_buffer(response.read(256), mime=True).lower()
-            if self.message_logger:
-                self.message_logger.info(mime_type)
-
+            mime_type = result["mime_type"]
             if mime_type not in SUPPORTED_MIMETYPES:
                 raise AsyncProcessError("Mimetype <%s> of url <%s> is not supported. "
                                         "Supported mimetypes are: %s" % (
@@ -138,6 +177,8 @@ class GeoDataDownloadImportSupport(object):
                                             ",".join(SUPPORTED_MIMETYPES)))
 
             self.detected_mime_types.append(mime_type)
+            self.download_cache_keys.append(
+                create_download_cache_key(url, result["headers"]))
 
     def get_download_process_list(self):
         """Create the process list to download, import and preprocess
@@ -148,7 +189,12 @@ class GeoDataDownloadImportSupport(object):
         the download cache. This avoids broken files in case a download was
         interrupted or stopped by termination.
 
-        This method creates wget calls and mv calls.
+        This method creates download and mv calls. Files that can be
+        validated by their ETag or Last-Modified header are fetched from the
+        shared download cache and hard linked into the temporary directory of
+        the job instead, they are imported from there. The link is removed
+        with the temporary directory, so that the shared download cache can
+        evict the file after the job finished.
 
         Returns:
             (download_commands, import_file_info)
@@ -159,6 +205,7 @@ class GeoDataDownloadImportSupport(object):
         download_commands = []
         count = 0
         create_copy_list = False
+        shared_cache_path = get_shared_download_cache_path(self.config)
 
         if not self.copy_file_list:
             create_copy_list = True
@@ -179,11 +226,23 @@ class GeoDataDownloadImportSupport(object):
             # Download file only if it does not exist in the download cache
             if os.path.isfile(dest) is False:
 
-                p = get_wget_process(source, url)
+                # Fetch the file from the shared download cache if the URL
+                # provides validators to detect changes of the remote file
+                key = self.download_cache_keys[count]
+                if shared_cache_path is not None and key is not None:
+                    p = get_download_cache_process(shared_cache_path, key,
+                                                   url, source)
+                    download_commands.append(p)
+                    self.copy_file_list[count] = (source, source)
+                    count += 1
+                    continue
+
+                p = get_download_process(source, url)
                 download_commands.append(p)
                 if source != dest:
                     p = get_mv_process(source, dest)
                     download_commands.append(p)
+                    self.move_process_ids[dest] = p.id
             count += 1
 
         # Create the import file info list
@@ -194,6 +253,45 @@ class GeoDataDownloadImportSupport(object):
 
         return download_commands, self.import_file_info
 
+    def get_file_dependencies(self, file_path):
+        """Return the ids of the processes that must be finished before a
+        downloaded file can be imported
+
+        The downloads themselves are not listed, processes wait for the
+        downloads of the files they reference.
+
+        Args:
+            file_path (str): The path of the downloaded file
+
+        Returns:
+            list:
+            The process ids
+        """
+        if file_path in self.move_process_ids:
+            return [self.move_process_ids[file_path]]
+        return []
+
+    def get_remote_import_info(self):
+        """Check the urls and create the import file info to read the remote
+        files with the GDAL virtual file system for HTTP without downloading
+        them
+
+        Returns:
+            list:
+            The import file info list [(mime_type, url, /vsicurl/url), ...]
+        """
+        self._check_urls()
+
+        self.import_file_info = []
+        for mtype, url in zip(self.detected_mime_types, self.url_list):
+            if mtype in UNSUPPORTED_REMOTE_MIMETYPES:
+                raise AsyncProcessError(
+                    "Mimetype <%s> of url <%s> can not be imported without "
+                    "download." % (mtype, url))
+            self.import_file_info.append((mtype, url, "/vsicurl/" + url))
+
+        return self.import_file_info
+
     @staticmethod
     def get_file_rename_command(file_path, file_name):
         """Generate the file-rename process list so that the input file has a specific
@@ -216,7 +314,8 @@ class GeoDataDownloadImportSupport(object):
 
     @staticmethod
     def get_raster_import_command(file_path, raster_name, resample=None,
-                                  resolution=None, resolution_value=None):
+                                  resolution=None, resolution_value=None,
+                                  extent=None):
         """Generate raster import process list that makes use of r.import
 
         Args:
@@ -230,6 +329,8 @@ class GeoDataDownloadImportSupport(object):
             resolution_value (str): Resolution of output raster map (use with option
                                     resolution=value). Must be in units of the target
                                     coordinate reference system, not in map units.
+            extent (str): The output raster map extent
+                          Options: input, region (default: input)
 
         Returns:
             Process
@@ -245,6 +346,8 @@ class GeoDataDownloadImportSupport(object):
             executable_params.append("resolution=%s" % resolution)
         if resolution_value is not None:
             executable_params.append("resolution_value=%s" % resolution_value)
+        if extent is not None:
+            executable_params.append("extent=%s" % extent)
 
         p = Process(exec_type="grass",
                     executable="r.import",
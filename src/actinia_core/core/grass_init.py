@@ -25,6 +25,7 @@
 GRASS GIS environment initialization
 """
 
+import hashlib
 import os
 import os.path
 import subprocess
@@ -269,6 +270,349 @@ class GrassWindFile(ProcessLogging):
         return self.__windFile
 
 
+class GrassMapsetTemplate(ProcessLogging):
+    """This class creates new mapsets from a pre-built template mapset
+    without running any GRASS GIS module.
+
+    The template of a location contains the files that g.mapset -c and
+    db.connect would create: the WIND file, which is a copy of the DEFAULT_WIND
+    file of the PERMANENT mapset, and the VAR file with the vector database
+    settings. A template is created once per PERMANENT mapset and
+    modification time of its region and projection files in the template
+    directory and is reused by all following jobs. Outdated templates of a
+    PERMANENT mapset are removed when its new template is created. New mapsets
+    are created by copying the template directory, the mapset search path is
+    validated and written directly into the SEARCH_PATH file.
+    """
+
+    db_driver = "sqlite"
+    db_database = "$GISDBASE/$LOCATION_NAME/$MAPSET/vector/$MAP/sqlite.db"
+    # The files of the PERMANENT mapset that invalidate the template
+    permanent_files = ["DEFAULT_WIND", "WIND", "PROJ_INFO", "PROJ_UNITS",
+                       "PROJ_EPSG", "PROJ_WKT", "PROJ_SRID"]
+
+    def __init__(self, template_path):
+        """
+
+        Args:
+            template_path (str): The directory in which the mapset
+                                 templates are stored
+
+        """
+        ProcessLogging.__init__(self)
+        self.template_path = template_path
+
+    def _get_template_name(self, permanent_path):
+        """Create the unique name of the template for a PERMANENT mapset
+
+        The name consists of a prefix that identifies the PERMANENT mapset
+        and a suffix that changes with its region and projection files.
+
+        Args:
+            permanent_path (str): The path to the PERMANENT mapset
+
+        Returns:
+            tuple:
+            (prefix, name) The prefix of all templates of the PERMANENT mapset
+            and the name of its current template
+
+        """
+        real_path = os.path.realpath(permanent_path)
+        # DEFAULT_WIND is required, os.stat() raises an error if it is missing
+        stat = os.stat(os.path.join(real_path, "DEFAULT_WIND"))
+        stamps = ["DEFAULT_WIND:%i:%i" % (stat.st_mtime_ns, stat.st_size)]
+        for name in self.permanent_files[1:]:
+            path = os.path.join(real_path, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                stamps.append("%s:%i:%i" % (name, stat.st_mtime_ns,
+                                            stat.st_size))
+        prefix = hashlib.sha1(real_path.encode()).hexdigest()[:16]
+        key = hashlib.sha1("|".join(stamps).encode()).hexdigest()[:16]
+        return prefix, "%s_%s" % (prefix, key)
+
+    def _remove_outdated_templates(self, prefix, name):
+        """Remove the templates of a PERMANENT mapset except the current one
+
+        Args:
+            prefix (str): The prefix of the templates of the PERMANENT mapset
+            name (str): The name of the current template
+
+        """
+        for entry in os.listdir(self.template_path):
+            if entry.startswith(prefix + "_") and entry != name:
+                shutil.rmtree(os.path.join(self.template_path, entry),
+                              ignore_errors=True)
+                self.log_debug("Removed outdated mapset template %s" % entry)
+
+    def get_template(self, permanent_path):
+        """Return the path of the template mapset for a PERMANENT mapset and
+        create it, if it does not exist
+
+        Args:
+            permanent_path (str): The path to the PERMANENT mapset
+
+        Raises:
+            GrassInitError if unable to create the template
+
+        Returns:
+            str:
+            The path to the template mapset
+
+        """
+        try:
+            prefix, name = self._get_template_name(permanent_path)
+            template = os.path.join(self.template_path, name)
+            if os.path.isdir(template):
+                return template
+
+            os.makedirs(self.template_path, exist_ok=True)
+            # Write the template into a temporary directory and rename it, so
+            # that concurrent jobs never see a partially written template
+            tmp_template = tempfile.mkdtemp(dir=self.template_path)
+            shutil.copyfile(os.path.join(permanent_path, "DEFAULT_WIND"),
+                            os.path.join(tmp_template, "WIND"))
+            self.write_var_file(os.path.join(tmp_template, "VAR"))
+            try:
+                os.rename(tmp_template, template)
+            except OSError:
+                # Another job created the template in the meantime
+                shutil.rmtree(tmp_template, ignore_errors=True)
+            self.log_debug("Created mapset template %s" % template)
+            self._remove_outdated_templates(prefix, name)
+        except Exception as e:
+            raise GrassInitError("Unable to create the mapset template for "
+                                 "<%s>: %s" % (permanent_path, str(e)))
+        return template
+
+    def write_var_file(self, var_file):
+        """Write the vector database connection into a VAR file, existing
+        entries of the VAR file are kept
+
+        Args:
+            var_file (str): The path to the VAR file
+
+        """
+        entries = {}
+        if os.path.isfile(var_file):
+            with open(var_file, "r") as var:
+                for line in var:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        entries[key.strip()] = value.strip()
+        entries["DB_DRIVER"] = self.db_driver
+        entries["DB_DATABASE"] = self.db_database
+        with open(var_file, "w") as var:
+            for key, value in entries.items():
+                var.write("%s: %s\n" % (key, value))
+
+    @staticmethod
+    def write_search_path(mapset_path, mapsets):
+        """Add mapsets to the search path of a mapset like g.mapsets
+        operation=add does
+
+        Entries of an existing SEARCH_PATH file that are no mapsets of the
+        location are removed.
+
+        Args:
+            mapset_path (str): The path to the mapset
+            mapsets (list): The mapset names to add to the search path
+
+        Raises:
+            GrassInitError if a mapset does not exist in the location
+
+        """
+        search_path_file = os.path.join(mapset_path, "SEARCH_PATH")
+        location_path = os.path.dirname(mapset_path)
+        mapset_name = os.path.basename(mapset_path)
+
+        def is_mapset(mapset):
+            return (mapset == os.path.basename(mapset)
+                    and not mapset.startswith(".")
+                    and os.path.isdir(os.path.join(location_path, mapset)))
+
+        for mapset in mapsets:
+            if not is_mapset(mapset):
+                raise GrassInitError("Mapset <%s> does not exist in location "
+                                     "<%s>" % (mapset,
+                                               os.path.basename(location_path)))
+        if os.path.isfile(search_path_file):
+            with open(search_path_file, "r") as search_path:
+                search_path_list = [mapset for mapset
+                                    in search_path.read().split()
+                                    if is_mapset(mapset)]
+        else:
+            search_path_list = [mapset_name]
+            if mapset_name != "PERMANENT":
+                search_path_list.append("PERMANENT")
+        for mapset in mapsets:
+            if mapset not in search_path_list:
+                search_path_list.append(mapset)
+        with open(search_path_file, "w") as search_path:
+            search_path.write("\n".join(search_path_list) + "\n")
+
+    def _copy_template(self, template, mapset_path):
+        """Copy the files of a template into a mapset, existing files of the
+        mapset are kept
+
+        Args:
+            template (str): The path to the template mapset
+            mapset_path (str): The path to the mapset
+
+        """
+        if os.path.isdir(mapset_path):
+            for name in os.listdir(template):
+                if not os.path.exists(os.path.join(mapset_path, name)):
+                    shutil.copyfile(os.path.join(template, name),
+                                    os.path.join(mapset_path, name))
+            self.write_var_file(os.path.join(mapset_path, "VAR"))
+        else:
+            shutil.copytree(template, mapset_path)
+
+    def create_mapset(self, location_path, mapset_name, search_path=None):
+        """Create a new mapset in a location by copying the template of the
+        PERMANENT mapset
+
+        Files that already exist in the mapset directory, e.g. interim results,
+        are not overwritten.
+
+        Args:
+            location_path (str): The path to the location
+            mapset_name (str): The name of the mapset to create
+            search_path (list): The mapset names to add to the search path
+
+        Raises:
+            GrassInitError if unable to create the mapset
+
+        Returns:
+            str:
+            The path to the new mapset
+
+        """
+        permanent_path = os.path.join(location_path, "PERMANENT")
+        mapset_path = os.path.join(location_path, mapset_name)
+        try:
+            try:
+                self._copy_template(self.get_template(permanent_path),
+                                    mapset_path)
+            except FileNotFoundError:
+                # The template was replaced by a concurrent job
+                self._copy_template(self.get_template(permanent_path),
+                                    mapset_path)
+            if search_path:
+                self.write_search_path(mapset_path, search_path)
+        except Exception as e:
+            raise GrassInitError("Unable to create mapset <%s> from template: %s"
+                                 % (mapset_name, str(e)))
+        return mapset_path
+
+
+class GrassModulePathIndex(ProcessLogging):
+    """This class maps GRASS GIS module names to their executable paths.
+
+    The bin and scripts directories of the GRASS installation and the addon
+    path are scanned once, the index is rebuilt only if the modification time
+    of the addon directories changed, e.g. if an addon was installed.
+    Modules in the GRASS installation take precedence over addons.
+    """
+
+    def __init__(self, grassbase, grass_addon_path):
+        """
+
+        Args:
+            grassbase (str): The installation directory of GRASS GIS
+            grass_addon_path (str): The path to GRASS addons
+
+        """
+        ProcessLogging.__init__(self)
+        self.directories = [os.path.join(grassbase, "bin"),
+                            os.path.join(grassbase, "scripts")]
+        self.addon_directories = []
+        if grass_addon_path:
+            self.addon_directories = [os.path.join(grass_addon_path, "bin"),
+                                      os.path.join(grass_addon_path, "scripts")]
+            self.directories.extend(self.addon_directories)
+        self.modules = {}
+        self.addon_mtimes = None
+        self._build()
+
+    def _get_addon_mtimes(self):
+        mtimes = []
+        for directory in self.addon_directories:
+            try:
+                mtimes.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def _build(self):
+        """Scan all module directories and create the index"""
+        self.addon_mtimes = self._get_addon_mtimes()
+        modules = {}
+        for directory in self.directories:
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name not in modules and entry.is_file():
+                        modules[entry.name] = entry.path
+        self.modules = modules
+        self.log_debug("Indexed %i GRASS modules in %s"
+                       % (len(modules), str(self.directories)))
+
+    @property
+    def is_available(self):
+        """True if GRASS modules were found"""
+        return len(self.modules) > 0
+
+    def get_module_path(self, grass_module):
+        """Return the path of a GRASS module
+
+        Args:
+            grass_module (str): The name of the module
+
+        Returns:
+            str:
+            The path to the module or None if the module is not installed
+
+        """
+        if self._get_addon_mtimes() != self.addon_mtimes:
+            self._build()
+
+        if os.name != "posix":
+            grass_module = grass_module + ".exe"
+
+        return self.modules.get(grass_module)
+
+    def has_module(self, grass_module):
+        return self.get_module_path(grass_module) is not None
+
+
+# The module path indices of the GRASS installations used in this process
+module_path_indices = {}
+
+
+def get_module_path_index(grassbase, grass_addon_path):
+    """Return the module path index of a GRASS installation, the index is
+    created once per process
+
+    Args:
+        grassbase (str): The installation directory of GRASS GIS
+        grass_addon_path (str): The path to GRASS addons
+
+    Returns:
+        GrassModulePathIndex:
+        The module path index
+
+    """
+    key = (grassbase, grass_addon_path)
+    if key not in module_path_indices:
+        module_path_indices[key] = GrassModulePathIndex(grassbase, grass_addon_path)
+    return module_path_indices[key]
+
+
 class GrassModuleRunner(ProcessLogging):
 
     def __init__(self, grassbase, grass_addon_path):
@@ -279,7 +623,7 @@ class GrassModuleRunner(ProcessLogging):
         self.grass_addon_path = grass_addon_path
 
     def _run_process(self, inputlist, raw=False, stdout=subprocess.PIPE,
-                     stderr=subprocess.PIPE, stdin=subprocess.PIPE):
+                     stderr=subprocess.PIPE, stdin=subprocess.PIPE, env=None):
         """This function runs a process and logs its stdout and stderr output.
         It either returns the subprocess or its error id, stderr and stdout
 
@@ -288,6 +632,8 @@ class GrassModuleRunner(ProcessLogging):
             raw (bool): If True return the subprocess, the caller has to take care of it
             stdout (file): A file object that receives stdout, default subprocess.PIPE
             stderr (file): A file object that receives stderr, default subprocess.PIPE
+            env (dict): The environment of the process, default the
+                        environment of this process
 
         Returns:
             subprocess:
@@ -297,7 +643,7 @@ class GrassModuleRunner(ProcessLogging):
         try:
             self.log_info("Run process: " + str(inputlist))
             proc = subprocess.Popen(args=inputlist, stdout=stdout,
-                                    stderr=stderr, stdin=stdin)
+                                    stderr=stderr, stdin=stdin, env=env)
             self.runPID = proc.pid
             self.log_debug("Process pid: " + str(self.runPID))
 
@@ -317,45 +663,19 @@ class GrassModuleRunner(ProcessLogging):
 
     def _create_grass_module_path(self, grass_module):
         """Create the parameter list and start the grass module. Search for grass
-        modules in different grass specific directories
+        modules in different grass specific directories using the module path
+        index of the GRASS installation
 
         Args:
             grass_module: The name of the module
 
         """
-
-        if os.name != "posix":
-            grass_module = grass_module + ".exe"
-
-        pathList = []
-
-        # Search the module in the bin directory
-        grass_module_path = os.path.join(self.grassbase, "bin", grass_module)
-        pathList.append(grass_module_path)
-        self.log_debug("Looking for %s" % grass_module_path)
-
-        if os.path.isfile(grass_module_path) is not True:
-            grass_module_path = os.path.join(self.grassbase, "scripts", grass_module)
-            pathList.append(grass_module_path)
-            self.log_debug("Looking for %s" % grass_module_path)
-            # if the module was not found in the bin dir, test the script directory
-            if os.path.isfile(grass_module_path) is not True:
-                grass_module_path = os.path.join(
-                    self.grass_addon_path, "bin", grass_module)
-                pathList.append(grass_module_path)
-                self.log_debug("Looking for %s" % grass_module_path)
-                # if the module was not found in the script dir, test the addon path
-                if os.path.isfile(grass_module_path) is not True:
-                    grass_module_path = os.path.join(
-                        self.grass_addon_path, "scripts", grass_module)
-                    pathList.append(grass_module_path)
-                    self.log_debug("Looking for %s" % grass_module_path)
-                    if os.path.isfile(grass_module_path) is not True:
-                        raise GrassInitError(
-                            "GRASS module " + grass_module + " not found in "
-                            + str(pathList))
-
-        self.log_debug("GRASS module path is " + grass_module_path)
+        index = get_module_path_index(self.grassbase, self.grass_addon_path)
+        grass_module_path = index.get_module_path(grass_module)
+        if grass_module_path is None:
+            raise GrassInitError(
+                "GRASS module " + grass_module + " not found in "
+                + str(index.directories))
 
         return grass_module_path
 
@@ -363,7 +683,8 @@ class GrassModuleRunner(ProcessLogging):
                    args, raw=False,
                    stdout=subprocess.PIPE,
                    stderr=subprocess.PIPE,
-                   stdin=subprocess.PIPE):
+                   stdin=subprocess.PIPE,
+                   env=None):
         """Set all input and output options and start the module
 
         Raises:
@@ -380,6 +701,8 @@ class GrassModuleRunner(ProcessLogging):
             stdout (file): A file object that receives stdout, default subprocess.PIPE
             stderr (file): A file object that receives stderr, default subprocess.PIPE
             stdin (file): A file object that provides stdin, default subprocess.PIPE
+            env (dict): The environment of the module, e.g. to run it in
+                        another mapset, default the environment of this process
 
         Returns:
             subprocess:
@@ -393,10 +716,12 @@ class GrassModuleRunner(ProcessLogging):
         parameter.extend(args)
 
         if raw is False:
-            errorid, stdout_buff, stderr_buff = self._run_process(parameter)
+            errorid, stdout_buff, stderr_buff = self._run_process(
+                parameter, env=env)
         else:
             return self._run_process(
-                parameter, raw=raw, stdout=stdout, stderr=stderr, stdin=stdin)
+                parameter, raw=raw, stdout=stdout, stderr=stderr, stdin=stdin,
+                env=env)
 
         if errorid != 0:
             log = "Error while executing the grass module. "" \
@@ -463,9 +788,26 @@ class GrassInitializer(ProcessLogging):
         self.runner = GrassModuleRunner(self.grass_base_dir,
                                         self.grass_addon_path)
 
+    def switch_mapset(self, mapset_name):
+        """Switch the current mapset by rewriting the gisrc file
+
+        In contrast to g.mapset no GRASS module is executed, the mapset must
+        exist.
+
+        Args:
+            mapset_name (str): The name of the mapset to switch into
+
+        """
+        self.mapset_name = mapset_name
+        self.mapset_path = os.path.join(self.grass_data_base,
+                                        self.location_name,
+                                        self.mapset_name)
+        self.gisrc.mapset = mapset_name
+        self.gisrc.rewrite_file()
+
     def run_module(self, module_name, parameter_list, raw=False,
                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                   stdin=subprocess.PIPE):
+                   stdin=subprocess.PIPE, env=None):
         """Run a grass module
 
         Args:
@@ -476,6 +818,8 @@ class GrassInitializer(ProcessLogging):
                         is returned
             stdout (file): A file object that receives stdout, default subprocess.PIPE
             stderr (file): A file object that receives stderr, default subprocess.PIPE
+            env (dict): The environment of the module, default the environment
+                        of this process
 
         Raises:
             This method raises a GrassInitError Exception in case
@@ -488,7 +832,7 @@ class GrassInitializer(ProcessLogging):
 
         """
         return self.runner.run_module(module_name, parameter_list, raw, stdout=stdout,
-                                      stderr=stderr, stdin=stdin)
+                                      stderr=stderr, stdin=stdin, env=env)
 
     def clean_up(self):
         """Try to remove the temporary gisrc file and the mapset lock
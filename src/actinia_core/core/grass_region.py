@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+In-process handling of GRASS GIS region files (WIND, windows/*, cellhd/*)
+"""
+
+import os
+import re
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# Degree, minutes, seconds notation of lat/long coordinates, e.g.: 35:30:15.5N
+DMS_PATTERN = re.compile(
+    r"^(\d+)(?::(\d+)(?::(\d+(?:\.\d*)?))?)?([NSEWnsew]?)$")
+
+
+class GrassRegionError(Exception):
+    """Exception that is thrown in case a region file can not be
+    handled in-process
+    """
+
+
+def scan_coordinate(value):
+    """Convert a coordinate or resolution of a region file into a float
+
+    Args:
+        value (str): The coordinate in decimal or degree, minutes,
+                     seconds notation
+
+    Raises:
+        GrassRegionError if the value can not be converted
+
+    Returns:
+        float:
+        The coordinate
+
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    match = DMS_PATTERN.match(value.strip())
+    if match is None:
+        raise GrassRegionError("Unable to convert <%s> into a coordinate" % value)
+    degree, minutes, seconds, hemisphere = match.groups()
+    coordinate = float(degree) + float(minutes or 0) / 60.0 \
+        + float(seconds or 0) / 3600.0
+    if hemisphere.upper() in ("S", "W"):
+        coordinate = -coordinate
+    return coordinate
+
+
+class GrassRegion(object):
+    """This class represents the two dimensional part of a GRASS GIS region
+    that is read from a region file without running g.region.
+
+    All entries of the region file are kept, so that a modified region
+    can be written back without losing the 3D settings.
+    """
+
+    def __init__(self, entries):
+        """
+
+        Args:
+            entries (dict): The key/value entries of a region file
+
+        Raises:
+            GrassRegionError if the region entries are incomplete
+
+        """
+        self.entries = entries
+        try:
+            self.proj = int(entries["proj"])
+            self.north = scan_coordinate(entries["north"])
+            self.south = scan_coordinate(entries["south"])
+            self.east = scan_coordinate(entries["east"])
+            self.west = scan_coordinate(entries["west"])
+            self.rows = int(entries["rows"])
+            self.cols = int(entries["cols"])
+        except (KeyError, ValueError) as e:
+            raise GrassRegionError("Incomplete region definition: %s" % str(e))
+
+        if self.rows <= 0 or self.cols <= 0:
+            raise GrassRegionError("Invalid number of rows or columns")
+
+    @classmethod
+    def read(cls, region_file):
+        """Read a WIND, windows or cellhd region file
+
+        Args:
+            region_file (str): The path to the region file
+
+        Raises:
+            GrassRegionError if the region file can not be read
+
+        Returns:
+            GrassRegion:
+            The region
+
+        """
+        entries = {}
+        try:
+            with open(region_file, "r") as region:
+                for line in region:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        entries[key.strip()] = value.strip()
+        except OSError as e:
+            raise GrassRegionError("Unable to read region file <%s>: %s"
+                                   % (region_file, str(e)))
+        return cls(entries)
+
+    @property
+    def ns_res(self):
+        return (self.north - self.south) / self.rows
+
+    @property
+    def ew_res(self):
+        if self.proj == 3 and self.east < self.west:
+            # Region crossing the dateline
+            return (self.east + 360.0 - self.west) / self.cols
+        return (self.east - self.west) / self.cols
+
+    @property
+    def cells(self):
+        return self.rows * self.cols
+
+    def as_dict(self):
+        """Return the region using the keys of g.region -ug"""
+        return {"n": self.north, "s": self.south, "e": self.east, "w": self.west,
+                "nsres": self.ns_res, "ewres": self.ew_res,
+                "rows": self.rows, "cols": self.cols, "cells": self.cells}
+
+    def set_resolution(self, ns_res, ew_res):
+        """Set the resolution while keeping the region bounds, like g.region
+        nsres= ewres= does
+
+        The number of rows and columns is rounded and the resolution
+        is adjusted to the bounds.
+
+        Args:
+            ns_res (float): The north-south resolution
+            ew_res (float): The east-west resolution
+
+        """
+        self.rows = max(1, int((self.north - self.south) / ns_res + 0.5))
+        self.cols = max(1, int((self.east - self.west) / ew_res + 0.5))
+
+    def write(self, region_file):
+        """Write the region into a region file
+
+        Lat/long regions use degree, minutes, seconds notation in region files
+        and are not written in-process.
+
+        Args:
+            region_file (str): The path to the region file
+
+        Raises:
+            GrassRegionError if the region can not be written
+
+        """
+        if self.proj == 3:
+            raise GrassRegionError("Lat/long regions can not be written in-process")
+
+        entries = dict(self.entries)
+        entries["north"] = "%.15g" % self.north
+        entries["south"] = "%.15g" % self.south
+        entries["east"] = "%.15g" % self.east
+        entries["west"] = "%.15g" % self.west
+        entries["cols"] = str(self.cols)
+        entries["rows"] = str(self.rows)
+        entries["e-w resol"] = "%.15g" % self.ew_res
+        entries["n-s resol"] = "%.15g" % self.ns_res
+
+        try:
+            with open(region_file, "w") as region:
+                for key, value in entries.items():
+                    region.write("%-12s%s\n" % (key + ":", value))
+        except OSError as e:
+            raise GrassRegionError("Unable to write region file <%s>: %s"
+                                   % (region_file, str(e)))
+
+
+def get_region_file_path(mapset_path):
+    """Return the path to the region file that is used by GRASS GIS modules in a
+    mapset. The WIND_OVERRIDE environment variable is respected.
+
+    Args:
+        mapset_path (str): The path to the current mapset
+
+    Raises:
+        GrassRegionError if the region is set by the GRASS_REGION
+        environment variable
+
+    Returns:
+        str:
+        The path to the region file
+
+    """
+    if os.environ.get("GRASS_REGION"):
+        raise GrassRegionError("The region is defined by GRASS_REGION")
+    wind_override = os.environ.get("WIND_OVERRIDE")
+    if wind_override:
+        return os.path.join(mapset_path, "windows", wind_override)
+    return os.path.join(mapset_path, "WIND")
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Readiness checks and drain mode of an actinia node
+"""
+
+import os
+import shutil
+
+import redis
+
+from actinia_core.core.common.process_queue import get_process_queue_state
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The connection and response timeout in seconds of the redis check
+REDIS_CHECK_TIMEOUT = 2
+DRAIN_MESSAGE = "The server is draining and does not accept new jobs"
+
+
+def is_draining(config):
+    """Check if the node is in drain mode
+
+    Args:
+        config (Configuration): The actinia configuration
+
+    Returns:
+        bool:
+        True if the drain file exists
+    """
+    return bool(config.DRAIN_FILE) and os.path.exists(config.DRAIN_FILE)
+
+
+def set_draining(config, drain):
+    """Switch the drain mode of the node on or off
+
+    The drain mode is shared by all server workers of the node, since it is
+    stored as file.
+
+    Args:
+        config (Configuration): The actinia configuration
+        drain (bool): True to switch the drain mode on, False to switch it off
+
+    """
+    if drain is True:
+        os.makedirs(os.path.dirname(config.DRAIN_FILE), exist_ok=True)
+        with open(config.DRAIN_FILE, "a"):
+            pass
+    elif os.path.exists(config.DRAIN_FILE):
+        os.remove(config.DRAIN_FILE)
+
+
+def check_redis(config):
+    """Check if the redis server is reachable
+
+    Args:
+        config (Configuration): The actinia configuration
+
+    Returns:
+        tuple:
+        (ok, message)
+    """
+    kwargs = dict()
+    kwargs['host'] = config.REDIS_SERVER_URL
+    kwargs['port'] = config.REDIS_SERVER_PORT
+    if config.REDIS_SERVER_PW and config.REDIS_SERVER_PW is not None:
+        kwargs['password'] = config.REDIS_SERVER_PW
+    connection = redis.StrictRedis(socket_timeout=REDIS_CHECK_TIMEOUT,
+                                   socket_connect_timeout=REDIS_CHECK_TIMEOUT,
+                                   **kwargs)
+    try:
+        connection.ping()
+    except redis.exceptions.RedisError as e:
+        return False, "Redis server is not reachable: %s" % str(e)
+    finally:
+        connection.connection_pool.disconnect()
+    return True, "Redis server is reachable"
+
+
+def check_process_queue(config):
+    """Check if the process queue manager is alive and responsive
+
+    Args:
+        config (Configuration): The actinia configuration
+
+    Returns:
+        tuple:
+        (ok, message)
+    """
+    if config.QUEUE_TYPE != "local":
+        return True, "The local process queue is not used"
+    alive, heartbeat_age = get_process_queue_state()
+    if alive is False:
+        return False, "The process queue manager is not running"
+    if heartbeat_age > config.READINESS_QUEUE_TIMEOUT:
+        return False, ("The process queue manager did not respond for %.0f "
+                       "seconds" % heartbeat_age)
+    return True, "The process queue manager is running"
+
+
+def check_disk_space(config):
+    """Check if the temporary database has enough free disk space
+
+    Args:
+        config (Configuration): The actinia configuration
+
+    Returns:
+        tuple:
+        (ok, message)
+    """
+    try:
+        free = shutil.disk_usage(config.GRASS_TMP_DATABASE).free
+    except OSError as e:
+        return False, "Unable to read the free disk space: %s" % str(e)
+    free_gb = free / (1024.0 * 1024.0 * 1024.0)
+    message = "%.1f GB free disk space in the temporary database" % free_gb
+    return free_gb >= config.READINESS_MIN_FREE_DISK, message
+
+
+def get_readiness(config):
+    """Run all readiness checks of the node
+
+    Args:
+        config (Configuration): The actinia configuration
+
+    Returns:
+        tuple:
+        (status, checks) the status is "ready", "not ready" or "draining",
+        checks is a dict with the check names as keys and
+        {"status": "ok" or "failed", "message": str} as values
+    """
+    checks = dict()
+    ready = True
+    for name, check in (("redis", check_redis),
+                        ("process_queue", check_process_queue),
+                        ("disk_space", check_disk_space)):
+        ok, message = check(config)
+        checks[name] = {"status": "ok" if ok is True else "failed",
+                        "message": message}
+        ready = ready and ok
+
+    if is_draining(config) is True:
+        status = "draining"
+    elif ready is True:
+        status = "ready"
+    else:
+        status = "not ready"
+    return status, checks
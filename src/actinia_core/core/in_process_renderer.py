@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+In-process raster map renderer using GDAL and NumPy
+
+The renderer reproduces d.rast -n in the API process: the raster map is read
+with the GRASS driver of GDAL at the output resolution or at the cell
+resolution if the cells are larger than the pixels, the color table of
+the map is applied with a vectorized lookup and the image is encoded as PNG
+by GDAL. The region is fitted into the image like the display modules do,
+null cells and the area outside of the region are transparent.
+
+GDAL and NumPy are imported on first use. Raster maps that can not be
+rendered in-process, e.g. maps without color table, images that exceed the
+pixel limit or an unavailable GRASS driver, raise RenderNotSupported and are
+rendered by a d.rast job. The GRASS driver of GDAL is not thread-safe, the
+raster maps are opened and read by one thread at a time.
+"""
+
+import math
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The color of values that are not covered by the color rules
+DEFAULT_COLOR = (255, 255, 255)
+# The number of rows that the color table is applied to at once
+BLOCK_ROWS = 256
+
+_executor = None
+_executor_lock = threading.Lock()
+# Serializes the access to the GRASS driver of GDAL
+_gdal_lock = threading.Lock()
+
+
+class RenderNotSupported(Exception):
+    """Exception that is raised if a raster map can not be rendered
+    in-process
+    """
+
+
+def _import_gdal():
+    """Import GDAL and NumPy
+
+    Raises:
+        RenderNotSupported: If GDAL, NumPy or the GRASS driver of GDAL are
+                            not available
+
+    Returns:
+        tuple:
+        (gdal, numpy)
+    """
+    try:
+        import numpy
+        from osgeo import gdal
+    except ImportError as e:
+        raise RenderNotSupported("GDAL and NumPy are required: %s" % str(e))
+    if gdal.GetDriverByName("GRASS") is None:
+        raise RenderNotSupported("The GRASS driver of GDAL is not available")
+    return gdal, numpy
+
+
+def get_render_executor(max_workers):
+    """Return the thread pool of the in-process renderer
+
+    Args:
+        max_workers (int): The number of threads
+
+    Returns:
+        ThreadPoolExecutor:
+        The thread pool that is shared by all requests of the process
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, max_workers),
+                thread_name_prefix="render")
+        return _executor
+
+
+def _parse_color(value):
+    """Parse a "r:g:b" or "grey" color of a color table"""
+    components = [int(component) for component in value.split(":")]
+    if len(components) == 1:
+        components = components * 3
+    if len(components) != 3:
+        raise ValueError("Invalid color <%s>" % value)
+    return tuple(components)
+
+
+def read_color_table(colr_file):
+    """Read the color table of a raster map
+
+    Only the color table format of GRASS 4 and newer is supported.
+
+    Args:
+        colr_file (str): The path to the colr file of the raster map
+
+    Raises:
+        RenderNotSupported: If the color table does not exist or can not be
+                            read
+
+    Returns:
+        dict:
+        The color table {"rules": [(value1, color1, value2, color2)],
+        "null": color or None, "default": color, "shift": float,
+        "invert": bool}
+    """
+    table = {"rules": [], "null": None, "default": DEFAULT_COLOR,
+             "shift": 0.0, "invert": False}
+    try:
+        with open(colr_file) as colr:
+            lines = [line.strip() for line in colr if line.strip()]
+        if not lines or not lines[0].startswith("%"):
+            raise ValueError("Unsupported color table format")
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            if line == "invert":
+                table["invert"] = True
+            elif key == "shift":
+                table["shift"] = float(value)
+            elif key == "nv":
+                table["null"] = _parse_color(value)
+            elif key == "*":
+                table["default"] = _parse_color(value)
+            else:
+                entries = line.split()
+                if len(entries) == 1:
+                    entries.append(entries[0])
+                if len(entries) != 2:
+                    raise ValueError("Invalid color rule <%s>" % line)
+                value1, _, color1 = entries[0].partition(":")
+                value2, _, color2 = entries[1].partition(":")
+                table["rules"].append((float(value1), _parse_color(color1),
+                                       float(value2), _parse_color(color2)))
+    except (OSError, ValueError) as e:
+        raise RenderNotSupported("Unable to read the color table <%s>: %s"
+                                 % (colr_file, str(e)))
+    return table
+
+
+def get_image_frame(region, width, height):
+    """Fit a region into an image, keeping its aspect ratio
+
+    Args:
+        region (dict): The region {"north", "south", "east", "west"}
+        width (int): The image width in pixel
+        height (int): The image height in pixel
+
+    Returns:
+        tuple:
+        (x_offset, y_offset, scale) The pixel offset of the north-west corner
+        of the region and the number of pixel per map unit
+    """
+    ew_extent = region["east"] - region["west"]
+    ns_extent = region["north"] - region["south"]
+    scale = min(width / ew_extent, height / ns_extent)
+    return ((width - ew_extent * scale) / 2.0,
+            (height - ns_extent * scale) / 2.0, scale)
+
+
+def get_source_window(geo_transform, raster_size, region, frame):
+    """Compute the cells of a raster map that cover a region and the pixel
+    rectangle in the image that they are drawn to
+
+    Args:
+        geo_transform (tuple): The GDAL geo transform of the raster map
+        raster_size (tuple): The (columns, rows) of the raster map
+        region (dict): The region {"north", "south", "east", "west"}
+        frame (tuple): The image frame of the region from get_image_frame()
+
+    Returns:
+        tuple:
+        ((column, row, columns, rows), (x, y, width, height)) The cell window
+        and the pixel rectangle, or None if the raster map does not overlap
+        the region
+    """
+    west, ew_res, _, north, _, ns_res = geo_transform
+    ns_res = -ns_res
+    columns, rows = raster_size
+    x_offset, y_offset, scale = frame
+
+    col0 = max(0, math.floor((max(region["west"], west) - west) / ew_res))
+    col1 = min(columns, math.ceil((min(region["east"], west + columns * ew_res)
+                                   - west) / ew_res))
+    row0 = max(0, math.floor((north - min(region["north"], north)) / ns_res))
+    row1 = min(rows, math.ceil((north - max(region["south"],
+                                            north - rows * ns_res)) / ns_res))
+    if col0 >= col1 or row0 >= row1:
+        return None
+
+    x0 = round(x_offset + (west + col0 * ew_res - region["west"]) * scale)
+    x1 = round(x_offset + (west + col1 * ew_res - region["west"]) * scale)
+    y0 = round(y_offset + (region["north"] - (north - row0 * ns_res)) * scale)
+    y1 = round(y_offset + (region["north"] - (north - row1 * ns_res)) * scale)
+    return ((col0, row0, col1 - col0, row1 - row0),
+            (x0, y0, max(1, x1 - x0), max(1, y1 - y0)))
+
+
+def get_buffer_indices(numpy, start, stop, size, buffer_size):
+    """Compute the nearest buffer element of the pixels of a pixel range
+
+    Args:
+        numpy (module): The NumPy module
+        start (int): The first pixel relative to the pixel rectangle
+        stop (int): The pixel after the last pixel
+        size (int): The size of the pixel rectangle
+        buffer_size (int): The size of the read buffer that covers the pixel
+                           rectangle
+
+    Returns:
+        numpy.ndarray:
+        The buffer index of each pixel
+    """
+    pixels = numpy.arange(start, stop) + 0.5
+    return numpy.minimum((pixels * buffer_size / size).astype(int),
+                         buffer_size - 1)
+
+
+def apply_color_table(numpy, data, valid, table):
+    """Apply a color table to raster values
+
+    The color rules are sorted by their lower value and looked up with a
+    binary search, the colors are interpolated linearly within a rule. The
+    rows are processed in blocks of BLOCK_ROWS rows with single precision to
+    limit the memory of the intermediate arrays.
+
+    Args:
+        numpy (module): The NumPy module
+        data (numpy.ndarray): The raster values
+        valid (numpy.ndarray): The mask of the cells that are not null
+        table (dict): The color table from read_color_table()
+
+    Returns:
+        numpy.ndarray:
+        The RGBA image with shape (rows, columns, 4)
+    """
+    rgba = numpy.zeros(data.shape + (4,), dtype=numpy.uint8)
+    rules = sorted(table["rules"], key=lambda rule: rule[0])
+    low = numpy.array([rule[0] for rule in rules], dtype=numpy.float32)
+    high = numpy.array([rule[2] for rule in rules], dtype=numpy.float32)
+    low_colors = numpy.array([rule[1] for rule in rules],
+                             dtype=numpy.float32).reshape(-1, 3)
+    color_steps = numpy.array([rule[3] for rule in rules],
+                              dtype=numpy.float32).reshape(-1, 3) - low_colors
+    default = numpy.array(table["default"], dtype=numpy.float32)
+
+    for start in range(0, data.shape[0], BLOCK_ROWS):
+        block = slice(start, start + BLOCK_ROWS)
+        values = data[block].astype(numpy.float32) - numpy.float32(
+            table["shift"])
+        colors = numpy.empty(values.shape + (3,), dtype=numpy.float32)
+        colors[:] = default
+
+        if rules:
+            index = numpy.searchsorted(low, values, side="right") - 1
+            covered = index >= 0
+            index = numpy.clip(index, 0, len(rules) - 1)
+            covered &= values <= high[index]
+            span = high[index] - low[index]
+            fraction = numpy.where(
+                span > 0, (values - low[index]) / numpy.where(span > 0, span, 1),
+                numpy.float32(0.0))[..., numpy.newaxis]
+            colors[covered] = (low_colors[index] + fraction
+                               * color_steps[index])[covered]
+
+        if table["invert"]:
+            colors = 255 - colors
+        rgba[block, :, :3] = numpy.clip(numpy.rint(colors), 0, 255)
+        rgba[block, :, 3] = numpy.where(valid[block], 255, 0)
+    return rgba
+
+
+def _encode_png(gdal, rgba):
+    """Encode a RGBA image as PNG with GDAL"""
+    rows, columns, _ = rgba.shape
+    memory = gdal.GetDriverByName("MEM").Create("", columns, rows, 4,
+                                                gdal.GDT_Byte)
+    for band in range(4):
+        memory.GetRasterBand(band + 1).WriteArray(rgba[..., band])
+    path = "/vsimem/render_%s.png" % uuid.uuid4().hex
+    png = gdal.GetDriverByName("PNG").CreateCopy(path, memory)
+    if png is None:
+        raise RenderNotSupported("Unable to encode the PNG image: %s"
+                                 % gdal.GetLastErrorMsg())
+    png = None
+    try:
+        handle = gdal.VSIFOpenL(path, "rb")
+        gdal.VSIFSeekL(handle, 0, 2)
+        size = gdal.VSIFTellL(handle)
+        gdal.VSIFSeekL(handle, 0, 0)
+        image = gdal.VSIFReadL(1, size, handle)
+        gdal.VSIFCloseL(handle)
+    finally:
+        gdal.Unlink(path)
+    return image
+
+
+def render_raster(mapset_path, raster_name, options, max_pixels=None):
+    """Render a raster map as PNG image like d.rast -n
+
+    Args:
+        mapset_path (str): The path to the mapset of the raster map
+        raster_name (str): The name of the raster map
+        options (dict): The render options with width, height and the
+                        optional n, s, e, w region settings
+        max_pixels (int): The maximum number of pixel of the image, larger
+                          images are not rendered in-process
+
+    Raises:
+        RenderNotSupported: If the raster map can not be rendered in-process
+
+    Returns:
+        bytes:
+        The PNG image
+    """
+    width = int(options["width"])
+    height = int(options["height"])
+    if max_pixels is not None and width * height > max_pixels:
+        raise RenderNotSupported("The image size %ix%i exceeds the limit of "
+                                 "%i pixel" % (width, height, max_pixels))
+
+    gdal, numpy = _import_gdal()
+    table = read_color_table(os.path.join(mapset_path, "colr", raster_name))
+
+    with _gdal_lock:
+        dataset = gdal.Open(os.path.join(mapset_path, "cellhd", raster_name))
+        if dataset is None:
+            raise RenderNotSupported("Unable to open raster map <%s>: %s"
+                                     % (raster_name, gdal.GetLastErrorMsg()))
+        geo_transform = dataset.GetGeoTransform()
+        raster_size = (dataset.RasterXSize, dataset.RasterYSize)
+    region = {
+        "north": options.get("n", geo_transform[3]),
+        "south": options.get("s", geo_transform[3]
+                             + raster_size[1] * geo_transform[5]),
+        "east": options.get("e", geo_transform[0]
+                            + raster_size[0] * geo_transform[1]),
+        "west": options.get("w", geo_transform[0])}
+    if region["north"] <= region["south"] or region["east"] <= region["west"]:
+        with _gdal_lock:
+            dataset = None
+        raise RenderNotSupported("Invalid region <%s>" % str(region))
+
+    rgba = numpy.zeros((height, width, 4), dtype=numpy.uint8)
+    frame = get_image_frame(region, width, height)
+    window = get_source_window(geo_transform, raster_size, region, frame)
+    if window is not None:
+        (col, row, columns, rows), (x, y, x_size, y_size) = window
+        # Clip the drawn cells to the region
+        x0, y0 = max(x, round(frame[0])), max(y, round(frame[1]))
+        x1 = min(x + x_size, width - round(frame[0]))
+        y1 = min(y + y_size, height - round(frame[1]))
+    if window is None or x0 >= x1 or y0 >= y1:
+        with _gdal_lock:
+            dataset = None
+        return _encode_png(gdal, rgba)
+
+    # The cells are read with at most one value per pixel and magnified to
+    # the clipped pixel rectangle, so that the size of the read buffer is
+    # limited by the image size for cells that are larger than a pixel
+    buffer_columns = min(columns, x_size)
+    buffer_rows = min(rows, y_size)
+    with _gdal_lock:
+        band = dataset.GetRasterBand(1)
+        data = band.ReadAsArray(col, row, columns, rows, buffer_columns,
+                                buffer_rows)
+        nodata = band.GetNoDataValue()
+        error = gdal.GetLastErrorMsg()
+        band = None
+        dataset = None
+    if data is None:
+        raise RenderNotSupported("Unable to read raster map <%s>: %s"
+                                 % (raster_name, error))
+    data = data[get_buffer_indices(numpy, y0 - y, y1 - y, y_size,
+                                   buffer_rows)[:, numpy.newaxis],
+                get_buffer_indices(numpy, x0 - x, x1 - x, x_size,
+                                   buffer_columns)]
+    valid = numpy.ones(data.shape, dtype=bool)
+    if nodata is not None:
+        valid &= data != nodata
+    if data.dtype.kind == "f":
+        valid &= ~numpy.isnan(data)
+    rgba[y0:y1, x0:x1] = apply_color_table(numpy, data, valid, table)
+
+    return _encode_png(gdal, rgba)
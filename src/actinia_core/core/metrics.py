@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Prometheus metrics of the queue, the jobs, the modules, the redis calls, the
+download cache and the exports
+
+The metrics are collected in-process. If the environment variable
+PROMETHEUS_MULTIPROC_DIR is set, the metrics of all gunicorn workers, process
+queue managers and job processes are written to memory mapped files in this
+directory and aggregated by the /metrics endpoint. The directory must be empty
+at server start. Use the child_exit() function as gunicorn hook to remove the
+gauges of dead workers.
+
+The job processes are short-lived, each of them would leave its counter and
+histogram files in the multiprocess directory. Hence they send their
+observations through the process queue to the process queue manager that
+records them, see set_metrics_queue().
+
+All functions do nothing if prometheus_client is not installed.
+"""
+
+import os
+import time
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, \
+        Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest, \
+        multiprocess
+
+    has_prometheus = True
+except Exception:
+    has_prometheus = False
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+MULTIPROC_DIR_VARIABLE = "PROMETHEUS_MULTIPROC_DIR"
+# The first element of the queue messages that contain observations
+METRICS_MESSAGE = "METRICS"
+# The histogram buckets in seconds of jobs and modules
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0,
+               10800.0, 86400.0)
+# The histogram buckets in seconds of redis calls
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                 1.0)
+
+if has_prometheus is True:
+    QUEUE_WAITING_JOBS = Gauge(
+        "actinia_queue_waiting_jobs",
+        "Number of jobs that wait in the process queues",
+        multiprocess_mode="livesum")
+    QUEUE_RUNNING_JOBS = Gauge(
+        "actinia_queue_running_jobs",
+        "Number of jobs that are run by the process queues",
+        multiprocess_mode="livesum")
+    JOB_WAIT_SECONDS = Histogram(
+        "actinia_job_wait_seconds",
+        "Time between the acceptance and the start of a job",
+        ["endpoint"], buckets=JOB_BUCKETS)
+    JOB_RUN_SECONDS = Histogram(
+        "actinia_job_run_seconds",
+        "Time between the start and the end of a job",
+        ["endpoint", "status"], buckets=JOB_BUCKETS)
+    MODULE_RUN_SECONDS = Histogram(
+        "actinia_module_run_seconds",
+        "Run time of the GRASS GIS modules and executables",
+        ["module"], buckets=JOB_BUCKETS)
+    REDIS_CALL_SECONDS = Histogram(
+        "actinia_redis_call_seconds",
+        "Latency of the redis calls",
+        ["command"], buckets=REDIS_BUCKETS)
+    DOWNLOAD_CACHE_REQUESTS = Counter(
+        "actinia_download_cache_requests",
+        "Number of files that were requested from the shared download cache",
+        ["result"])
+    EXPORT_BYTES = Counter(
+        "actinia_export_bytes",
+        "Number of bytes of the exported resources",
+        ["type"])
+    EXPORT_SECONDS = Counter(
+        "actinia_export_seconds",
+        "Time that was spent to export and store resources",
+        ["type"])
+    WORKER_CPU_SECONDS = Gauge(
+        "actinia_worker_cpu_seconds",
+        "User and system CPU time of the server worker processes",
+        multiprocess_mode="liveall")
+
+    # The metrics with labels and the methods that record an observation
+    METRICS = {
+        "job_wait": (JOB_WAIT_SECONDS, "observe"),
+        "job_run": (JOB_RUN_SECONDS, "observe"),
+        "module_run": (MODULE_RUN_SECONDS, "observe"),
+        "redis_call": (REDIS_CALL_SECONDS, "observe"),
+        "download_cache_requests": (DOWNLOAD_CACHE_REQUESTS, "inc"),
+        "export_bytes": (EXPORT_BYTES, "inc"),
+        "export_seconds": (EXPORT_SECONDS, "inc")}
+
+# The queue that receives the observations of the processes that are forked
+# from the process queue manager and the process id of the manager
+metrics_queue = None
+metrics_queue_pid = None
+
+
+def _get_endpoint(api_info):
+    """Return the endpoint of the api info of a job"""
+    if api_info and "endpoint" in api_info:
+        return str(api_info["endpoint"])
+    return "unknown"
+
+
+def _record(name, labels, value):
+    """Record an observation or send it to the process queue manager
+
+    Args:
+        name (str): The key of the metric in METRICS
+        labels (tuple): The label values
+        value (float): The observed value
+
+    """
+    if has_prometheus is False:
+        return
+    if metrics_queue is not None and os.getpid() != metrics_queue_pid:
+        try:
+            # The process id and the time make the message unique in the set
+            # of the queue watcher
+            metrics_queue.put((METRICS_MESSAGE, name, labels, value,
+                               os.getpid(), time.perf_counter_ns()))
+        except Exception:
+            pass
+        return
+    metric, method = METRICS[name]
+    getattr(metric.labels(*labels), method)(value)
+
+
+def set_metrics_queue(queue):
+    """Send the observations of all processes that are forked from the
+    current process to a queue
+
+    This is used by the process queue manager in multiprocess mode, it
+    records the observations of the job processes with record_metrics().
+
+    Args:
+        queue: The multiprocessing.Queue() of the process queue manager
+
+    """
+    global metrics_queue, metrics_queue_pid
+    if has_prometheus is False or is_multiprocess_mode() is False:
+        return
+    metrics_queue = queue
+    metrics_queue_pid = os.getpid()
+
+
+def is_metrics_message(data):
+    """Check if a queue message contains an observation
+
+    Args:
+        data: The queue message
+
+    Returns:
+        bool:
+        True if the message was sent by _record()
+    """
+    return isinstance(data, tuple) and len(data) == 6 \
+        and data[0] == METRICS_MESSAGE
+
+
+def record_metrics(data):
+    """Record the observation of a queue message
+
+    Args:
+        data (tuple): The queue message
+
+    """
+    if has_prometheus is False:
+        return
+    _, name, labels, value, _, _ = data
+    if name in METRICS:
+        _record(name, labels, value)
+
+
+def is_multiprocess_mode():
+    """Check if the metrics are shared between processes
+
+    Returns:
+        bool:
+        True if the metrics are written to the multiprocess directory
+    """
+    return bool(os.environ.get(MULTIPROC_DIR_VARIABLE))
+
+
+def set_queue_size(waiting, running):
+    """Set the number of waiting and running jobs of a process queue
+
+    Args:
+        waiting (int): The number of waiting jobs
+        running (int): The number of running jobs
+
+    """
+    if has_prometheus is False:
+        return
+    QUEUE_WAITING_JOBS.set(waiting)
+    QUEUE_RUNNING_JOBS.set(running)
+
+
+def observe_job_start(api_info, accept_time):
+    """Observe the time that a job waited in the queue
+
+    Args:
+        api_info (dict): The api info of the job
+        accept_time (float): The time when the job was accepted
+
+    """
+    _record("job_wait", (_get_endpoint(api_info),),
+            max(0.0, time.time() - accept_time))
+
+
+def observe_job_finish(api_info, status, start_time):
+    """Observe the run time of a job
+
+    Args:
+        api_info (dict): The api info of the job
+        status (str): The final status of the job
+        start_time (float): The time when the job was started
+
+    """
+    _record("job_run", (_get_endpoint(api_info), status),
+            max(0.0, time.time() - start_time))
+
+
+def observe_module_run(executable, run_time):
+    """Observe the run time of a GRASS GIS module or executable
+
+    Args:
+        executable (str): The module name or the path of the executable
+        run_time (float): The run time in seconds
+
+    """
+    _record("module_run", (os.path.basename(str(executable)),), run_time)
+
+
+def observe_redis_call(command, run_time):
+    """Observe the latency of a redis call
+
+    Args:
+        command (str): The redis command
+        run_time (float): The latency in seconds
+
+    """
+    if isinstance(command, bytes):
+        command = command.decode(errors="replace")
+    _record("redis_call", (str(command).upper(),), run_time)
+
+
+def count_download_cache_request(hit):
+    """Count a request of the shared download cache
+
+    Args:
+        hit (bool): True if the file was in the cache
+
+    """
+    _record("download_cache_requests", ("hit" if hit is True else "miss",), 1)
+
+
+def observe_export(export_type, num_bytes, run_time):
+    """Observe the export of a resource
+
+    Args:
+        export_type (str): The type of the resource, e.g. raster or vector
+        num_bytes (int): The size of the exported file
+        run_time (float): The time to export and store the resource
+
+    """
+    _record("export_bytes", (export_type,), num_bytes)
+    _record("export_seconds", (export_type,), run_time)
+
+
+def update_worker_cpu_usage():
+    """Set the CPU time of the current server worker process"""
+    if has_prometheus is False:
+        return
+    times = os.times()
+    WORKER_CPU_SECONDS.set(times.user + times.system)
+
+
+def mark_process_dead(pid):
+    """Remove the live gauges of a dead process in multiprocess mode
+
+    Args:
+        pid (int): The process id
+
+    """
+    if has_prometheus is False or is_multiprocess_mode() is False:
+        return
+    multiprocess.mark_process_dead(pid)
+
+
+def child_exit(server, worker):
+    """The gunicorn hook that is called after a worker exited"""
+    mark_process_dead(worker.pid)
+
+
+def generate_metrics():
+    """Create the metrics in the prometheus text format
+
+    The metrics of all processes are aggregated in multiprocess mode.
+
+    Returns:
+        tuple:
+        (data, content_type) or None if prometheus_client is not installed
+    """
+    if has_prometheus is False:
+        return None
+    if is_multiprocess_mode() is True:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Concurrent download of the files of a process chain
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from actinia_core.core.download_cache import SharedDownloadCache
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+class DownloadCancelled(Exception):
+    """Exception that is raised in the download threads if the downloads
+    were cancelled
+    """
+
+
+class ParallelDownloader(object):
+    """Download files concurrently using a pooled HTTP session
+
+    The number of concurrent connections is bounded in total and per host.
+    Partially downloaded files are resumed with HTTP range requests, like
+    wget -c does. Files of the shared download cache are fetched through the
+    cache.
+    """
+
+    def __init__(self, max_connections=8, max_connections_per_host=4,
+                 retries=5, timeout=60, chunk_size=1024 * 1024):
+        """
+
+        Args:
+            max_connections (int): The maximum number of concurrent downloads
+            max_connections_per_host (int): The maximum number of concurrent
+                                            downloads from a single host
+            retries (int): The number of retries of a failed connection
+            timeout (int): The connection and read timeout in seconds
+            chunk_size (int): The size of the chunks that are written
+
+        """
+        self.max_connections = max(1, max_connections)
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_connections,
+                              pool_maxsize=self.max_connections,
+                              max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = None
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.host_semaphores = {}
+        self.cache_paths = set()
+        self.num_files = 0
+        self.finished_files = 0
+        self.downloaded_bytes = 0
+
+    def _get_host_semaphore(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(
+                    self.max_connections_per_host)
+            return self.host_semaphores[host]
+
+    def _download(self, target, url, cache_path=None, key=None):
+        """Download a single file or fetch it from the shared download cache
+
+        Args:
+            target (str): The path of the downloaded file
+            url (str): The URL of the file
+            cache_path (str): The path to the shared download cache
+            key (str): The cache key of the file in the shared download cache
+
+        """
+        with self._get_host_semaphore(url):
+            if self.cancelled.is_set():
+                raise DownloadCancelled("Download of <%s> was cancelled" % url)
+
+            if cache_path is not None:
+                SharedDownloadCache(cache_path, timeout=self.timeout,
+                                    session=self.session).fetch(url, key, target)
+            else:
+                self._download_file(target, url)
+
+        with self.lock:
+            self.finished_files += 1
+
+    def _download_file(self, target, url):
+        """Download or resume the download of a single file
+
+        Args:
+            target (str): The path of the downloaded file
+            url (str): The URL of the file
+
+        """
+        offset = os.path.getsize(target) if os.path.isfile(target) else 0
+        headers = {"Range": "bytes=%i-" % offset} if offset > 0 else {}
+
+        with self.session.get(url, stream=True, timeout=self.timeout,
+                              headers=headers) as resp:
+            # The file was already downloaded completely
+            if offset > 0 and resp.status_code == 416:
+                return
+            resp.raise_for_status()
+            mode = "ab" if resp.status_code == 206 else "wb"
+
+            with open(target, mode) as output:
+                for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                    if self.cancelled.is_set():
+                        raise DownloadCancelled(
+                            "Download of <%s> was cancelled" % url)
+                    output.write(chunk)
+                    with self.lock:
+                        self.downloaded_bytes += len(chunk)
+
+    def start(self, download_list):
+        """Start the concurrent download of files
+
+        Args:
+            download_list (list): A list of download parameters, that are
+                                  [target, url] or [target, url, cache_path,
+                                  key] for files of the shared download cache
+
+        Returns:
+            list:
+            The futures of the downloads in the order of the download list
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_connections)
+        self.num_files += len(download_list)
+        futures = []
+        for params in download_list:
+            if len(params) > 2:
+                self.cache_paths.add(params[2])
+            futures.append(self.executor.submit(self._download, *params))
+        return futures
+
+    def cancel(self):
+        """Cancel all running and pending downloads"""
+        self.cancelled.set()
+
+    def shutdown(self):
+        """Wait for all download threads and close the HTTP session"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def get_progress_message(self):
+        """Return a message that describes the aggregate download progress
+
+        Returns:
+            str:
+            The progress message
+        """
+        with self.lock:
+            return "Downloaded %i of %i files (%.1f MB)" % (
+                self.finished_files, self.num_files,
+                self.downloaded_bytes / (1024.0 * 1024.0))
+
+    def download(self, download_list):
+        """Download files concurrently and wait for all downloads
+
+        Args:
+            download_list (list): A list of download parameters
+
+        Raises:
+            The first exception of a failed download
+
+        """
+        try:
+            futures = self.start(download_list)
+            for future in futures:
+                if future.exception() is not None:
+                    self.cancel()
+                    raise future.exception()
+        finally:
+            self.shutdown()
+
+
+def get_path_tokens(param):
+    """Return the file paths that a process parameter references
+
+    The value of "name=value" parameters is split at commas, GDAL virtual
+    file system prefixes like /vsizip/ are removed and paths of files in
+    archives are reduced to the archive path.
+
+    Args:
+        param: The process parameter
+
+    Returns:
+        set:
+        The referenced file paths
+    """
+    param = str(param)
+    if "=" in param and not param.startswith("/"):
+        param = param.split("=", 1)[1]
+    tokens = set()
+    for token in param.split(","):
+        token = token.strip()
+        while token.startswith("/vsi"):
+            parts = token.split("/", 2)
+            token = parts[2] if len(parts) > 2 else ""
+        if not token:
+            continue
+        tokens.add(token)
+        # A file in an archive, e.g. /vsizip/archive.zip/file.shp
+        path = token
+        while os.path.dirname(path) not in ("", path):
+            path = os.path.dirname(path)
+            tokens.add(path)
+    return tokens
+
+
+class PendingDownloads(object):
+    """The download processes of a process list that run in the background,
+    while the processes that do not require the downloaded files are executed
+    """
+
+    def __init__(self, downloader):
+        """
+
+        Args:
+            downloader (ParallelDownloader): The downloader
+
+        """
+        self.downloader = downloader
+        self.processes = []
+        self.futures = []
+        self.reported = set()
+        self.start_time = time.time()
+
+    def start(self, process_list):
+        """Start the download processes
+
+        Args:
+            process_list (list): The download processes
+
+        """
+        self.processes.extend(process_list)
+        self.futures.extend(self.downloader.start(
+            [process.executable_params for process in process_list]))
+
+    def get_required_futures(self, process=None):
+        """Return the futures of the downloads that a process requires
+
+        Processes of the user process chain require all downloads, internal
+        processes, e.g. the imports, require the downloads of the files they
+        reference in their parameters.
+
+        Args:
+            process (Process): The process, all futures are returned if None
+
+        Returns:
+            list:
+            The futures of the required downloads
+        """
+        if process is None or process.skip_permission_check is False:
+            return list(self.futures)
+        paths = set()
+        for param in process.executable_params:
+            paths.update(get_path_tokens(param))
+        return [future for download, future in zip(self.processes, self.futures)
+                if download.executable_params[0] in paths]
+
+    def get_finished(self):
+        """Return the downloads that finished since the last call
+
+        Returns:
+            list:
+            A list of (process, exception) tuples, exception is None if the
+            download was successful
+        """
+        finished = []
+        for index, (process, future) in enumerate(zip(self.processes,
+                                                      self.futures)):
+            if index not in self.reported and future.done():
+                self.reported.add(index)
+                finished.append((process, future.exception()))
+        return finished
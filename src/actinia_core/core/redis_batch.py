@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Redis server interface to store the jobs of batch submissions
+"""
+
+import json
+
+from actinia_core.core.common.redis_base import RedisBaseInterface
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+class RedisBatchInterface(RedisBaseInterface):
+    """
+    The Redis batch interface
+
+    A batch entry stores the resource ids, status URLs and parameters of the
+    jobs that were created from a process chain template. The status of the
+    batch is aggregated from the resource entries of its jobs.
+    """
+    # Batch entries are JSON encoded dicts that expire like the resources
+    batch_id_prefix = "BATCH-ID::"
+
+    def __init__(self):
+        RedisBaseInterface.__init__(self)
+
+    def _get_key(self, user_id, batch_id):
+        return "%s%s/%s" % (self.batch_id_prefix, user_id, batch_id)
+
+    def get(self, user_id, batch_id):
+        """Return a batch entry
+
+        Args:
+            user_id (str): The user id
+            batch_id (str): The batch id
+
+        Returns:
+            dict:
+            The batch entry or None if it does not exist
+
+        """
+        data = self.redis_server.get(self._get_key(user_id, batch_id))
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def set(self, user_id, batch_id, batch, expiration):
+        """Store a batch entry
+
+        Args:
+            user_id (str): The user id
+            batch_id (str): The batch id
+            batch (dict): The batch entry
+            expiration (int): The expiration time in seconds
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.setex(
+            self._get_key(user_id, batch_id), expiration, json.dumps(batch)))
+
+    def delete(self, user_id, batch_id):
+        """Remove a batch entry
+
+        Args:
+            user_id (str): The user id
+            batch_id (str): The batch id
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.delete(self._get_key(user_id, batch_id)))
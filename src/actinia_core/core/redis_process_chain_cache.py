@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Redis server interface to cache validated process chains
+"""
+
+import copy
+import hashlib
+import json
+import pickle
+
+from actinia_core.core.common.redis_base import RedisBaseInterface
+from actinia_core.core.common.process_object import Process
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The job specific temporary file path is replaced by this placeholder in
+# the cached process lists
+TEMP_FILE_PATH_PLACEHOLDER = "$ACTINIA_TEMP_FILE_PATH"
+
+# The ProcessChainConverter attributes that are filled by the conversion
+CONVERTER_LISTS = ["required_mapsets", "resource_export_list",
+                   "output_parser_list", "import_descr_list"]
+CONVERTER_DICTS = ["temporary_pc_files", "process_dict"]
+CONVERTER_VALUES = ["webhook_finished", "webhook_update", "webhook_auth",
+                    "temp_file_count"]
+
+
+class RedisProcessChainCacheInterface(RedisBaseInterface):
+    """
+    The Redis process chain cache interface
+
+    The cache stores the result of the conversion of a process chain into a
+    process list, so that identical process chains are neither converted nor
+    checked again, e.g. the URL checks of the importer are skipped.
+    """
+    # Process chain cache entries are pickled dicts that expire
+    process_chain_cache_prefix = "PROCESS-CHAIN-CACHE::"
+
+    def __init__(self):
+        RedisBaseInterface.__init__(self)
+
+    def get(self, key):
+        """Return the cached conversion result of a process chain
+
+        Args:
+            key (str): The process chain cache key
+
+        Returns:
+            bytes:
+            The pickled conversion result or None if not in cache
+
+        """
+        return self.redis_server.get(self.process_chain_cache_prefix + key)
+
+    def set(self, key, skeleton, expiration):
+        """Store the conversion result of a process chain
+
+        Args:
+            key (str): The process chain cache key
+            skeleton (bytes): The pickled conversion result
+            expiration (int): The expiration time in seconds
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.setex(
+            self.process_chain_cache_prefix + key, expiration, skeleton))
+
+    def delete(self, key):
+        """Remove a process chain from the cache
+
+        Args:
+            key (str): The process chain cache key
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.delete(self.process_chain_cache_prefix + key))
+
+
+def create_process_chain_cache_key(process_chain, user_credentials, user_id,
+                                   location_name):
+    """Create the cache key of a process chain from the canonical JSON
+    representation of the process chain, the user, the location and the user
+    permissions
+
+    The webhook credentials are not part of the key, they are never cached.
+
+    Args:
+        process_chain (dict): The process chain
+        user_credentials (dict): The user credentials dictionary
+        user_id (str): The id of the user
+        location_name (str): The name of the location
+
+    Returns:
+        str:
+        The cache key or None if the process chain can not be serialized
+
+    """
+    try:
+        canonical = json.dumps([strip_webhook_auth(process_chain),
+                                user_credentials["permissions"], user_id,
+                                location_name],
+                               sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def strip_webhook_auth(process_chain):
+    """Return a copy of a process chain without the webhook credentials
+
+    Args:
+        process_chain (dict): The process chain
+
+    Returns:
+        dict:
+        The process chain without the auth entry of the webhooks
+    """
+    if (not isinstance(process_chain, dict)
+            or not isinstance(process_chain.get("webhooks"), dict)
+            or "auth" not in process_chain["webhooks"]):
+        return process_chain
+    process_chain = copy.copy(process_chain)
+    process_chain["webhooks"] = {key: value for key, value
+                                 in process_chain["webhooks"].items()
+                                 if key != "auth"}
+    return process_chain
+
+
+def replace_temp_file_path(obj, old, new, visited=None):
+    """Replace the temporary file path in all strings of a conversion result
+
+    Lists, dictionaries and Process objects are modified in-place to keep
+    the references between processes, e.g. of stdin definitions.
+
+    Args:
+        obj: The object to modify
+        old (str): The path to replace
+        new (str): The replacement
+
+    Returns:
+        The modified object
+    """
+    if visited is None:
+        visited = set()
+    if isinstance(obj, str):
+        return obj.replace(old, new)
+    if isinstance(obj, tuple):
+        return tuple(replace_temp_file_path(entry, old, new, visited)
+                     for entry in obj)
+    if id(obj) in visited:
+        return obj
+    if isinstance(obj, list):
+        visited.add(id(obj))
+        for index, entry in enumerate(obj):
+            obj[index] = replace_temp_file_path(entry, old, new, visited)
+    elif isinstance(obj, dict):
+        visited.add(id(obj))
+        for key, entry in obj.items():
+            obj[key] = replace_temp_file_path(entry, old, new, visited)
+    elif isinstance(obj, Process):
+        visited.add(id(obj))
+        for key, entry in vars(obj).items():
+            setattr(obj, key, replace_temp_file_path(entry, old, new, visited))
+    return obj
+
+
+def create_process_chain_skeleton(converter, process_chain, process_list):
+    """Create the cache entry of a converted process chain
+
+    Args:
+        converter (ProcessChainConverter): The converter after the conversion
+        process_chain (dict): The converted process chain
+        process_list (list): The process list created by the converter
+
+    Returns:
+        bytes:
+        The pickled conversion result without job specific paths and webhook
+        credentials
+    """
+    skeleton = {"process_chain": strip_webhook_auth(process_chain),
+                "process_list": process_list}
+    for name in CONVERTER_LISTS + CONVERTER_DICTS + CONVERTER_VALUES:
+        skeleton[name] = getattr(converter, name)
+    skeleton["webhook_auth"] = None
+    # Create a copy that keeps the references between the objects
+    skeleton = pickle.loads(pickle.dumps(skeleton))
+    replace_temp_file_path(skeleton, converter.temp_file_path,
+                           TEMP_FILE_PATH_PLACEHOLDER)
+    return pickle.dumps(skeleton)
+
+
+def restore_process_chain_skeleton(converter, data, process_chain):
+    """Restore a cached conversion result into a fresh converter
+
+    The webhook credentials are taken from the process chain of the job.
+
+    Args:
+        converter (ProcessChainConverter): The converter of the job
+        data (bytes): The pickled conversion result
+        process_chain (dict): The process chain of the job
+
+    Returns:
+        tuple:
+        The converted process chain and the process list
+    """
+    skeleton = replace_temp_file_path(pickle.loads(data),
+                                      TEMP_FILE_PATH_PLACEHOLDER,
+                                      converter.temp_file_path)
+    # The lists and dicts of the converter are shared with the processing
+    # object and must be extended in-place
+    for name in CONVERTER_LISTS:
+        getattr(converter, name).extend(skeleton[name])
+    for name in CONVERTER_DICTS:
+        getattr(converter, name).update(skeleton[name])
+    for name in CONVERTER_VALUES:
+        setattr(converter, name, skeleton[name])
+    cached_chain = skeleton["process_chain"]
+    webhooks = process_chain.get("webhooks") \
+        if isinstance(process_chain, dict) else None
+    if isinstance(webhooks, dict) and "auth" in webhooks:
+        converter.webhook_auth = webhooks["auth"]
+        cached_chain["webhooks"]["auth"] = webhooks["auth"]
+    return cached_chain, skeleton["process_list"]
+
+
+def is_converter_unused(converter):
+    """Check if a converter did not convert a process chain yet, only then
+    a cached conversion result can be restored into it
+
+    Args:
+        converter (ProcessChainConverter): The converter
+
+    Returns:
+        bool
+    """
+    if converter.temp_file_count != 0:
+        return False
+    for name in CONVERTER_LISTS + CONVERTER_DICTS:
+        if getattr(converter, name):
+            return False
+    return True
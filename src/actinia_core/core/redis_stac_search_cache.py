@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Redis server interface to cache STAC search results
+"""
+
+import hashlib
+import json
+
+from actinia_core.core.common.redis_base import RedisBaseInterface
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+class RedisStacSearchCacheInterface(RedisBaseInterface):
+    """
+    The Redis STAC search cache interface
+
+    The cache stores the items of all pages of a STAC search, so that follow
+    up jobs with the same collection, bbox, interval and filter do not search
+    again.
+    """
+    # STAC search cache entries are JSON encoded item lists that expire
+    stac_search_cache_prefix = "STAC-SEARCH-CACHE::"
+
+    def __init__(self):
+        RedisBaseInterface.__init__(self)
+
+    def get(self, key):
+        """Return the cached items of a STAC search
+
+        Args:
+            key (str): The STAC search cache key
+
+        Returns:
+            list:
+            The STAC items or None if not in cache
+
+        """
+        data = self.redis_server.get(self.stac_search_cache_prefix + key)
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def set(self, key, items, expiration):
+        """Store the items of a STAC search
+
+        Args:
+            key (str): The STAC search cache key
+            items (list): The STAC items
+            expiration (int): The expiration time in seconds
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.setex(
+            self.stac_search_cache_prefix + key, expiration, json.dumps(items)))
+
+    def delete(self, key):
+        """Remove a STAC search from the cache
+
+        Args:
+            key (str): The STAC search cache key
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.delete(self.stac_search_cache_prefix + key))
+
+
+def create_stac_search_cache_key(stac_root_search, search_body):
+    """Create the cache key of a STAC search from the canonical JSON
+    representation of the search URL and the search body, that contains the
+    collection, bbox, interval and filter
+
+    Args:
+        stac_root_search (str): The URL of the STAC search endpoint
+        search_body (dict): The search body
+
+    Returns:
+        str:
+        The cache key
+    """
+    canonical = json.dumps([stac_root_search, search_body], sort_keys=True,
+                           separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
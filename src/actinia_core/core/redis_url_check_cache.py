@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Redis server interface to cache the results of import URL checks
+"""
+
+import hashlib
+import json
+
+from actinia_core.core.common.redis_base import RedisBaseInterface
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+class RedisUrlCheckCacheInterface(RedisBaseInterface):
+    """
+    The Redis URL check cache interface
+
+    The cache stores the status code, the validator headers and the detected
+    mimetype of accessible import URLs, so that the URLs of following jobs
+    are not checked again.
+    """
+    # URL check cache entries are JSON encoded dicts that expire
+    url_check_cache_prefix = "URL-CHECK-CACHE::"
+
+    def __init__(self):
+        RedisBaseInterface.__init__(self)
+
+    def _get_key(self, url):
+        return self.url_check_cache_prefix + hashlib.sha256(
+            url.encode()).hexdigest()
+
+    def get(self, url):
+        """Return the cached check result of an URL
+
+        Args:
+            url (str): The checked URL
+
+        Returns:
+            dict:
+            The check result or None if not in cache
+
+        """
+        data = self.redis_server.get(self._get_key(url))
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def set(self, url, result, expiration):
+        """Store the check result of an URL
+
+        Args:
+            url (str): The checked URL
+            result (dict): The check result
+            expiration (int): The expiration time in seconds
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.setex(
+            self._get_key(url), expiration, json.dumps(result)))
+
+    def delete(self, url):
+        """Remove the check result of an URL from the cache
+
+        Args:
+            url (str): The checked URL
+
+        Returns:
+            bool:
+            True in case of success, False otherwise
+
+        """
+        return bool(self.redis_server.delete(self._get_key(url)))
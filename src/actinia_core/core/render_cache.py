@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Disk cache of rendered PNG images
+
+The images of the raster and vector renderers are cached for the
+normalized render options and the modification times of the files of the
+rendered maps. A modified map changes the cache key, so that outdated images
+are never served. The cache key is used as ETag of the image. STRDS renders
+are not cached, since the registered raster maps can be modified without
+changing the temporal database.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The files of a map, relative to its mapset, that change its rendering
+MAP_ELEMENTS = {
+    "raster": ["cellhd/{name}", "cell/{name}", "fcell/{name}",
+               "colr/{name}"],
+    "vector": ["vector/{name}/head", "vector/{name}/coor"]
+}
+# The interval in seconds in that the size of the render cache is determined
+# from the cache directory, since other processes write into it as well
+PRUNE_INTERVAL = 300
+
+# The estimated size of the render cache directories and the time they
+# were scanned
+_cache_sizes = {}
+_cache_sizes_lock = threading.Lock()
+
+
+def get_map_stamps(config, user_group, location_name, mapset_name, map_type,
+                   map_name):
+    """Return the modification stamps of the files of a map in the user or
+    the global database
+
+    Args:
+        config (Configuration): The actinia configuration
+        user_group (str): The group of the user
+        location_name (str): The name of the location
+        mapset_name (str): The name of the mapset
+        map_type (str): The type of the map, "raster" or "vector"
+        map_name (str): The name of the map without mapset
+
+    Returns:
+        list:
+        The "path:mtime" stamps of the existing files of the map or None if
+        the map does not exist
+    """
+    elements = [element.format(name=map_name)
+                for element in MAP_ELEMENTS[map_type]]
+    databases = (os.path.join(config.GRASS_USER_DATABASE, user_group),
+                 config.GRASS_DATABASE)
+    for database_path in databases:
+        mapset_path = os.path.join(database_path, location_name, mapset_name)
+        stamps = []
+        for element in elements:
+            path = os.path.join(mapset_path, element)
+            try:
+                stamps.append("%s:%i" % (path, os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+        # The first element identifies the map
+        if stamps and stamps[0].startswith(
+                os.path.join(mapset_path, elements[0]) + ":"):
+            return stamps
+    return None
+
+
+def create_render_cache_key(render_type, options, stamps):
+    """Create the cache key of a rendered image
+
+    The numeric render options are normalized, so that 800 and 800.0 result
+    in the same key.
+
+    Args:
+        render_type (str): The type of the renderer
+        options (dict): The render options
+        stamps (list): The modification stamps of the rendered maps
+
+    Returns:
+        str:
+        The cache key
+    """
+    normalized = {}
+    for key, value in options.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            normalized[key] = "%.15g" % value
+        else:
+            normalized[key] = str(value)
+    data = json.dumps({"type": render_type, "options": normalized,
+                       "stamps": sorted(stamps)}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()[:32]
+
+
+def get_render_cache_file(cache_path, key):
+    """Return the path of a cached image
+
+    Args:
+        cache_path (str): The render cache directory
+        key (str): The cache key of the image
+
+    Returns:
+        str:
+        The path of the PNG file
+    """
+    return os.path.join(cache_path, key[:2], "%s.png" % key)
+
+
+def store_render_cache_file(cache_path, key, image):
+    """Write a rendered image atomically into the render cache
+
+    Args:
+        cache_path (str): The render cache directory
+        key (str): The cache key of the image
+        image (bytes): The rendered PNG image
+
+    Returns:
+        str:
+        The path of the cached PNG file
+    """
+    cache_file = get_render_cache_file(cache_path, key)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file),
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as output:
+            output.write(image)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return cache_file
+
+
+def prune_render_cache(cache_path, max_size):
+    """Remove the oldest cached images until the size of the render cache is
+    below the maximum size
+
+    Args:
+        cache_path (str): The render cache directory
+        max_size (int): The maximum size of the render cache in bytes
+
+    Returns:
+        int:
+        The size of the render cache in bytes
+    """
+    if not os.path.isdir(cache_path):
+        return 0
+    entries = []
+    size = 0
+    for entry in os.scandir(cache_path):
+        if not entry.is_dir():
+            continue
+        for image in os.scandir(entry.path):
+            try:
+                stat = image.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, image.path))
+            size += stat.st_size
+    for _, image_size, path in sorted(entries):
+        if size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        size -= image_size
+    return size
+
+
+def add_render_cache_size(cache_path, image_size, max_size):
+    """Add the size of a stored image to the estimated size of the render
+    cache and prune the render cache if the estimated size exceeds the
+    maximum size
+
+    The render cache directory is scanned only if the maximum size is
+    exceeded or the last scan is older than PRUNE_INTERVAL seconds.
+
+    Args:
+        cache_path (str): The render cache directory
+        image_size (int): The size of the stored image in bytes
+        max_size (int): The maximum size of the render cache in bytes
+
+    """
+    with _cache_sizes_lock:
+        size, scan_time = _cache_sizes.get(cache_path, (None, 0))
+        if (size is None or size + image_size > max_size
+                or time.time() - scan_time > PRUNE_INTERVAL):
+            _cache_sizes[cache_path] = (
+                prune_render_cache(cache_path, max_size), time.time())
+        else:
+            _cache_sizes[cache_path] = (size + image_size, scan_time)
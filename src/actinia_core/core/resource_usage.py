@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Resource usage of the processes of a process chain
+"""
+
+import os
+import sys
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The unit of the maximum resident set size of getrusage() in bytes
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+# The fields of /proc/<pid>/io that count the bytes read from and written to
+# the storage layer
+IO_FIELDS = ("read_bytes", "write_bytes")
+# The resource usage values that are summed up for a job, the maximum is used
+# for the peak memory
+SUM_FIELDS = ("cpu_user_time", "cpu_system_time") + IO_FIELDS
+
+
+def is_process_finished(proc):
+    """Check if a subprocess finished without reaping it, so that its I/O
+    counters can still be read
+
+    Args:
+        proc (subprocess.Popen): The subprocess
+
+    Returns:
+        bool:
+        True if the process finished
+    """
+    if proc.returncode is not None:
+        return True
+    if not hasattr(os, "waitid"):
+        return proc.poll() is not None
+    try:
+        result = os.waitid(os.P_PID, proc.pid,
+                           os.WEXITED | os.WNOHANG | os.WNOWAIT)
+    except ChildProcessError:
+        # The process was already reaped
+        return proc.poll() is not None
+    return result is not None
+
+
+def read_process_io(pid):
+    """Read the I/O counters of a process from /proc/<pid>/io
+
+    Args:
+        pid (int): The process id
+
+    Returns:
+        dict:
+        The number of bytes read and written or None if the counters are not
+        available
+    """
+    try:
+        with open("/proc/%i/io" % pid, "r") as io_file:
+            counters = dict(line.split(":", 1) for line in io_file if ":" in line)
+        return {field: int(counters[field]) for field in IO_FIELDS}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def reap_process(proc):
+    """Reap a finished subprocess and return its resource usage
+
+    The CPU times and the peak memory include the children of the process
+    that it waited for. The return code of the subprocess is set.
+
+    Args:
+        proc (subprocess.Popen): The finished subprocess
+
+    Returns:
+        dict:
+        The CPU user and system time in seconds, the maximum resident set
+        size and the read and written bytes or None if the process was
+        already reaped
+    """
+    if proc.returncode is not None or not hasattr(os, "wait4"):
+        return None
+    io_counters = read_process_io(proc.pid)
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        return None
+
+    if os.WIFSIGNALED(status):
+        proc.returncode = -os.WTERMSIG(status)
+    else:
+        proc.returncode = os.WEXITSTATUS(status)
+
+    resource_usage = {"cpu_user_time": rusage.ru_utime,
+                      "cpu_system_time": rusage.ru_stime,
+                      "max_rss": rusage.ru_maxrss * RSS_UNIT}
+    if io_counters is not None:
+        resource_usage.update(io_counters)
+    return resource_usage
+
+
+def aggregate_resource_usage(process_log):
+    """Aggregate the resource usage of the processes of a job
+
+    Args:
+        process_log (list): The process log entries
+
+    Returns:
+        dict:
+        The summed up CPU times and I/O bytes and the maximum of the peak
+        memory or None if no process provides its resource usage
+    """
+    usages = [entry["resource_usage"] for entry in process_log
+              if isinstance(entry, dict) and entry.get("resource_usage")]
+    if not usages:
+        return None
+
+    total = {}
+    for usage in usages:
+        for field, value in usage.items():
+            if field in SUM_FIELDS:
+                total[field] = total.get(field, 0) + value
+            else:
+                total[field] = max(total.get(field, 0), value)
+    return total
@@ -44,7 +44,7 @@ from shapely.geometry import Polygon, mapping
 
 from actinia_core.core.common.exceptions import AsyncProcessTermination
 from actinia_core.core.common.app import API_VERSION
-from actinia_core.version import G_VERSION
+from actinia_core.version import get_grass_version
 
 try:
     from actinia_stac_plugin.core.common import connectRedis
@@ -263,7 +263,7 @@ class STACExporter:
         input_item["processing:facility"] = f"Actinia Core {API_VERSION}",
         input_item["processing:level"] = "L4"
         input_item["processing:derived_from"] = "https://actinia.mundialis.de/"
-        input_item["processing:software"] = f" GRASS {G_VERSION}"
+        input_item["processing:software"] = f" GRASS {get_grass_version()}"
         proc_schema = "https://stac-extensions.github.io/processing/v1.1.0/schema.json"
 
         input_item["stac_extensions"].append(proc_schema)
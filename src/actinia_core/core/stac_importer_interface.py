@@ -41,9 +41,17 @@ __email__ = "info@mundialis.de"
 import requests
 import os
 import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
 
 from actinia_core.core.common.exceptions import AsyncProcessError
 from actinia_core.core.common.process_object import Process
+from actinia_core.core.redis_stac_search_cache import \
+    create_stac_search_cache_key
+from actinia_core.core.utils import get_download_process
 try:
     from actinia_stac_plugin.core.stac_collection_id import callStacCollection
     has_plugin = True
@@ -51,8 +59,33 @@ except Exception:
     has_plugin = False
 
 
+# The number of items that are requested per page of a STAC search
+SEARCH_PAGE_LIMIT = 100
+# The maximum number of pages of a STAC search
+SEARCH_MAX_PAGES = 1000
+
+
 class STACImporter:
 
+    def __init__(self, search_cache=None, search_cache_ttl=0,
+                 max_connections=8, timeout=60):
+        """Search STAC collections and create the download and import
+        processes of the found assets
+
+        Args:
+            search_cache (RedisStacSearchCacheInterface): The redis cache of
+                                                          STAC search results
+            search_cache_ttl (int): The time in seconds a search is cached
+            max_connections (int): The maximum number of concurrent requests
+            timeout (int): The connection and read timeout in seconds
+
+        """
+        self.search_cache = search_cache
+        self.search_cache_ttl = search_cache_ttl
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.session = None
+
     @staticmethod
     def _get_search_root(stac_collection_id):
 
@@ -76,8 +109,152 @@ class STACImporter:
 
         return stac_root_search
 
+    def _get_session(self):
+        if self.session is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_connections,
+                                  pool_maxsize=self.max_connections)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        return self.session
+
+    def _request_page(self, method, url, body=None):
+        """Request a single page of a STAC search
+
+        Args:
+            method (str): The HTTP method of the request
+            url (str): The URL of the page
+            body (dict): The JSON body of POST requests
+
+        Returns:
+            dict:
+            The STAC item collection of the page
+        """
+        resp = self._get_session().request(
+            method, url, json=body if method == "POST" else None,
+            timeout=self.timeout)
+        result = resp.json()
+
+        if "features" in result:
+            return result
+        else:
+            raise AsyncProcessError(result)
+
     @staticmethod
-    def _apply_filter(stac_root_search, stac_name, interval, bbox, filter):
+    def _get_next_request(page, body):
+        """Return the request of the next page from the next link of a page
+
+        Args:
+            page (dict): The STAC item collection of a page
+            body (dict): The search body of the page request
+
+        Returns:
+            tuple:
+            (method, url, body) of the next page or None if it is the last page
+        """
+        for link in page.get("links", []):
+            if link.get("rel") == "next":
+                method = link.get("method", "GET").upper()
+                next_body = link.get("body")
+                if method == "POST" and next_body is not None \
+                        and link.get("merge", False) is True:
+                    next_body = dict(body, **next_body)
+                return method, link["href"], next_body
+        return None
+
+    @staticmethod
+    def _get_page_requests(page, search_body, next_request):
+        """Predict the requests of all remaining pages of a search, if the
+        next link of the first page uses a page number
+
+        Args:
+            page (dict): The STAC item collection of the first page
+            search_body (dict): The search body of the first page
+            next_request (tuple): The request of the second page
+
+        Returns:
+            list:
+            The (method, url, body) requests of the remaining pages or None if
+            the pages can not be predicted
+        """
+        matched = page.get("numberMatched",
+                           page.get("context", {}).get("matched"))
+        if matched is None:
+            return None
+        num_pages = min(int(math.ceil(matched / float(search_body["limit"]))),
+                        SEARCH_MAX_PAGES)
+
+        method, url, body = next_request
+        if method == "POST" and isinstance(body, dict) and "page" in body:
+            next_page = int(body["page"])
+            return [(method, url, dict(body, page=number))
+                    for number in range(next_page, next_page + num_pages - 1)]
+
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        if method == "GET" and "page" in query:
+            next_page = int(query["page"][0])
+            requests_list = []
+            for number in range(next_page, next_page + num_pages - 1):
+                query["page"] = [str(number)]
+                requests_list.append((method, urlunsplit(parts._replace(
+                    query=urlencode(query, doseq=True))), None))
+            return requests_list
+        return None
+
+    def _search(self, stac_root_search, search_body):
+        """Request all pages of a STAC search
+
+        The pages are requested concurrently if the API uses page numbers,
+        otherwise the next links are followed.
+
+        Args:
+            stac_root_search (str): The URL of the STAC search endpoint
+            search_body (dict): The search body
+
+        Returns:
+            list:
+            The STAC items of all pages
+        """
+        try:
+            pages = self._request_pages(stac_root_search, search_body)
+        finally:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+        # Items may be repeated if the search result changed while paging
+        items = {}
+        for page in pages:
+            for feature in page["features"]:
+                items.setdefault(feature["id"], feature)
+        return list(items.values())
+
+    def _request_pages(self, stac_root_search, search_body):
+        page = self._request_page("POST", stac_root_search, search_body)
+        pages = [page]
+
+        next_request = self._get_next_request(page, search_body)
+        if next_request is not None:
+            page_requests = self._get_page_requests(page, search_body,
+                                                    next_request)
+            if page_requests is not None:
+                with ThreadPoolExecutor(max_workers=min(
+                        self.max_connections, max(1, len(page_requests)))) \
+                        as executor:
+                    pages.extend(executor.map(
+                        lambda request: self._request_page(*request),
+                        page_requests))
+            else:
+                while next_request is not None and len(pages) < SEARCH_MAX_PAGES:
+                    page = self._request_page(*next_request)
+                    if not page["features"]:
+                        break
+                    pages.append(page)
+                    next_request = self._get_next_request(page, next_request[2])
+        return pages
+
+    def _apply_filter(self, stac_root_search, stac_name, interval, bbox, filter):
 
         search_body = {
             "collections": [stac_name],
@@ -88,17 +265,27 @@ class STACImporter:
 
         search_body["interval"] = interval
 
-        stac_search = requests.post(
-            stac_root_search,
-            json=search_body
-        )
+        search_body["limit"] = SEARCH_PAGE_LIMIT
 
-        full_filtered_result = stac_search.json()
+        key = None
+        if self.search_cache is not None and self.search_cache_ttl > 0:
+            key = create_stac_search_cache_key(stac_root_search, search_body)
+            try:
+                items = self.search_cache.get(key)
+                if items is not None:
+                    return {"type": "FeatureCollection", "features": items}
+            except Exception:
+                key = None
 
-        if "features" in full_filtered_result:
-            return full_filtered_result
-        else:
-            raise AsyncProcessError(full_filtered_result)
+        items = self._search(stac_root_search, search_body)
+
+        if key is not None:
+            try:
+                self.search_cache.set(key, items, self.search_cache_ttl)
+            except Exception:
+                pass
+
+        return {"type": "FeatureCollection", "features": items}
 
     @staticmethod
     def _get_filtered_bands(stac_items, semantic_label):
@@ -124,8 +311,69 @@ class STACImporter:
                             band_roots[band_name][feature_id] = item_link
         return band_roots
 
+    @staticmethod
+    def _get_import_processes(stac_name, stac_result, import_mode,
+                              temp_file_path):
+        """Create the processes to import each asset into its own raster map
+
+        By default the assets are read with /vsicurl/. In the download mode
+        all assets are downloaded concurrently and each asset is imported as
+        soon as its download finished. In the region mode only the region
+        window is read from the remote assets.
+
+        Args:
+            stac_name (str): The name of the STAC collection
+            stac_result (dict): The asset URLs per band and item
+            import_mode (str): The import mode, download, region or None
+            temp_file_path (str): The path to store the downloaded assets
+
+        Returns:
+            list:
+            The download and import processes
+        """
+        download_processes = []
+        import_processes = []
+
+        for key, value in stac_result.items():
+
+            for name_id, url in value.items():
+
+                output_name = stac_name + "_" + key + "_" + name_id
+
+                if import_mode is None:
+                    exec_params = ["input=%s" % "/vsicurl/"+url,
+                                   "output=%s" % output_name,
+                                   "-o"]
+                elif import_mode == "region":
+                    # Read only the window of the current region
+                    exec_params = ["input=%s" % "/vsicurl/"+url,
+                                   "output=%s" % output_name,
+                                   "-o", "-r"]
+                else:
+                    file_name = output_name + os.path.splitext(
+                        urlsplit(url).path)[1]
+                    file_path = os.path.join(temp_file_path, file_name)
+                    download_processes.append(
+                        get_download_process(file_path, url))
+                    exec_params = ["input=%s" % file_path,
+                                   "output=%s" % output_name,
+                                   "-o"]
+
+                p = Process(
+                    exec_type="grass",
+                    executable="r.in.gdal",
+                    executable_params=exec_params,
+                    id=f"r_gdal_{os.path.basename(output_name)}",
+                    skip_permission_check=True
+                )
+
+                import_processes.append(p)
+
+        return download_processes + import_processes
+
     def _stac_import(self, stac_collection_id=None, semantic_label=None,
-                     interval=None, bbox=None, filter=None):
+                     interval=None, bbox=None, filter=None,
+                     import_mode=None, temp_file_path="/tmp"):
 
         if has_plugin:
             try:
@@ -140,28 +388,8 @@ class STACImporter:
 
             stac_result = self._get_filtered_bands(stac_filtered, semantic_label)
 
-            stac_processes = []
-
-            for key, value in stac_result.items():
-
-                for name_id, url in value.items():
-
-                    output_name = stac_name + "_" + key + "_" + name_id
-
-                    # From Here Onwards, the Process build starts
-                    exec_params = ["input=%s" % "/vsicurl/"+url,
-                                   "output=%s" % output_name,
-                                   "-o"]
-
-                    p = Process(
-                        exec_type="grass",
-                        executable="r.in.gdal",
-                        executable_params=exec_params,
-                        id=f"r_gdal_{os.path.basename(output_name)}",
-                        skip_permission_check=True
-                    )
-
-                    stac_processes.append(p)
+            stac_processes = self._get_import_processes(
+                stac_name, stac_result, import_mode, temp_file_path)
         else:
             raise AsyncProcessError("Actinia STAC plugin is not installed")
 
@@ -211,5 +439,8 @@ class STACImporter:
                     semantic_label=stac_semantic_label,
                     interval=stac_interval,
                     bbox=stac_extent,
-                    filter=stac_filter)
+                    filter=stac_filter,
+                    import_mode=stac_entry["import_descr"].get(
+                        "import_mode"),
+                    temp_file_path=temp_file_path or "/tmp")
             return stac_command
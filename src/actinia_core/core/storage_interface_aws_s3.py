@@ -25,7 +25,6 @@
 Storage base class
 """
 import os
-import boto3
 from .storage_interface_base import ResourceStorageBase
 
 __license__ = "GPLv3"
@@ -56,6 +55,8 @@ class ResourceStorageS3(ResourceStorageBase):
     def setup(self):
         """Setup the AWS S3 botot3 client and the AWS login credentials
         """
+        # boto3 is imported on first use to speed up the server start
+        import boto3
 
         self.session = boto3.Session(
             region_name=self.config.S3_AWS_DEFAULT_REGION,
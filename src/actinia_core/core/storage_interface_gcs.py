@@ -26,8 +26,6 @@ Storage base class
 """
 import os
 import datetime
-from google.cloud import storage
-from google.cloud import bigquery
 from .storage_interface_base import ResourceStorageBase
 
 __license__ = "GPLv3"
@@ -57,6 +55,10 @@ class ResourceStorageGCS(ResourceStorageBase):
     def setup(self):
         """Setup the Google Cloud Storage (GCS) client and the GCS credentials
         """
+        # The Google Cloud client is imported on first use to speed up the
+        # server start
+        from google.cloud import storage
+
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = \
             self.config.GOOGLE_APPLICATION_CREDENTIALS
         self.storage_client = storage.Client()
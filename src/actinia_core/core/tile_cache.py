@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Disk cache of rendered raster map tiles
+
+The tiles use a tile grid in the coordinate reference system of the location.
+Zoom level 0 is a single tile that covers the square around the extent of
+the raster map with its north-west corner as origin, each zoom level splits
+the tiles of the previous level into four tiles. The tiles are cached for
+the modification times of the header and the color table of the raster map,
+so that a modified raster map invalidates its tiles.
+"""
+
+import hashlib
+import os
+import shutil
+
+from actinia_core.core.common.exceptions import AsyncProcessError
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The width and height of a tile in pixel
+TILE_SIZE = 256
+# The elements of a raster map that change its rendering
+RASTER_ELEMENTS = ["cellhd", "colr"]
+
+
+def find_raster_map(config, user_group, location_name, mapset_name,
+                    raster_name):
+    """Find the mapset of a raster map in the user and the global database
+
+    Args:
+        config (Configuration): The actinia configuration
+        user_group (str): The group of the user
+        location_name (str): The name of the location
+        mapset_name (str): The name of the mapset
+        raster_name (str): The name of the raster map
+
+    Returns:
+        tuple:
+        (database, mapset_path) database is "user" or "global", or
+        (None, None) if the raster map does not exist
+    """
+    databases = (
+        ("user", os.path.join(config.GRASS_USER_DATABASE, user_group)),
+        ("global", config.GRASS_DATABASE))
+    for database, database_path in databases:
+        mapset_path = os.path.join(database_path, location_name, mapset_name)
+        if os.path.isfile(os.path.join(mapset_path, "cellhd", raster_name)):
+            return database, mapset_path
+    return None, None
+
+
+def read_raster_header(mapset_path, raster_name):
+    """Read the extent of a raster map from its header file
+
+    Args:
+        mapset_path (str): The path to the mapset of the raster map
+        raster_name (str): The name of the raster map
+
+    Raises:
+        AsyncProcessError: If the header can not be read
+
+    Returns:
+        dict:
+        The extent {"north": float, "south": float, "east": float,
+        "west": float}
+    """
+    header = {}
+    try:
+        with open(os.path.join(mapset_path, "cellhd", raster_name)) as cellhd:
+            for line in cellhd:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    header[key.strip()] = value.strip()
+        return {key: float(header[key])
+                for key in ["north", "south", "east", "west"]}
+    except (OSError, KeyError, ValueError) as e:
+        raise AsyncProcessError("Unable to read the header of raster map "
+                                "<%s>: %s" % (raster_name, str(e)))
+
+
+def get_raster_cache_key(mapset_path, raster_name):
+    """Create the cache key of the tiles of a raster map from the
+    modification times of its header and its color table
+
+    Args:
+        mapset_path (str): The path to the mapset of the raster map
+        raster_name (str): The name of the raster map
+
+    Returns:
+        str:
+        The cache key
+    """
+    key = [mapset_path, raster_name]
+    for element in RASTER_ELEMENTS:
+        path = os.path.join(mapset_path, element, raster_name)
+        if os.path.isfile(path):
+            key.append("%s:%i" % (element, os.stat(path).st_mtime_ns))
+    return hashlib.sha256("|".join(key).encode()).hexdigest()[:32]
+
+
+def get_raster_tile_cache_path(config, database, location_name, mapset_name,
+                               raster_name, user_group):
+    """Return the cache directory of the tiles of a raster map
+
+    Args:
+        config (Configuration): The actinia configuration
+        database (str): The database of the raster map, "user" or "global"
+        location_name (str): The name of the location
+        mapset_name (str): The name of the mapset
+        raster_name (str): The name of the raster map
+        user_group (str): The group of the user
+
+    Returns:
+        str:
+        The path of the cache directory
+    """
+    if database == "user":
+        return os.path.join(config.TILE_CACHE, database, user_group,
+                            location_name, mapset_name, raster_name)
+    return os.path.join(config.TILE_CACHE, database, location_name,
+                        mapset_name, raster_name)
+
+
+def get_tile_file(cache_path, key, z, x, y):
+    """Return the path of a cached tile
+
+    Args:
+        cache_path (str): The cache directory of the raster map
+        key (str): The cache key of the raster map
+        z (int): The zoom level
+        x (int): The column of the tile
+        y (int): The row of the tile
+
+    Returns:
+        str:
+        The path of the PNG file
+    """
+    return os.path.join(cache_path, key, str(z), str(x), "%i.png" % y)
+
+
+def check_tile_index(z, x, y, max_zoom):
+    """Check the zoom level, column and row of a tile
+
+    Args:
+        z (int): The zoom level
+        x (int): The column of the tile
+        y (int): The row of the tile
+        max_zoom (int): The maximum zoom level
+
+    Raises:
+        AsyncProcessError: If the tile does not exist
+
+    """
+    if z < 0 or z > max_zoom:
+        raise AsyncProcessError("The zoom level must be between 0 and %i"
+                                % max_zoom)
+    if x < 0 or y < 0 or x >= 2 ** z or y >= 2 ** z:
+        raise AsyncProcessError("The tile %i/%i/%i does not exist"
+                                % (z, x, y))
+
+
+def get_tile_region(extent, z, x, y):
+    """Compute the region of a tile
+
+    Args:
+        extent (dict): The extent of the raster map
+        z (int): The zoom level
+        x (int): The column of the tile
+        y (int): The row of the tile
+
+    Returns:
+        list:
+        The region [north, south, east, west] of the tile
+    """
+    size = max(extent["north"] - extent["south"],
+               extent["east"] - extent["west"])
+    tile_size = size / 2 ** z
+    north = extent["north"] - y * tile_size
+    west = extent["west"] + x * tile_size
+    return [north, north - tile_size, west + tile_size, west]
+
+
+def get_seed_tiles(min_zoom, max_zoom, max_tiles):
+    """Return all tiles of a zoom range
+
+    Args:
+        min_zoom (int): The minimum zoom level
+        max_zoom (int): The maximum zoom level
+        max_tiles (int): The maximum number of tiles
+
+    Raises:
+        AsyncProcessError: If the zoom range is wrong or contains too many
+                           tiles
+
+    Returns:
+        list:
+        The (z, x, y) tuples of the tiles
+    """
+    if min_zoom < 0 or max_zoom < min_zoom:
+        raise AsyncProcessError("The zoom range %i - %i is wrong"
+                                % (min_zoom, max_zoom))
+    num_tiles = sum(4 ** z for z in range(min_zoom, max_zoom + 1))
+    if num_tiles > max_tiles:
+        raise AsyncProcessError("The zoom range %i - %i contains %i tiles, "
+                                "the maximum is %i"
+                                % (min_zoom, max_zoom, num_tiles, max_tiles))
+    return [(z, x, y) for z in range(min_zoom, max_zoom + 1)
+            for x in range(2 ** z) for y in range(2 ** z)]
+
+
+def remove_outdated_tiles(cache_path, key):
+    """Remove the cached tiles of previous versions of a raster map
+
+    Args:
+        cache_path (str): The cache directory of the raster map
+        key (str): The cache key of the current version of the raster map
+
+    """
+    if not os.path.isdir(cache_path):
+        return
+    for name in os.listdir(cache_path):
+        if name != key:
+            shutil.rmtree(os.path.join(cache_path, name), ignore_errors=True)
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tile-parallel execution of raster process chains
+"""
+
+import re
+
+from actinia_core.core.common.exceptions import AsyncProcessError
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The suffix of the raster maps that contain the tile without the overlap
+TILE_CORE_SUFFIX = "_tile_core"
+# The r.mapcalc functions and neighborhood modifiers with results that depend
+# on the position of a cell in the region or on the region itself
+MAPCALC_REGION_PATTERN = re.compile(
+    r"\b(row|col|x|y|nrows|ncols|rand)\s*\(|\[")
+# The raster map that a r.mapcalc statement creates
+MAPCALC_OUTPUT_PATTERN = re.compile(r"^\s*([\w.]+)\s*=(?!=)")
+
+
+def get_tiling_settings(process_chain):
+    """Read and check the tiling settings of a process chain
+
+    Args:
+        process_chain (dict): The process chain
+
+    Raises:
+        AsyncProcessError: If the tiling settings are wrong
+
+    Returns:
+        dict:
+        The tiling settings {"tile_size": int, "overlap": int} or None if the
+        process chain is not executed tile-parallel
+    """
+    if not isinstance(process_chain, dict) or "tiling" not in process_chain:
+        return None
+
+    tiling = process_chain["tiling"]
+    if not isinstance(tiling, dict) or "tile_size" not in tiling:
+        raise AsyncProcessError("The tile size is missing in the tiling "
+                                "definition of the process chain")
+    try:
+        tile_size = int(tiling["tile_size"])
+        overlap = int(tiling.get("overlap", 0))
+    except (TypeError, ValueError):
+        raise AsyncProcessError("The tile size and the overlap of the tiling "
+                                "definition must be integers")
+    if tile_size < 1 or overlap < 0:
+        raise AsyncProcessError("The tile size must be positive and the "
+                                "overlap must not be negative")
+    return {"tile_size": tile_size, "overlap": overlap}
+
+
+def split_tiled_process_list(process_list, tile_safe_modules,
+                             stdout_process_ids=()):
+    """Split a process list into the processes that prepare the data and
+    the region and the processes that are executed tile-parallel
+
+    The downloads, imports and g.region calls at the beginning of the
+    process list prepare the data and the region, all following processes
+    must be tile-safe modules.
+
+    Args:
+        process_list (list): The process list
+        tile_safe_modules (list): The names of the tile-safe modules
+        stdout_process_ids (list): The ids of the processes with stdout
+                                   parsers
+
+    Raises:
+        AsyncProcessError: If a process can not be executed tile-parallel
+
+    Returns:
+        tuple:
+        (prepare_process_list, tiled_process_list)
+    """
+    count = 0
+    for process in process_list:
+        if process.exec_type == "download" \
+                or process.skip_permission_check is True \
+                or process.executable == "g.region":
+            count += 1
+        else:
+            break
+
+    tiled_process_list = process_list[count:]
+    for process in tiled_process_list:
+        if process.exec_type != "grass" \
+                or process.executable not in tile_safe_modules \
+                or process.stdin_source is not None \
+                or process.id in stdout_process_ids:
+            raise AsyncProcessError(
+                "Process <%s> with module <%s> can not be executed "
+                "tile-parallel, supported modules are: %s"
+                % (process.id, process.executable,
+                   ", ".join(tile_safe_modules)))
+        if process.executable == "r.mapcalc" \
+                and not is_tile_safe_expression(process.executable_params):
+            raise AsyncProcessError(
+                "Process <%s> with module <r.mapcalc> can not be executed "
+                "tile-parallel, the expression must not use row(), col(), "
+                "x(), y(), nrows(), ncols(), rand() or neighborhood "
+                "modifiers" % process.id)
+
+    return process_list[:count], tiled_process_list
+
+
+def is_tile_safe_expression(executable_params):
+    """Check if the result of a r.mapcalc call is independent of the tiles
+
+    Args:
+        executable_params (list): The r.mapcalc parameters
+
+    Returns:
+        bool:
+        True if the expression does not depend on the region
+    """
+    expressions = [param.split("=", 1)[1] for param in executable_params
+                   if param.startswith("expression=")]
+    if not expressions:
+        # The expressions of a file can not be checked
+        return False
+    return not any(MAPCALC_REGION_PATTERN.search(expression)
+                   for expression in expressions)
+
+
+def get_process_chain_outputs(process_chain):
+    """Return the outputs of the modules of a process chain
+
+    Args:
+        process_chain (dict): The process chain
+
+    Returns:
+        dict:
+        The process ids as keys and the lists of output definitions as values
+    """
+    outputs = {}
+    if isinstance(process_chain, dict) \
+            and isinstance(process_chain.get("list"), list):
+        for process_descr in process_chain["list"]:
+            if isinstance(process_descr, dict) and "module" in process_descr:
+                outputs[process_descr.get("id")] = \
+                    process_descr.get("outputs", [])
+    return outputs
+
+
+def get_tiled_raster_outputs(tiled_process_list, outputs):
+    """Return the raster maps that the tile-parallel processes create
+
+    These are the declared outputs of the processes and the maps that
+    r.mapcalc expressions create.
+
+    Args:
+        tiled_process_list (list): The tile-parallel processes
+        outputs (dict): The output definitions of the processes, see
+                        get_process_chain_outputs()
+
+    Raises:
+        AsyncProcessError: If a process has outputs that are no raster maps or
+                           no declared raster output
+
+    Returns:
+        list:
+        The names of the raster maps
+    """
+    raster_names = []
+    for process in tiled_process_list:
+        names = []
+        for output in outputs.get(process.id, []):
+            value = str(output.get("value", ""))
+            export_type = output.get("export", {}).get("type", "raster")
+            if export_type != "raster" or "/" in value or "::" in value:
+                raise AsyncProcessError(
+                    "Process <%s> with module <%s> can not be executed "
+                    "tile-parallel, the output <%s> is no raster map"
+                    % (process.id, process.executable, output.get("param")))
+            names.extend(name for name in value.split(",") if name)
+        if process.executable == "r.mapcalc":
+            for param in process.executable_params:
+                if param.startswith("expression="):
+                    for statement in re.split(r"[;\n]", param[11:]):
+                        match = MAPCALC_OUTPUT_PATTERN.match(statement)
+                        if match:
+                            names.append(match.group(1))
+        if not names:
+            raise AsyncProcessError(
+                "Process <%s> with module <%s> can not be executed "
+                "tile-parallel, it has no declared raster output"
+                % (process.id, process.executable))
+        for name in names:
+            if name not in raster_names:
+                raster_names.append(name)
+    return raster_names
+
+
+def get_window_parameters(region, first_row, last_row, first_col, last_col):
+    """Create the g.region parameters of a window of a region
+
+    Args:
+        region (GrassRegion): The region
+        first_row (int): The first row of the window
+        last_row (int): The row after the last row of the window
+        first_col (int): The first column of the window
+        last_col (int): The column after the last column of the window
+
+    Returns:
+        list:
+        The g.region parameters
+    """
+    ns_res = region.ns_res
+    ew_res = region.ew_res
+    return ["n=%.15g" % (region.north - first_row * ns_res),
+            "s=%.15g" % (region.north - last_row * ns_res),
+            "w=%.15g" % (region.west + first_col * ew_res),
+            "e=%.15g" % (region.west + last_col * ew_res),
+            "rows=%i" % (last_row - first_row),
+            "cols=%i" % (last_col - first_col)]
+
+
+def get_tiles(region, tile_size, overlap=0):
+    """Split a region into tiles
+
+    Args:
+        region (GrassRegion): The region
+        tile_size (int): The number of rows and columns of a tile
+        overlap (int): The number of rows and columns by which the tiles are
+                       extended into their neighbour tiles
+
+    Returns:
+        list:
+        A list of (core, extended) tuples with the g.region parameters of the
+        tiles without and with the overlap
+    """
+    tiles = []
+    for row in range(0, region.rows, tile_size):
+        last_row = min(row + tile_size, region.rows)
+        for col in range(0, region.cols, tile_size):
+            last_col = min(col + tile_size, region.cols)
+            core = get_window_parameters(region, row, last_row, col, last_col)
+            extended = get_window_parameters(
+                region, max(0, row - overlap),
+                min(region.rows, last_row + overlap),
+                max(0, col - overlap), min(region.cols, last_col + overlap))
+            tiles.append((core, extended))
+    return tiles
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Concurrent access and mimetype checks of import URLs
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import magic
+import requests
+from requests.adapters import HTTPAdapter
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The number of bytes that are downloaded to detect the mimetype
+SNIFF_SIZE = 256
+# The response headers that are stored in the check result
+RESULT_HEADERS = ["ETag", "Last-Modified", "Content-Type"]
+
+
+class UrlChecker(object):
+    """Check the access and the mimetype of URLs concurrently
+
+    A single ranged GET request of the first bytes of a file is used to check
+    the existence of the file and to detect its mimetype. The connections are
+    reused by a pooled HTTP session. The results are kept for the lifetime of
+    the checker and optionally cached in the redis server for following jobs.
+    """
+
+    def __init__(self, max_connections=8, timeout=60, cache=None,
+                 cache_ttl=0, message_logger=None):
+        """
+
+        Args:
+            max_connections (int): The maximum number of concurrent checks
+            timeout (int): The connection and read timeout in seconds
+            cache (RedisUrlCheckCacheInterface): The redis URL check cache
+            cache_ttl (int): The time in seconds a successful check is cached
+            message_logger: The message logger to be used
+
+        """
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.message_logger = message_logger
+        self.results = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_connections,
+                              pool_maxsize=self.max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_cached_result(self, url):
+        if self.cache is None or self.cache_ttl <= 0:
+            return None
+        try:
+            return self.cache.get(url)
+        except Exception as e:
+            if self.message_logger:
+                self.message_logger.warning(
+                    "Unable to read the URL check cache: %s" % str(e))
+        return None
+
+    def _set_cached_result(self, url, result):
+        if self.cache is None or self.cache_ttl <= 0:
+            return
+        try:
+            self.cache.set(url, result, self.cache_ttl)
+        except Exception as e:
+            if self.message_logger:
+                self.message_logger.warning(
+                    "Unable to write the URL check cache: %s" % str(e))
+
+    def _check_url(self, url):
+        """Check the access and the mimetype of a single URL
+
+        Args:
+            url (str): The URL to check
+
+        Returns:
+            dict:
+            The check result with the keys "status_code", "mime_type",
+            "headers" and "error"
+        """
+        result = self._get_cached_result(url)
+        if result is not None:
+            return result
+
+        result = {"status_code": None, "mime_type": None, "headers": {},
+                  "error": None}
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout,
+                                  headers={"Range": "bytes=0-%i"
+                                           % (SNIFF_SIZE - 1)}) as resp:
+                result["status_code"] = resp.status_code
+                result["headers"] = {name: resp.headers[name]
+                                     for name in RESULT_HEADERS
+                                     if name in resp.headers}
+                if resp.status_code in (200, 206):
+                    data = resp.raw.read(SNIFF_SIZE, decode_content=True)
+                    result["mime_type"] = magic.from_buffer(
+                        data, mime=True).lower()
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+
+        if result["mime_type"] is not None:
+            self._set_cached_result(url, result)
+        return result
+
+    def check_urls(self, url_list):
+        """Check the access and the mimetype of URLs concurrently
+
+        Args:
+            url_list (list): The URLs to check
+
+        Returns:
+            list:
+            The check results in the order of the URL list
+        """
+        missing = [url for url in dict.fromkeys(url_list)
+                   if url not in self.results]
+        if len(missing) == 1:
+            self.results[missing[0]] = self._check_url(missing[0])
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(
+                    self.max_connections, len(missing))) as executor:
+                for url, result in zip(missing,
+                                       executor.map(self._check_url, missing)):
+                    self.results[url] = result
+        return [self.results[url] for url in url_list]
+
+    def close(self):
+        """Close the HTTP session"""
+        self.session.close()
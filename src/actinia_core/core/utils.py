@@ -54,29 +54,21 @@ def os_path_normpath(path_parts):
     return path
 
 
-def get_wget_process(source, url):
-    """The function returns a wget Process for the given source and url
+def get_download_process(source, url):
+    """The function returns a download Process for the given source and url.
+    Consecutive download processes are executed concurrently.
 
     Args:
         source (str): The source file name where to download the data
         url (str): The url which should be downloaded
 
     Returns:
-        p (Process): process for wget
+        p (Process): process for the download
     """
-
-    wget = "/usr/bin/wget"
-    wget_params = list()
-    wget_params.append("-t5")
-    wget_params.append("-c")
-    wget_params.append("-q")
-    wget_params.append("-O")
-    wget_params.append("%s" % source)
-    wget_params.append(url)
-
     p = Process(
-        exec_type="exec", executable=wget, executable_params=wget_params,
-        id=f"importer_wget_{os.path.basename(source)}",
+        exec_type="download", executable="download",
+        executable_params=[source, url],
+        id=f"importer_download_{os.path.basename(source)}",
         skip_permission_check=True)
     return p
 
@@ -59,6 +59,7 @@ from actinia_core.rest.raster_export import \
      AsyncEphemeralRasterLayerRegionExporterResource
 from actinia_core.rest.raster_export import AsyncEphemeralRasterLayerExporterResource
 from actinia_core.rest.persistent_processing import AsyncPersistentResource
+from actinia_core.rest.batch_processing import AsyncBatchResource, BatchManager
 from actinia_core.rest.ephemeral_custom_processing import AsyncEphemeralCustomResource
 from actinia_core.rest.process_validation import AsyncProcessValidationResource
 from actinia_core.rest.process_validation import SyncProcessValidationResource
@@ -70,6 +71,7 @@ from actinia_core.rest.resource_management \
     import ResourceManager, ResourcesManager, ResourceIterationManager
 from actinia_core.rest.resource_streamer import RequestStreamerResource
 from actinia_core.rest.download_cache_management import SyncDownloadCacheResource
+from actinia_core.rest.drain_management import DrainResource
 from actinia_core.rest.resource_storage_management import SyncResourceStorageResource
 from actinia_core.rest.vector_renderer import SyncEphemeralVectorRendererResource
 from actinia_core.rest.raster_legend import SyncEphemeralRasterLegendResource
@@ -77,10 +79,12 @@ from actinia_core.rest.raster_colors import SyncPersistentRasterColorsResource
 from actinia_core.rest.raster_renderer import SyncEphemeralRasterRendererResource
 from actinia_core.rest.raster_renderer import SyncEphemeralRasterRGBRendererResource
 from actinia_core.rest.raster_renderer import SyncEphemeralRasterShapeRendererResource
+from actinia_core.rest.raster_tiles import SyncEphemeralRasterTileResource
+from actinia_core.rest.raster_tiles import AsyncEphemeralRasterTileSeedResource
 from actinia_core.rest.strds_renderer import SyncEphemeralSTRDSRendererResource
 from actinia_core.rest.process_chain_monitoring import \
     MaxMapsetSizeResource, MapsetSizeResource, MapsetSizeRenderResource, \
-    MapsetSizeDiffResource, MapsetSizeDiffRenderResource
+    MapsetSizeDiffResource, MapsetSizeDiffRenderResource, ResourceUsageResource
 
 
 __license__ = "GPLv3"
@@ -129,6 +133,14 @@ def create_core_endpoints():
         SyncEphemeralRasterRendererResource,
         '/locations/<string:location_name>/mapsets/<string:mapset_name>/'
         'raster_layers/<string:raster_name>/render')
+    flask_api.add_resource(
+        SyncEphemeralRasterTileResource,
+        '/locations/<string:location_name>/mapsets/<string:mapset_name>/'
+        'raster_layers/<string:raster_name>/tiles/<int:z>/<int:x>/<int:y>.png')
+    flask_api.add_resource(
+        AsyncEphemeralRasterTileSeedResource,
+        '/locations/<string:location_name>/mapsets/<string:mapset_name>/'
+        'raster_layers/<string:raster_name>/tiles')
     flask_api.add_resource(
         SyncEphemeralRasterRGBRendererResource,
         '/locations/<string:location_name>/mapsets/<string:mapset_name>/render_rgb')
@@ -191,6 +203,9 @@ def create_core_endpoints():
         AsyncPersistentResource,
         '/locations/<string:location_name>/mapsets/'
         '<string:mapset_name>/processing_async')
+    flask_api.add_resource(
+        AsyncBatchResource,
+        '/locations/<string:location_name>/processing_async_batch')
     flask_api.add_resource(
         AsyncPersistentMapsetMergerResource,
         '/locations/<string:location_name>/mapsets/'
@@ -226,6 +241,8 @@ def create_core_endpoints():
     flask_api.add_resource(
         ResourceManager, '/resources/<string:user_id>/<string:resource_id>')
     flask_api.add_resource(ResourcesManager, '/resources/<string:user_id>')
+    flask_api.add_resource(
+        BatchManager, '/resources/<string:user_id>/batches/<string:batch_id>')
     flask_api.add_resource(
         ResourceIterationManager,
         '/resources/<string:user_id>/<string:resource_id>/<int:iteration>')
@@ -236,6 +253,7 @@ def create_core_endpoints():
     # Download and resource management
     flask_api.add_resource(SyncDownloadCacheResource, '/download_cache')
     flask_api.add_resource(SyncResourceStorageResource, '/resource_storage')
+    flask_api.add_resource(DrainResource, '/drain')
 
     # Endpoints for monitoring a process chain
     flask_api.add_resource(
@@ -253,6 +271,9 @@ def create_core_endpoints():
     flask_api.add_resource(
         MapsetSizeDiffRenderResource,
         '/resources/<string:user_id>/<string:resource_id>/mapsetsizes/diffs/render')
+    flask_api.add_resource(
+        ResourceUsageResource,
+        '/resources/<string:user_id>/<string:resource_id>/resource_usage')
 
 
 def check_import_plugins():
@@ -33,7 +33,9 @@ __maintainer__ = "Sören Gebbert"
 __email__ = "soerengebbert@googlemail.com"
 
 from actinia_core.core.common.app import flask_app, URL_PREFIX
-from flask import make_response
+from actinia_core.core.common.config import global_config
+from actinia_core.core.health import get_readiness
+from flask import jsonify, make_response
 
 # This is a simple endpoint to check the health of the Actinia Core server
 # This is needed by Google load balancer
@@ -41,12 +43,18 @@ from flask import make_response
 
 @flask_app.route(URL_PREFIX + '/health_check')
 def health_check():
-    # TODO: Add checks of the Actinia Core compute node state
-    #       - is the config correct
-    #       - Are the queues running
-    #       - Is redis available
-    # TODO: This check must be triggered to respond with 404 for node replacement
-    #       in case of an update or bugfix.
-    #       Hence, the load balance will not deliver any content to this node if
-    #       the health check responses with a 404.
+    # The liveness check of the server, the state of the compute node is
+    # checked by the readiness check
     return make_response("OK", 200)
+
+
+# The readiness check responds with 503 if redis is not reachable, the process
+# queue manager is not responsive, the temporary database has not enough free
+# disk space or the node is draining. Hence, the load balancer will not
+# deliver new jobs to this node, while the running jobs are finished.
+@flask_app.route(URL_PREFIX + '/readiness_check')
+def readiness_check():
+    status, checks = get_readiness(global_config)
+    http_code = 200 if status == "ready" else 503
+    return make_response(jsonify({"status": status, "checks": checks}),
+                         http_code)
@@ -29,6 +29,7 @@ Actinia Core
 import os
 from .endpoints import create_endpoints
 from .health_check import health_check
+from .metrics import metrics
 from .version import version, init_versions
 from actinia_core.core.common.app import flask_app
 from actinia_core.core.common.config import global_config, DEFAULT_CONFIG_PATH
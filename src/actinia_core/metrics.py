@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Prometheus metrics endpoint of the Actinia Core server
+"""
+
+from flask import make_response
+
+from actinia_core.core.common.app import flask_app, URL_PREFIX
+from actinia_core.core.metrics import generate_metrics, \
+    update_worker_cpu_usage
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+@flask_app.after_request
+def update_worker_metrics(response):
+    """Update the CPU time of the worker after each request"""
+    update_worker_cpu_usage()
+    return response
+
+
+@flask_app.route(URL_PREFIX + '/metrics')
+def metrics():
+    """Return the metrics in the prometheus text format"""
+    update_worker_cpu_usage()
+    result = generate_metrics()
+    if result is None:
+        return make_response("The prometheus client is not installed", 404)
+    data, content_type = result
+    response = make_response(data, 200)
+    response.headers["Content-Type"] = content_type
+    return response
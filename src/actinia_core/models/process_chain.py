@@ -220,6 +220,23 @@ class InputParameter(IOParameterBase):
                             }
                 }
             },
+            'import_mode': {
+                'type': 'string',
+                'description': 'The import mode of raster and stac sources. '
+                               'In case of <download> the whole file is '
+                               'downloaded and imported, this is the default '
+                               'for raster sources. Stac assets are read with '
+                               '/vsicurl/ by default. In case '
+                               'of <region> the file is not downloaded, only the '
+                               'window of the current computational region is '
+                               'read from the remote file with HTTP range '
+                               'requests. The import runs directly before the '
+                               'process that declares it, after the region was '
+                               'set by the previous processes. This is '
+                               'recommended to import small regions of large '
+                               'cloud optimized GeoTIFFs.',
+                'enum': ["download", "region"]
+            },
             'basic_auth': {
                 'type': 'string',
                 'description': 'User name and password for basic HTTP, HTTPS and FTP '
@@ -400,7 +417,16 @@ class GrassModule(Schema):
                                       'module.'},
         'interface-description': {'type': 'boolean',
                                   'description': 'Set True to print interface '
-                                                 'description and exit.'}
+                                                 'description and exit.'},
+        'depends_on': {'type': 'array',
+                       'items': {'type': 'string'},
+                       'description': 'The ids of previous modules or '
+                                      'executables of the process chain that '
+                                      'must be finished before this module '
+                                      'runs. Dependencies on modules that '
+                                      'write the input maps of this module are '
+                                      'detected automatically, independent '
+                                      'modules run concurrently.'}
     }
     required = ['id', 'module']
     description = (
@@ -449,7 +475,14 @@ class Executable(Schema):
                                  'in of the process chain as input for this module. '
                                  'Refer to the module/executable output as id::stderr '
                                  'or id::stdout, the \"id\" is the unique identifier '
-                                 'of a GRASS GIS module.'}
+                                 'of a GRASS GIS module.'},
+        'depends_on': {'type': 'array',
+                       'items': {'type': 'string'},
+                       'description': 'The ids of previous modules or '
+                                      'executables of the process chain that '
+                                      'must be finished before this executable '
+                                      'runs. Executables always wait for all '
+                                      'previous modules and executables.'}
     }
     required = ['id', 'exe']
     description = 'The definition of a Linux executable and its parameters. ' \
@@ -502,6 +535,30 @@ class Webhooks(Schema):
                     'actinia-finished-webhook'}
 
 
+class Tiling(Schema):
+    """The definition of the tile-parallel execution
+    """
+    type = 'object'
+    properties = {
+        'tile_size': {'type': 'integer',
+                      'description': 'The number of rows and columns of a tile'},
+        'overlap': {'type': 'integer',
+                    'default': 0,
+                    'description': 'The number of rows and columns by which the '
+                                   'tiles are extended into their neighbour '
+                                   'tiles, e.g. for moving window modules'},
+    }
+    required = ['tile_size']
+    description = (
+        'Execute the process chain tile-parallel. The computational region is '
+        'split into tiles, the modules after the imports and g.region calls run '
+        'for each tile in a temporary mapset and the declared raster outputs are '
+        'patched into the mapset. Only modules that are declared tile-safe in '
+        'the actinia configuration and that have only raster outputs are '
+        'supported.')
+    example = {'tile_size': 1000, 'overlap': 5}
+
+
 class ProcessChainModel(Schema):
     """Definition of the actinia process chain that includes GRASS GIS modules
     and common Linux commands
@@ -514,8 +571,11 @@ class ProcessChainModel(Schema):
         'list': {'type': 'array',
                  'items': GrassModule,
                  'description': "A list of process definitions that should be executed "
-                                "in the order provided by the list."},
+                                "in the order provided by the list. Modules "
+                                "that do not depend on each other run "
+                                "concurrently."},
         'webhooks': Webhooks,
+        'tiling': Tiling,
     }
     required = ['version', 'list']
     example = {
@@ -622,3 +682,36 @@ class ProcessChainModel(Schema):
             'finished': f'http://business-logic.company.com{URL_PREFIX}/'
                         'actinia-finished-webhook'},
         'version': '1'}
+
+
+class BatchProcessChainModel(Schema):
+    """Definition of a batch submission that executes a process chain template
+    once for each entry of a parameter list
+    """
+    type = 'object'
+    properties = {
+        'process_chain': ProcessChainModel,
+        'parameters': {
+            'type': 'array',
+            'items': {'type': 'object'},
+            'description': 'A list of parameter objects, a job is created for '
+                           'each object. The placeholders {{name}} in the '
+                           'process chain template are replaced by the values '
+                           'of the parameters. If the parameter "mapset" is '
+                           'set, the job runs in this mapset of the user '
+                           'database, otherwise it runs in an ephemeral mapset '
+                           'and exports its results.'},
+    }
+    required = ['process_chain', 'parameters']
+    example = {
+        'process_chain': {
+            'version': '1',
+            'list': [{
+                'id': 'ndvi',
+                'module': 'r.mapcalc',
+                'inputs': [{
+                    'param': 'expression',
+                    'value': 'ndvi = float(nir@{{mapset}} - red@{{mapset}}) / '
+                             '(nir@{{mapset}} + red@{{mapset}})'}]}]},
+        'parameters': [{'mapset': 'scene_2021_06_01'},
+                       {'mapset': 'scene_2021_06_11'}]}
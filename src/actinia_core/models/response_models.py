@@ -32,6 +32,7 @@ from flask_restful_swagger_2 import Schema
 from copy import deepcopy
 from actinia_core.core.common.app import URL_PREFIX
 from actinia_core.core.common.process_chain import GrassModule
+from actinia_core.core.resource_usage import aggregate_resource_usage
 
 __license__ = "GPLv3"
 __author__ = "Sören Gebbert, Julia Haas, Guido Riembauer"
@@ -77,6 +78,49 @@ class ProgressInfoModel(Schema):
     }
 
 
+class ResourceUsageModel(Schema):
+    """This class defines the model for the resource usage of Unix processes.
+
+    The CPU times and the peak memory include the child processes that a
+    process waited for, the I/O bytes are the bytes that were read from and
+    written to the storage layer.
+    """
+    type = 'object'
+    properties = {
+        'cpu_user_time': {
+            'type': 'number',
+            'format': 'float',
+            'description': 'The CPU time spent in user mode in seconds'
+        },
+        'cpu_system_time': {
+            'type': 'number',
+            'format': 'float',
+            'description': 'The CPU time spent in system mode in seconds'
+        },
+        'max_rss': {
+            'type': 'number',
+            'format': 'int64',
+            'description': 'The peak resident set size in bytes'
+        },
+        'read_bytes': {
+            'type': 'number',
+            'format': 'int64',
+            'description': 'The number of bytes read from the storage layer'
+        },
+        'write_bytes': {
+            'type': 'number',
+            'format': 'int64',
+            'description': 'The number of bytes written to the storage layer'
+        }
+    }
+    example = {
+        "cpu_user_time": 1.52,
+        "cpu_system_time": 0.08,
+        "max_rss": 48128000,
+        "read_bytes": 2048000,
+        "write_bytes": 1232896}
+
+
 class ProcessLogModel(Schema):
     """This class defines the model for Unix process information.
 
@@ -126,7 +170,8 @@ class ProcessLogModel(Schema):
             'type': 'number',
             'format': 'float',
             'description': 'The size of the mapset in bytes'
-        }
+        },
+        'resource_usage': ResourceUsageModel
     }
     required = ['executable', 'parameter', 'stdout', 'stderr', 'return_code']
 
@@ -378,7 +423,8 @@ class ProcessingResponseModel(Schema):
             'description': 'The HTTP code of the response'
         },
         'urls': UrlModel,
-        'api_info': ApiInfoModel
+        'api_info': ApiInfoModel,
+        'resource_usage': ResourceUsageModel
     }
     required = ['status', 'user_id', 'resource_id', 'timestamp', 'datetime',
                 'accept_timestamp', 'accept_datetime', 'message']
@@ -501,6 +547,170 @@ class ProcessingResponseListModel(Schema):
     required = ["resource_list"]
 
 
+class ProcessResourceUsageModel(Schema):
+    """Response schema of the resource usage of a single process
+    """
+    type = 'object'
+    properties = {
+        'id': {
+            'type': 'string',
+            'description': 'The ID of the executable'
+        },
+        'executable': {
+            'type': 'string',
+            'description': 'The name of the executable'
+        },
+        'run_time': {
+            'type': 'number',
+            'format': 'float',
+            'description': 'The runtime of the executable in seconds'
+        },
+        'resource_usage': ResourceUsageModel
+    }
+    required = ['executable']
+
+
+class ResourceUsageResponseModel(Schema):
+    """Response schema of the resource usage of the processes of a resource
+    """
+    type = 'object'
+    properties = {
+        'status': {
+            'type': 'string',
+            'description': 'The status of the request'
+        },
+        'process_resource_usage': {
+            'type': 'array',
+            'items': ProcessResourceUsageModel,
+            'description': 'The resource usage of each process in the order of '
+                           'the process log'
+        },
+        'resource_usage': ResourceUsageModel
+    }
+    required = ['status', 'process_resource_usage']
+    example = {
+        "process_resource_usage": [
+            {"executable": "r.slope.aspect",
+             "id": "slope",
+             "resource_usage": {"cpu_system_time": 0.08,
+                                "cpu_user_time": 1.52,
+                                "max_rss": 48128000,
+                                "read_bytes": 2048000,
+                                "write_bytes": 1232896},
+             "run_time": 1.7}],
+        "resource_usage": {"cpu_system_time": 0.08,
+                           "cpu_user_time": 1.52,
+                           "max_rss": 48128000,
+                           "read_bytes": 2048000,
+                           "write_bytes": 1232896},
+        "status": "success"}
+
+
+class BatchJobModel(Schema):
+    """Response schema of a job of a batch submission
+    """
+    type = 'object'
+    properties = {
+        'resource_id': {
+            'type': 'string',
+            'description': 'The unique resource id of the job'
+        },
+        'status': {
+            'type': 'string',
+            'description': 'The status of the job'
+        },
+        'parameters': {
+            'type': 'object',
+            'description': 'The parameters that were used to render the process '
+                           'chain template of the job'
+        },
+        'message': {
+            'type': 'string',
+            'description': 'The message of the job'
+        },
+        'progress': ProgressInfoModel,
+        'urls': UrlModel
+    }
+    required = ['resource_id', 'status', 'parameters']
+
+
+class BatchResponseModel(Schema):
+    """Response schema of a batch submission, the status and the progress are
+    aggregated from the jobs of the batch
+    """
+    type = 'object'
+    properties = {
+        'status': {
+            'type': 'string',
+            'description': 'The aggregated status of the jobs: accepted, running, '
+                           'finished, error or terminated'
+        },
+        'user_id': {
+            'type': 'string',
+            'description': 'The id of the user that issued the batch'
+        },
+        'batch_id': {
+            'type': 'string',
+            'description': 'The unique batch id'
+        },
+        'message': {
+            'type': 'string',
+            'description': 'Message for the user'
+        },
+        'progress': ProgressInfoModel,
+        'summary': {
+            'type': 'object',
+            'description': 'The number of jobs for each status'
+        },
+        'jobs': {
+            'type': 'array',
+            'items': BatchJobModel,
+            'description': 'The jobs of the batch in the order of the parameters, '
+                           'the URLs of the results are available as soon as a '
+                           'job is finished'
+        },
+        'accept_datetime': {
+            'type': 'string',
+            'description': 'The acceptance timestamp of the batch in human '
+                           'readable format'
+        },
+        'status_url': {
+            'type': 'string',
+            'description': 'The URL of the batch status'
+        }
+    }
+    required = ['status', 'user_id', 'batch_id', 'summary', 'jobs']
+    example = {
+        "accept_datetime": "2022-05-24 22:37:21.607255",
+        "batch_id": "batch_id-a3b1c5d2-5c3c-4bb8-9b6b-6f7aa3d7a0c2",
+        "jobs": [
+            {"parameters": {"mapset": "scene_1"},
+             "progress": {"num_of_steps": 3, "step": 3},
+             "resource_id": "resource_id-2be8cafe-b451-46a0-be15-f61d95c5efa1",
+             "status": "finished",
+             "urls": {
+                 "resources": [],
+                 "status": f"http://localhost{URL_PREFIX}/resources/admin/"
+                           "resource_id-2be8cafe-b451-46a0-be15-f61d95c5efa1"}},
+            {"parameters": {"mapset": "scene_2"},
+             "progress": {"num_of_steps": 3, "step": 1},
+             "resource_id": "resource_id-9c2a1e4e-6a7d-4e61-a2b0-0c8f7f0ab7e3",
+             "status": "running",
+             "urls": {
+                 "resources": [],
+                 "status": f"http://localhost{URL_PREFIX}/resources/admin/"
+                           "resource_id-9c2a1e4e-6a7d-4e61-a2b0-0c8f7f0ab7e3"}}
+        ],
+        "message": "1 of 2 jobs finished",
+        "progress": {"num_of_steps": 2, "step": 1},
+        "status": "running",
+        "status_url": f"http://localhost{URL_PREFIX}/resources/admin/batches/"
+                      "batch_id-a3b1c5d2-5c3c-4bb8-9b6b-6f7aa3d7a0c2",
+        "summary": {"finished": 1, "running": 1},
+        "user_id": "admin"
+    }
+
+
 class StorageModel(Schema):
     """This class defines the model to inform about available storage
     that is used for caching or user specific resource storage.
@@ -1259,6 +1469,10 @@ def create_response_from_model(response_model_class=ProcessingResponseModel,
 
     if process_log is not None:
         resp_dict["process_log"] = process_log
+        if isinstance(process_log, list):
+            resource_usage = aggregate_resource_usage(process_log)
+            if resource_usage is not None:
+                resp_dict["resource_usage"] = resource_usage
     if progress is not None:
         resp_dict["progress"] = progress
     if results is not None:
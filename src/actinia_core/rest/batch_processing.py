@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Fan-out of a process chain template over many mapsets, time slices or tiles
+"""
+import pickle
+
+from flask import jsonify, make_response
+from flask_restful_swagger_2 import swagger
+
+from actinia_core.core.batch import MAPSET_PARAMETER, aggregate_batch_status, \
+    check_batch_definition, render_process_chain_template
+from actinia_core.core.common.app import flask_api
+from actinia_core.core.common.config import global_config
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.common.redis_interface import enqueue_job
+from actinia_core.core.health import DRAIN_MESSAGE, is_draining
+from actinia_core.core.redis_batch import RedisBatchInterface
+from actinia_core.models.process_chain import BatchProcessChainModel
+from actinia_core.models.response_models import BatchResponseModel, \
+    SimpleResponseModel
+from actinia_core.rest.ephemeral_processing_with_export import \
+    AsyncEphemeralExportResource, start_job as start_export_job
+from actinia_core.rest.persistent_processing import \
+    AsyncPersistentResource, start_job as start_persistent_job
+from actinia_core.rest.resource_base import ResourceBase
+from actinia_core.rest.resource_management import ResourceManagerBase
+from actinia_core.rest.user_auth import UserPermissions
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+DESCR = """Execute a process chain template for each entry of a list of
+parameters, e.g. a list of mapsets, time slices or tiles.
+Minimum required user role: user.
+
+The batch definition is validated once and a job is enqueued for each
+parameter entry. The placeholders {{name}} in the process chain template are
+replaced by the parameter values of the job. Jobs with a "mapset" parameter
+run in this mapset of the user database, all other jobs run in an ephemeral
+mapset and export their results.
+
+The provided status URL of the batch must be polled to gain information
+about the aggregated progress. The result URLs of each job are available as
+soon as the job is finished.
+"""
+
+
+def connect_batch_interface():
+    """Connect to the redis batch database
+
+    Returns:
+        RedisBatchInterface:
+        The connected batch interface
+    """
+    kwargs = dict()
+    kwargs['host'] = global_config.REDIS_SERVER_URL
+    kwargs['port'] = global_config.REDIS_SERVER_PORT
+    if global_config.REDIS_SERVER_PW and global_config.REDIS_SERVER_PW is not None:
+        kwargs['password'] = global_config.REDIS_SERVER_PW
+    batch_interface = RedisBatchInterface()
+    batch_interface.connect(**kwargs)
+    return batch_interface
+
+
+def get_batch_status_url(user_id, batch_id):
+    """Return the status URL of a batch"""
+    status_url = flask_api.url_for(BatchManager, user_id=user_id,
+                                   batch_id=batch_id, _external=True)
+    if global_config.FORCE_HTTPS_URLS is True and "http://" in status_url:
+        status_url = status_url.replace("http://", "https://")
+    return status_url
+
+
+def create_batch_response(status, user_id, batch_id, message, progress,
+                          summary, jobs, accept_datetime, http_code=200):
+    """Create the response that describes the state of a batch
+
+    Returns:
+        flask.Response:
+        The HTTP status and the BatchResponseModel
+    """
+    response_model = BatchResponseModel(
+        status=status,
+        user_id=user_id,
+        batch_id=batch_id,
+        message=message,
+        summary=summary,
+        jobs=jobs,
+        accept_datetime=accept_datetime,
+        status_url=get_batch_status_url(user_id, batch_id))
+    # Nested models are assigned after the validation of the simple types
+    response_model["progress"] = progress
+    return make_response(jsonify(response_model), http_code)
+
+
+class AsyncBatchResource(ResourceBase):
+    """This class represents a resource that fans out a process chain
+    template into many processing jobs
+    """
+
+    def __init__(self):
+        ResourceBase.__init__(self)
+        self.batch_id = self.resource_id.replace("resource_id-", "batch_id-")
+
+    def _check_permissions(self, location_name, process_chain_list,
+                           parameter_list):
+        """Check the access to the mapsets and modules of all jobs, the
+        results are memoised so that each mapset and module is checked once
+
+        Raises:
+            AsyncProcessError: If the user is not allowed to run a job
+        """
+        user_permissions = UserPermissions(
+            user_credentials=self.user_credentials, config=global_config)
+        for process_chain, parameters in zip(process_chain_list,
+                                             parameter_list):
+            resp = user_permissions.check_location_mapset_module_access(
+                location_name=location_name,
+                mapset_name=parameters.get(MAPSET_PARAMETER))
+            if resp is not None:
+                raise AsyncProcessError(resp[1]["Messages"])
+            for entry in process_chain["list"]:
+                module_name = entry.get("module") \
+                    if isinstance(entry, dict) else None
+                if module_name in (None, "importer", "exporter"):
+                    continue
+                if user_permissions.check_location_mapset_module_access(
+                        module_name=module_name) is not None:
+                    raise AsyncProcessError(
+                        "Module or executable <%s> is not supported"
+                        % module_name)
+
+    def _enqueue_job(self, location_name, process_chain, parameters):
+        """Enqueue the job of a parameter entry
+
+        Raises:
+            AsyncProcessError: If the job was rejected
+
+        Returns:
+            dict:
+            The batch entry of the job
+        """
+        mapset_name = parameters.get(MAPSET_PARAMETER)
+        if mapset_name is None:
+            resource = AsyncEphemeralExportResource()
+            start_job = start_export_job
+        else:
+            resource = AsyncPersistentResource()
+            start_job = start_persistent_job
+
+        resource.request_data = process_chain
+        rdc = resource.preprocess(has_json=False, location_name=location_name,
+                                  mapset_name=mapset_name)
+        if rdc is None:
+            _, response_model = pickle.loads(resource.response_data)
+            raise AsyncProcessError(response_model["message"])
+        if mapset_name is None:
+            rdc.set_storage_model_to_file()
+        enqueue_job(resource.job_timeout, start_job, rdc)
+
+        return {"resource_id": resource.resource_id,
+                "status_url": resource.status_url,
+                "parameters": parameters}
+
+    @swagger.doc({
+        'tags': ['Processing'],
+        'description': DESCR,
+        'consumes': ['application/json'],
+        'parameters': [
+            {
+                'name': 'location_name',
+                'description': 'The location name that contains the data that '
+                               'should be processed',
+                'required': True,
+                'in': 'path',
+                'type': 'string',
+                'default': 'nc_spm_08'
+            },
+            {
+                'name': 'batch',
+                'description': 'The process chain template and the list of '
+                               'job parameters',
+                'required': True,
+                'in': 'body',
+                'schema': BatchProcessChainModel
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'The accepted batch with the status URL',
+                'schema': BatchResponseModel
+            },
+            '400': {
+                'description': 'The error message why the batch was rejected '
+                               'or the jobs that were enqueued before a job '
+                               'was rejected',
+                'schema': SimpleResponseModel
+            },
+            '503': {
+                'description': 'The node is draining and rejects new jobs',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def post(self, location_name):
+        """Execute a process chain template for each entry of a parameter list.
+        """
+        if self.check_for_json() is False:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
+        if is_draining(global_config) is True:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error", message=DRAIN_MESSAGE)), 503)
+
+        try:
+            template, parameter_list = check_batch_definition(
+                self.request_data, global_config.BATCH_MAX_JOBS)
+            process_chain_list = [
+                render_process_chain_template(template, parameters)
+                for parameters in parameter_list]
+            self._check_permissions(location_name, process_chain_list,
+                                    parameter_list)
+        except AsyncProcessError as e:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error", message=str(e))), 400)
+
+        # The jobs that were enqueued before a job was rejected are running,
+        # they are stored in the batch and reported in the response
+        jobs = []
+        error = None
+        for process_chain, parameters in zip(process_chain_list,
+                                             parameter_list):
+            try:
+                jobs.append(self._enqueue_job(location_name, process_chain,
+                                              parameters))
+            except AsyncProcessError as e:
+                error = "Job %i was rejected: %s" % (len(jobs), str(e))
+                break
+        if not jobs:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error", message=error)), 400)
+
+        batch = {"batch_id": self.batch_id,
+                 "user_id": self.user_id,
+                 "accept_datetime": self.orig_datetime,
+                 "jobs": jobs}
+        connect_batch_interface().set(
+            self.user_id, self.batch_id, batch,
+            global_config.REDIS_RESOURCE_EXPIRE_TIME)
+
+        if error is None:
+            status = "accepted"
+            message = "Batch accepted, %i jobs enqueued" % len(jobs)
+            http_code = 200
+        else:
+            status = "error"
+            message = "Batch partially accepted, %i of %i jobs enqueued. %s" \
+                % (len(jobs), len(parameter_list), error)
+            http_code = 400
+
+        return create_batch_response(
+            status=status,
+            user_id=self.user_id,
+            batch_id=self.batch_id,
+            message=message,
+            progress={"step": 0, "num_of_steps": len(jobs)},
+            summary={"accepted": len(jobs)},
+            jobs=[{"resource_id": job["resource_id"], "status": "accepted",
+                   "parameters": job["parameters"],
+                   "urls": {"status": job["status_url"], "resources": []}}
+                  for job in jobs],
+            accept_datetime=self.orig_datetime,
+            http_code=http_code)
+
+
+class BatchManager(ResourceManagerBase):
+    """This class answers the status requests of batches and requests the
+    termination of their jobs
+    """
+
+    def __init__(self):
+        ResourceManagerBase.__init__(self)
+        self.batch_interface = connect_batch_interface()
+
+    def _get_job_list(self, user_id, batch):
+        """Return the latest iterations and status documents of the jobs of a
+        batch, the status document is None if the resource does not exist
+        """
+        job_list = []
+        for job in batch["jobs"]:
+            iteration, response_data = \
+                self.resource_logger.get_latest_iteration(
+                    user_id, job["resource_id"])
+            if response_data is None:
+                job_list.append((iteration, None))
+            else:
+                job_list.append((iteration, pickle.loads(response_data)[1]))
+        return job_list
+
+    @swagger.doc({
+        'tags': ['Resource Management'],
+        'description': 'Get the aggregated status of a batch and the status '
+                       'and result URLs of its jobs. Minimum required user '
+                       'role: user.',
+        'parameters': [
+            {
+                'name': 'user_id',
+                'description': 'The unique user name/id',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            },
+            {
+                'name': 'batch_id',
+                'description': 'The id of the batch',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'The aggregated state of the batch',
+                'schema': BatchResponseModel
+            },
+            '400': {
+                'description': 'The error message if the batch does not exists',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def get(self, user_id, batch_id):
+        """Get the aggregated status of a batch."""
+
+        ret = self.check_permissions(user_id=user_id)
+        if ret:
+            return ret
+
+        batch = self.batch_interface.get(user_id, batch_id)
+        if batch is None:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error", message="Batch does not exist")), 400)
+
+        job_list = [response_model for _, response_model
+                    in self._get_job_list(user_id, batch)]
+        status, summary, progress = aggregate_batch_status(job_list)
+
+        jobs = []
+        for job, response_model in zip(batch["jobs"], job_list):
+            entry = {"resource_id": job["resource_id"],
+                     "parameters": job["parameters"],
+                     "urls": {"status": job["status_url"], "resources": []}}
+            if response_model is None:
+                entry["status"] = "error"
+                entry["message"] = "Resource does not exist"
+            else:
+                entry["status"] = response_model["status"]
+                entry["message"] = response_model["message"]
+                if response_model.get("progress"):
+                    entry["progress"] = response_model["progress"]
+                if response_model.get("urls"):
+                    entry["urls"] = response_model["urls"]
+            jobs.append(entry)
+
+        return create_batch_response(
+            status=status,
+            user_id=user_id,
+            batch_id=batch_id,
+            message="%i of %i jobs finished" % (progress["step"],
+                                                progress["num_of_steps"]),
+            progress=progress,
+            summary=summary,
+            jobs=jobs,
+            accept_datetime=batch["accept_datetime"])
+
+    @swagger.doc({
+        'tags': ['Resource Management'],
+        'description': 'Request the termination of all unfinished jobs of a '
+                       'batch. Minimum required user role: user.',
+        'parameters': [
+            {
+                'name': 'user_id',
+                'description': 'The unique user name/id',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            },
+            {
+                'name': 'batch_id',
+                'description': 'The id of the batch',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'Returned if the termination requests of the jobs '
+                               'were successfully committed.',
+                'schema': SimpleResponseModel
+            },
+            '400': {
+                'description': 'The error message if the batch does not exists',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def delete(self, user_id, batch_id):
+        """Request the termination of all unfinished jobs of a batch."""
+
+        ret = self.check_permissions(user_id=user_id)
+        if ret:
+            return ret
+
+        batch = self.batch_interface.get(user_id, batch_id)
+        if batch is None:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error", message="Batch does not exist")), 400)
+
+        count = 0
+        for job, (iteration, response_model) in zip(
+                batch["jobs"], self._get_job_list(user_id, batch)):
+            if response_model is not None \
+                    and response_model["status"] in ("accepted", "running"):
+                self.resource_logger.commit_termination(
+                    user_id, job["resource_id"], iteration)
+                count += 1
+
+        return make_response(jsonify(SimpleResponseModel(
+            status="accepted",
+            message="Termination request committed for %i jobs" % count)), 200)
@@ -35,8 +35,9 @@ from actinia_core.rest.ephemeral_processing import EphemeralProcessing
 from actinia_core.rest.persistent_processing import PersistentProcessing
 from actinia_core.rest.resource_base import ResourceBase
 from actinia_core.core.common.redis_interface import enqueue_job
-from actinia_core.core.common.process_object import Process
 from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.download_cache import DownloadCacheIndex, \
+    get_download_cache_quota
 from actinia_core.models.response_models import \
     StorageResponseModel, StorageModel, ProcessingResponseModel
 from actinia_core.core.common.api_logger import log_api_call
@@ -133,16 +134,12 @@ class DownloadCacheSize(EphemeralProcessing):
         if (os.path.exists(self.user_download_cache_path)
                 and os.path.isdir(self.user_download_cache_path)):
 
-            executable = "/usr/bin/du"
-            args = ["-sb", self.user_download_cache_path]
-
-            self._run_process(Process(exec_type="exec",
-                                      executable=executable,
-                                      id="compute_download_cache_size",
-                                      executable_params=args))
-            print("Disk usage ", self.module_output_log[0]["stdout"])
-            dc_size = int(self.module_output_log[0]["stdout"].split("\t")[0])
-            quota_size = int(self.config.DOWNLOAD_CACHE_QUOTA * 1024 * 1024 * 1024)
+            # Files that were moved into the download cache by process
+            # chains are registered first
+            index = DownloadCacheIndex(self.user_download_cache_path)
+            index.synchronize()
+            dc_size = index.size()
+            quota_size = get_download_cache_quota(self.config)
 
             model = StorageModel(
                 used=dc_size,
@@ -164,7 +161,8 @@ def start_download_cache_remove(*args):
 
 
 class DownloadCacheDelete(PersistentProcessing):
-    """Delete the whole download cache directory
+    """Delete the whole download cache directory, except the entries that
+    are used by running jobs
     """
 
     def __init__(self, *args):
@@ -179,15 +177,10 @@ class DownloadCacheDelete(PersistentProcessing):
 
         if (os.path.exists(self.user_download_cache_path)
                 and os.path.isdir(self.user_download_cache_path)):
-            executable = "/bin/rm"
-            args = ["-rf", self.user_download_cache_path]
-
-            self._run_process(Process(exec_type="exec",
-                                      executable=executable,
-                                      id="delete_download_cache_directory",
-                                      executable_params=args))
-
-            os.mkdir(self.user_download_cache_path)
+            # Remove all entries that are not used by running jobs
+            index = DownloadCacheIndex(self.user_download_cache_path)
+            index.synchronize()
+            index.evict(0)
             self.finish_message = "Download cache successfully removed."
         else:
             raise AsyncProcessError(
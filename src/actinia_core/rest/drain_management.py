@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Drain mode management of the node for rolling deployments
+"""
+
+from flask import jsonify, make_response
+from flask_restful_swagger_2 import swagger
+
+from actinia_core.core.common.config import global_config
+from actinia_core.core.health import is_draining, set_draining
+from actinia_core.models.response_models import SimpleResponseModel
+from actinia_core.rest.base_login import LoginBase
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def create_drain_response():
+    """Create the response with the current drain mode of the node"""
+    if is_draining(global_config) is True:
+        message = "The node is draining, new jobs are rejected"
+        status = "draining"
+    else:
+        message = "The node accepts new jobs"
+        status = "active"
+    return make_response(jsonify(SimpleResponseModel(
+        status=status, message=message)), 200)
+
+
+class DrainResource(LoginBase):
+    """Switch the drain mode of the node that answers the request
+    """
+
+    @swagger.doc({
+        'tags': ['Drain Management'],
+        'description': 'Get the drain mode of the node. '
+                       'Minimum required user role: admin.',
+        'responses': {
+            '200': {
+                'description': 'The drain mode of the node',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def get(self):
+        """Get the drain mode of the node"""
+        return create_drain_response()
+
+    @swagger.doc({
+        'tags': ['Drain Management'],
+        'description': 'Switch the node into drain mode. New jobs are '
+                       'rejected with 503 and the readiness check fails, '
+                       'while the running jobs are finished. '
+                       'Minimum required user role: admin.',
+        'responses': {
+            '200': {
+                'description': 'The drain mode of the node',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def post(self):
+        """Switch the node into drain mode"""
+        set_draining(global_config, True)
+        return create_drain_response()
+
+    @swagger.doc({
+        'tags': ['Drain Management'],
+        'description': 'Switch the drain mode of the node off, so that new '
+                       'jobs are accepted. '
+                       'Minimum required user role: admin.',
+        'responses': {
+            '200': {
+                'description': 'The drain mode of the node',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def delete(self):
+        """Switch the drain mode of the node off"""
+        set_draining(global_config, False)
+        return create_drain_response()
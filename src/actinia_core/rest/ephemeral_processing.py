@@ -33,19 +33,47 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import uuid
+from concurrent.futures import FIRST_COMPLETED, FIRST_EXCEPTION, \
+    ThreadPoolExecutor, wait
 
 from flask import jsonify, make_response, json
 from requests.auth import HTTPBasicAuth
 
+from actinia_core.core.common.process_graph import get_process_dependencies, \
+    has_process_dependencies, remove_finished_dependencies
 from actinia_core.core.common.process_object import Process
-from actinia_core.core.grass_init import GrassInitializer
+from actinia_core.core.geodata_download_importer import \
+    get_vsicurl_gdal_config
+from actinia_core.core.grass_init import GrassGisRC, GrassInitializer, \
+    GrassMapsetTemplate, get_module_path_index
+from actinia_core.core.grass_region import GrassRegion, GrassRegionError, \
+    get_region_file_path
 from actinia_core.core.messages_logger import MessageLogger
+from actinia_core.core.metrics import observe_job_finish, \
+    observe_job_start, observe_module_run
+from actinia_core.core.download_cache import SharedDownloadCache, \
+    get_download_cache_quota, update_download_cache_index
+from actinia_core.core.parallel_download import ParallelDownloader, \
+    PendingDownloads, DownloadCancelled
 from actinia_core.core.common.redis_interface import enqueue_job
 from actinia_core.core.redis_lock import RedisLockingInterface
+from actinia_core.core.redis_process_chain_cache import \
+    RedisProcessChainCacheInterface, create_process_chain_cache_key, \
+    create_process_chain_skeleton, restore_process_chain_skeleton, \
+    is_converter_unused
+from actinia_core.core.redis_stac_search_cache import \
+    RedisStacSearchCacheInterface
+from actinia_core.core.redis_url_check_cache import RedisUrlCheckCacheInterface
+from actinia_core.core.resource_usage import is_process_finished, \
+    reap_process
 from actinia_core.core.resources_logger import ResourceLogger
+from actinia_core.core.tiling import TILE_CORE_SUFFIX, get_tiles, \
+    get_tiling_settings, split_tiled_process_list, \
+    get_process_chain_outputs, get_tiled_raster_outputs
 from actinia_core.core.common.process_chain import ProcessChainConverter
 from actinia_core.core.common.exceptions \
     import AsyncProcessError, AsyncProcessTermination, RsyncError
@@ -55,7 +83,7 @@ from actinia_core.models.response_models \
 from actinia_core.models.response_models \
     import create_response_from_model, ProcessLogModel, ProgressInfoModel
 from actinia_core.core.interim_results import InterimResult, get_directory_size
-from actinia_core.rest.user_auth import check_location_mapset_module_access
+from actinia_core.rest.user_auth import UserPermissions
 from actinia_core.rest.resource_base import ResourceBase
 
 __license__ = "GPLv3"
@@ -215,7 +243,8 @@ class EphemeralProcessing(object):
     4. Set the GRASS GIS environmental variables to point to the new gisdbase,
        location and PERMANENT maspet
 
-    5. Create a new mapset with g.mapset in the temporary location directory
+    5. Create a new mapset from the location template in the temporary
+       location directory
 
        e.g: /tmp/soeren_temp_gisdbase/ECAD/MyMapset
 
@@ -363,6 +392,21 @@ class EphemeralProcessing(object):
         self.response_model_class = ProcessingResponseModel
         # The class that converts process chain definitions into
         self.proc_chain_converter = None
+        # The redis interface to cache converted process chains
+        self.process_chain_cache = None
+        # The redis interface to cache the checks of import URLs
+        self.url_check_cache = None
+        # The redis interface to cache STAC search results
+        self.stac_search_cache = None
+        # The downloads that run in the background while processing
+        self.pending_downloads = None
+        # The lock that protects the state that is shared by processes that
+        # run concurrently
+        self.process_lock = threading.Lock()
+        # The event that aborts all concurrently running processes
+        self.abort_event = threading.Event()
+        # The tiling settings if the process chain is executed tile-parallel
+        self.tiling = None
         # process lists that will be executed. This variable is
         # initiated in the setup method
         # The list of all process chains that were processed
@@ -663,15 +707,18 @@ class EphemeralProcessing(object):
 
         # Backward compatibility
         if process_chain is None:
-            process_list = self.proc_chain_converter.process_chain_to_process_list(
-                self.request_data)
-            self.process_chain_list.append(self.request_data)
-        else:
-            process_list = self.proc_chain_converter.process_chain_to_process_list(
-                process_chain)
-            self.process_chain_list.append(process_chain)
+            process_chain = self.request_data
+        process_chain, process_list = self._convert_process_chain(process_chain)
+        self.process_chain_list.append(process_chain)
+        # Check for tile-parallel execution
+        self.tiling = get_tiling_settings(process_chain)
+        if self.tiling is not None:
+            self.tiling["outputs"] = get_process_chain_outputs(process_chain)
         if pc_step is not None:
+            finished_ids = set(getattr(process, "id", None)
+                               for process in process_list[:pc_step])
             del process_list[:pc_step]
+            remove_finished_dependencies(process_list, finished_ids)
 
         # Check for the webhook
         if (hasattr(self.proc_chain_converter, 'webhook_finished')
@@ -695,6 +742,12 @@ class EphemeralProcessing(object):
                 "Process limit exceeded, a maximum of %i "
                 "processes are allowed in the process chain." % self.process_num_limit)
 
+        # The installed GRASS modules to reject unknown modules before
+        # the processing starts
+        module_path_index = get_module_path_index(self.config.GRASS_GIS_BASE,
+                                                  self.config.GRASS_ADDON_PATH)
+        check_access = self.user_permissions.check_location_mapset_module_access
+
         # Check if the module description was correct and if the
         # module or executable is in the user white list.
         for process in process_list:
@@ -703,17 +756,20 @@ class EphemeralProcessing(object):
             self._add_actinia_process(process)
 
             if process.exec_type == "grass" or process.exec_type == "exec":
+                if (process.exec_type == "grass"
+                        and module_path_index.is_available is True
+                        and module_path_index.has_module(
+                            process.executable) is False):
+                    raise AsyncProcessError(
+                        "GRASS module <%s> is not installed" % process.executable)
                 if skip_permission_check is False:
                     if process.skip_permission_check is False:
-                        resp = check_location_mapset_module_access(
-                            user_credentials=self.user_credentials,
-                            config=self.config,
-                            module_name=process.executable)
+                        resp = check_access(module_name=process.executable)
                         if resp is not None:
                             raise AsyncProcessError(
                                 "Module or executable <%s> is not supported"
                                 % process.executable)
-            else:
+            elif process.exec_type != "download":
                 message = (
                     "Wrong process description, type: %s "
                     "module/executable: %s, args: %s" % (
@@ -727,6 +783,60 @@ class EphemeralProcessing(object):
 
         return process_list
 
+    def _convert_process_chain(self, process_chain):
+        """Convert a process chain into a process list using the process chain
+        cache
+
+        If an identical process chain was converted for the same user,
+        location and permissions within PROCESS_CHAIN_CACHE_TTL seconds, the
+        cached
+        conversion result is used and the conversion including the URL and
+        webhook checks is skipped.
+
+        Args:
+            process_chain (dict): The process chain to be converted
+
+        Raises:
+            This function raises AsyncProcessError in case of an error.
+
+        Returns: tuple:
+            The converted process chain and the process list
+        """
+        key = None
+        if (self.process_chain_cache is not None
+                and is_converter_unused(self.proc_chain_converter) is True):
+            key = create_process_chain_cache_key(process_chain,
+                                                 self.user_credentials,
+                                                 self.user_id,
+                                                 self.location_name)
+
+        if key is not None:
+            try:
+                data = self.process_chain_cache.get(key)
+                if data is not None:
+                    self.message_logger.info(
+                        "Using cached process list of process chain %s" % key)
+                    return restore_process_chain_skeleton(
+                        self.proc_chain_converter, data, process_chain)
+            except Exception as e:
+                self.message_logger.warning(
+                    "Unable to read the process chain cache: %s" % str(e))
+
+        process_list = self.proc_chain_converter.process_chain_to_process_list(
+            process_chain)
+
+        if key is not None:
+            try:
+                skeleton = create_process_chain_skeleton(
+                    self.proc_chain_converter, process_chain, process_list)
+                self.process_chain_cache.set(
+                    key, skeleton, self.config.PROCESS_CHAIN_CACHE_TTL)
+            except Exception as e:
+                self.message_logger.warning(
+                    "Unable to cache the process chain: %s" % str(e))
+
+        return process_chain, process_list
+
     def _setup(self, init_grass=True):
         """Setup the logger, the mapset lock and the credentials. Create the
         temporary grass database and temporary file directories
@@ -782,9 +892,22 @@ class EphemeralProcessing(object):
 
         self.lock_interface = RedisLockingInterface()
         self.lock_interface.connect(**kwargs)
+
+        if self.config.PROCESS_CHAIN_CACHE_TTL > 0:
+            self.process_chain_cache = RedisProcessChainCacheInterface()
+            self.process_chain_cache.connect(**kwargs)
+        if self.config.URL_CHECK_CACHE_TTL > 0:
+            self.url_check_cache = RedisUrlCheckCacheInterface()
+            self.url_check_cache.connect(**kwargs)
+        if self.config.STAC_SEARCH_CACHE_TTL > 0:
+            self.stac_search_cache = RedisStacSearchCacheInterface()
+            self.stac_search_cache.connect(**kwargs)
         del kwargs
         self.process_time_limit = int(
             self.user_credentials["permissions"]["process_time_limit"])
+        # The user permissions compiled into lookup tables for this job
+        self.user_permissions = UserPermissions(
+            user_credentials=self.user_credentials, config=self.config)
 
         # Check and create all required paths to global, user and temporary locations
         if init_grass is True:
@@ -799,7 +922,9 @@ class EphemeralProcessing(object):
             resource_export_list=self.resource_export_list,
             output_parser_list=self.output_parser_list,
             message_logger=self.message_logger,
-            send_resource_update=self._send_resource_update)
+            send_resource_update=self._send_resource_update,
+            url_check_cache=self.url_check_cache,
+            stac_search_cache=self.stac_search_cache)
 
     def _setup_paths(self):
         """Helper method to setup the paths
@@ -968,6 +1093,7 @@ class EphemeralProcessing(object):
             mapsets (list): List of mapsets in location
             mapsets_to_link (list): List of mapsets paths to link
         """
+        check_access = self.user_permissions.check_location_mapset_module_access
         if os.path.isdir(location_path):
             if check_all_mapsets is True:
                 mapsets = os.listdir(location_path)
@@ -981,11 +1107,8 @@ class EphemeralProcessing(object):
                         if mapset not in mapsets_to_link and global_db is True:
                             # Link the mapset from the global database
                             # only if it can be accessed
-                            resp = check_location_mapset_module_access(
-                                    user_credentials=self.user_credentials,
-                                    config=self.config,
-                                    location_name=self.location_name,
-                                    mapset_name=mapset)
+                            resp = check_access(location_name=self.location_name,
+                                                mapset_name=mapset)
                             if resp is None:
                                 mapsets_to_link.append((mapset_path, mapset))
                         elif mapset not in mapsets_to_link and global_db is False:
@@ -1027,6 +1150,10 @@ class EphemeralProcessing(object):
 
         self.ginit.initialize()
 
+        # Cache the HTTP range requests of remote raster imports
+        for key, value in get_vsicurl_gdal_config(self.config).items():
+            os.environ.setdefault(key, value)
+
     def _create_temporary_mapset(self, temp_mapset_name, source_mapset_name=None,
                                  interim_result_mapset=None,
                                  interim_result_file_path=None):
@@ -1040,8 +1167,9 @@ class EphemeralProcessing(object):
         IMPORTANT: You need to call self._create_grass_environment() to set up
         the environment before calling this method.
 
-        A new temporary mapset is created. All in the process chain detected mapsets
-        of input maps or STDS will be added to the mapset search path using g.mapsets.
+        A new temporary mapset is created as a copy of the mapset template of the
+        location, no GRASS module is executed. All in the process chain detected
+        mapsets of input maps or STDS will be added to the mapset search path.
 
         Optionally the WIND file of a source mapset can be copied into the temporary
         mapset.
@@ -1058,8 +1186,8 @@ class EphemeralProcessing(object):
 
 
         Raises:
-            This function will raise an exception if the
-            g.mapset/g.mapsets/db.connect modules fail
+            This function will raise a GrassInitError if the mapset
+            can not be created from the location template
 
         """
         self.temp_mapset_path = os.path.join(self.temp_location_path, temp_mapset_name)
@@ -1084,21 +1212,19 @@ class EphemeralProcessing(object):
                     "Error while rsyncing of interim temporary file path to new "
                     "temporare file path")
 
-        self.ginit.run_module("g.mapset", ["-c", "mapset=%s" % temp_mapset_name])
+        # Create the mapset from the location template and switch into it,
+        # this replaces the g.mapset -c, g.mapsets and db.connect calls
+        mapset_template = GrassMapsetTemplate(
+            os.path.join(self.grass_temp_database, ".mapset_templates"))
+        mapset_template.create_mapset(location_path=self.temp_location_path,
+                                      mapset_name=temp_mapset_name,
+                                      search_path=self.required_mapsets)
+        self.ginit.switch_mapset(temp_mapset_name)
 
         if self.required_mapsets:
-            self.ginit.run_module("g.mapsets",
-                                  ["operation=add",
-                                   "mapset=%s" % (",".join(self.required_mapsets))])
-
             self.message_logger.info("Added the following mapsets to the mapset "
                                      "search path: " + ",".join(self.required_mapsets))
 
-        # Set the vector database connection to vector map specific databases
-        self.ginit.run_module("db.connect", [
-            "driver=sqlite",
-            "database=$GISDBASE/$LOCATION_NAME/$MAPSET/vector/$MAP/sqlite.db"])
-
         # self.ginit.run_module("g.gisenv", ["set=DEBUG=2",])
 
         # If a source mapset is provided, the WIND file will be copied from it to the
@@ -1129,6 +1255,9 @@ class EphemeralProcessing(object):
         Reset the current processing region to a meaningful state
         so that the user cell limit is not reached and the mapset can be accessed again.
 
+        The region file of the current mapset is read in-process, g.region -ug
+        is only executed if the region file can not be interpreted.
+
         Raises:
             This method will raise an AsyncProcessError exception
 
@@ -1136,6 +1265,37 @@ class EphemeralProcessing(object):
         if self.skip_region_check is True:
             return
 
+        try:
+            region_file = get_region_file_path(self.ginit.mapset_path)
+            grass_region = GrassRegion.read(region_file)
+            region = grass_region.as_dict()
+        except GrassRegionError as e:
+            self.message_logger.debug(
+                "Unable to read the region in-process: %s" % str(e))
+            region_file = None
+            grass_region = None
+            region = self._get_region_from_module()
+
+        self.message_logger.info(str(region))
+
+        num_cells = int(region["cells"])
+        ns_res = float(region["nsres"])
+        ew_res = float(region["ewres"])
+
+        if num_cells > self.cell_limit:
+            self._adjust_region_size(num_cells, ns_res, ew_res,
+                                     grass_region, region_file)
+
+    def _get_region_from_module(self):
+        """Helper method to get the current region with g.region -ug
+
+        Raises:
+            This method will raise an AsyncProcessError exception
+
+        Returns:
+            dict:
+            The region settings
+        """
         errorid, stdout_buff, stderr_buff = self.ginit.run_module("g.region", ["-ug"])
 
         if errorid != 0:
@@ -1147,23 +1307,20 @@ class EphemeralProcessing(object):
             if "=" in line:
                 option = line.split("=", 1)
                 region[option[0]] = option[1]
+        return region
 
-        self.message_logger.info(str(region))
-
-        num_cells = int(region["cells"])
-        ns_res = float(region["nsres"])
-        ew_res = float(region["ewres"])
-
-        if num_cells > self.cell_limit:
-            self._adjust_region_size(num_cells, ns_res, ew_res)
-
-    def _adjust_region_size(self, num_cells, ns_res, ew_res):
+    def _adjust_region_size(self, num_cells, ns_res, ew_res,
+                            grass_region=None, region_file=None):
         """Helper method to adjust the region size
 
         Args:
             num_cells (int): GRASS GIS number of cells of the region
             ns_res (float): GRASS GIS north-south cell resolution of the region
             ew_res (float): GRASS GIS east-west cell resolution of the region
+            grass_region (GrassRegion): The region that was read in-process,
+                                        if None g.region is used to adjust
+                                        the region
+            region_file (str): The region file to write the adjusted region to
 
         Raises:
             This method will raise an AsyncProcessError exception
@@ -1174,13 +1331,21 @@ class EphemeralProcessing(object):
         fak = math.sqrt(fak) + 2.0
         ns_res = ns_res * fak
         ew_res = ew_res * fak
-        errorid, stdout_buff, stderr_buff = self.ginit.run_module(
-                "g.region", ["nsres=%f" % ns_res, "ewres=%f" % ew_res, "-g"])
-        self.message_logger.info(stdout_buff)
-        if errorid != 0:
-            raise AsyncProcessError(
-                    "Unable to adjust the region settings to nsres: "
-                    "%f ewres: %f error: %s" % (ns_res, ew_res, stderr_buff))
+        if grass_region is not None:
+            try:
+                grass_region.set_resolution(ns_res, ew_res)
+                grass_region.write(region_file)
+                self.message_logger.info(str(grass_region.as_dict()))
+            except GrassRegionError:
+                grass_region = None
+        if grass_region is None:
+            errorid, stdout_buff, stderr_buff = self.ginit.run_module(
+                    "g.region", ["nsres=%f" % ns_res, "ewres=%f" % ew_res, "-g"])
+            self.message_logger.info(stdout_buff)
+            if errorid != 0:
+                raise AsyncProcessError(
+                        "Unable to adjust the region settings to nsres: "
+                        "%f ewres: %f error: %s" % (ns_res, ew_res, stderr_buff))
         raise AsyncProcessError(
             "Region too large, set a coarser resolution to minimum nsres: "
             "%f ewres: %f [num_cells: %d]" % (ns_res, ew_res, num_cells))
@@ -1191,8 +1356,9 @@ class EphemeralProcessing(object):
         Args:
             num (int): The number for which the progress should be increased
         """
-        self.progress_steps += num
-        self.progress["step"] = self.progress_steps
+        with self.process_lock:
+            self.progress_steps += num
+            self.progress["step"] = self.progress_steps
 
     def _add_actinia_process(self, process: Process):
         """Add an actinia process to the list and dictionary
@@ -1233,8 +1399,14 @@ class EphemeralProcessing(object):
         termination_check_count = 0
         update_check_count = 0
         while True:
-            if proc.poll() is not None:
+            # The finished process is not reaped, to read its resource usage
+            if is_process_finished(proc) is True:
                 break
+            elif self.abort_event.is_set():
+                # A concurrently running process of the process list failed
+                proc.kill()
+                raise AsyncProcessTermination("Process <%s> was aborted"
+                                              % module_name)
             else:
                 # Sleep some time and update the resource status
                 time.sleep(poll_time)
@@ -1308,6 +1480,151 @@ class EphemeralProcessing(object):
 
         return self._run_executable(process, poll_time)
 
+    def _start_downloads(self, process_list):
+        """Start download processes concurrently in the background
+
+        Args:
+            process_list (list): The download processes, the executable
+                                 parameters of each process are [target, url]
+                                 or [target, url, cache_path, key]
+
+        Raises:
+            AsyncProcessTermination:
+
+        """
+        if self.resource_logger.get_termination(
+                self.user_id, self.resource_id, self.iteration) is True:
+            raise AsyncProcessTermination("Download was terminated by "
+                                          "user request")
+
+        self._increment_progress(num=len(process_list))
+
+        if self.pending_downloads is None:
+            self.pending_downloads = PendingDownloads(ParallelDownloader(
+                max_connections=self.config.DOWNLOAD_MAX_CONNECTIONS,
+                max_connections_per_host=self.config.DOWNLOAD_MAX_CONNECTIONS_PER_HOST))
+        self.pending_downloads.start(process_list)
+
+    def _wait_for_downloads(self, futures, poll_time=0.5):
+        """Wait for running downloads and send the aggregate download progress
+        to the resource database.
+
+        Check each poll the termination status of the resource and the
+        process time limit.
+
+        Args:
+            futures (list): The futures of the downloads to wait for
+            poll_time (float): The time to check the download status and to
+                               send updates to the resource db
+
+        Raises:
+            AsyncProcessError:
+            AsyncProcessTermination:
+            AsyncProcessTimeLimit:
+
+        """
+        pending = self.pending_downloads
+        while True:
+            done, not_done = wait(futures, timeout=poll_time,
+                                  return_when=FIRST_EXCEPTION)
+            self._log_finished_downloads()
+            if not not_done or any(f.exception() for f in done):
+                break
+            if self.resource_logger.get_termination(
+                    self.user_id, self.resource_id, self.iteration) is True:
+                raise AsyncProcessTermination("Download was terminated by "
+                                              "user request")
+            if (time.time() - pending.start_time) > self.process_time_limit:
+                raise AsyncProcessTimeLimit(
+                    "Time (%i seconds) exceeded to download %i files"
+                    % (self.process_time_limit, len(pending.futures)))
+            self._send_resource_update(
+                pending.downloader.get_progress_message())
+
+        self._check_download_errors()
+
+    def _check_download_errors(self):
+        """Check the finished downloads for errors
+
+        Raises:
+            AsyncProcessError:
+
+        """
+        pending = self.pending_downloads
+        errors = []
+        for download, future in zip(pending.processes, pending.futures):
+            if future.done() and future.exception() is not None \
+                    and not isinstance(future.exception(), DownloadCancelled):
+                errors.append("<%s>: %s" % (download.executable_params[1],
+                                            str(future.exception())))
+        if errors:
+            raise AsyncProcessError(
+                "Error while downloading %s" % ", ".join(errors))
+
+    def _log_finished_downloads(self):
+        """Create the process log of the downloads that finished"""
+        run_time = time.time() - self.pending_downloads.start_time
+        for process, error in self.pending_downloads.get_finished():
+            plm = ProcessLogModel(
+                id=process.id,
+                executable=process.executable,
+                parameter=process.executable_params[:2],
+                return_code=0 if error is None else 1,
+                stdout="",
+                stderr=[] if error is None else [str(error)],
+                run_time=run_time)
+            with self.process_lock:
+                self.module_output_log.append(plm)
+                if process.id is not None:
+                    self.module_output_dict[process.id] = plm
+
+    def _finish_downloads(self):
+        """Wait for all running downloads and enforce the quota of the used
+        shared download caches
+
+        Raises:
+            AsyncProcessError:
+            AsyncProcessTermination:
+            AsyncProcessTimeLimit:
+
+        """
+        if self.pending_downloads is None:
+            return
+        self._wait_for_downloads(self.pending_downloads.get_required_futures())
+        downloader = self.pending_downloads.downloader
+        self._cancel_downloads()
+        for cache_path in downloader.cache_paths:
+            SharedDownloadCache(cache_path).evict(
+                get_download_cache_quota(self.config))
+
+    def _update_user_download_cache(self, process_list):
+        """Register the files that processes wrote into the user download
+        cache and enforce its quota
+
+        Args:
+            process_list (list): The executed process list
+
+        """
+        cache_path = os.path.join(self.config.DOWNLOAD_CACHE, self.user_id)
+        prefix = cache_path + os.sep
+        if not any(prefix in str(param) for process in process_list
+                   if process.exec_type in ("exec", "download")
+                   for param in process.executable_params):
+            return
+        try:
+            update_download_cache_index(self.config, cache_path)
+        except Exception as e:
+            self.message_logger.warning(
+                "Unable to update the download cache index: %s" % str(e))
+
+    def _cancel_downloads(self):
+        """Cancel all running downloads and wait for the download threads"""
+        if self.pending_downloads is None:
+            return
+        self.pending_downloads.downloader.cancel()
+        self.pending_downloads.downloader.shutdown()
+        self.pending_downloads = None
+
     def _run_module(self, process, poll_time=0.05):
         """Run the GRASS module actinia_core.core.common.process_object.Process) with its module
         options and send progress updates to the database server that manages
@@ -1348,11 +1665,13 @@ class EphemeralProcessing(object):
 
         """
         # Count the processes
-        self.process_count += 1
+        with self.process_lock:
+            self.process_count += 1
+            process_count = self.process_count
         # Check for each 20. process if a kill request was received
         # This is required in case a single of many fast running processes in a chain
         # is not able to trigger the termination check in the while loop
-        if self.process_count % 20 == 0:
+        if process_count % 20 == 0:
             if self.resource_logger.get_termination(
                     self.user_id, self.resource_id, self.iteration) is True:
                 raise AsyncProcessTermination("Process <%s> was terminated "
@@ -1378,7 +1697,8 @@ class EphemeralProcessing(object):
         the correct handling of stdout, stderr and stdin, creates the
         process log model and returns stdout, stderr and the return code.
 
-        It creates the temporary file paths.
+        It creates the temporary file paths. The process log model includes
+        the CPU times, the peak memory and the I/O bytes of the process.
 
         The returncode of 0 indicates that it ran successfully. A negative value -N
         indicates that the child was terminated by signal N (POSIX only; see also
@@ -1409,7 +1729,8 @@ class EphemeralProcessing(object):
         stdin_file = None
 
         if process.stdin_source is not None:
-            tmp_file = self.proc_chain_converter.generate_temp_file_path()
+            with self.process_lock:
+                tmp_file = self.proc_chain_converter.generate_temp_file_path()
             stdin_file = open(tmp_file, "w")
             stdin_file.write(process.stdin_source())
             stdin_file.close()
@@ -1425,7 +1746,8 @@ class EphemeralProcessing(object):
                                          process.executable_params, raw=True,
                                          stdout=stdout_buff,
                                          stderr=stderr_buff,
-                                         stdin=stdin_file)
+                                         stdin=stdin_file,
+                                         env=getattr(process, "env", None))
         else:
             inputlist = list()
             inputlist.append(process.executable)
@@ -1434,11 +1756,14 @@ class EphemeralProcessing(object):
             proc = subprocess.Popen(args=inputlist,
                                     stdout=stdout_buff,
                                     stderr=stderr_buff,
-                                    stdin=stdin_file)
+                                    stdin=stdin_file,
+                                    env=getattr(process, "env", None))
 
         run_time = self._wait_for_process(process.executable,
                                           process.executable_params,
                                           proc, poll_time)
+        resource_usage = reap_process(proc)
+        observe_module_run(process.executable, run_time)
 
         proc.wait()
 
@@ -1467,11 +1792,15 @@ class EphemeralProcessing(object):
             kwargs['mapset_size'] = get_directory_size(self.temp_mapset_path)
 
         plm = ProcessLogModel(**kwargs)
+        if resource_usage is not None:
+            plm['resource_usage'] = resource_usage
 
-        self.module_output_log.append(plm)
-        # Store the log in an additional dictionary for automated output generation
-        if process.id is not None:
-            self.module_output_dict[process.id] = plm
+        with self.process_lock:
+            self.module_output_log.append(plm)
+            # Store the log in an additional dictionary for automated output
+            # generation
+            if process.id is not None:
+                self.module_output_dict[process.id] = plm
 
         if proc.returncode != 0:
             raise AsyncProcessError(
@@ -1480,8 +1809,10 @@ class EphemeralProcessing(object):
         # save interim results
         if (self.interim_result.saving_interim_results is True
                 and self.temp_mapset_path is not None):
-            self.interim_result.save_interim_results(
-                self.progress_steps, self.temp_mapset_path, self.temp_file_path)
+            with self.process_lock:
+                self.interim_result.save_interim_results(
+                    self.progress_steps, self.temp_mapset_path,
+                    self.temp_file_path)
         elif self.temp_mapset_path is None:
             self.message_logger.debug(
                 "No temp mapset path set. Because of that no interim results"
@@ -1729,13 +2060,374 @@ class EphemeralProcessing(object):
             or AsyncProcessTermination
 
         """
+        tiled_process_list = []
+        if self.tiling is not None:
+            stdout_process_ids = [process_id for entry in self.output_parser_list
+                                  for process_id in entry]
+            process_list, tiled_process_list = split_tiled_process_list(
+                process_list, self.config.TILE_SAFE_MODULES, stdout_process_ids)
+            raster_names = get_tiled_raster_outputs(
+                tiled_process_list, self.tiling.get("outputs", {}))
+
+        try:
+            # The progress step of a resumed job is the number of finished
+            # processes, this requires the order of the process list
+            if has_process_dependencies(process_list) and \
+                    not self.interim_result.saving_interim_results:
+                self._execute_process_graph(process_list)
+            else:
+                for process in process_list:
+                    # Downloads run in the background, processes wait only
+                    # for the downloads they require
+                    if process.exec_type == "download":
+                        self._start_downloads([process])
+                        continue
+                    if self.pending_downloads is not None:
+                        self._wait_for_downloads(
+                            self.pending_downloads.get_required_futures(
+                                process))
+                    self._execute_process(process)
+            self._finish_downloads()
+        finally:
+            self._cancel_downloads()
+            self._update_user_download_cache(process_list)
+
+        if tiled_process_list:
+            self._execute_tiled_process_list(tiled_process_list, raster_names)
+
+    def _execute_tiled_process_list(self, process_list, raster_names):
+        """Run tile-safe modules tile-parallel
+
+        The current region is split into tiles that are extended by the
+        overlap. The process list is executed for each tile in a temporary
+        mapset that has the current mapset and the linked mapsets in its search
+        path, the tiles are processed concurrently. The raster outputs of the
+        processes are cropped to the tiles without overlap and patched into
+        the current mapset.
+
+        Args:
+            process_list: The tile-safe processes
+            raster_names (list): The raster outputs of the processes
+
+        Raises:
+            This method will raise an AsyncProcessError, AsyncProcessTimeLimit
+            or AsyncProcessTermination
+
+        """
+        # The cell limit applies to the whole region
+        self._check_reset_region()
+        try:
+            region = GrassRegion.read(
+                get_region_file_path(self.ginit.mapset_path))
+        except GrassRegionError as e:
+            raise AsyncProcessError(
+                "Unable to read the region for the tiling: %s" % str(e))
+
+        tiles = get_tiles(region, self.tiling["tile_size"],
+                          self.tiling["overlap"])
+        if len(tiles) * len(process_list) > self.process_num_limit:
+            raise AsyncProcessError(
+                "Process limit exceeded, the %i tiles of the region require "
+                "%i processes, a maximum of %i processes are allowed."
+                % (len(tiles), len(tiles) * len(process_list),
+                   self.process_num_limit))
+
+        location_path = os.path.dirname(self.ginit.mapset_path)
+        mapset_template = GrassMapsetTemplate(
+            os.path.join(self.grass_temp_database, ".mapset_templates"))
+        search_path = [self.ginit.mapset_name] + list(self.required_mapsets)
+        tile_mapsets = []
+        try:
+            tile_process_list = []
+            for count, (core, extended) in enumerate(tiles):
+                tile_mapset = "%s_tile_%i" % (self.ginit.mapset_name, count)
+                mapset_template.create_mapset(location_path=location_path,
+                                              mapset_name=tile_mapset,
+                                              search_path=search_path)
+                tile_mapsets.append(tile_mapset)
+                tile_process_list.extend(self._create_tile_process_list(
+                    process_list, tile_mapset, extended))
+            self._update_num_of_steps(len(tile_process_list) - len(process_list))
+            self._execute_process_graph(tile_process_list)
+
+            patch_process_list = self._create_tile_patch_process_list(
+                location_path, tile_mapsets, tiles, raster_names)
+            self._update_num_of_steps(len(patch_process_list))
+            self._execute_process_graph(patch_process_list)
+        finally:
+            for tile_mapset in tile_mapsets:
+                shutil.rmtree(os.path.join(location_path, tile_mapset),
+                              ignore_errors=True)
+                shutil.rmtree(os.path.join(self.temp_file_path, tile_mapset),
+                              ignore_errors=True)
+
+    def _create_tile_environment(self, tile_mapset):
+        """Create the environment of the processes that run in a tile mapset
+
+        Args:
+            tile_mapset (str): The name of the tile mapset
+
+        Returns:
+            dict:
+            The environment variables
+        """
+        gisrc_path = os.path.join(self.temp_file_path, tile_mapset)
+        os.makedirs(gisrc_path, exist_ok=True)
+        GrassGisRC(self.ginit.grass_data_base, self.ginit.location_name,
+                   tile_mapset).write(gisrc_path)
+
+        env = dict(os.environ)
+        env["GISRC"] = os.path.join(gisrc_path, "gisrc")
+        # The tile processes use the region of the tile mapset
+        env.pop("WIND_OVERRIDE", None)
+        env.pop("GRASS_REGION", None)
+        return env
+
+    def _create_tile_process_list(self, process_list, tile_mapset,
+                                  region_parameters):
+        """Create the processes that run the process list in a tile mapset
+
+        Args:
+            process_list (list): The tile-safe processes
+            tile_mapset (str): The name of the tile mapset
+            region_parameters (list): The g.region parameters of the tile
+
+        Returns:
+            list:
+            The processes of the tile
+        """
+        env = self._create_tile_environment(tile_mapset)
+        region_id = "%s_region" % tile_mapset
+        tile_process_list = [Process(exec_type="grass", executable="g.region",
+                                     executable_params=list(region_parameters),
+                                     id=region_id, skip_permission_check=True,
+                                     depends_on=[], env=env)]
+        process_ids = set(process.id for process in process_list)
         for process in process_list:
-            if process.exec_type == "grass":
-                self._run_module(process)
-            elif process.exec_type == "exec":
-                self._run_process(process)
-            elif process.exec_type == "python":
-                eval(process.executable)
+            if process.depends_on is None:
+                depends_on = [p.id for p in tile_process_list]
+            else:
+                depends_on = [region_id] + [
+                    "%s_%s" % (process_id, tile_mapset)
+                    for process_id in process.depends_on
+                    if process_id in process_ids]
+            tile_process_list.append(Process(
+                exec_type="grass", executable=process.executable,
+                executable_params=list(process.executable_params),
+                id="%s_%s" % (process.id, tile_mapset),
+                skip_permission_check=True, depends_on=depends_on, env=env))
+        return tile_process_list
+
+    def _create_tile_patch_process_list(self, location_path, tile_mapsets,
+                                        tiles, raster_names):
+        """Create the processes that crop the raster outputs of the tile
+        mapsets to the tiles without overlap and patch them into the current
+        mapset
+
+        Args:
+            location_path (str): The path of the location
+            tile_mapsets (list): The names of the tile mapsets
+            tiles (list): The (core, extended) g.region parameters of the tiles
+            raster_names (list): The raster outputs of the processes
+
+        Raises:
+            AsyncProcessError: If a raster output was not created
+
+        Returns:
+            list:
+            The crop and patch processes
+        """
+        for tile_mapset in tile_mapsets:
+            for name in raster_names:
+                if not os.path.isfile(os.path.join(
+                        location_path, tile_mapset, "cellhd", name)):
+                    raise AsyncProcessError(
+                        "The raster map <%s> was not created in the tile "
+                        "mapset <%s>" % (name, tile_mapset))
+
+        process_list = []
+        patch_inputs = dict((name, []) for name in raster_names)
+        for tile_mapset, (core, extended) in zip(tile_mapsets, tiles):
+            if core == extended:
+                for name in raster_names:
+                    patch_inputs[name].append("%s@%s" % (name, tile_mapset))
+                continue
+            env = self._create_tile_environment(tile_mapset)
+            region_id = "%s_core_region" % tile_mapset
+            process_list.append(Process(
+                exec_type="grass", executable="g.region",
+                executable_params=list(core), id=region_id,
+                skip_permission_check=True, depends_on=[], env=env))
+            for name in raster_names:
+                process_list.append(Process(
+                    exec_type="grass", executable="r.mapcalc",
+                    executable_params=["expression=%s%s = %s" % (
+                        name, TILE_CORE_SUFFIX, name)],
+                    id="crop_%s_%s" % (name, tile_mapset),
+                    skip_permission_check=True, depends_on=[region_id],
+                    env=env))
+                patch_inputs[name].append("%s%s@%s" % (
+                    name, TILE_CORE_SUFFIX, tile_mapset))
+
+        # The patches use the region of the current mapset
+        crop_ids = [process.id for process in process_list]
+        for name in raster_names:
+            process_list.append(Process(
+                exec_type="grass", executable="r.patch",
+                executable_params=["input=%s" % ",".join(patch_inputs[name]),
+                                   "output=%s" % name, "--o"],
+                id="patch_%s" % name, skip_permission_check=True,
+                depends_on=crop_ids))
+        return process_list
+
+    def _is_download_finished(self, process):
+        """Check if all downloads that a process requires are finished
+
+        Args:
+            process: The process
+
+        Returns:
+            bool:
+            True if the process can run
+        """
+        if self.pending_downloads is None:
+            return True
+        return all(future.done() for future in
+                   self.pending_downloads.get_required_futures(process))
+
+    def _execute_process_graph(self, process_list, poll_time=0.5):
+        """Run the modules or executables of the process list concurrently,
+        each process starts as soon as the processes it depends on and the
+        downloads it requires are finished
+
+        At most PROCESS_MAX_PARALLEL processes run at the same time. If a
+        process fails, all running processes are aborted. The first user
+        module after a g.region call runs exclusively, since it checks and
+        may reset the region. The process log is ordered like the process
+        list.
+
+        Args:
+            process_list: The process list that specifies the dependencies
+                          of its processes
+            poll_time (float): The time to check the download status
+
+        Raises:
+            This method will raise an AsyncProcessError, AsyncProcessTimeLimit
+            or AsyncProcessTermination
+
+        """
+        dependencies = get_process_dependencies(process_list)
+        downloads = [process for process in process_list
+                     if process.exec_type == "download"]
+        if downloads:
+            self._start_downloads(downloads)
+
+        max_parallel = max(1, self.config.PROCESS_MAX_PARALLEL)
+        waiting = sorted(dependencies)
+        running = {}
+        exclusive = None
+        finished = set()
+        log_start = len(self.module_output_log)
+        executor = ThreadPoolExecutor(max_workers=max_parallel)
+        try:
+            while waiting or running:
+                if self.pending_downloads is not None:
+                    self._log_finished_downloads()
+                    self._check_download_errors()
+                for index in list(waiting):
+                    if len(running) >= max_parallel or exclusive is not None:
+                        break
+                    process = process_list[index]
+                    if dependencies[index] <= finished and \
+                            self._is_download_finished(process):
+                        if self._is_region_check_required(process):
+                            if running:
+                                break
+                            exclusive = index
+                        waiting.remove(index)
+                        future = executor.submit(self._execute_process, process)
+                        running[future] = index
+
+                if not running:
+                    # All waiting processes wait for downloads
+                    ready = [index for index in waiting
+                             if dependencies[index] <= finished]
+                    self._wait_for_downloads(
+                        self.pending_downloads.get_required_futures(
+                            process_list[ready[0]]))
+                    continue
+
+                futures = list(running)
+                if self.pending_downloads is not None:
+                    futures.extend(future for future in
+                                   self.pending_downloads.futures
+                                   if not future.done())
+                done, _ = wait(futures, timeout=poll_time,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in running:
+                        index = running.pop(future)
+                        future.result()
+                        finished.add(index)
+                        if index == exclusive:
+                            exclusive = None
+        except Exception:
+            self.abort_event.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self.abort_event.clear()
+            self._sort_process_log(process_list, log_start)
+
+    def _is_region_check_required(self, process):
+        """Check if the region is checked before a process runs, see
+        _run_module()
+
+        Args:
+            process: The process
+
+        Returns:
+            bool:
+            True if the region is checked
+        """
+        return (process.exec_type == "grass"
+                and process.skip_permission_check is False
+                and self.last_module == "g.region")
+
+    def _sort_process_log(self, process_list, log_start=0):
+        """Sort the process log entries of concurrently executed processes
+        in the order of the process list
+
+        Args:
+            process_list: The executed process list
+            log_start (int): The index of the first log entry of the process
+                             list
+        """
+        positions = {}
+        for position, process in enumerate(process_list):
+            positions.setdefault(process.id, position)
+        with self.process_lock:
+            self.module_output_log[log_start:] = sorted(
+                self.module_output_log[log_start:],
+                key=lambda plm: positions.get(plm.get("id"), len(process_list)))
+
+    def _execute_process(self, process):
+        """Run a single module or executable of the process list
+
+        Args:
+            process: The process to run
+
+        Raises:
+            This method will raise an AsyncProcessError, AsyncProcessTimeLimit
+            or AsyncProcessTermination
+
+        """
+        if process.exec_type == "grass":
+            self._run_module(process)
+        elif process.exec_type == "exec":
+            self._run_process(process)
+        elif process.exec_type == "python":
+            eval(process.executable)
 
     def _final_cleanup(self):
         """Overwrite this function in subclasses to perform the final cleanup,
@@ -1761,6 +2453,8 @@ class EphemeralProcessing(object):
             message = [e.__class__, e_type, e_value, traceback.format_tb(e_traceback)]
             message = pprint.pformat(message)
         """
+        start_time = time.time()
+        observe_job_start(self.api_info, self.orig_time)
 
         try:
             # Run the _execute function that does all the work
@@ -1798,13 +2492,17 @@ class EphemeralProcessing(object):
                                                 type=str(e_type))
                 self.run_state = {"error": str(e), "exception": model}
             # After all processing finished, send the final status
+            status = "error"
             if "success" in self.run_state:
+                status = "finished"
                 self._send_resource_finished(message=self.finish_message,
                                              results=self.module_results)
             elif "terminated" in self.run_state:
+                status = "terminated"
                 # Send an error message if an exception was raised
                 self._send_resource_terminated(message=self.run_state["terminated"])
             elif "time limit exceeded" in self.run_state:
+                status = "timeout"
                 self._send_resource_time_limit_exceeded(
                     message=self.run_state["time limit exceeded"])
             elif "error" in self.run_state:
@@ -1814,3 +2512,4 @@ class EphemeralProcessing(object):
                     exception=self.run_state["exception"])
             else:
                 self._send_resource_error(message="Unknown error")
+            observe_job_finish(self.api_info, status, start_time)
@@ -27,6 +27,7 @@ with export of required map layers.
 """
 import pickle
 import os
+import time
 from flask import jsonify, make_response
 
 from copy import deepcopy
@@ -37,9 +38,9 @@ from actinia_core.core.common.redis_interface import enqueue_job
 from actinia_core.core.common.process_object import Process
 from actinia_core.core.common.process_chain import ProcessChainModel
 from actinia_core.core.common.exceptions import AsyncProcessTermination
+from actinia_core.core.metrics import observe_export
 from actinia_core.models.response_models import \
     ProcessingResponseModel, ProcessingErrorResponseModel
-from actinia_core.core.stac_exporter_interface import STACExporter
 
 __license__ = "GPLv3"
 __author__ = "Sören Gebbert"
@@ -528,6 +529,7 @@ class EphemeralProcessingWithExport(EphemeralProcessing):
 
                 output_type = resource["export"]["type"]
                 output_path = None
+                export_start = time.time()
 
                 # Legacy code
                 if "name" in resource:
@@ -587,11 +589,21 @@ class EphemeralProcessingWithExport(EphemeralProcessing):
                 # Store the temporary file in the resource storage
                 # and receive the resource URL
                 if output_path is not None:
+                    output_size = 0
+                    if os.path.isfile(output_path):
+                        output_size = os.path.getsize(output_path)
                     resource_url = self.storage_interface.store_resource(output_path)
                     self.resource_url_list.append(resource_url)
+                    observe_export(output_type, output_size,
+                                   time.time() - export_start)
 
                     if "metadata" in resource:
                         if resource["metadata"]["format"] == "STAC":
+                            # pystac, rasterio and numpy are imported on first
+                            # use to speed up the server start
+                            from actinia_core.core.stac_exporter_interface \
+                                import STACExporter
+
                             stac = STACExporter()
 
                             stac_catalog = stac.stac_builder(resource_url, file_name,
@@ -737,40 +737,40 @@ class PersistentProcessing(EphemeralProcessing):
                 if os.path.isdir(interim_dir):
                     shutil.rmtree(interim_dir)
 
-    def _execute_process_list(self, process_list):
-        """Extend the mapset lock and execute the provided process list
+    def _extend_mapset_locks(self):
+        """Extend the target and temporary mapset locks by the maximum
+        processing time * 2
+
+        Raises:
+            This method will raise an AsyncProcessError
+        """
+        if self.target_mapset_lock_set is True:
+            ret = self.lock_interface.extend(resource_id=self.target_mapset_lock_id,
+                                             expiration=self.process_time_limit * 2)
+            if ret == 0:
+                raise AsyncProcessError(
+                    "Unable to extend lock for mapset <%s>"
+                    % self.target_mapset_name)
+
+        if self.temp_mapset_lock_set is True:
+            ret = self.lock_interface.extend(resource_id=self.temp_mapset_lock_id,
+                                             expiration=self.process_time_limit * 2)
+            if ret == 0:
+                raise AsyncProcessError(
+                    "Unable to extend lock for "
+                    "temporary mapset <%s>" % self.temp_mapset_name)
+
+    def _execute_process(self, process):
+        """Extend the mapset lock and execute the provided process
 
         Args:
-            process_list: The process list to execute
+            process: The process to execute
 
         Raises:
             This method will raise an AsyncProcessError or AsyncProcessTermination
         """
-        for process in process_list:
-            # Extent the lock for each process by max processing time * 2
-            if self.target_mapset_lock_set is True:
-                ret = self.lock_interface.extend(resource_id=self.target_mapset_lock_id,
-                                                 expiration=self.process_time_limit * 2)
-                if ret == 0:
-                    raise AsyncProcessError(
-                        "Unable to extend lock for mapset <%s>"
-                        % self.target_mapset_name)
-
-            if self.temp_mapset_lock_set is True:
-                # Extent the lock for each process by max processing time * 2
-                ret = self.lock_interface.extend(resource_id=self.temp_mapset_lock_id,
-                                                 expiration=self.process_time_limit * 2)
-                if ret == 0:
-                    raise AsyncProcessError(
-                        "Unable to extend lock for "
-                        "temporary mapset <%s>" % self.temp_mapset_name)
-
-            if process.exec_type == "grass":
-                self._run_module(process)
-            elif process.exec_type == "exec":
-                self._run_process(process)
-            elif process.exec_type == "python":
-                eval(process.executable)
+        self._extend_mapset_locks()
+        EphemeralProcessing._execute_process(self, process)
 
     def _execute(self, skip_permission_check=False):
         """Overwrite this function in subclasses
@@ -24,8 +24,6 @@
 """
 Process Chain Monitoring
 """
-import matplotlib.pyplot as plt
-import numpy as np
 import os
 import pickle
 from tempfile import NamedTemporaryFile
@@ -34,8 +32,10 @@ from flask_restful_swagger_2 import swagger
 from actinia_api.swagger2.actinia_core.schemas.process_chain_monitoring import \
      MapsetSizeResponseModel, MaxMapsetSizeResponseModel
 
+from actinia_core.core.resource_usage import aggregate_resource_usage
 from actinia_core.rest.resource_management import ResourceManager
-from actinia_core.models.response_models import SimpleResponseModel
+from actinia_core.models.response_models import SimpleResponseModel, \
+    ResourceUsageResponseModel
 
 __license__ = "GPLv3"
 __author__ = "Anika Weinmann, Carmen Tawalika"
@@ -44,6 +44,10 @@ __maintainer__ = "mundialis"
 
 
 def create_scatter_plot(x, y, xlabel, ylabel, title):
+    # matplotlib and numpy are imported on first use to speed up the server
+    # start
+    import matplotlib.pyplot as plt
+    import numpy as np
 
     plt.clf()
     plt.scatter(x, y, s=(np.pi * 5), c=(1, 0, 0))
@@ -138,6 +142,87 @@ class MapsetSizeResource(ResourceManager):
                 message="Resource does not exist")), 400)
 
 
+class ResourceUsageResource(ResourceManager):
+    """
+    This class returns the CPU times, the peak memory and the I/O bytes of
+    the processes of a resource
+    """
+    def __init__(self):
+
+        # Configuration
+        ResourceManager.__init__(self)
+
+    @swagger.doc({
+        'tags': ['Process Chain Monitoring'],
+        'description': 'Get the CPU times, the peak memory and the I/O bytes '
+                       'of each process of a resource and of the whole '
+                       'resource. Minimum required user role: user.',
+        'parameters': [
+            {
+                'name': 'user_id',
+                'description': 'The unique user name/id',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            },
+            {
+                'name': 'resource_id',
+                'description': 'The id of the resource',
+                'required': True,
+                'in': 'path',
+                'type': 'string'
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'The resource usage of the processes',
+                'schema': ResourceUsageResponseModel
+            },
+            '400': {
+                'description': 'The error message if the resource does not exist',
+                'schema': SimpleResponseModel
+            }
+        }
+    })
+    def get(self, user_id, resource_id):
+        """Get the resource usage of the processes of a resource."""
+
+        ret = self.check_permissions(user_id=user_id)
+        if ret:
+            return ret
+
+        response_data = self.resource_logger.get(user_id, resource_id)
+
+        if response_data is not None:
+            http_code, pc_response_model = pickle.loads(response_data)
+
+            pc_status = pc_response_model['status']
+            if pc_status in ['accepted', 'running']:
+                return make_response(jsonify(SimpleResponseModel(
+                    status="error",
+                    message="Resource is not ready it is %s" % pc_status)),
+                    400)
+
+            process_log = pc_response_model.get('process_log') or []
+            process_resource_usage = [
+                {key: proc[key] for key in
+                 ('id', 'executable', 'run_time', 'resource_usage')
+                 if key in proc}
+                for proc in process_log]
+
+            response_model = ResourceUsageResponseModel(
+                status="success",
+                process_resource_usage=process_resource_usage)
+            resource_usage = aggregate_resource_usage(process_log)
+            if resource_usage is not None:
+                response_model['resource_usage'] = resource_usage
+            return make_response(jsonify(response_model), http_code)
+        else:
+            return make_response(jsonify(SimpleResponseModel(
+                status="error",
+                message="Resource does not exist")), 400)
+
+
 class MapsetSizeDiffResource(ResourceManager):
     """
     This class returns the step-by-step mapset size differences of a resource
@@ -342,6 +427,7 @@ class MapsetSizeRenderResource(ResourceManager):
             mapset_sizes = [
                 proc['mapset_size'] for proc in pc_response_model['process_log']]
 
+            import numpy as np
             y = np.array(mapset_sizes)
             x = np.array(list(range(1, len(mapset_sizes) + 1)))
             unit = "bytes"
@@ -432,6 +518,7 @@ class MapsetSizeDiffRenderResource(ResourceManager):
                 proc['mapset_size'] for proc in pc_response_model['process_log']]
             diffs = compute_mapset_size_diffs(mapset_sizes)
 
+            import numpy as np
             y = np.array(diffs)
             x = np.array(list(range(1, len(mapset_sizes) + 1)))
             unit = "bytes"
@@ -38,7 +38,9 @@ from actinia_core.rest.ephemeral_processing import EphemeralProcessing
 from actinia_core.rest.persistent_processing import PersistentProcessing
 from actinia_core.rest.map_layer_base import MapLayerRegionResourceBase
 from actinia_core.core.common.redis_interface import enqueue_job
+from actinia_core.core.common.config import global_config
 from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.download_cache import register_download_cache_entry
 from actinia_core.core.utils import allowed_file
 from actinia_core.models.response_models import \
     ProcessingResponseModel, ProcessingErrorResponseModel
@@ -269,6 +271,11 @@ class RasterLayerResource(MapLayerRegionResourceBase):
                               mapset_name=mapset_name,
                               map_name=raster_name)
         if rdc:
+            # Protect the uploaded file from eviction until the job finished
+            register_download_cache_entry(
+                global_config, self.download_cache,
+                os.path.relpath(file_path, self.download_cache).split(os.sep)[0],
+                self.resource_id, self.job_timeout)
             rdc.set_request_data(file_path)
             enqueue_job(self.job_timeout, start_create_job, rdc)
 
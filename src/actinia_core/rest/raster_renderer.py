@@ -28,9 +28,14 @@ Raster map renderer
 from flask_restful_swagger_2 import swagger
 from tempfile import NamedTemporaryFile
 import os
-from flask import jsonify, make_response, Response
+import pickle
+from flask import jsonify, make_response
 from .ephemeral_processing import EphemeralProcessing
+from actinia_core.core.common.config import global_config
 from actinia_core.core.common.redis_interface import enqueue_job
+from actinia_core.core.in_process_renderer import RenderNotSupported, \
+    get_render_executor, render_raster
+from actinia_core.core.tile_cache import find_raster_map
 from .renderer_base import RendererBaseResource, EphemeralRendererBase
 from actinia_core.models.response_models import ProcessingErrorResponseModel
 
@@ -45,6 +50,46 @@ class SyncEphemeralRasterRendererResource(RendererBaseResource):
     """Render a raster image with g.region/d.rast approach synchronously
     """
 
+    def _render_in_process(self, location_name, mapset_name, raster_name,
+                           options):
+        """Render a raster map in the thread pool of the in-process renderer
+
+        Args:
+            location_name (str): The name of the location
+            mapset_name (str): The name of the mapset
+            raster_name (str): The name of the raster map
+            options (dict): The render options
+
+        Returns:
+            bytes:
+            The PNG image or None if the raster map must be rendered by a
+            d.rast job
+
+        """
+        if "@" in raster_name:
+            return None
+        _, mapset_path = find_raster_map(global_config, self.user_group,
+                                         location_name, mapset_name,
+                                         raster_name)
+        if mapset_path is None:
+            return None
+        executor = get_render_executor(global_config.RENDER_IN_PROCESS_THREADS)
+        future = executor.submit(render_raster, mapset_path, raster_name,
+                                 options,
+                                 global_config.RENDER_IN_PROCESS_MAX_PIXELS)
+        try:
+            return future.result()
+        except RenderNotSupported as e:
+            self.message_logger.info("Raster map <%s> is rendered by d.rast: %s"
+                                     % (raster_name, str(e)))
+            return None
+        except Exception as e:
+            # Read, memory and encoding errors of GDAL and NumPy
+            self.message_logger.warning("In-process rendering of raster map "
+                                        "<%s> failed, it is rendered by "
+                                        "d.rast: %s" % (raster_name, str(e)))
+            return None
+
     @swagger.doc({
         'tags': ['Raster Management'],
         'description': 'Render a raster map layer as a PNG image. '
@@ -147,10 +192,26 @@ class SyncEphemeralRasterRendererResource(RendererBaseResource):
         if isinstance(options, dict) is False:
             return options
 
+        key = self.get_render_cache_key(
+            "raster", location_name, mapset_name,
+            [("raster", raster_name)], options)
+        response = self.get_cached_image_response(key)
+        if response is not None:
+            return response
+
+        if global_config.RENDER_IN_PROCESS is True:
+            image = self._render_in_process(location_name, mapset_name,
+                                            raster_name, options)
+            if image is not None:
+                return self.create_rendered_image_response(image, key)
+
         rdc = self.preprocess(has_json=False, has_xml=False,
                               location_name=location_name,
                               mapset_name=mapset_name,
                               map_name=raster_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
 
         rdc.set_user_data(options)
 
@@ -162,9 +223,8 @@ class SyncEphemeralRasterRendererResource(RendererBaseResource):
             # Open the image file, read it and then delete it
             if result_file:
                 if os.path.isfile(result_file):
-                    image = open(result_file, "rb").read()
-                    os.remove(result_file)
-                    return Response(image, mimetype='image/png')
+                    return self.create_result_image_response(
+                        result_file, key)
         return make_response(jsonify(response_model), http_code)
 
 
@@ -390,9 +450,20 @@ class SyncEphemeralRasterRGBRendererResource(RendererBaseResource):
         if isinstance(rgb_options, dict) is False:
             return rgb_options
 
+        key = self.get_render_cache_key(
+            "rgb", location_name, mapset_name,
+            [("raster", rgb_options[color])
+             for color in ["red", "green", "blue"]], rgb_options)
+        response = self.get_cached_image_response(key)
+        if response is not None:
+            return response
+
         rdc = self.preprocess(has_json=False, has_xml=False,
                               location_name=location_name,
                               mapset_name=mapset_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
 
         rdc.set_user_data(rgb_options)
 
@@ -404,9 +475,8 @@ class SyncEphemeralRasterRGBRendererResource(RendererBaseResource):
             # Open the image file, read it and then delete it
             if result_file:
                 if os.path.isfile(result_file):
-                    image = open(result_file, "rb").read()
-                    os.remove(result_file)
-                    return Response(image, mimetype='image/png')
+                    return self.create_result_image_response(
+                        result_file, key)
         return make_response(jsonify(response_model), http_code)
 
 
@@ -618,9 +688,20 @@ class SyncEphemeralRasterShapeRendererResource(RendererBaseResource):
         if isinstance(options, dict) is False:
             return options
 
+        key = self.get_render_cache_key(
+            "shade", location_name, mapset_name,
+            [("raster", options["shade"]), ("raster", options["color"])],
+            options)
+        response = self.get_cached_image_response(key)
+        if response is not None:
+            return response
+
         rdc = self.preprocess(has_json=False, has_xml=False,
                               location_name=location_name,
                               mapset_name=mapset_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
 
         rdc.set_user_data(options)
 
@@ -632,9 +713,8 @@ class SyncEphemeralRasterShapeRendererResource(RendererBaseResource):
             # Open the image file, read it and then delete it
             if result_file:
                 if os.path.isfile(result_file):
-                    image = open(result_file, "rb").read()
-                    os.remove(result_file)
-                    return Response(image, mimetype='image/png')
+                    return self.create_result_image_response(
+                        result_file, key)
         return make_response(jsonify(response_model), http_code)
 
 
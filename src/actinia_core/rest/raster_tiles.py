@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Raster map tile renderer with a disk cache
+"""
+import os
+import pickle
+from flask import jsonify, make_response, Response
+from flask_restful_swagger_2 import swagger
+
+from actinia_core.core.common.config import global_config
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.common.redis_interface import enqueue_job
+from actinia_core.core.tile_cache import TILE_SIZE, check_tile_index, \
+    find_raster_map, get_raster_cache_key, get_raster_tile_cache_path, \
+    get_seed_tiles, get_tile_file, get_tile_region, read_raster_header, \
+    remove_outdated_tiles
+from actinia_core.models.response_models import \
+    ProcessingErrorResponseModel, ProcessingResponseModel
+from .renderer_base import RendererBaseResource, EphemeralRendererBase
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+MAP_PARAMETERS = [
+    {
+        'name': 'location_name',
+        'description': 'The location name',
+        'required': True,
+        'in': 'path',
+        'type': 'string',
+        'default': 'nc_spm_08'
+    },
+    {
+        'name': 'mapset_name',
+        'description': 'The name of the mapset that contains the '
+                       'required raster map layer',
+        'required': True,
+        'in': 'path',
+        'type': 'string',
+        'default': 'PERMANENT'
+    },
+    {
+        'name': 'raster_name',
+        'description': 'The name of the raster map layer to render',
+        'required': True,
+        'in': 'path',
+        'type': 'string',
+        'default': 'elevation'
+    }
+]
+TILE_PARAMETERS = [
+    {
+        'name': name,
+        'description': description,
+        'required': True,
+        'in': 'path',
+        'type': 'integer',
+        'default': 0
+    } for name, description in [
+        ('z', 'The zoom level, the tile of zoom level 0 covers the square '
+              'around the extent of the raster map layer'),
+        ('x', 'The column of the tile from west to east'),
+        ('y', 'The row of the tile from north to south')]
+]
+
+
+class RasterTileResourceBase(RendererBaseResource):
+    """Base class of the raster map tile resources
+    """
+
+    def _create_tiles(self, location_name, mapset_name, raster_name, tiles):
+        """Create the definitions of the tiles of a raster map
+
+        Args:
+            location_name (str): The name of the location
+            mapset_name (str): The name of the mapset
+            raster_name (str): The name of the raster map
+            tiles (list): The (z, x, y) tuples of the tiles
+
+        Returns:
+            dict:
+            The render options with the cache directory, the cache key and
+            the tile definitions or an error response
+        """
+        if "@" in raster_name:
+            return self.get_error_response(
+                message="Mapset name is not allowed in layer names")
+
+        database, mapset_path = find_raster_map(
+            global_config, self.user_group, location_name, mapset_name,
+            raster_name)
+        if mapset_path is None:
+            return self.get_error_response(
+                message="Raster map <%s> does not exist in mapset <%s>"
+                        % (raster_name, mapset_name), http_code=404)
+        try:
+            extent = read_raster_header(mapset_path, raster_name)
+        except AsyncProcessError as e:
+            return self.get_error_response(message=str(e))
+
+        cache_path = get_raster_tile_cache_path(
+            global_config, database, location_name, mapset_name, raster_name,
+            self.user_group)
+        key = get_raster_cache_key(mapset_path, raster_name)
+        return {"cache_path": cache_path,
+                "key": key,
+                "tiles": [{"z": z, "x": x, "y": y,
+                           "region": get_tile_region(extent, z, x, y),
+                           "file": get_tile_file(cache_path, key, z, x, y)}
+                          for z, x, y in tiles]}
+
+
+class SyncEphemeralRasterTileResource(RasterTileResourceBase):
+    """Render a tile of a raster map, tiles are served from the tile cache
+    without processing if they were rendered before
+    """
+
+    @swagger.doc({
+        'tags': ['Raster Management'],
+        'description': 'Render a tile of a raster map layer as 256x256 PNG '
+                       'image. The tiles use a tile grid in the coordinate '
+                       'reference system of the location. Rendered tiles '
+                       'are cached until the raster map layer or its color '
+                       'table is modified. '
+                       'Minimum required user role: user.',
+        'parameters': MAP_PARAMETERS + TILE_PARAMETERS,
+        'produces': ["image/png"],
+        'responses': {
+            '200': {
+                'description': 'The PNG image'},
+            '400': {
+                'description': 'The error message and a detailed log why '
+                               'rendering did not succeeded',
+                'schema': ProcessingErrorResponseModel
+            },
+            '404': {
+                'description': 'The raster map layer does not exist',
+                'schema': ProcessingErrorResponseModel
+            }
+        }
+    })
+    def get(self, location_name, mapset_name, raster_name, z, x, y):
+        """Render a tile of a raster map layer as PNG image.
+        """
+        try:
+            check_tile_index(z, x, y, global_config.TILE_CACHE_MAX_ZOOM)
+        except AsyncProcessError as e:
+            return self.get_error_response(message=str(e), http_code=404)
+
+        options = self._create_tiles(location_name, mapset_name, raster_name,
+                                     [(z, x, y)])
+        if isinstance(options, dict) is False:
+            return options
+
+        # Serve the cached tile directly
+        tile_file = options["tiles"][0]["file"]
+        if os.path.isfile(tile_file):
+            try:
+                with open(tile_file, "rb") as tile:
+                    return Response(tile.read(), mimetype='image/png')
+            except OSError:
+                # The tile was removed in between, render it again
+                pass
+
+        rdc = self.preprocess(has_json=False, has_xml=False,
+                              location_name=location_name,
+                              mapset_name=mapset_name,
+                              map_name=raster_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
+
+        rdc.set_user_data(options)
+        enqueue_job(self.job_timeout, start_job, rdc)
+
+        http_code, response_model = self.wait_until_finish(0.05)
+        if http_code == 200 and os.path.isfile(tile_file):
+            with open(tile_file, "rb") as tile:
+                return Response(tile.read(), mimetype='image/png')
+        return make_response(jsonify(response_model), http_code)
+
+
+class AsyncEphemeralRasterTileSeedResource(RasterTileResourceBase):
+    """Render all tiles of a zoom range of a raster map into the tile cache
+    """
+
+    @swagger.doc({
+        'tags': ['Raster Management'],
+        'description': 'Render all tiles of a zoom range of a raster map '
+                       'layer into the tile cache as background job. Tiles '
+                       'that are already cached are skipped. '
+                       'Minimum required user role: user.',
+        'consumes': ['application/json'],
+        'parameters': MAP_PARAMETERS + [
+            {
+                'name': 'zoom_range',
+                'description': 'The zoom range {"min_zoom": 0, '
+                               '"max_zoom": 5} of the tiles to render',
+                'required': True,
+                'in': 'body',
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'min_zoom': {'type': 'integer', 'default': 0},
+                        'max_zoom': {'type': 'integer'}
+                    },
+                    'required': ['max_zoom']
+                }
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'The response including the status URL of '
+                               'the seeding job',
+                'schema': ProcessingResponseModel
+            },
+            '400': {
+                'description': 'The error message why the seeding job was '
+                               'rejected',
+                'schema': ProcessingErrorResponseModel
+            }
+        }
+    })
+    def post(self, location_name, mapset_name, raster_name):
+        """Render all tiles of a zoom range of a raster map layer into the
+        tile cache.
+        """
+        rdc = self.preprocess(has_json=True, has_xml=False,
+                              location_name=location_name,
+                              mapset_name=mapset_name,
+                              map_name=raster_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
+
+        try:
+            if not isinstance(self.request_data, dict) \
+                    or "max_zoom" not in self.request_data:
+                raise AsyncProcessError("The maximum zoom level is missing")
+            min_zoom = int(self.request_data.get("min_zoom", 0))
+            max_zoom = int(self.request_data["max_zoom"])
+            if max_zoom > global_config.TILE_CACHE_MAX_ZOOM:
+                raise AsyncProcessError(
+                    "The zoom level must be between 0 and %i"
+                    % global_config.TILE_CACHE_MAX_ZOOM)
+            tiles = get_seed_tiles(min_zoom, max_zoom,
+                                   global_config.TILE_CACHE_MAX_SEED_TILES)
+        except (TypeError, ValueError):
+            return self.get_error_response(
+                message="The zoom levels must be integers")
+        except AsyncProcessError as e:
+            return self.get_error_response(message=str(e))
+
+        options = self._create_tiles(location_name, mapset_name, raster_name,
+                                     tiles)
+        if isinstance(options, dict) is False:
+            return options
+
+        rdc.set_user_data(options)
+        enqueue_job(self.job_timeout, start_job, rdc)
+        http_code, response_model = pickle.loads(self.response_data)
+        return make_response(jsonify(response_model), http_code)
+
+
+def start_job(*args):
+    processing = EphemeralRasterTileRenderer(*args)
+    processing.run()
+
+
+class EphemeralRasterTileRenderer(EphemeralRendererBase):
+    """Render raster map tiles into the tile cache
+    """
+
+    def __init__(self, *args):
+        EphemeralRendererBase.__init__(self, *args)
+
+    def _render_tile(self, raster, tile):
+        """Render a single tile and publish it atomically in the tile cache
+
+        Args:
+            raster (str): The raster map with mapset
+            tile (dict): The tile definition
+
+        """
+        os.makedirs(os.path.dirname(tile["file"]), exist_ok=True)
+        tmp_file = "%s.%s.png" % (tile["file"], self.unique_id)
+        north, south, east, west = tile["region"]
+        name = "%i_%i_%i" % (tile["z"], tile["x"], tile["y"])
+
+        process_list = [
+            Process(exec_type="grass", executable="g.region",
+                    executable_params=["n=%.15g" % north, "s=%.15g" % south,
+                                       "e=%.15g" % east, "w=%.15g" % west,
+                                       "rows=%i" % TILE_SIZE,
+                                       "cols=%i" % TILE_SIZE],
+                    id="tile_region_" + name, skip_permission_check=True),
+            Process(exec_type="grass", executable="d.rast",
+                    executable_params=["map=" + raster, "-n"],
+                    id="render_tile_" + name, skip_permission_check=True,
+                    env=self._create_render_environment(
+                        tmp_file, TILE_SIZE, TILE_SIZE))]
+        try:
+            self._execute_process_list(process_list)
+            os.replace(tmp_file, tile["file"])
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def _execute(self, skip_permission_check=True):
+        """Render all tiles of the render options that are not cached
+
+        Workflow:
+
+            1. The tiles of previous versions of the raster map are removed
+            2. For each tile the region is set to the tile extent with
+               256 rows and columns
+            3. d.rast is invoked to create the PNG file of the tile
+
+        """
+        self._setup()
+
+        options = self.rdc.user_data
+        raster = self.map_name + "@" + self.mapset_name
+        self.required_mapsets.append(self.mapset_name)
+        self.skip_region_check = True
+
+        remove_outdated_tiles(options["cache_path"], options["key"])
+        tiles = [tile for tile in options["tiles"]
+                 if not os.path.isfile(tile["file"])]
+        self._update_num_of_steps(2 * len(tiles))
+
+        if tiles:
+            self._create_temporary_grass_environment()
+        for tile in tiles:
+            # Only the process logs of the last tile are kept, since a
+            # seeding job may render thousands of tiles
+            with self.process_lock:
+                self.module_output_log.clear()
+                self.module_output_dict.clear()
+            self._render_tile(raster, tile)
+
+        self.finish_message = "Rendered %i of %i tiles" % (
+            len(tiles), len(options["tiles"]))
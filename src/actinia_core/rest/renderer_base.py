@@ -25,7 +25,12 @@
 Render base classes
 """
 
+from flask import request, Response
 from flask_restful import reqparse
+from actinia_core.core.common.config import global_config
+from actinia_core.core.render_cache import create_render_cache_key, \
+    add_render_cache_size, get_map_stamps, get_render_cache_file, \
+    store_render_cache_file
 from .ephemeral_processing import EphemeralProcessing
 from .resource_base import ResourceBase
 import os
@@ -183,12 +188,159 @@ class RendererBaseResource(ResourceBase):
             options["end_time"] = args["end_time"]
         return options
 
+    def get_render_cache_key(self, render_type, location_name, mapset_name,
+                             maps, options):
+        """Create the render cache key of an image from the render options and
+        the modification stamps of the rendered maps
+
+        Args:
+            render_type (str): The type of the renderer
+            location_name (str): The name of the location
+            mapset_name (str): The name of the mapset of the maps
+            maps (list): The (map_type, map_name) tuples of the rendered maps
+            options (dict): The render options
+
+        Returns:
+            str:
+            The cache key or None if the render cache is disabled or a map
+            does not exist
+
+        """
+        if not global_config.RENDER_CACHE:
+            return None
+        stamps = []
+        for map_type, map_name in maps:
+            if "@" in map_name:
+                map_name, map_mapset = map_name.split("@", 1)
+                if map_mapset != mapset_name:
+                    return None
+            map_stamps = get_map_stamps(
+                global_config, self.user_group, location_name, mapset_name,
+                map_type, map_name)
+            if map_stamps is None:
+                return None
+            stamps.extend(map_stamps)
+        return create_render_cache_key(render_type, options, stamps)
+
+    @staticmethod
+    def create_image_response(image, key=None, last_modified=None):
+        """Create the response of a PNG image, the response is conditional if
+        the cache key is provided
+
+        Args:
+            image (bytes): The PNG image
+            key (str): The render cache key that is used as ETag
+            last_modified (float): The modification time of the cached image
+
+        Returns:
+            flask.Response:
+            The image response or a 304 response if the client has the image
+
+        """
+        response = Response(image, mimetype='image/png')
+        if key is None:
+            return response
+        response.set_etag(key)
+        response.last_modified = int(last_modified)
+        # Clients must revalidate the image, since the maps may be modified
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    def get_cached_image_response(self, key):
+        """Return the cached image of a render cache key
+
+        Args:
+            key (str): The render cache key
+
+        Returns:
+            flask.Response:
+            The image response or None if the image is not cached
+
+        """
+        if key is None:
+            return None
+        cache_file = get_render_cache_file(global_config.RENDER_CACHE, key)
+        try:
+            last_modified = os.stat(cache_file).st_mtime
+            with open(cache_file, "rb") as cached:
+                image = cached.read()
+        except OSError:
+            return None
+        return self.create_image_response(image, key, last_modified)
+
+    def create_result_image_response(self, result_file, key=None):
+        """Read and remove the rendered image of a job and store it in the
+        render cache
+
+        Args:
+            result_file (str): The rendered PNG file
+            key (str): The render cache key
+
+        Returns:
+            flask.Response:
+            The image response
+
+        """
+        with open(result_file, "rb") as result:
+            image = result.read()
+        os.remove(result_file)
+        return self.create_rendered_image_response(image, key)
+
+    def create_rendered_image_response(self, image, key=None):
+        """Store a rendered image in the render cache and create its response
+
+        Args:
+            image (bytes): The rendered PNG image
+            key (str): The render cache key
+
+        Returns:
+            flask.Response:
+            The image response
+
+        """
+        if key is None:
+            return self.create_image_response(image)
+        try:
+            cache_file = store_render_cache_file(global_config.RENDER_CACHE,
+                                                 key, image)
+            last_modified = os.stat(cache_file).st_mtime
+            add_render_cache_size(global_config.RENDER_CACHE, len(image),
+                                  global_config.RENDER_CACHE_QUOTA * 1024 * 1024)
+        except OSError:
+            # The image is delivered without caching
+            return self.create_image_response(image)
+        return self.create_image_response(image, key, last_modified)
+
 
 class EphemeralRendererBase(EphemeralProcessing):
 
     def __init__(self, *args):
         EphemeralProcessing.__init__(self, *args)
 
+    @staticmethod
+    def _create_render_environment(result_file, width, height):
+        """Create the environment of a display module that renders into a
+        PNG file, so that several images can be rendered by one job
+
+        Args:
+            result_file: The resulting PNG file name
+            width: The image width in pixel
+            height: The image height in pixel
+
+        Returns:
+            dict:
+            The environment variables
+        """
+        env = dict(os.environ)
+        env["GRASS_RENDER_IMMEDIATE"] = "png"
+        env["GRASS_RENDER_WIDTH"] = str(width)
+        env["GRASS_RENDER_HEIGHT"] = str(height)
+        env["GRASS_RENDER_TRANSPARENT"] = "TRUE"
+        env["GRASS_RENDER_TRUECOLOR"] = "TRUE"
+        env["GRASS_RENDER_FILE"] = result_file
+        env["GRASS_RENDER_FILE_READ"] = "TRUE"
+        return env
+
     def _setup_render_environment_and_region(self, options, result_file, legacy=True):
         """Setup the render environment and create a g.region
          process chain entry to setup the extent from the options.
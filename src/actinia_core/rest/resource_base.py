@@ -37,6 +37,9 @@ from actinia_core.core.common.app import auth
 from actinia_core.core.common.app import flask_api
 from actinia_core.core.common.config import global_config
 from actinia_core.core.common.api_logger import log_api_call
+from actinia_core.core.common.process_chain import get_process_chain_modules
+from actinia_core.core.grass_init import get_module_path_index
+from actinia_core.core.health import DRAIN_MESSAGE, is_draining
 from actinia_core.core.messages_logger import MessageLogger
 from actinia_core.core.resources_logger import ResourceLogger
 from actinia_core.core.resource_data_container import ResourceDataContainer
@@ -224,6 +227,27 @@ class ResourceBase(Resource):
 
         return True
 
+    def check_process_chain_modules(self):
+        """Check if the GRASS modules of the process chain in the request data
+        are installed, so that invalid process chains are rejected before
+        they are enqueued
+
+        The check is skipped if GRASS GIS is not installed on this node.
+
+        Return: bool:
+            True in case of success, False otherwise
+        """
+        module_path_index = get_module_path_index(
+            global_config.GRASS_GIS_BASE, global_config.GRASS_ADDON_PATH)
+        if module_path_index.is_available is False:
+            return True
+        for module in get_process_chain_modules(self.request_data):
+            if module_path_index.has_module(module) is False:
+                self.create_error_response(
+                    message="GRASS module <%s> is not installed" % module)
+                return False
+        return True
+
     def check_for_xml(self):
         """Check if the Payload is a XML document
 
@@ -276,6 +300,10 @@ class ResourceBase(Resource):
             the self.response_data variable to send a response.
 
         """
+        if is_draining(global_config) is True:
+            self.create_error_response(message=DRAIN_MESSAGE, http_code=503)
+            return None
+
         if has_json is True and has_xml is True:
             if request.is_json is True:
                 self.request_data = request.get_json()
@@ -289,6 +317,9 @@ class ResourceBase(Resource):
             if self.check_for_json() is False:
                 return None
 
+        if has_json is True and self.check_process_chain_modules() is False:
+            return None
+
         # Compute the job timeout of the worker queue from the user credentials
         process_time_limit = self.user_credentials["permissions"]["process_time_limit"]
         process_num_limit = self.user_credentials["permissions"]["process_num_limit"]
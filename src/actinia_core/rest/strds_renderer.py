@@ -24,12 +24,13 @@
 """
 Raster map renderer
 """
-from flask import jsonify, make_response, Response
+from flask import jsonify, make_response
 from .ephemeral_processing import EphemeralProcessing
 from actinia_core.core.common.redis_interface import enqueue_job
 from .renderer_base import RendererBaseResource, EphemeralRendererBase
 
 import os
+import pickle
 from flask_restful_swagger_2 import swagger
 from tempfile import NamedTemporaryFile
 from actinia_core.models.response_models import ProcessingErrorResponseModel
@@ -167,6 +168,9 @@ class SyncEphemeralSTRDSRendererResource(RendererBaseResource):
                               location_name=location_name,
                               mapset_name=mapset_name,
                               map_name=strds_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
 
         rdc.set_user_data(options)
 
@@ -178,9 +182,7 @@ class SyncEphemeralSTRDSRendererResource(RendererBaseResource):
             # Open the image file, read it and then delete it
             if result_file:
                 if os.path.isfile(result_file):
-                    image = open(result_file, "rb").read()
-                    os.remove(result_file)
-                    return Response(image, mimetype='image/png')
+                    return self.create_result_image_response(result_file)
         return make_response(jsonify(response_model), http_code)
 
 
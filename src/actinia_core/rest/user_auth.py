@@ -209,6 +209,9 @@ def check_location_mapset_module_access(user_credentials,
 
     If the user has an admin or superadmin role, the tests are skipped.
 
+    Use the UserPermissions class to check many locations, mapsets or modules
+    of the same user.
+
     Args:
         user_credentials (dict): The user credentials dictionary
         config (actinia_core.core.common.config.Configuration): The actinia
@@ -224,61 +227,120 @@ def check_location_mapset_module_access(user_credentials,
         or "None" if the user has all required permissions or is admin
 
     """
+    permissions = UserPermissions(user_credentials=user_credentials, config=config)
+    return permissions.check_location_mapset_module_access(
+        location_name=location_name, mapset_name=mapset_name,
+        module_name=module_name)
 
-    # Admin is allowed to do anything
-    if (user_credentials["user_role"] == "admin"
-            or user_credentials["user_role"] == "superadmin"):
-        return None
 
-    # Mapset without location results in error
-    if location_name is None and mapset_name is not None:
-        resp = {"Status": "error",
-                "Messages": "Internal error, mapset definition without location"}
-        return (500, resp)
-
-    if location_name:
-        # Check if the location exists in the global database, if not return
-        grass_data_base = config.GRASS_DATABASE
-        location_path = os.path.join(grass_data_base, location_name)
-        if (os.path.exists(location_path) is False
-                or os.path.isdir(location_path) is False
-                or os.access(location_path, os.R_OK & os.X_OK) is False):
-            return None
+class UserPermissions(object):
+    """The permissions of a user compiled into lookup tables
 
-        # Check if the mapset exists in the global location, if not return
-        if mapset_name:
-            mapset_path = os.path.join(location_path, mapset_name)
+    The accessible modules and the mapsets of each accessible location are
+    stored as frozensets, so that each module or mapset check is a hash
+    lookup. The results of the access checks are memoised, hence create an
+    instance of this class for each request or job to reflect changes of the
+    user permissions and the global database.
+    """
 
-            if (os.path.exists(mapset_path) is False
-                    or os.path.isdir(mapset_path) is False
-                    or os.access(mapset_path, os.R_OK & os.X_OK) is False):
+    def __init__(self, user_credentials, config):
+        """
+
+        Args:
+            user_credentials (dict): The user credentials dictionary
+            config (actinia_core.core.common.config.Configuration): The actinia
+                                                                    configuration
+
+        """
+        self.config = config
+        self.is_admin = user_credentials["user_role"] in ("admin", "superadmin")
+        permissions = user_credentials["permissions"]
+        self.accessible_modules = frozenset(
+            permissions.get("accessible_modules") or [])
+        accessible_datasets = permissions.get("accessible_datasets") or {}
+        self.accessible_datasets = {
+            location: frozenset(mapsets or [])
+            for location, mapsets in accessible_datasets.items()}
+        self._access_cache = {}
+
+    def check_location_mapset_module_access(self, location_name=None,
+                                            mapset_name=None,
+                                            module_name=None):
+        """Check the user permissions to access locations, mapsets and modules.
+
+        See check_location_mapset_module_access() for details, the results
+        are memoised.
+
+        Args:
+            location_name (str): Name of the location to access
+            mapset_name (str): Name of the mapset to access
+            module_name (str): Name of the module to access
+
+        Returns:
+            tuple:
+            In case of missing permissions a tuple with HTTP status
+            code and a dict with status and message entries
+            or "None" if the user has all required permissions or is admin
+
+        """
+        key = (location_name, mapset_name, module_name)
+        if key not in self._access_cache:
+            self._access_cache[key] = self._check_access(
+                location_name, mapset_name, module_name)
+        return self._access_cache[key]
+
+    def _check_access(self, location_name, mapset_name, module_name):
+
+        # Admin is allowed to do anything
+        if self.is_admin is True:
+            return None
+
+        # Mapset without location results in error
+        if location_name is None and mapset_name is not None:
+            resp = {"Status": "error",
+                    "Messages": "Internal error, mapset definition without location"}
+            return (500, resp)
+
+        if location_name:
+            # Check if the location exists in the global database, if not return
+            grass_data_base = self.config.GRASS_DATABASE
+            location_path = os.path.join(grass_data_base, location_name)
+            if (os.path.exists(location_path) is False
+                    or os.path.isdir(location_path) is False
+                    or os.access(location_path, os.R_OK & os.X_OK) is False):
                 return None
 
-        # Check permissions to the global database locations and mapsets
-        accessible_datasets = user_credentials["permissions"]["accessible_datasets"]
+            # Check if the mapset exists in the global location, if not return
+            if mapset_name:
+                mapset_path = os.path.join(location_path, mapset_name)
 
-        if location_name not in accessible_datasets:
-            resp = {"Status": "error",
-                    "Messages": "Unauthorized access to location <%s>" % location_name}
-            return (401, resp)
-
-        # Check if the mapset is allowed to be accessed
-        if mapset_name:
-            # Check if the mapset exists in the global database
-            if not accessible_datasets[location_name] or \
-                    mapset_name not in accessible_datasets[location_name]:
+                if (os.path.exists(mapset_path) is False
+                        or os.path.isdir(mapset_path) is False
+                        or os.access(mapset_path, os.R_OK & os.X_OK) is False):
+                    return None
+
+            # Check permissions to the global database locations and mapsets
+            if location_name not in self.accessible_datasets:
                 resp = {"Status": "error",
-                        "Messages": "Unauthorized access to mapset "
-                                    "<%s> in location <%s>"
-                                    % (mapset_name, location_name)}
+                        "Messages": "Unauthorized access to location <%s>"
+                                    % location_name}
                 return (401, resp)
 
-    # Check if the module name is in the access list
-    if module_name:
-        accessible_modules = user_credentials["permissions"]["accessible_modules"]
-        if module_name not in accessible_modules:
-            resp = {"Status": "error",
-                    "Messages": "Module <%s> is not supported" % module_name}
-            return (401, resp)
+            # Check if the mapset is allowed to be accessed
+            if mapset_name:
+                # Check if the mapset exists in the global database
+                if mapset_name not in self.accessible_datasets[location_name]:
+                    resp = {"Status": "error",
+                            "Messages": "Unauthorized access to mapset "
+                                        "<%s> in location <%s>"
+                                        % (mapset_name, location_name)}
+                    return (401, resp)
+
+        # Check if the module name is in the access list
+        if module_name:
+            if module_name not in self.accessible_modules:
+                resp = {"Status": "error",
+                        "Messages": "Module <%s> is not supported" % module_name}
+                return (401, resp)
 
-    return None
+        return None
@@ -38,7 +38,9 @@ from actinia_api.swagger2.actinia_core.schemas.vector_layer import \
 
 from actinia_core.core.common.app import URL_PREFIX
 from actinia_core.core.common.redis_interface import enqueue_job
+from actinia_core.core.common.config import global_config
 from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.download_cache import register_download_cache_entry
 from actinia_core.core.utils import allowed_file
 from actinia_core.models.response_models import \
     ProcessingResponseModel, ProcessingErrorResponseModel, SimpleResponseModel
@@ -303,6 +305,11 @@ class VectorLayerResource(MapLayerRegionResourceBase):
                               mapset_name=mapset_name,
                               map_name=vector_name)
         if rdc:
+            # Protect the uploaded file from eviction until the job finished
+            register_download_cache_entry(
+                global_config, self.download_cache,
+                os.path.relpath(file_path, self.download_cache).split(os.sep)[0],
+                self.resource_id, self.job_timeout)
             rdc.set_request_data(file_path)
             enqueue_job(self.job_timeout, start_create_job, rdc)
 
@@ -27,8 +27,9 @@ Raster map renderer
 """
 
 import os
+import pickle
 from flask_restful_swagger_2 import swagger
-from flask import jsonify, make_response, Response
+from flask import jsonify, make_response
 from tempfile import NamedTemporaryFile
 from .ephemeral_processing import EphemeralProcessing
 from actinia_core.core.common.redis_interface import enqueue_job
@@ -148,10 +149,20 @@ class SyncEphemeralVectorRendererResource(RendererBaseResource):
         if isinstance(options, dict) is False:
             return options
 
+        key = self.get_render_cache_key(
+            "vector", location_name, mapset_name,
+            [("vector", vector_name)], options)
+        response = self.get_cached_image_response(key)
+        if response is not None:
+            return response
+
         rdc = self.preprocess(has_json=False, has_xml=False,
                               location_name=location_name,
                               mapset_name=mapset_name,
                               map_name=vector_name)
+        if rdc is None:
+            http_code, response_model = pickle.loads(self.response_data)
+            return make_response(jsonify(response_model), http_code)
 
         rdc.set_user_data(options)
 
@@ -163,9 +174,8 @@ class SyncEphemeralVectorRendererResource(RendererBaseResource):
             # Open the image file, read it and then delete it
             if result_file:
                 if os.path.isfile(result_file):
-                    image = open(result_file, "rb").read()
-                    os.remove(result_file)
-                    return Response(image, mimetype='image/png')
+                    return self.create_result_image_response(
+                        result_file, key)
 
         return make_response(jsonify(response_model), http_code)
 
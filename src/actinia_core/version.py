@@ -32,11 +32,14 @@ __copyright__ = "Copyright 2016-2018, Sören Gebbert and mundialis GmbH & Co. KG
 __maintainer__ = "mundialis"
 
 from flask import make_response, jsonify, request
+import json
 import os
 import re
 import importlib
+import shutil
 import subprocess
 import sys
+import tempfile
 
 from actinia_core.core.common.app import flask_app, URL_PREFIX
 from actinia_core.core.common.config import global_config
@@ -50,18 +53,119 @@ G_VERSION = {}
 PLUGIN_VERSIONS = {}
 PYTHON_VERSION = ""
 API_VERSION = ""
+# The file in the TMP_WORKDIR that caches the GRASS GIS version
+GRASS_VERSION_CACHE_NAME = "grass_version.json"
 
 
-def init_versions():
-    global PYTHON_VERSION
-    global API_VERSION
+def get_grass_version_cache_key(grass_gis_base):
+    """Create the cache key of the GRASS GIS version from the modification
+    times of the GRASS GIS installation and the grass start script
+
+    Args:
+        grass_gis_base (str): The path to the GRASS GIS installation
+
+    Returns:
+        str:
+        The cache key or None if GRASS GIS is not installed
+    """
+    key = []
+    for path in (grass_gis_base, shutil.which("grass")):
+        if path and os.path.exists(path):
+            key.append("%s:%i" % (path, os.stat(path).st_mtime_ns))
+    if not key:
+        return None
+    return "|".join(key)
+
+
+def read_grass_version_cache(cache_file, key):
+    """Read the cached GRASS GIS version
+
+    Args:
+        cache_file (str): The path to the cache file
+        key (str): The cache key of the current GRASS GIS installation
+
+    Returns:
+        dict:
+        The GRASS GIS version or None if it is not cached for the key
+    """
+    try:
+        with open(cache_file, "r") as cache:
+            content = json.load(cache)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(content, dict) or content.get("key") != key:
+        return None
+    return content.get("grass_version")
+
+
+def write_grass_version_cache(cache_file, key, grass_version):
+    """Write the GRASS GIS version atomically into the cache file
+
+    Args:
+        cache_file (str): The path to the cache file
+        key (str): The cache key of the current GRASS GIS installation
+        grass_version (dict): The GRASS GIS version
 
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+        with os.fdopen(fd, "w") as cache:
+            json.dump({"key": key, "grass_version": grass_version}, cache)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log.warning("Unable to cache the GRASS GIS version: %s" % str(e))
+
+
+def detect_grass_version():
+    """Run g.version in a temporary location to detect the GRASS GIS version
+
+    Returns:
+        dict:
+        The GRASS GIS version information
+    """
+    log.debug('Detecting GRASS GIS version')
     g_version = subprocess.run(
         ['grass', '--tmp-location', 'epsg:4326', '--exec',
          'g.version', '-rge'], capture_output=True).stdout
-    log.debug('Detecting GRASS GIS version')
+    grass_version = {}
     for i in g_version.decode('utf-8').strip('\n').split('\n'):
-        G_VERSION[i.split('=')[0]] = i.split('=')[1]
+        if '=' in i:
+            grass_version[i.split('=')[0]] = i.split('=', 1)[1]
+    return grass_version
+
+
+def get_grass_version():
+    """Return the GRASS GIS version
+
+    The version is detected on first use, since starting GRASS GIS is slow.
+    It is cached on disk for the current GRASS GIS installation, so that
+    the server workers and restarts of the server share it.
+
+    Returns:
+        dict:
+        The GRASS GIS version information
+    """
+    if G_VERSION:
+        return G_VERSION
+
+    cache_file = os.path.join(global_config.TMP_WORKDIR,
+                              GRASS_VERSION_CACHE_NAME)
+    key = get_grass_version_cache_key(global_config.GRASS_GIS_BASE)
+    grass_version = None
+    if key is not None:
+        grass_version = read_grass_version_cache(cache_file, key)
+    if grass_version is None:
+        grass_version = detect_grass_version()
+        if key is not None and grass_version:
+            write_grass_version_cache(cache_file, key, grass_version)
+    G_VERSION.update(grass_version)
+    return G_VERSION
+
+
+def init_versions():
+    global PYTHON_VERSION
+    global API_VERSION
 
     log.debug('Detecting Plugin versions')
     for i in global_config.PLUGINS:
@@ -135,7 +239,7 @@ def version():
     info = find_additional_version_info()
     info['version'] = __version__
     info['plugins'] = ",".join(global_config.PLUGINS)
-    info['grass_version'] = G_VERSION
+    info['grass_version'] = get_grass_version()
     info['plugin_versions'] = PLUGIN_VERSIONS
     info['api_version'] = API_VERSION
     info['python_version'] = PYTHON_VERSION
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+
+"""
+Tests: AWS Sentinel-2 metadata cache unittest case
+"""
+import json
+import pytest
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from actinia_core.core.common.aws_sentinel_interface import \
+    AWSSentinel2AInterface
+from actinia_core.core.common.config import Configuration
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+PRODUCT_IDS = ["S2A_MSIL1C_201702%02iT104141_N0204_R008_T31TGJ_201702%02iT104138"
+               % (day, day) for day in range(10, 16)]
+
+
+class MetadataRequestHandler(BaseHTTPRequestHandler):
+    """Serve productInfo.json and tileInfo.json files"""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        time.sleep(0.2)
+        if self.path.endswith("productInfo.json"):
+            info = {"timestamp": "2017-02-12T10:41:41.000Z",
+                    "tiles": [{"path": "tiles/31/T/GJ/%s/0"
+                               % self.path.split("/")[4]}]}
+        else:
+            info = {"tileDataGeometry": {"type": "Polygon",
+                                         "coordinates": []}}
+        data = json.dumps(info).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    MetadataRequestHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MetadataRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%i" % httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.fixture
+def config():
+    config = Configuration()
+    config.DOWNLOAD_CACHE = tempfile.mkdtemp()
+    yield config
+    shutil.rmtree(config.DOWNLOAD_CACHE)
+
+
+def create_interface(config, server):
+    aws = AWSSentinel2AInterface(config)
+    aws.aws_sentinel_base_url = server
+    return aws
+
+
+@pytest.mark.unittest
+def test_sentinel_metadata_cache(server, config):
+    aws = create_interface(config, server)
+    start = time.perf_counter()
+    result = aws.get_sentinel_urls(PRODUCT_IDS, ["B04"])
+    assert time.perf_counter() - start < 0.6
+    assert [entry["product_id"] for entry in result] == PRODUCT_IDS
+    assert result[0]["tiles"][0]["B04"]["public_url"] == \
+        server + "/tiles/31/T/GJ/10/0/B04.jp2"
+    assert len(MetadataRequestHandler.requests) == len(PRODUCT_IDS)
+
+    footprint = aws.get_sentinel_tile_footprint(result[0]["tiles"][0])
+    assert json.loads(footprint)["type"] == "Polygon"
+
+    # The metadata of following jobs is read from the cache
+    aws = create_interface(config, server)
+    assert aws.get_sentinel_urls(PRODUCT_IDS, ["B04"]) == result
+    assert aws.get_sentinel_tile_footprint(result[0]["tiles"][0]) == footprint
+    assert len(MetadataRequestHandler.requests) == len(PRODUCT_IDS) + 1
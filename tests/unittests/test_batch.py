@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Batch submission unittest case
+"""
+import pytest
+
+from actinia_core.core.batch import aggregate_batch_status, \
+    check_batch_definition, get_template_parameters, \
+    render_process_chain_template
+from actinia_core.core.common.exceptions import AsyncProcessError
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+TEMPLATE = {
+    "version": "1",
+    "list": [{"id": "ndvi", "module": "r.mapcalc",
+              "inputs": [{"param": "expression",
+                          "value": "ndvi = nir@{{mapset}} - red@{{ mapset }}"}]},
+             {"id": "neighbors", "module": "r.neighbors",
+              "inputs": [{"param": "input", "value": "ndvi"},
+                         {"param": "size", "value": "{{size}}"}]}]}
+
+
+@pytest.mark.unittest
+def test_render_process_chain_template():
+    assert get_template_parameters(TEMPLATE) == {"mapset", "size"}
+    process_chain = render_process_chain_template(
+        TEMPLATE, {"mapset": "scene_1", "size": 5})
+    assert process_chain["list"][0]["inputs"][0]["value"] == \
+        "ndvi = nir@scene_1 - red@scene_1"
+    # A single placeholder keeps the type of the parameter
+    assert process_chain["list"][1]["inputs"][1]["value"] == 5
+    assert TEMPLATE["list"][1]["inputs"][1]["value"] == "{{size}}"
+
+
+@pytest.mark.unittest
+def test_check_batch_definition():
+    parameters = [{"mapset": "scene_%i" % i, "size": 3} for i in range(3)]
+    assert check_batch_definition(
+        {"process_chain": TEMPLATE, "parameters": parameters}, 3) == (
+        TEMPLATE, parameters)
+
+    with pytest.raises(AsyncProcessError, match="maximum of 2 jobs"):
+        check_batch_definition(
+            {"process_chain": TEMPLATE, "parameters": parameters}, 2)
+    with pytest.raises(AsyncProcessError, match="<size> of job 1"):
+        check_batch_definition(
+            {"process_chain": TEMPLATE,
+             "parameters": [parameters[0], {"mapset": "scene_1"}]}, 10)
+    with pytest.raises(AsyncProcessError, match="non-empty list"):
+        check_batch_definition({"process_chain": TEMPLATE}, 10)
+    with pytest.raises(AsyncProcessError,
+                       match="<scene_0> of job 2 is already used by job 0"):
+        check_batch_definition(
+            {"process_chain": TEMPLATE,
+             "parameters": parameters[:2] + [parameters[0]]}, 10)
+
+
+@pytest.mark.unittest
+def test_aggregate_batch_status():
+    assert aggregate_batch_status(
+        [{"status": "accepted"}, {"status": "accepted"}]) == (
+        "accepted", {"accepted": 2}, {"step": 0, "num_of_steps": 2})
+    assert aggregate_batch_status(
+        [{"status": "finished"}, {"status": "accepted"}]) == (
+        "running", {"finished": 1, "accepted": 1},
+        {"step": 1, "num_of_steps": 2})
+    assert aggregate_batch_status(
+        [{"status": "finished"}, {"status": "finished"}])[0] == "finished"
+    assert aggregate_batch_status([{"status": "finished"}, None]) == (
+        "error", {"finished": 1, "error": 1}, {"step": 2, "num_of_steps": 2})
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+
+"""
+Tests: Google BigQuery result cache unittest case
+"""
+import pytest
+import shutil
+import tempfile
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.google_satellite_bigquery_interface import \
+    GoogleSatelliteBigQueryInterface, MAX_IN_QUERY_IDS
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+LANDSAT_IDS = ["LC80440342016%03iLGN00" % day for day in range(1, 6)]
+
+
+class StubQueryJob(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def result(self):
+        return self.rows
+
+
+class StubBigQueryClient(object):
+    """A BigQuery client that answers landsat index queries"""
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, query):
+        self.queries.append(query)
+        if "sensing_time,base_url" in query:
+            scene_ids = [scene_id for scene_id in LANDSAT_IDS
+                         if '"%s"' % scene_id in query]
+            return StubQueryJob([
+                (scene_id, "2016-09-15T18:46:18.6867380Z",
+                 "gs://gcp-public-data-landsat/LC08/PRE/044/034/" + scene_id)
+                for scene_id in scene_ids])
+        return StubQueryJob([
+            (LANDSAT_IDS[0], "2016-01-01T18:46:18Z", 1.0, 0.0, 1.0, 0.0,
+             10.0, 1000)])
+
+
+@pytest.fixture
+def config():
+    config = Configuration()
+    config.DOWNLOAD_CACHE = tempfile.mkdtemp()
+    yield config
+    shutil.rmtree(config.DOWNLOAD_CACHE)
+
+
+def create_interface(config, client):
+    return GoogleSatelliteBigQueryInterface(
+        config, bigquery_client=client, storage_client=object())
+
+
+@pytest.mark.unittest
+def test_landsat_url_lookup_cache(config):
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    result = gqi.get_landsat_urls(LANDSAT_IDS[:3], ["B1"])
+    assert sorted(result) == LANDSAT_IDS[:3]
+    assert result[LANDSAT_IDS[0]]["B1"]["public_url"].endswith(
+        LANDSAT_IDS[0] + "_B1.TIF")
+    assert len(client.queries) == 1
+
+    # Only the scenes that are not cached are queried, in a single IN query
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    assert sorted(gqi.get_landsat_urls(LANDSAT_IDS, ["B1"])) == LANDSAT_IDS
+    assert len(client.queries) == 1
+    assert all('"%s"' % scene_id in client.queries[0]
+               for scene_id in LANDSAT_IDS[3:])
+    assert '"%s"' % LANDSAT_IDS[0] not in client.queries[0]
+
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    assert gqi.get_landsat_urls(LANDSAT_IDS[:3], ["B1"]) == result
+    assert client.queries == []
+
+
+@pytest.mark.unittest
+def test_landsat_url_lookup_batches(config, monkeypatch):
+    monkeypatch.setattr(
+        "actinia_core.core.common.google_satellite_bigquery_interface."
+        "MAX_IN_QUERY_IDS", 2)
+    config.METADATA_CACHE = False
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    assert sorted(gqi.get_landsat_urls(LANDSAT_IDS, ["B1"])) == LANDSAT_IDS
+    assert len(client.queries) == 3
+    assert MAX_IN_QUERY_IDS == 1000
+
+
+@pytest.mark.unittest
+def test_archive_query_cache(config):
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    query = dict(start_time="2016-01-01T00:00:00", end_time="2016-01-31T00:00:00",
+                 lat=0.5, lon=0.5, scene_id=LANDSAT_IDS[:2])
+    result = gqi.query_landsat_archive(**query)
+    assert result[0]["scene_id"] == LANDSAT_IDS[0]
+    assert "scene_id IN ('%s','%s')" % tuple(LANDSAT_IDS[:2]) \
+        in client.queries[0]
+
+    client = StubBigQueryClient()
+    gqi = create_interface(config, client)
+    query["scene_id"] = list(reversed(LANDSAT_IDS[:2]))
+    assert gqi.query_landsat_archive(**query) == result
+    assert client.queries == []
+
+    config.BIGQUERY_CACHE_TTL = 0
+    gqi = create_interface(config, client)
+    gqi.query_landsat_archive(**query)
+    assert len(client.queries) == 1
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Shared download cache unittest case
+"""
+import functools
+import os
+import pytest
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from actinia_core.core.download_cache import (
+    DownloadCacheIndex,
+    SharedDownloadCache,
+    create_download_cache_key,
+    update_download_cache_index
+)
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+class CountingRequestHandler(SimpleHTTPRequestHandler):
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    data_path = tempfile.mkdtemp()
+    with open(os.path.join(data_path, "elevation.tif"), "wb") as data:
+        data.write(os.urandom(1024 * 1024))
+    CountingRequestHandler.requests = []
+    httpd = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        functools.partial(CountingRequestHandler, directory=data_path))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%i" % httpd.server_address[1], data_path
+    httpd.shutdown()
+    shutil.rmtree(data_path)
+
+
+@pytest.fixture
+def work_path():
+    work_path = tempfile.mkdtemp()
+    yield work_path
+    shutil.rmtree(work_path)
+
+
+@pytest.mark.unittest
+def test_download_cache_key():
+    url = "https://example.com/elevation.tif"
+    key = create_download_cache_key(url, {"ETag": '"1234"'})
+    assert key == create_download_cache_key(url, {"ETag": '"1234"'})
+    assert key != create_download_cache_key(url, {"ETag": '"5678"'})
+    assert key != create_download_cache_key(
+        url, {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert create_download_cache_key(url, {}) is None
+
+
+@pytest.mark.unittest
+def test_download_cache_single_flight(server, work_path):
+    url, data_path = server
+    cache = SharedDownloadCache(os.path.join(work_path, "cache"))
+    targets = [os.path.join(work_path, "job_%i.tif" % i) for i in range(8)]
+
+    def fetch(target):
+        cache.fetch(url + "/elevation.tif", "key", target)
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        list(executor.map(fetch, targets))
+
+    assert CountingRequestHandler.requests == ["/elevation.tif"]
+    with open(os.path.join(data_path, "elevation.tif"), "rb") as data:
+        content = data.read()
+    cache_file = cache.get_cache_file_path("key")
+    assert os.stat(cache_file).st_nlink == len(targets) + 1
+    for target in targets:
+        with open(target, "rb") as job_file:
+            assert job_file.read() == content
+    assert not [name for name in os.listdir(cache.cache_path)
+                if name.startswith(".download_")]
+    index = DownloadCacheIndex(cache.cache_path)
+    assert index.size() == 1024 * 1024
+    assert index.count() == 1
+    # The cached file is hard linked into running jobs
+    assert cache.evict(0) == []
+    for target in targets:
+        os.remove(target)
+    assert cache.evict(0) == ["key"]
+    assert index.size() == 0
+
+
+@pytest.mark.unittest
+def test_download_cache_failed_download(server, work_path):
+    url, _ = server
+    cache = SharedDownloadCache(os.path.join(work_path, "cache"), retries=0)
+    with pytest.raises(Exception):
+        cache.fetch(url + "/missing.tif", "key")
+    assert not os.path.exists(cache.get_cache_file_path("key"))
+    assert DownloadCacheIndex(cache.cache_path).count() == 0
+
+
+def create_entry(cache_path, name, size, last_access):
+    path = os.path.join(cache_path, name)
+    with open(path, "wb") as entry:
+        entry.write(b"0" * size)
+    os.utime(path, (last_access, last_access))
+
+
+@pytest.mark.unittest
+def test_download_cache_index_eviction(work_path):
+    create_entry(work_path, "old.tif", 100, 1000)
+    create_entry(work_path, "older.tif", 100, 500)
+    create_entry(work_path, "pinned.tif", 100, 100)
+    open(os.path.join(work_path, "older.tif.lock"), "a").close()
+    index = DownloadCacheIndex(work_path)
+    assert index.size() == 300
+    assert index.count() == 3
+
+    index.pin("pinned.tif", "resource_id-1", 60)
+    index.add("new.tif", 100)
+    assert index.size() == 400
+    assert index.evict(250) == ["older.tif", "old.tif"]
+    assert index.size() == 200
+    assert sorted(os.listdir(work_path)) == [".index.sqlite", "pinned.tif"]
+
+    # new.tif was never written, the synchronization removes it
+    index.synchronize()
+    assert index.count() == 1
+    index.unpin("pinned.tif", "resource_id-1")
+    assert index.evict(0) == ["pinned.tif"]
+    assert index.size() == 0
+
+
+class DownloadCacheConfig:
+    DOWNLOAD_CACHE_QUOTA = 0
+
+
+@pytest.mark.unittest
+def test_download_cache_index_unregistered_entries(work_path):
+    index = DownloadCacheIndex(work_path)
+    assert index.size() == 0
+    # Entries that were moved into the cache by processes
+    create_entry(work_path, "old.tif", 100, 1000)
+    create_entry(work_path, "new.tif", 100, time.time())
+    update_download_cache_index(DownloadCacheConfig(), work_path)
+    assert sorted(os.listdir(work_path)) == [".index.sqlite", "new.tif"]
+    assert index.size() == 100
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: GRASS mapset template unittest case
+"""
+import os
+import pytest
+import shutil
+import tempfile
+import unittest
+
+from actinia_core.core.grass_init import GrassInitError, GrassMapsetTemplate
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+DEFAULT_WIND = """proj:       99
+zone:       0
+north:      320000
+south:      10000
+east:       935000
+west:       120000
+cols:       815
+rows:       310
+e-w resol:  1000
+n-s resol:  1000
+"""
+
+
+@pytest.mark.unittest
+class GrassMapsetTemplateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.location_path = os.path.join(self.tmp_dir, "location")
+        os.makedirs(os.path.join(self.location_path, "PERMANENT"))
+        with open(os.path.join(
+                self.location_path, "PERMANENT", "DEFAULT_WIND"), "w") as wind:
+            wind.write(DEFAULT_WIND)
+        for mapset in ["landsat", "modis"]:
+            os.makedirs(os.path.join(self.location_path, mapset))
+        self.template = GrassMapsetTemplate(os.path.join(self.tmp_dir, "templates"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_create_mapset(self):
+        mapset_path = self.template.create_mapset(
+            self.location_path, "mapset_1", search_path=["landsat", "PERMANENT"])
+
+        with open(os.path.join(mapset_path, "WIND"), "r") as wind:
+            self.assertEqual(wind.read(), DEFAULT_WIND)
+        with open(os.path.join(mapset_path, "VAR"), "r") as var:
+            self.assertEqual(
+                var.read(), "DB_DRIVER: sqlite\nDB_DATABASE: "
+                "$GISDBASE/$LOCATION_NAME/$MAPSET/vector/$MAP/sqlite.db\n")
+        with open(os.path.join(mapset_path, "SEARCH_PATH"), "r") as search_path:
+            self.assertEqual(search_path.read().split(),
+                             ["mapset_1", "PERMANENT", "landsat"])
+
+    def test_template_reuse(self):
+        self.template.create_mapset(self.location_path, "mapset_1")
+        self.template.create_mapset(self.location_path, "mapset_2")
+        self.assertEqual(len(os.listdir(self.template.template_path)), 1)
+
+        template = os.listdir(self.template.template_path)[0]
+
+        # A modified DEFAULT_WIND file requires a new template, the outdated
+        # template is removed
+        default_wind = os.path.join(self.location_path, "PERMANENT", "DEFAULT_WIND")
+        with open(default_wind, "a") as wind:
+            wind.write("top:        1\n")
+        self.template.create_mapset(self.location_path, "mapset_3")
+        templates = os.listdir(self.template.template_path)
+        self.assertEqual(len(templates), 1)
+        self.assertNotEqual(templates[0], template)
+
+        # So does a modified projection
+        with open(os.path.join(self.location_path, "PERMANENT", "PROJ_INFO"),
+                  "w") as proj_info:
+            proj_info.write("name: Lambert Conformal Conic\n")
+        self.template.create_mapset(self.location_path, "mapset_4")
+        self.assertNotEqual(os.listdir(self.template.template_path), templates)
+
+    def test_existing_mapset(self):
+        mapset_path = os.path.join(self.location_path, "interim")
+        os.mkdir(mapset_path)
+        with open(os.path.join(mapset_path, "WIND"), "w") as wind:
+            wind.write("interim")
+        with open(os.path.join(mapset_path, "SEARCH_PATH"), "w") as search_path:
+            search_path.write("interim\nPERMANENT\nremoved\nlandsat\n")
+
+        self.template.create_mapset(
+            self.location_path, "interim", search_path=["modis", "landsat"])
+
+        with open(os.path.join(mapset_path, "WIND"), "r") as wind:
+            self.assertEqual(wind.read(), "interim")
+        with open(os.path.join(mapset_path, "SEARCH_PATH"), "r") as search_path:
+            self.assertEqual(search_path.read().split(),
+                             ["interim", "PERMANENT", "landsat", "modis"])
+
+    def test_invalid_search_path(self):
+        for mapset in ["sentinel", "../location", ".mapset_templates"]:
+            with self.assertRaises(GrassInitError):
+                self.template.create_mapset(
+                    self.location_path, "mapset_1", search_path=[mapset])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: GRASS module path index unittest case
+"""
+import os
+import pytest
+import shutil
+import tempfile
+import unittest
+
+from actinia_core.core.common.process_chain import get_process_chain_modules
+from actinia_core.core.grass_init import (
+    GrassModulePathIndex,
+    get_module_path_index
+)
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def touch(*path):
+    open(os.path.join(*path), "w").close()
+
+
+@pytest.mark.unittest
+class GrassModulePathIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.grassbase = os.path.join(self.tmp_dir, "grass")
+        self.addons = os.path.join(self.tmp_dir, "addons")
+        for directory in [(self.grassbase, "bin"), (self.grassbase, "scripts"),
+                          (self.addons, "bin"), (self.addons, "scripts")]:
+            os.makedirs(os.path.join(*directory))
+        touch(self.grassbase, "bin", "r.slope.aspect")
+        touch(self.grassbase, "scripts", "r.import")
+        touch(self.addons, "scripts", "r.import")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup(self):
+        index = GrassModulePathIndex(self.grassbase, self.addons)
+        self.assertTrue(index.is_available)
+        self.assertEqual(index.get_module_path("r.slope.aspect"),
+                         os.path.join(self.grassbase, "bin", "r.slope.aspect"))
+        # Modules of the GRASS installation take precedence over addons
+        self.assertEqual(index.get_module_path("r.import"),
+                         os.path.join(self.grassbase, "scripts", "r.import"))
+        self.assertIsNone(index.get_module_path("r.unknown"))
+
+    def test_addon_refresh(self):
+        index = GrassModulePathIndex(self.grassbase, self.addons)
+        self.assertFalse(index.has_module("i.sentinel.import"))
+        touch(self.addons, "bin", "i.sentinel.import")
+        # Make sure the directory modification time changed
+        os.utime(os.path.join(self.addons, "bin"), ns=(0, 0))
+        self.assertTrue(index.has_module("i.sentinel.import"))
+
+    def test_missing_installation(self):
+        index = GrassModulePathIndex(os.path.join(self.tmp_dir, "none"), "")
+        self.assertFalse(index.is_available)
+
+    def test_index_per_process(self):
+        index = get_module_path_index(self.grassbase, self.addons)
+        self.assertIs(index, get_module_path_index(self.grassbase, self.addons))
+
+    def test_process_chain_modules(self):
+        process_chain = {
+            "version": "1",
+            "list": [{"id": "import", "module": "importer"},
+                     {"id": "region", "module": "g.region"},
+                     {"id": "slope", "module": "r.slope.aspect"},
+                     {"id": "list", "exe": "/bin/ls"},
+                     {"id": "region_2", "module": "g.region"}]}
+        self.assertEqual(get_process_chain_modules(process_chain),
+                         ["g.region", "r.slope.aspect"])
+        self.assertEqual(get_process_chain_modules(
+            {"1": {"module": "r.info"}, "2": {"executable": "/bin/ls"}}),
+            ["r.info"])
+        self.assertEqual(get_process_chain_modules(["r.info"]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: GRASS region file unittest case
+"""
+import os
+import pytest
+import tempfile
+
+from actinia_core.core.grass_region import (
+    GrassRegion,
+    GrassRegionError,
+    get_region_file_path,
+    scan_coordinate
+)
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+WIND = """proj:       99
+zone:       0
+north:      228500
+south:      215000
+east:       645000
+west:       630000
+cols:       1500
+rows:       1350
+e-w resol:  10
+n-s resol:  10
+top:        1
+bottom:     0
+cols3:      1500
+rows3:      1350
+depths:     1
+e-w resol3: 10
+n-s resol3: 10
+t-b resol:  1
+"""
+
+
+def write_wind(content):
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, "w") as wind:
+        wind.write(content)
+    return path
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("value,expected", [
+    ("228500", 228500.0),
+    ("-15.5", -15.5),
+    ("35N", 35.0),
+    ("35:30S", -35.5),
+    ("78:30:36W", -78.51),
+    ("0:00:30", 1.0 / 120.0)
+])
+def test_scan_coordinate(value, expected):
+    assert scan_coordinate(value) == pytest.approx(expected)
+
+
+@pytest.mark.unittest
+def test_scan_coordinate_error():
+    with pytest.raises(GrassRegionError):
+        scan_coordinate("north")
+
+
+@pytest.mark.unittest
+def test_read_region():
+    path = write_wind(WIND)
+    region = GrassRegion.read(path).as_dict()
+    os.remove(path)
+    assert region["cells"] == 2025000
+    assert region["nsres"] == 10.0
+    assert region["ewres"] == 10.0
+
+
+@pytest.mark.unittest
+def test_read_latlong_region():
+    path = write_wind(
+        "proj: 3\nzone: 0\nnorth: 60N\nsouth: 30N\neast: 20E\nwest: 10W\n"
+        "cols: 3600\nrows: 3600\ne-w resol: 0:00:30\nn-s resol: 0:00:30\n")
+    region = GrassRegion.read(path)
+    os.remove(path)
+    assert region.cells == 3600 * 3600
+    assert region.ns_res == pytest.approx(1.0 / 120.0)
+    assert region.ew_res == pytest.approx(1.0 / 120.0)
+    with pytest.raises(GrassRegionError):
+        region.write(path)
+
+
+@pytest.mark.unittest
+def test_incomplete_region():
+    path = write_wind("proj: 99\nnorth: 1\n")
+    with pytest.raises(GrassRegionError):
+        GrassRegion.read(path)
+    os.remove(path)
+
+
+@pytest.mark.unittest
+def test_set_resolution_and_write():
+    path = write_wind(WIND)
+    region = GrassRegion.read(path)
+    region.set_resolution(33.0, 33.0)
+    region.write(path)
+    region = GrassRegion.read(path)
+    with open(path, "r") as wind:
+        content = wind.read()
+    os.remove(path)
+    assert region.rows == 409
+    assert region.cols == 455
+    assert region.north == 228500.0
+    assert region.west == 630000.0
+    assert "t-b resol:  1" in content
+
+
+@pytest.mark.unittest
+def test_get_region_file_path(monkeypatch):
+    monkeypatch.delenv("WIND_OVERRIDE", raising=False)
+    monkeypatch.delenv("GRASS_REGION", raising=False)
+    assert get_region_file_path("/mapset") == "/mapset/WIND"
+    monkeypatch.setenv("WIND_OVERRIDE", "tmp.region")
+    assert get_region_file_path("/mapset") == "/mapset/windows/tmp.region"
+    monkeypatch.setenv("GRASS_REGION", "north:1")
+    with pytest.raises(GrassRegionError):
+        get_region_file_path("/mapset")
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Readiness checks and drain mode unittest case
+"""
+import os
+import pytest
+
+from actinia_core.core import health
+from actinia_core.core.common.config import Configuration
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Configuration()
+    config.DRAIN_FILE = str(tmp_path / "node" / "drain")
+    config.GRASS_TMP_DATABASE = str(tmp_path)
+    config.READINESS_MIN_FREE_DISK = 0.0
+    return config
+
+
+@pytest.mark.unittest
+def test_drain_mode(config):
+    assert health.is_draining(config) is False
+    health.set_draining(config, True)
+    assert os.path.isfile(config.DRAIN_FILE)
+    assert health.is_draining(config) is True
+    health.set_draining(config, False)
+    assert health.is_draining(config) is False
+    health.set_draining(config, False)
+
+
+@pytest.mark.unittest
+def test_readiness_checks(config, monkeypatch):
+    assert health.check_disk_space(config)[0] is True
+    config.READINESS_MIN_FREE_DISK = 1.0e9
+    assert health.check_disk_space(config)[0] is False
+
+    monkeypatch.setattr(health, "get_process_queue_state",
+                        lambda: (True, 5.0))
+    assert health.check_process_queue(config)[0] is True
+    monkeypatch.setattr(health, "get_process_queue_state",
+                        lambda: (True, 60.0))
+    ok, message = health.check_process_queue(config)
+    assert ok is False and "did not respond" in message
+    monkeypatch.setattr(health, "get_process_queue_state",
+                        lambda: (False, None))
+    assert health.check_process_queue(config)[0] is False
+    config.QUEUE_TYPE = "redis"
+    assert health.check_process_queue(config)[0] is True
+
+
+@pytest.mark.unittest
+def test_readiness_status(config, monkeypatch):
+    monkeypatch.setattr(health, "check_redis",
+                        lambda config: (True, "reachable"))
+    monkeypatch.setattr(health, "get_process_queue_state",
+                        lambda: (True, 0.1))
+    status, checks = health.get_readiness(config)
+    assert status == "ready"
+    assert sorted(checks) == ["disk_space", "process_queue", "redis"]
+
+    health.set_draining(config, True)
+    assert health.get_readiness(config)[0] == "draining"
+    health.set_draining(config, False)
+
+    monkeypatch.setattr(health, "check_redis",
+                        lambda config: (False, "not reachable"))
+    status, checks = health.get_readiness(config)
+    assert status == "not ready"
+    assert checks["redis"] == {"status": "failed",
+                               "message": "not reachable"}
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Import of the core modules
+"""
+import json
+import os
+import pytest
+import subprocess
+import sys
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+# The dependencies that must be imported on first use
+HEAVY_MODULES = ["boto3", "google.cloud.bigquery", "google.cloud.storage",
+                 "matplotlib", "numpy", "pystac", "rasterio"]
+IMPORT_CHECK = """
+import json
+import sys
+import actinia_core.core.common.process_chain
+import actinia_core.core.resource_data_container
+print(json.dumps([name for name in %r if name in sys.modules]))
+""" % HEAVY_MODULES
+
+
+@pytest.mark.unittest
+def test_lazy_imports():
+    """Check that the import of the process chain converter and the storage
+    interfaces in a fresh interpreter does not import heavy dependencies
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    output = subprocess.run([sys.executable, "-c", IMPORT_CHECK], env=env,
+                            capture_output=True, check=True).stdout
+    imported = json.loads(output.decode().strip().split("\n")[-1])
+
+    assert imported == []
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: In-process raster renderer unittest case
+"""
+import pytest
+
+from actinia_core.core import in_process_renderer
+from actinia_core.core.in_process_renderer import RenderNotSupported, \
+    apply_color_table, get_image_frame, get_source_window, read_color_table, \
+    render_raster
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+COLR = """% 0 100
+nv:255
+*:255:0:255
+0:0:0:0 50:0:0:255
+50:0:0:255 100:255:255:255
+"""
+
+
+@pytest.mark.unittest
+def test_read_color_table(tmp_path):
+    colr_file = tmp_path / "elevation"
+    colr_file.write_text(COLR)
+    table = read_color_table(str(colr_file))
+    assert table["rules"] == [(0.0, (0, 0, 0), 50.0, (0, 0, 255)),
+                              (50.0, (0, 0, 255), 100.0, (255, 255, 255))]
+    assert table["null"] == (255, 255, 255)
+    assert table["default"] == (255, 0, 255)
+
+    colr_file.write_text("#0 100\n0 0 0\n")
+    with pytest.raises(RenderNotSupported, match="Unsupported"):
+        read_color_table(str(colr_file))
+    with pytest.raises(RenderNotSupported):
+        read_color_table(str(tmp_path / "slope"))
+
+
+@pytest.mark.unittest
+def test_render_geometry():
+    region = {"north": 100.0, "south": 0.0, "east": 200.0, "west": 0.0}
+    frame = get_image_frame(region, 400, 400)
+    assert frame == (0.0, 100.0, 2.0)
+
+    # The raster map covers the eastern half of the region with 10 m cells
+    geo_transform = (100.0, 10.0, 0.0, 150.0, 0.0, -10.0)
+    assert get_source_window(geo_transform, (20, 10), region, frame) == (
+        (0, 5, 10, 5), (200, 100, 200, 100))
+    assert get_source_window(geo_transform, (20, 10), {
+        "north": 10.0, "south": 0.0, "east": 10.0, "west": 0.0}, frame) is None
+
+
+@pytest.mark.unittest
+def test_apply_color_table(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    colr_file = tmp_path / "elevation"
+    colr_file.write_text(COLR)
+    table = read_color_table(str(colr_file))
+
+    data = numpy.array([[0.0, 25.0, 75.0], [100.0, 150.0, numpy.nan]])
+    rgba = apply_color_table(numpy, data, ~numpy.isnan(data), table)
+    assert rgba.tolist() == [
+        [[0, 0, 0, 255], [0, 0, 128, 255], [128, 128, 255, 255]],
+        [[255, 255, 255, 255], [255, 0, 255, 255], [255, 0, 255, 0]]]
+
+
+@pytest.mark.unittest
+def test_render_raster_max_pixels(tmp_path):
+    options = {"width": 10000, "height": 10000}
+    with pytest.raises(RenderNotSupported):
+        render_raster(str(tmp_path), "elevation", options, max_pixels=4000000)
+
+
+class FakeBand:
+    def __init__(self, numpy):
+        self.numpy = numpy
+        self.buffer_size = None
+
+    def ReadAsArray(self, col, row, columns, rows, buffer_columns,
+                    buffer_rows):
+        self.buffer_size = (buffer_columns, buffer_rows)
+        return self.numpy.full((buffer_rows, buffer_columns), 25.0)
+
+    def GetNoDataValue(self):
+        return None
+
+
+class FakeDataset:
+    RasterXSize = 20
+    RasterYSize = 10
+
+    def __init__(self, band):
+        self.band = band
+
+    def GetGeoTransform(self):
+        return (0.0, 10.0, 0.0, 100.0, 0.0, -10.0)
+
+    def GetRasterBand(self, index):
+        return self.band
+
+
+class FakeGDAL:
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def Open(self, path):
+        return self.dataset
+
+    def GetLastErrorMsg(self):
+        return ""
+
+
+@pytest.mark.unittest
+def test_render_raster_region_inside_cell(tmp_path, monkeypatch):
+    numpy = pytest.importorskip("numpy")
+    (tmp_path / "colr").mkdir()
+    (tmp_path / "colr" / "elevation").write_text(COLR)
+    band = FakeBand(numpy)
+    gdal = FakeGDAL(FakeDataset(band))
+    monkeypatch.setattr(in_process_renderer, "_import_gdal",
+                        lambda: (gdal, numpy))
+    monkeypatch.setattr(in_process_renderer, "_encode_png",
+                        lambda gdal, rgba: rgba)
+
+    # A region of 0.001 m inside a 10 m cell is read as a single cell
+    options = {"width": 800, "height": 600, "n": 55.001, "s": 55.0,
+               "e": 55.001, "w": 55.0}
+    rgba = render_raster(str(tmp_path), "elevation", options,
+                         max_pixels=4000000)
+    assert band.buffer_size == (1, 1)
+    assert rgba.shape == (600, 800, 4)
+    assert rgba[0, 50].tolist() == [0, 0, 0, 0]
+    assert rgba[0, 100].tolist() == [0, 0, 128, 255]
+    assert rgba[300, 400].tolist() == [0, 0, 128, 255]
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Prometheus metrics unittest case
+"""
+import pytest
+
+from actinia_core.core import metrics
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def observe_all():
+    api_info = {"endpoint": "asyncephemeralresource"}
+    metrics.set_queue_size(waiting=3, running=2)
+    metrics.observe_job_start(api_info, accept_time=0.0)
+    metrics.observe_job_finish(None, "finished", start_time=0.0)
+    metrics.observe_module_run("/usr/bin/gdalinfo", 0.5)
+    metrics.observe_redis_call(b"get", 0.001)
+    metrics.count_download_cache_request(hit=True)
+    metrics.count_download_cache_request(hit=False)
+    metrics.observe_export("raster", 1024, 2.0)
+    metrics.update_worker_cpu_usage()
+
+
+@pytest.mark.unittest
+def test_metrics_without_prometheus(monkeypatch):
+    monkeypatch.setattr(metrics, "has_prometheus", False)
+    observe_all()
+    assert metrics.generate_metrics() is None
+
+
+class QueueDummy(list):
+
+    def put(self, data):
+        self.append(data)
+
+
+@pytest.mark.unittest
+def test_job_process_metrics(monkeypatch):
+    # Processes forked from the process queue manager send their observations
+    queue = QueueDummy()
+    monkeypatch.setattr(metrics, "has_prometheus", True)
+    monkeypatch.setattr(metrics, "metrics_queue", queue)
+    monkeypatch.setattr(metrics, "metrics_queue_pid", -1)
+    metrics.observe_module_run("/usr/bin/gdalinfo", 0.5)
+    metrics.observe_module_run("/usr/bin/gdalinfo", 0.5)
+    metrics.count_download_cache_request(hit=True)
+    assert [data[1:4] for data in queue] == [
+        ("module_run", ("gdalinfo",), 0.5), ("module_run", ("gdalinfo",), 0.5),
+        ("download_cache_requests", ("hit",), 1)]
+    assert all(metrics.is_metrics_message(data) for data in queue)
+    # The messages are unique in the set of the queue watcher
+    assert len(set(queue)) == 3
+    assert metrics.is_metrics_message("STOP") is False
+
+
+@pytest.mark.unittest
+def test_generate_metrics(monkeypatch):
+    pytest.importorskip("prometheus_client")
+    monkeypatch.delenv(metrics.MULTIPROC_DIR_VARIABLE, raising=False)
+    observe_all()
+    # An observation of a job process
+    metrics.record_metrics((metrics.METRICS_MESSAGE, "module_run",
+                            ("r.info",), 0.1, 1, 1))
+    data, content_type = metrics.generate_metrics()
+    data = data.decode()
+    assert content_type.startswith("text/plain")
+    assert "actinia_queue_waiting_jobs 3.0" in data
+    assert 'actinia_job_wait_seconds_count{endpoint=' \
+        '"asyncephemeralresource"}' in data
+    assert 'actinia_job_run_seconds_count{endpoint="unknown",' \
+        'status="finished"}' in data
+    assert 'actinia_module_run_seconds_count{module="gdalinfo"}' in data
+    assert 'actinia_module_run_seconds_count{module="r.info"}' in data
+    assert 'actinia_redis_call_seconds_count{command="GET"}' in data
+    assert 'actinia_download_cache_requests_total{result="hit"}' in data
+    assert 'actinia_export_bytes_total{type="raster"}' in data
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Parallel download unittest case
+"""
+import os
+import pytest
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.process_chain import ProcessChainConverter
+from actinia_core.core.geodata_download_importer import \
+    GeoDataDownloadImportSupport
+from actinia_core.core.parallel_download import ParallelDownloader, \
+    PendingDownloads
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.utils import get_download_process
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+CONTENT = os.urandom(256 * 1024)
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serve CONTENT for every path, supports range requests and tracks the
+    number of concurrent requests
+    """
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    ranges = []
+
+    def do_GET(self):
+        cls = RangeRequestHandler
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(0.1)
+            offset = 0
+            if "Range" in self.headers:
+                offset = int(self.headers["Range"][6:].split("-")[0])
+                cls.ranges.append(offset)
+            if offset >= len(CONTENT):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206 if offset > 0 else 200)
+            self.send_header("Content-Length", str(len(CONTENT) - offset))
+            self.end_headers()
+            self.wfile.write(CONTENT[offset:])
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeRequestHandler.max_active = 0
+    RangeRequestHandler.ranges = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%i" % httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.fixture
+def work_path():
+    work_path = tempfile.mkdtemp()
+    yield work_path
+    shutil.rmtree(work_path)
+
+
+@pytest.mark.unittest
+def test_parallel_download(server, work_path):
+    download_list = [[os.path.join(work_path, "band_%i.tif" % i),
+                      "%s/band_%i.tif" % (server, i)] for i in range(8)]
+    # A partial download is resumed
+    with open(download_list[0][0], "wb") as partial:
+        partial.write(CONTENT[:1000])
+
+    downloader = ParallelDownloader(max_connections=8,
+                                    max_connections_per_host=3)
+    start = time.perf_counter()
+    downloader.download(download_list)
+    run_time = time.perf_counter() - start
+
+    for target, _ in download_list:
+        with open(target, "rb") as band:
+            assert band.read() == CONTENT
+    assert RangeRequestHandler.ranges == [1000]
+    assert RangeRequestHandler.max_active == 3
+    # 8 requests of 0.1 seconds with 3 concurrent connections
+    assert run_time < 0.6
+    assert downloader.get_progress_message().startswith(
+        "Downloaded 8 of 8 files")
+
+
+@pytest.mark.unittest
+def test_download_processes_in_front(monkeypatch):
+    process_chain = {
+        "version": "1",
+        "list": [{
+            "id": "importer_1",
+            "module": "importer",
+            "inputs": [{"import_descr": {
+                "source": "https://example.com/%s.tif" % name,
+                "type": "raster"}, "param": "map", "value": name}
+                for name in ["dem", "slope"]]}]}
+
+    def get_download_import_commands(entry):
+        return [get_download_process(entry["value"] + ".tif",
+                                     entry["import_descr"]["source"]),
+                GeoDataDownloadImportSupport.get_raster_import_command(
+                    entry["value"] + ".tif", entry["value"])]
+
+    converter = ProcessChainConverter(config=Configuration())
+    monkeypatch.setattr(converter,
+                        "_get_raster_vector_file_download_import_command",
+                        get_download_import_commands)
+    process_list = converter.process_chain_to_process_list(process_chain)
+    assert [p.executable for p in process_list] == [
+        "download", "download", "r.import", "r.import"]
+
+
+@pytest.mark.unittest
+def test_pending_downloads(server, work_path):
+    downloads = [get_download_process(os.path.join(work_path, "%s.tif" % name),
+                                      "%s/%s.tif" % (server, name))
+                 for name in ["dem", "slope"]]
+    importer = GeoDataDownloadImportSupport.get_raster_import_command(
+        os.path.join(work_path, "slope.tif"), "slope")
+    user_process = Process(exec_type="grass", executable="r.info",
+                           executable_params=["map=slope"])
+
+    pending = PendingDownloads(ParallelDownloader())
+    pending.start(downloads)
+    try:
+        required = pending.get_required_futures(importer)
+        assert required == pending.futures[1:]
+        # A path that contains the name of a download does not require it
+        importer.executable_params[0] = "input=%s" % os.path.join(
+            work_path, "dem.tif.aux.xml")
+        assert pending.get_required_futures(importer) == []
+        importer.executable_params[0] = "input=/vsizip/%s/dem/dem.tif" % \
+            os.path.join(work_path, "dem.tif")
+        assert pending.get_required_futures(importer) == pending.futures[:1]
+        assert pending.get_required_futures(user_process) == pending.futures
+        for future in pending.futures:
+            future.result()
+        finished = pending.get_finished()
+        assert [(p.id, e) for p, e in finished] == [
+            (downloads[0].id, None), (downloads[1].id, None)]
+        assert pending.get_finished() == []
+    finally:
+        pending.downloader.shutdown()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Process chain cache unittest case
+"""
+import pytest
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.process_chain import ProcessChainConverter
+from actinia_core.core.redis_process_chain_cache import (
+    TEMP_FILE_PATH_PLACEHOLDER,
+    create_process_chain_cache_key,
+    create_process_chain_skeleton,
+    restore_process_chain_skeleton,
+    is_converter_unused
+)
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+process_chain = {
+    "version": "1",
+    "list": [
+        {"id": "slope",
+         "module": "r.slope.aspect",
+         "inputs": [{"param": "elevation", "value": "elevation@PERMANENT"}],
+         "outputs": [{"param": "slope", "value": "slope"}]},
+        {"id": "stats",
+         "exe": "cat",
+         "params": ["$file::stats"]}]}
+
+
+def create_converter(temp_file_path):
+    return ProcessChainConverter(config=Configuration(),
+                                 temp_file_path=temp_file_path,
+                                 process_dict={},
+                                 temporary_pc_files={},
+                                 required_mapsets=[],
+                                 resource_export_list=[],
+                                 output_parser_list=[])
+
+
+def create_credentials(cell_limit=1000000):
+    return {"user_role": "user",
+            "permissions": {"accessible_modules": ["r.slope.aspect", "cat"],
+                            "cell_limit": cell_limit}}
+
+
+def create_key(process_chain, credentials, user_id="user",
+               location_name="nc_spm_08"):
+    return create_process_chain_cache_key(process_chain, credentials, user_id,
+                                          location_name)
+
+
+@pytest.mark.unittest
+def test_process_chain_cache_key():
+    key = create_key(process_chain, create_credentials())
+    assert key == create_key(
+        dict(reversed(list(process_chain.items()))), create_credentials())
+    assert key != create_key(process_chain, create_credentials(cell_limit=10))
+    assert key != create_key(process_chain, create_credentials(),
+                             user_id="admin")
+    assert key != create_key(process_chain, create_credentials(),
+                             location_name="latlong")
+    assert create_key({"list": [object()]}, create_credentials()) is None
+
+
+@pytest.mark.unittest
+def test_process_chain_skeleton():
+    converter = create_converter("/actinia/tmp/job_a")
+    assert is_converter_unused(converter) is True
+    process_list = converter.process_chain_to_process_list(process_chain)
+    assert is_converter_unused(converter) is False
+    skeleton = create_process_chain_skeleton(converter, process_chain,
+                                             process_list)
+    assert b"/actinia/tmp/job_a" not in skeleton
+    assert TEMP_FILE_PATH_PLACEHOLDER.encode() in skeleton
+
+    cached_converter = create_converter("/actinia/tmp/job_b")
+    required_mapsets = cached_converter.required_mapsets
+    cached_chain, cached_list = restore_process_chain_skeleton(
+        cached_converter, skeleton, process_chain)
+    assert cached_chain == process_chain
+    assert cached_converter.required_mapsets is required_mapsets
+    assert required_mapsets == converter.required_mapsets
+    assert cached_converter.temp_file_count == converter.temp_file_count
+    assert cached_converter.temporary_pc_files == {
+        "stats": "/actinia/tmp/job_b/temp_file_1"}
+    assert [p.executable for p in cached_list] == \
+        [p.executable for p in process_list]
+    assert cached_list[1].executable_params == ["/actinia/tmp/job_b/temp_file_1"]
+    assert sorted(cached_converter.process_dict) == sorted(converter.process_dict)
+
+
+@pytest.mark.unittest
+def test_process_chain_skeleton_without_webhook_auth():
+    webhook_chain = dict(process_chain, webhooks={
+        "finished": "http://0.0.0.0:5005/webhook/finished",
+        "auth": "actinia:secret"})
+    converter = create_converter("/actinia/tmp/job_a")
+    process_list = converter.process_chain_to_process_list(process_chain)
+    converter.webhook_finished = webhook_chain["webhooks"]["finished"]
+    converter.webhook_auth = webhook_chain["webhooks"]["auth"]
+    skeleton = create_process_chain_skeleton(converter, webhook_chain,
+                                             process_list)
+    assert b"secret" not in skeleton
+    assert webhook_chain["webhooks"]["auth"] == "actinia:secret"
+
+    other_chain = dict(process_chain, webhooks={
+        "finished": "http://0.0.0.0:5005/webhook/finished",
+        "auth": "actinia:other"})
+    assert create_key(webhook_chain, create_credentials()) == \
+        create_key(other_chain, create_credentials())
+    cached_converter = create_converter("/actinia/tmp/job_b")
+    cached_chain, _ = restore_process_chain_skeleton(
+        cached_converter, skeleton, other_chain)
+    assert cached_converter.webhook_auth == "actinia:other"
+    assert cached_chain["webhooks"]["auth"] == "actinia:other"
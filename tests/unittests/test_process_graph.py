@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Process dependency graph unittest case
+"""
+import pytest
+import threading
+import time
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.process_chain import ProcessChainConverter
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.common.process_graph import get_process_dependencies, \
+    has_process_dependencies, remove_finished_dependencies
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.common.sentinel_processing_library import \
+    Sentinel2Processing
+from actinia_core.core.utils import get_download_process
+from actinia_core.rest.ephemeral_processing import EphemeralProcessing
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def create_process(id, depends_on=None):
+    return Process(exec_type="grass", executable="r.info",
+                   executable_params=["map=%s" % id], id=id,
+                   depends_on=depends_on)
+
+
+@pytest.mark.unittest
+def test_process_dependencies():
+    process_list = [get_download_process("/tmp/b1.tif", "https://a.b/b1.tif"),
+                    create_process("b1", []),
+                    create_process("b2", []),
+                    create_process("index", ["b1", "b2"]),
+                    create_process("colors")]
+    assert has_process_dependencies(process_list) is True
+    assert has_process_dependencies(process_list[4:]) is False
+    assert get_process_dependencies(process_list) == {
+        1: set(), 2: set(), 3: {1, 2}, 4: {1, 2, 3}}
+
+    with pytest.raises(AsyncProcessError, match="unknown process <b3>"):
+        get_process_dependencies([create_process("b1", ["b3"])])
+    with pytest.raises(AsyncProcessError, match="cyclic"):
+        get_process_dependencies([create_process("b1", ["b2"]),
+                                  create_process("b2", ["b1"])])
+
+
+@pytest.mark.unittest
+def test_sentinel2_import_dependencies():
+    sp = Sentinel2Processing(product_id="S2A_MSIL1C_20170212T104141",
+                             bands=["B04", "B08"], download_cache="/cache",
+                             send_resource_update=None, message_logger=None)
+    sp.gml_cache_file_name = "/cache/S2A_MSIL1C_20170212T104141.gml"
+    sp.timestamp = "2017-02-12T10:41:41.000Z"
+    sp.bbox = [7.0, 46.0, 8.0, 45.0]
+    for band in sp.bands:
+        sp.import_file_info[band] = ("/cache/%s.jp2" % band, band)
+    sp.move_process_ids["/cache/B04.jp2"] = "mv_B04.jp2"
+
+    process_list = sp.get_sentinel2_import_process_list()
+    process_dict = {p.id: p for p in process_list}
+    assert len(process_dict) == len(process_list)
+
+    product = sp.product_id
+    assert process_dict[f"gdal_translate_{product}_B04"].depends_on == [
+        "mv_B04.jp2"]
+    assert process_dict[f"gdal_translate_{product}_B08"].depends_on == []
+    assert process_dict[f"r_import_{product}_B08"].depends_on == [
+        f"gdal_translate_{product}_B08"]
+    # The cropping waits for all previous processes and runs sequentially
+    assert process_dict[f"set_g_region_to_{product}_B04"].depends_on is None
+    assert process_dict[f"set_g_region_to_{product}_B08"].depends_on == [
+        f"remove_mask_{product}_B04"]
+
+    # The cropping of the next product waits for the previous cropping
+    sp.product_id = "S2B_MSIL1C_20170213T104141"
+    process_list.extend(sp.get_sentinel2_import_process_list())
+    process_list.insert(0, Process(exec_type="exec", executable="/bin/mv",
+                                   executable_params=[], id="mv_B04.jp2",
+                                   skip_permission_check=True))
+    ids = [p.id for p in process_list]
+    dependencies = get_process_dependencies(process_list)
+    first_crop = ids.index(f"set_g_region_to_{sp.product_id}_B04")
+    assert ids.index(f"remove_mask_{product}_B08") in dependencies[first_crop]
+    assert dependencies[ids.index(f"r_import_{sp.product_id}_B04")] == {
+        ids.index(f"gdal_translate_{sp.product_id}_B04")}
+
+
+class ProcessingDummy(EphemeralProcessing):
+
+    def __init__(self, max_parallel):
+        self.config = Configuration()
+        self.config.PROCESS_MAX_PARALLEL = max_parallel
+        self.pending_downloads = None
+        self.process_lock = threading.Lock()
+        self.abort_event = threading.Event()
+        self.module_output_log = []
+        self.last_module = "r.info"
+        self.running = 0
+        self.max_running = 0
+        self.finished = []
+
+    def _execute_process(self, process):
+        with self.process_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            exclusive = self.last_module == "g.region"
+        try:
+            if process.id == "fail":
+                raise AsyncProcessError("Error while running <fail>")
+            start = time.time()
+            # Processes with higher ids finish first
+            while time.time() - start < 0.03 * (10 - len(process.id)):
+                if self.abort_event.is_set():
+                    raise AsyncProcessError("aborted")
+                if exclusive:
+                    assert self.running == 1
+                time.sleep(0.01)
+            with self.process_lock:
+                self.finished.append(process.id)
+                self.module_output_log.append({"id": process.id})
+                self.last_module = process.executable
+        finally:
+            with self.process_lock:
+                self.running -= 1
+
+
+@pytest.mark.unittest
+def test_execute_process_graph():
+    processing = ProcessingDummy(max_parallel=2)
+    processing._execute_process_graph(
+        [create_process("b%i" % i, []) for i in range(3)]
+        + [create_process("index", ["b0", "b1", "b2"]),
+           create_process("colors")], poll_time=0.01)
+    assert processing.max_running == 2
+    assert sorted(processing.finished[:3]) == ["b0", "b1", "b2"]
+    assert processing.finished[3:] == ["index", "colors"]
+
+    # The user module after g.region runs exclusively, the log is ordered
+    processing = ProcessingDummy(max_parallel=4)
+    region = Process(exec_type="grass", executable="g.region",
+                     executable_params=[], id="region")
+    processing._execute_process_graph(
+        [region, create_process("a", ["region"]),
+         create_process("bbbb", ["region"]), create_process("cc", ["region"])],
+        poll_time=0.01)
+    assert processing.finished == ["region", "a", "bbbb", "cc"]
+    assert processing.max_running == 2
+
+    processing = ProcessingDummy(max_parallel=4)
+    processing._execute_process_graph(
+        [create_process(id, []) for id in ["a", "bbb", "cc"]], poll_time=0.01)
+    assert processing.finished == ["bbb", "cc", "a"]
+    assert [plm["id"] for plm in processing.module_output_log] == [
+        "a", "bbb", "cc"]
+
+    processing = ProcessingDummy(max_parallel=4)
+    with pytest.raises(AsyncProcessError, match="<fail>"):
+        processing._execute_process_graph(
+            [create_process("fail", []), create_process("b1", []),
+             create_process("index")], poll_time=0.01)
+    assert processing.finished == []
+    assert processing.abort_event.is_set() is False
+
+
+def create_parallel_config():
+    config = Configuration()
+    config.PROCESS_MAX_PARALLEL = 4
+    return config
+
+
+@pytest.mark.unittest
+def test_infer_process_chain_dependencies():
+    process_chain = {
+        "version": "1",
+        "list": [
+            {"id": "region", "module": "g.region",
+             "inputs": [{"param": "raster", "value": "elevation@PERMANENT"}]},
+            {"id": "slope", "module": "r.slope.aspect",
+             "inputs": [{"param": "elevation", "value": "elevation@PERMANENT"}],
+             "outputs": [{"param": "slope", "value": "slope"}]},
+            {"id": "flow", "module": "r.watershed",
+             "inputs": [{"param": "elevation", "value": "elevation@PERMANENT"}],
+             "outputs": [{"param": "accumulation", "value": "accumulation"}]},
+            {"id": "sum", "module": "r.mapcalc",
+             "inputs": [{"param": "expression",
+                         "value": "sum = slope + log(accumulation)"}]},
+            {"id": "colors", "module": "r.colors",
+             "inputs": [{"param": "map", "value": "slope"},
+                        {"param": "color", "value": "slope"}]},
+            {"id": "univar", "module": "r.univar",
+             "inputs": [{"param": "map", "value": "elevation@PERMANENT"}],
+             "depends_on": ["sum"]},
+            {"id": "list", "exe": "/bin/ls"}]}
+
+    # The processes run in order by default
+    process_list = ProcessChainConverter(config=Configuration()).\
+        process_chain_to_process_list(process_chain)
+    assert has_process_dependencies(process_list) is False
+
+    converter = ProcessChainConverter(config=create_parallel_config())
+    process_list = converter.process_chain_to_process_list(process_chain)
+    assert {p.id: p.depends_on for p in process_list} == {
+        "region": None,
+        "slope": ["region"],
+        "flow": ["region"],
+        "sum": ["region", "slope", "flow"],
+        "colors": ["region", "slope", "sum"],
+        "univar": ["region", "sum"],
+        "list": None}
+
+    process_chain["list"][1]["depends_on"] = ["univar"]
+    with pytest.raises(AsyncProcessError, match="later process <univar>"):
+        ProcessChainConverter(config=create_parallel_config()).\
+            process_chain_to_process_list(process_chain)
+
+    # The processes run in order if interim results are saved
+    config = create_parallel_config()
+    config.SAVE_INTERIM_RESULTS = True
+    process_chain["list"][1].pop("depends_on")
+    process_list = ProcessChainConverter(config=config).\
+        process_chain_to_process_list(process_chain)
+    assert has_process_dependencies(process_list) is False
+
+
+@pytest.mark.unittest
+def test_resumed_process_list_dependencies():
+    process_chain = {
+        "version": "1",
+        "list": [
+            {"id": "slope", "module": "r.slope.aspect",
+             "inputs": [{"param": "elevation", "value": "elevation@PERMANENT"}],
+             "outputs": [{"param": "slope", "value": "slope"}]},
+            {"id": "flow", "module": "r.watershed",
+             "inputs": [{"param": "elevation", "value": "elevation@PERMANENT"}],
+             "outputs": [{"param": "accumulation", "value": "accumulation"}]},
+            {"id": "sum", "module": "r.mapcalc",
+             "inputs": [{"param": "expression",
+                         "value": "sum = slope + log(accumulation)"}]},
+            {"id": "colors", "module": "r.colors",
+             "inputs": [{"param": "map", "value": "sum"},
+                        {"param": "color", "value": "slope"}]}]}
+
+    converter = ProcessChainConverter(config=create_parallel_config())
+    process_list = converter.process_chain_to_process_list(process_chain)
+    # The job is resumed after the first two processes, see
+    # EphemeralProcessing._validate_process_chain()
+    finished_ids = set(p.id for p in process_list[:2])
+    del process_list[:2]
+    with pytest.raises(AsyncProcessError, match="unknown process <slope>"):
+        get_process_dependencies(process_list)
+
+    remove_finished_dependencies(process_list, finished_ids)
+    assert {p.id: p.depends_on for p in process_list} == {
+        "sum": [], "colors": ["sum"]}
+    assert get_process_dependencies(process_list) == {0: set(), 1: {0}}
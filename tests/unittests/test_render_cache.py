@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Render cache unittest case
+"""
+import os
+import pytest
+from flask import Flask
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.render_cache import add_render_cache_size, \
+    create_render_cache_key, get_map_stamps, get_render_cache_file, \
+    prune_render_cache, store_render_cache_file
+from actinia_core.rest.renderer_base import RendererBaseResource
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Configuration()
+    config.GRASS_DATABASE = str(tmp_path / "grassdb")
+    config.GRASS_USER_DATABASE = str(tmp_path / "userdata")
+    mapset_path = os.path.join(config.GRASS_DATABASE, "nc_spm_08",
+                               "PERMANENT")
+    for element in ["cellhd/elevation", "colr/elevation",
+                    "vector/roads/head", "vector/roads/coor"]:
+        os.makedirs(os.path.dirname(os.path.join(mapset_path, element)),
+                    exist_ok=True)
+        with open(os.path.join(mapset_path, element), "w") as output:
+            output.write(element)
+    return config
+
+
+@pytest.mark.unittest
+def test_render_cache_key(config):
+    assert get_map_stamps(config, "group", "nc_spm_08", "PERMANENT",
+                          "raster", "slope") is None
+    assert len(get_map_stamps(config, "group", "nc_spm_08", "PERMANENT",
+                              "vector", "roads")) == 2
+    stamps = get_map_stamps(config, "group", "nc_spm_08", "PERMANENT",
+                            "raster", "elevation")
+    assert len(stamps) == 2
+
+    key = create_render_cache_key("raster", {"width": 800, "height": 600},
+                                  stamps)
+    assert key == create_render_cache_key(
+        "raster", {"height": 600.0, "width": 800.0}, stamps)
+    assert key != create_render_cache_key(
+        "raster", {"width": 800, "height": 600, "n": 228500}, stamps)
+    assert key != create_render_cache_key(
+        "rgb", {"width": 800, "height": 600}, stamps)
+
+    # A modified color table changes the key
+    colr = os.path.join(config.GRASS_DATABASE, "nc_spm_08", "PERMANENT",
+                        "colr", "elevation")
+    os.utime(colr, ns=(0, 0))
+    assert key != create_render_cache_key(
+        "raster", {"width": 800, "height": 600},
+        get_map_stamps(config, "group", "nc_spm_08", "PERMANENT", "raster",
+                       "elevation"))
+
+
+@pytest.mark.unittest
+def test_render_cache_files(tmp_path):
+    cache_path = str(tmp_path / "render_cache")
+    for index, key in enumerate(["a1", "b2", "c3"]):
+        cache_file = store_render_cache_file(cache_path, key, b"x" * 100)
+        assert cache_file == get_render_cache_file(cache_path, key)
+        os.utime(cache_file, (index, index))
+    assert sorted(os.listdir(cache_path)) == ["a1", "b2", "c3"]
+
+    assert prune_render_cache(cache_path, 250) == 200
+    assert os.path.isfile(get_render_cache_file(cache_path, "a1")) is False
+    assert os.path.isfile(get_render_cache_file(cache_path, "b2"))
+    assert os.path.isfile(get_render_cache_file(cache_path, "c3"))
+
+    # The cache is scanned once and pruned if the estimated size exceeds
+    # the maximum size
+    add_render_cache_size(cache_path, 0, 350)
+    cache_file = store_render_cache_file(cache_path, "d4", b"x" * 100)
+    os.utime(cache_file, (3, 3))
+    add_render_cache_size(cache_path, 100, 350)
+    assert os.path.isfile(get_render_cache_file(cache_path, "b2"))
+    cache_file = store_render_cache_file(cache_path, "e5", b"x" * 100)
+    os.utime(cache_file, (4, 4))
+    add_render_cache_size(cache_path, 100, 350)
+    assert os.path.isfile(get_render_cache_file(cache_path, "b2")) is False
+    assert os.path.isfile(get_render_cache_file(cache_path, "e5"))
+
+
+@pytest.mark.unittest
+def test_conditional_image_response():
+    app = Flask(__name__)
+    with app.test_request_context("/render"):
+        response = RendererBaseResource.create_image_response(
+            b"png", "a1", 1000000000)
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"a1"'
+        assert response.headers["Last-Modified"] == \
+            "Sun, 09 Sep 2001 01:46:40 GMT"
+
+    with app.test_request_context(
+            "/render", headers={"If-None-Match": '"a1"'}):
+        response = RendererBaseResource.create_image_response(
+            b"png", "a1", 1000000000)
+        assert response.status_code == 304
+
+    with app.test_request_context(
+            "/render", headers={"If-Modified-Since":
+                                "Sun, 09 Sep 2001 01:46:40 GMT"}):
+        response = RendererBaseResource.create_image_response(
+            b"png", "b2", 1000000000)
+        assert response.status_code == 304
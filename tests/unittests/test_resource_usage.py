@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Process resource usage unittest case
+"""
+import os
+import pickle
+import pytest
+import subprocess
+import sys
+import time
+
+from actinia_core.core.resource_usage import aggregate_resource_usage, \
+    is_process_finished, reap_process
+from actinia_core.models.response_models import ProcessLogModel, \
+    create_response_from_model
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+@pytest.mark.unittest
+def test_reap_process():
+    proc = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys; sum(range(3000000)); sys.exit(3)"])
+    while is_process_finished(proc) is False:
+        time.sleep(0.01)
+
+    resource_usage = reap_process(proc)
+    assert proc.returncode == 3
+    assert proc.wait() == 3
+    assert resource_usage["cpu_user_time"] > 0
+    assert resource_usage["max_rss"] > 1024 * 1024
+    if os.path.exists("/proc/self/io"):
+        assert "read_bytes" in resource_usage
+    # The process is reaped only once
+    assert reap_process(proc) is None
+
+
+@pytest.mark.unittest
+def test_aggregate_resource_usage():
+    process_log = []
+    for cpu, rss in [(1.5, 300), (0.5, 500)]:
+        plm = ProcessLogModel(executable="r.info", parameter=[], stdout="",
+                              stderr=[], return_code=0)
+        plm["resource_usage"] = {"cpu_user_time": cpu, "max_rss": rss,
+                                 "write_bytes": 10}
+        process_log.append(plm)
+    assert aggregate_resource_usage(process_log) == {
+        "cpu_user_time": 2.0, "max_rss": 500, "write_bytes": 20}
+    assert aggregate_resource_usage(["log"]) is None
+
+    _, response_model = pickle.loads(create_response_from_model(
+        status="finished", user_id="user", resource_id="resource_id-1",
+        process_log=process_log, message="finished", orig_time=time.time(),
+        orig_datetime="now"))
+    assert response_model["resource_usage"]["max_rss"] == 500
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+
+"""
+Tests: STAC importer unittest case
+"""
+import json
+import pytest
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from actinia_core.core.stac_importer_interface import STACImporter
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+NUM_ITEMS = 250
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """A STAC search endpoint with page numbers at /search and with tokens at
+    /token/search, the last item of each page is repeated on the next page
+    """
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.path, body))
+        limit = body["limit"]
+        if self.path == "/search":
+            page = body.get("page", 1)
+            next_body = {"page": page + 1}
+        else:
+            page = body.get("token", 1)
+            next_body = {"token": page + 1}
+        start = max(0, (page - 1) * limit - 1)
+        features = [{"id": "item_%i" % i, "assets": {}}
+                    for i in range(start, min(page * limit, NUM_ITEMS))]
+        result = {"type": "FeatureCollection", "features": features,
+                  "links": []}
+        if self.path == "/search":
+            result["numberMatched"] = NUM_ITEMS
+        if page * limit < NUM_ITEMS:
+            result["links"].append({"rel": "next", "method": "POST",
+                                    "href": "http://%s%s" % (
+                                        self.headers["Host"], self.path),
+                                    "body": next_body, "merge": True})
+        data = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DictCache(object):
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, items, expiration):
+        self.entries[key] = items
+
+
+@pytest.fixture
+def server():
+    SearchRequestHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SearchRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%i" % httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("path", ["/search", "/token/search"])
+def test_stac_search_paging(server, path):
+    cache = DictCache()
+    importer = STACImporter(search_cache=cache, search_cache_ttl=60)
+    result = importer._apply_filter(server + path, "sentinel-s2-l2a-cogs",
+                                    None, [30.1, -16.3, 42.8, -0.2], None)
+
+    assert [f["id"] for f in result["features"]] == [
+        "item_%i" % i for i in range(NUM_ITEMS)]
+    assert sorted(body.get("page", body.get("token", 1))
+                  for _, body in SearchRequestHandler.requests) == [1, 2, 3]
+    assert all(body["collections"] == ["sentinel-s2-l2a-cogs"]
+               for _, body in SearchRequestHandler.requests)
+
+    # The search of a follow up job is read from the cache
+    importer = STACImporter(search_cache=cache, search_cache_ttl=60)
+    assert importer._apply_filter(server + path, "sentinel-s2-l2a-cogs",
+                                  None, [30.1, -16.3, 42.8, -0.2],
+                                  None) == result
+    assert len(SearchRequestHandler.requests) == 3
+
+
+@pytest.mark.unittest
+def test_stac_import_processes():
+    stac_result = {"B04": {"item_1": "https://example.com/item_1/B04.tif",
+                           "item_2": "https://example.com/item_2/B04.tif"}}
+    processes = STACImporter._get_import_processes(
+        "sentinel-s2-l2a-cogs", stac_result, "download", "/tmp/job")
+    assert [p.executable for p in processes] == [
+        "download", "download", "r.in.gdal", "r.in.gdal"]
+    assert processes[0].executable_params == [
+        "/tmp/job/sentinel-s2-l2a-cogs_B04_item_1.tif",
+        "https://example.com/item_1/B04.tif"]
+    assert processes[2].executable_params == [
+        "input=/tmp/job/sentinel-s2-l2a-cogs_B04_item_1.tif",
+        "output=sentinel-s2-l2a-cogs_B04_item_1", "-o"]
+
+    processes = STACImporter._get_import_processes(
+        "sentinel-s2-l2a-cogs", stac_result, "region", "/tmp/job")
+    assert [p.executable for p in processes] == ["r.in.gdal", "r.in.gdal"]
+    assert processes[0].executable_params[0] == \
+        "input=/vsicurl/https://example.com/item_1/B04.tif"
+    assert "-r" in processes[0].executable_params
+
+    # The assets are read with /vsicurl/ by default
+    processes = STACImporter._get_import_processes(
+        "sentinel-s2-l2a-cogs", stac_result, None, "/tmp/job")
+    assert [p.executable for p in processes] == ["r.in.gdal", "r.in.gdal"]
+    assert processes[0].executable_params == [
+        "input=/vsicurl/https://example.com/item_1/B04.tif",
+        "output=sentinel-s2-l2a-cogs_B04_item_1", "-o"]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Raster map tile cache unittest case
+"""
+import os
+import pytest
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.tile_cache import check_tile_index, \
+    find_raster_map, get_raster_cache_key, get_raster_tile_cache_path, \
+    get_seed_tiles, get_tile_file, get_tile_region, read_raster_header, \
+    remove_outdated_tiles
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+CELLHD = """proj:       99
+zone:       0
+north:      228500
+south:      215000
+east:       645000
+west:       630000
+cols:       1500
+rows:       1350
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Configuration()
+    config.GRASS_DATABASE = str(tmp_path / "grassdb")
+    config.GRASS_USER_DATABASE = str(tmp_path / "userdata")
+    config.TILE_CACHE = str(tmp_path / "tile_cache")
+    mapset_path = os.path.join(config.GRASS_DATABASE, "nc_spm_08",
+                               "PERMANENT")
+    for element in ["cellhd", "colr"]:
+        os.makedirs(os.path.join(mapset_path, element))
+        with open(os.path.join(mapset_path, element, "elevation"), "w") \
+                as output:
+            output.write(CELLHD)
+    return config
+
+
+@pytest.mark.unittest
+def test_raster_map_cache_key(config):
+    assert find_raster_map(config, "group", "nc_spm_08", "PERMANENT",
+                           "slope") == (None, None)
+    database, mapset_path = find_raster_map(
+        config, "group", "nc_spm_08", "PERMANENT", "elevation")
+    assert database == "global"
+    assert read_raster_header(mapset_path, "elevation") == {
+        "north": 228500.0, "south": 215000.0, "east": 645000.0,
+        "west": 630000.0}
+    with pytest.raises(AsyncProcessError, match="<slope>"):
+        read_raster_header(mapset_path, "slope")
+
+    cache_path = get_raster_tile_cache_path(
+        config, database, "nc_spm_08", "PERMANENT", "elevation", "group")
+    assert cache_path == os.path.join(config.TILE_CACHE, "global",
+                                      "nc_spm_08", "PERMANENT", "elevation")
+
+    # A new color table invalidates the tiles
+    key = get_raster_cache_key(mapset_path, "elevation")
+    assert get_raster_cache_key(mapset_path, "elevation") == key
+    colr = os.path.join(mapset_path, "colr", "elevation")
+    mtime = os.stat(colr).st_mtime
+    os.utime(colr, (mtime + 10, mtime + 10))
+    new_key = get_raster_cache_key(mapset_path, "elevation")
+    assert new_key != key
+
+    for cache_key in [key, new_key]:
+        tile_file = get_tile_file(cache_path, cache_key, 1, 0, 1)
+        os.makedirs(os.path.dirname(tile_file))
+        open(tile_file, "w").close()
+    remove_outdated_tiles(cache_path, new_key)
+    assert os.listdir(cache_path) == [new_key]
+
+
+@pytest.mark.unittest
+def test_tile_grid():
+    extent = {"north": 228500.0, "south": 215000.0, "east": 645000.0,
+              "west": 630000.0}
+    assert get_tile_region(extent, 0, 0, 0) == [
+        228500.0, 213500.0, 645000.0, 630000.0]
+    assert get_tile_region(extent, 1, 1, 1) == [
+        221000.0, 213500.0, 645000.0, 637500.0]
+
+    check_tile_index(2, 3, 0, max_zoom=20)
+    with pytest.raises(AsyncProcessError, match="does not exist"):
+        check_tile_index(2, 4, 0, max_zoom=20)
+    with pytest.raises(AsyncProcessError, match="zoom level"):
+        check_tile_index(21, 0, 0, max_zoom=20)
+
+    tiles = get_seed_tiles(0, 2, max_tiles=21)
+    assert len(tiles) == 21
+    assert tiles[:2] == [(0, 0, 0), (1, 0, 0)]
+    with pytest.raises(AsyncProcessError, match="contains 85 tiles"):
+        get_seed_tiles(0, 3, max_tiles=21)
+    with pytest.raises(AsyncProcessError, match="is wrong"):
+        get_seed_tiles(3, 2, max_tiles=21)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: Tile-parallel execution unittest case
+"""
+import pytest
+
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.grass_region import GrassRegion
+from actinia_core.core.tiling import get_tiles, get_tiling_settings, \
+    split_tiled_process_list, get_process_chain_outputs, \
+    get_tiled_raster_outputs
+from actinia_core.core.utils import get_download_process
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def create_region():
+    return GrassRegion({"proj": "99", "north": "50", "south": "0",
+                        "east": "40", "west": "0", "rows": "5", "cols": "4"})
+
+
+@pytest.mark.unittest
+def test_tiling_settings():
+    assert get_tiling_settings({"version": "1", "list": []}) is None
+    assert get_tiling_settings({"tiling": {"tile_size": "100"}}) == {
+        "tile_size": 100, "overlap": 0}
+    with pytest.raises(AsyncProcessError, match="missing"):
+        get_tiling_settings({"tiling": {"overlap": 3}})
+    with pytest.raises(AsyncProcessError, match="positive"):
+        get_tiling_settings({"tiling": {"tile_size": 100, "overlap": -1}})
+
+
+@pytest.mark.unittest
+def test_split_tiled_process_list():
+    download = get_download_process("/tmp/dem.tif", "https://a.b/dem.tif")
+    importer = Process(exec_type="grass", executable="r.import",
+                       executable_params=["input=/tmp/dem.tif", "output=dem"],
+                       skip_permission_check=True)
+    region = Process(exec_type="grass", executable="g.region",
+                     executable_params=["raster=dem"], id="region")
+    slope = Process(exec_type="grass", executable="r.slope.aspect",
+                    executable_params=["elevation=dem", "slope=slope"],
+                    id="slope")
+    univar = Process(exec_type="grass", executable="r.univar",
+                     executable_params=["map=slope"], id="univar")
+
+    assert split_tiled_process_list(
+        [download, importer, region, slope], ["r.slope.aspect"]) == (
+        [download, importer, region], [slope])
+    with pytest.raises(AsyncProcessError, match="<univar>"):
+        split_tiled_process_list([region, slope, univar], ["r.slope.aspect"])
+    with pytest.raises(AsyncProcessError, match="<slope>"):
+        split_tiled_process_list([region, slope], ["r.slope.aspect"],
+                                 stdout_process_ids=["slope"])
+
+
+@pytest.mark.unittest
+def test_tiled_mapcalc_expressions():
+    def create_mapcalc(expression):
+        return Process(exec_type="grass", executable="r.mapcalc",
+                       executable_params=["expression=%s" % expression],
+                       id="mapcalc")
+
+    mapcalc = create_mapcalc("sum = dem + 2 * slope")
+    assert split_tiled_process_list([mapcalc], ["r.mapcalc"]) == ([], [mapcalc])
+    for expression in ["index = row() * ncols() + col()", "east = x()",
+                       "noise = rand(0, 10)", "diff = dem - dem[-1,0]"]:
+        with pytest.raises(AsyncProcessError, match="<mapcalc>"):
+            split_tiled_process_list([create_mapcalc(expression)],
+                                     ["r.mapcalc"])
+
+
+@pytest.mark.unittest
+def test_tiled_raster_outputs():
+    process_chain = {"version": "1", "list": [
+        {"id": "slope", "module": "r.slope.aspect",
+         "inputs": [{"param": "elevation", "value": "dem"}],
+         "outputs": [{"param": "slope", "value": "slope"},
+                     {"param": "aspect", "value": "aspect",
+                      "export": {"format": "GTiff", "type": "raster"}}]},
+        {"id": "mapcalc", "module": "r.mapcalc",
+         "inputs": [{"param": "expression",
+                     "value": "steep = slope > 30; flat = slope < 2"}]}]}
+    slope = Process(exec_type="grass", executable="r.slope.aspect",
+                    executable_params=["elevation=dem", "slope=slope",
+                                       "aspect=aspect"], id="slope")
+    mapcalc = Process(exec_type="grass", executable="r.mapcalc",
+                      executable_params=[
+                          "expression=steep = slope > 30; flat = slope < 2"],
+                      id="mapcalc")
+
+    outputs = get_process_chain_outputs(process_chain)
+    assert get_tiled_raster_outputs([slope, mapcalc], outputs) == [
+        "slope", "aspect", "steep", "flat"]
+
+    process_chain["list"][0]["outputs"][1]["export"]["type"] = "vector"
+    outputs = get_process_chain_outputs(process_chain)
+    with pytest.raises(AsyncProcessError, match="<aspect> is no raster map"):
+        get_tiled_raster_outputs([slope, mapcalc], outputs)
+
+    process_chain["list"][0].pop("outputs")
+    outputs = get_process_chain_outputs(process_chain)
+    with pytest.raises(AsyncProcessError, match="no declared raster output"):
+        get_tiled_raster_outputs([slope, mapcalc], outputs)
+
+
+@pytest.mark.unittest
+def test_tiles():
+    region = create_region()
+    tiles = get_tiles(region, tile_size=3)
+    assert len(tiles) == 4
+    assert all(core == extended for core, extended in tiles)
+    assert tiles[3][0] == ["n=20", "s=0", "w=30", "e=40", "rows=2", "cols=1"]
+
+    # The overlap is clipped at the border of the region
+    core, extended = get_tiles(region, tile_size=2, overlap=1)[3]
+    assert core == ["n=30", "s=10", "w=20", "e=40", "rows=2", "cols=2"]
+    assert extended == ["n=40", "s=0", "w=10", "e=40", "rows=4", "cols=3"]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+
+"""
+Tests: URL check unittest case
+"""
+import pytest
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from actinia_core.core.common.config import Configuration
+from actinia_core.core.common.exceptions import AsyncProcessError
+from actinia_core.core.common.process_chain import ProcessChainConverter
+from actinia_core.core.geodata_download_importer import \
+    GeoDataDownloadImportSupport
+from actinia_core.core.url_check import UrlChecker
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+TIFF = b"II*\x00" + b"\x00" * 4096
+
+
+class TiffRequestHandler(BaseHTTPRequestHandler):
+    """Serve a tiff file for every path that ends with .tif"""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Range")))
+        time.sleep(0.2)
+        if not self.path.endswith(".tif"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("Content-Length", "256")
+        self.send_header("ETag", '"%s"' % self.path)
+        self.end_headers()
+        self.wfile.write(TIFF[:256])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DictCache(object):
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def set(self, url, result, expiration):
+        self.entries[url] = result
+
+
+@pytest.fixture
+def server():
+    TiffRequestHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), TiffRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%i" % httpd.server_address[1]
+    httpd.shutdown()
+
+
+@pytest.mark.unittest
+def test_check_urls(server):
+    url_list = ["%s/band_%i.tif" % (server, i) for i in range(6)]
+    cache = DictCache()
+    checker = UrlChecker(max_connections=6, cache=cache, cache_ttl=60)
+    start = time.perf_counter()
+    results = checker.check_urls(url_list + [server + "/missing"])
+    assert time.perf_counter() - start < 0.6
+    checker.close()
+
+    assert [r["mime_type"] for r in results] == ["image/tiff"] * 6 + [None]
+    assert results[0]["headers"]["ETag"] == '"/band_0.tif"'
+    assert results[-1]["status_code"] == 404
+    # A single ranged request per URL, only accessible URLs are cached
+    assert len(TiffRequestHandler.requests) == 7
+    assert set(r for _, r in TiffRequestHandler.requests) == {"bytes=0-255"}
+    assert sorted(cache.entries) == sorted(url_list)
+
+    # Following checks use the cache
+    checker = UrlChecker(cache=cache, cache_ttl=60)
+    assert checker.check_urls(url_list) == results[:-1]
+    assert len(TiffRequestHandler.requests) == 7
+
+
+@pytest.mark.unittest
+def test_importer_check_urls(server):
+    def create_importer(url_list):
+        return GeoDataDownloadImportSupport(
+            config=Configuration(), temp_file_path="/tmp",
+            download_cache="/tmp", send_resource_update=None,
+            message_logger=None, url_list=url_list)
+
+    importer = create_importer([server + "/elevation.tif"])
+    importer._check_urls()
+    assert importer.detected_mime_types == ["image/tiff"]
+    assert importer.download_cache_keys[0] is not None
+
+    with pytest.raises(AsyncProcessError):
+        create_importer([server + "/missing"])._check_urls()
+
+
+@pytest.mark.unittest
+def test_region_import_mode(server):
+    process_chain = {
+        "version": "1",
+        "list": [{
+            "id": "importer_1",
+            "module": "importer",
+            "inputs": [{"import_descr": {"source": server + "/dem.tif",
+                                         "type": "raster",
+                                         "import_mode": "region"},
+                        "param": "map", "value": "dem"}]}]}
+
+    converter = ProcessChainConverter(config=Configuration())
+    process_list = converter.process_chain_to_process_list(process_chain)
+    assert [p.executable for p in process_list] == ["r.import"]
+    assert process_list[0].executable_params == [
+        "input=/vsicurl/%s/dem.tif" % server, "output=dem", "--q",
+        "extent=region"]
+
+    # The region import runs after the region was set
+    process_chain["list"].insert(0, {
+        "id": "g_region_1", "module": "g.region",
+        "inputs": [{"param": "n", "value": "10"}]})
+    process_chain["list"].append({
+        "id": "r_info_1", "module": "r.info",
+        "inputs": [{"param": "map", "value": "dem"}]})
+    converter = ProcessChainConverter(config=Configuration())
+    process_list = converter.process_chain_to_process_list(process_chain)
+    assert [p.executable for p in process_list] == [
+        "g.region", "r.import", "r.info"]
+
+    process_chain["list"][1]["inputs"][0]["import_descr"]["type"] = "vector"
+    with pytest.raises(AsyncProcessError):
+        ProcessChainConverter(config=Configuration()).\
+            process_chain_to_process_list(process_chain)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#######
+# actinia-core - an open source REST API for scalable, distributed, high
+# performance processing of geographical data that uses GRASS GIS for
+# computational tasks. For details, see https://actinia.mundialis.de/
+#
+# Copyright (c) 2016-2022 Sören Gebbert and mundialis GmbH & Co. KG
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#######
+
+"""
+Tests: User permissions unittest case and process chain validation benchmark
+"""
+import os
+import pytest
+import shutil
+import tempfile
+
+from actinia_core.core.common.config import Configuration, white_list
+from actinia_core.core.common.process_chain import ProcessChainConverter
+from actinia_core.rest.user_auth import (
+    UserPermissions,
+    check_location_mapset_module_access
+)
+
+__license__ = "GPLv3"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016-2022, Sören Gebbert and mundialis GmbH & Co. KG"
+__maintainer__ = "mundialis GmbH & Co. KG"
+
+
+def create_credentials(role="user"):
+    return {
+        "user_role": role,
+        "permissions": {
+            "accessible_datasets": {"nc_spm_08": ["PERMANENT", "landsat"],
+                                    "ECAD": None},
+            "accessible_modules": list(white_list),
+            "process_num_limit": 1000,
+            "process_time_limit": 600,
+            "cell_limit": 1000000}}
+
+
+@pytest.fixture
+def config():
+    grass_data_base = tempfile.mkdtemp()
+    for mapset in ["PERMANENT", "landsat", "modis"]:
+        os.makedirs(os.path.join(grass_data_base, "nc_spm_08", mapset))
+    os.makedirs(os.path.join(grass_data_base, "ECAD", "PERMANENT"))
+    config = Configuration()
+    config.GRASS_DATABASE = grass_data_base
+    yield config
+    shutil.rmtree(grass_data_base)
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("kwargs,status", [
+    ({"module_name": "r.slope.aspect"}, None),
+    ({"module_name": "rm"}, 401),
+    ({"location_name": "nc_spm_08", "mapset_name": "landsat"}, None),
+    ({"location_name": "nc_spm_08", "mapset_name": "modis"}, 401),
+    ({"location_name": "nc_spm_08", "mapset_name": "user_mapset"}, None),
+    ({"location_name": "ECAD", "mapset_name": "PERMANENT"}, 401),
+    ({"location_name": "latlong"}, None),
+    ({"mapset_name": "PERMANENT"}, 500)
+])
+def test_user_permissions(config, kwargs, status):
+    permissions = UserPermissions(create_credentials(), config)
+    resp = permissions.check_location_mapset_module_access(**kwargs)
+    assert resp == check_location_mapset_module_access(
+        create_credentials(), config, **kwargs)
+    if status is None:
+        assert resp is None
+    else:
+        assert resp[0] == status
+    admin_permissions = UserPermissions(create_credentials("admin"), config)
+    assert admin_permissions.check_location_mapset_module_access(**kwargs) is None
+
+
+@pytest.mark.unittest
+def test_user_permissions_memoised(config):
+    permissions = UserPermissions(create_credentials(), config)
+    resp = permissions.check_location_mapset_module_access(
+        location_name="nc_spm_08", mapset_name="modis")
+    assert resp is permissions.check_location_mapset_module_access(
+        location_name="nc_spm_08", mapset_name="modis")
+
+
+@pytest.mark.unittest
+def test_validation_large_process_chain(config):
+    """Check the conversion and the permission checks of a process chain
+    with 1000 steps, as allowed by the default PROCESS_NUM_LIMIT
+    """
+    modules = sorted(set(white_list) - {"importer", "exporter"})
+    process_chain = {"version": "1", "list": [
+        {"id": "step_%i" % i, "module": modules[i % len(modules)],
+         "inputs": [{"param": "input", "value": "elevation@PERMANENT"}],
+         "outputs": [{"param": "output", "value": "result_%i" % i}]}
+        for i in range(1000)]}
+
+    converter = ProcessChainConverter(config=config)
+    process_list = converter.process_chain_to_process_list(process_chain)
+    permissions = UserPermissions(create_credentials(), config)
+    for process in process_list:
+        assert permissions.check_location_mapset_module_access(
+            module_name=process.executable) is None
+    for mapset in converter.required_mapsets:
+        assert permissions.check_location_mapset_module_access(
+            location_name="nc_spm_08", mapset_name=mapset) is None
+    assert len(process_list) == 1000
+    assert permissions.check_location_mapset_module_access(
+        location_name="nc_spm_08", mapset_name="modis")[0] == 401
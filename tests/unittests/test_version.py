@@ -29,6 +29,7 @@ import pytest
 import re
 import unittest
 
+from actinia_core import version
 from actinia_core.version import (
     find_running_since_info,
     find_additional_version_info,
@@ -110,3 +111,34 @@ def test_find_additional_version_info(env_value, expected):
             del os.environ['ACTINIA_ADDITIONAL_VERSION_INFO']
     test = find_additional_version_info()
     assert test == expected, "Additional version is not right"
+
+
+@pytest.mark.unittest
+def test_grass_version_cache(tmp_path, monkeypatch):
+    grass_gis_base = tmp_path / "grass"
+    grass_gis_base.mkdir()
+    monkeypatch.setattr(version.global_config, "GRASS_GIS_BASE",
+                        str(grass_gis_base))
+    monkeypatch.setattr(version.global_config, "TMP_WORKDIR",
+                        str(tmp_path / "tmp"))
+    monkeypatch.setattr(version, "G_VERSION", {})
+    calls = []
+
+    def detect_grass_version():
+        calls.append(1)
+        return {"version": "8.0.%i" % len(calls)}
+
+    monkeypatch.setattr(version, "detect_grass_version", detect_grass_version)
+    assert version.get_grass_version() == {"version": "8.0.1"}
+    # The version is cached in memory and on disk
+    assert version.get_grass_version() == {"version": "8.0.1"}
+    version.G_VERSION.clear()
+    assert version.get_grass_version() == {"version": "8.0.1"}
+    assert len(calls) == 1
+
+    # A changed installation invalidates the cache
+    version.G_VERSION.clear()
+    mtime = grass_gis_base.stat().st_mtime
+    os.utime(grass_gis_base, (mtime + 10, mtime + 10))
+    assert version.get_grass_version() == {"version": "8.0.2"}
+    assert len(calls) == 2